@@ -315,6 +315,30 @@ def initialize_services(app):
     from .services.websocket_service import WebSocketService
     websocket_service = WebSocketService()
     websocket_service.init_app(app)
+
+    # Ingestion temps réel des frames biométriques
+    from .services.biometric_stream_service import BiometricStreamService
+    BiometricStreamService().init_app(app)
+
+    # Écriture asynchrone des logs d'audit
+    from .services.audit_writer import get_audit_writer
+    get_audit_writer().init_app(app)
+
+    # Historique de connexion (écriture groupée, GeoIP partagé)
+    from .services.login_telemetry import get_login_telemetry
+    get_login_telemetry().init_app(app)
+
+    # Traitement différé des webhooks Stripe
+    from .services.stripe_webhook_service import get_stripe_webhook_processor
+    get_stripe_webhook_processor().init_app(app)
+
+    # Indexation des documents de connaissance des assistants IA
+    from .services.assistant_document_index import get_assistant_document_index
+    get_assistant_document_index().init_app(app)
+
+    # Résumé glissant des conversations d'assistants (hors requête)
+    from .services.assistant_conversation_service import get_assistant_conversation_store
+    get_assistant_conversation_store().init_app(app)
     
     initialize_email_template_service(app)
     init_avatar_service(socketio)
@@ -7,7 +7,7 @@ import uuid
 import redis
 from werkzeug.local import LocalProxy
 from ..models.user import User
-from ..models.login_history import LoginHistory
+from ..services.login_telemetry import get_login_telemetry
 from .. import db
 
 # Définir une fonction pour obtenir le client Redis
@@ -131,42 +131,28 @@ def record_login_attempt(user_id, status, error_message=None):
     """
     Enregistre une tentative de connexion dans l'historique
     
+    L'écriture est différée (lots écrits par un thread dédié) ; appareil et
+    localisation sont résolus hors de la requête.
+    
     Args:
         user_id (str): ID de l'utilisateur
         status (str): 'success' ou 'failed'
         error_message (str, optional): Message d'erreur en cas d'échec
     """
     try:
-        # Récupérer l'adresse IP
-        ip_address = request.remote_addr
-        
-        # Déterminer l'appareil (user agent)
-        user_agent = request.headers.get('User-Agent', '')
-        device = parse_user_agent(user_agent)
-        
-        # Déterminer la localisation (si possible)
-        location = get_location_from_ip(ip_address)
-        
-        # Créer l'entrée d'historique
-        login_entry = LoginHistory(
-            user_id=user_id,
-            ip_address=ip_address,
-            device=device,
-            location=location,
-            status=status,
-            timestamp=datetime.utcnow()
+        get_login_telemetry().record(
+            user_id,
+            status,
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent', '')
         )
-        
-        db.session.add(login_entry)
-        db.session.commit()
-        
     except Exception as e:
         current_app.logger.error(f"Erreur lors de l'enregistrement de la tentative de connexion: {str(e)}")
         db.session.rollback()
 
 def parse_user_agent(user_agent_string):
     """
-    Analyse l'user agent pour déterminer l'appareil
+    Analyse l'user agent pour déterminer l'appareil (résultats en cache)
     
     Args:
         user_agent_string (str): Chaîne User-Agent
@@ -174,32 +160,11 @@ def parse_user_agent(user_agent_string):
     Returns:
         str: Description de l'appareil
     """
-    # Version simple pour la démonstration
-    # Dans une implémentation réelle, utilisez une bibliothèque comme user-agents
-    if 'Mobile' in user_agent_string:
-        if 'iPhone' in user_agent_string:
-            return 'iPhone'
-        elif 'Android' in user_agent_string:
-            return 'Android'
-        else:
-            return 'Mobile'
-    elif 'Tablet' in user_agent_string:
-        return 'Tablet'
-    else:
-        if 'Chrome' in user_agent_string:
-            return 'Chrome/Desktop'
-        elif 'Firefox' in user_agent_string:
-            return 'Firefox/Desktop'
-        elif 'Safari' in user_agent_string:
-            return 'Safari/Desktop'
-        elif 'Edge' in user_agent_string:
-            return 'Edge/Desktop'
-        else:
-            return 'Desktop'
+    return get_login_telemetry().device(user_agent_string or '')
 
 def get_location_from_ip(ip_address):
     """
-    Détermine la localisation à partir de l'adresse IP
+    Détermine la localisation à partir de l'adresse IP (lecteur GeoIP partagé, résultats en cache)
     
     Args:
         ip_address (str): Adresse IP
@@ -207,31 +172,7 @@ def get_location_from_ip(ip_address):
     Returns:
         str: Localisation (ville, pays)
     """
-    try:
-        # Pour les réseaux locaux, retourner une valeur connue
-        if ip_address == '127.0.0.1' or ip_address.startswith('192.168.') or ip_address.startswith('10.'):
-            return 'Réseau local'
-        
-        # Intégration avec un service de géolocalisation (optionnel)
-        # Cette partie peut être étendue avec un service réel comme MaxMind GeoIP
-        
-        # Exemple de code pour MaxMind GeoIP (nécessite geoip2 et une base de données)
-        geoip_db_path = current_app.config.get('GEOIP_DB_PATH')
-        if geoip_db_path:
-            try:
-                import geoip2.database
-                with geoip2.database.Reader(geoip_db_path) as reader:
-                    response = reader.city(ip_address)
-                    if response.city.name and response.country.name:
-                        return f"{response.city.name}, {response.country.name}"
-            except Exception:
-                pass
-        
-        # Si on ne peut pas déterminer la localisation, retourner une valeur par défaut
-        return 'Localisation inconnue'
-    except Exception as e:
-        current_app.logger.error(f"Erreur lors de la détermination de la localisation: {str(e)}")
-        return 'Localisation inconnue'
+    return get_login_telemetry().locate(ip_address)
 
 def create_token(user_id, role="user", expires_in=24):
     """
@@ -462,18 +403,13 @@ def record_api_access(endpoint_name=None):
             user = get_current_user()
             if user:
                 try:
-                    # Enregistrer l'accès à l'API
-                    endpoint = endpoint_name or request.endpoint
-                    login_entry = LoginHistory(
-                        user_id=user.id,
+                    # Enregistrer l'accès à l'API (écriture différée)
+                    get_login_telemetry().record(
+                        user.id,
+                        'api_access',
                         ip_address=request.remote_addr,
-                        device=parse_user_agent(request.headers.get('User-Agent', '')),
-                        location=get_location_from_ip(request.remote_addr),
-                        status='api_access',
-                        timestamp=datetime.utcnow()
+                        user_agent=request.headers.get('User-Agent', '')
                     )
-                    db.session.add(login_entry)
-                    db.session.commit()
                 except Exception as e:
                     current_app.logger.error(f"Erreur lors de l'enregistrement de l'accès API: {str(e)}")
                     db.session.rollback()
@@ -2,9 +2,13 @@
 from flask import g, request
 from functools import wraps
 from ..services.organization_service import OrganizationService
+from ..services.tenant_cache import get_tenant_cache
 
 def setup_tenant_middleware(app):
     """Configure le middleware de tenant pour l'application Flask"""
+    tenant_cache = get_tenant_cache()
+    tenant_cache.start_listener(app)
+    organization_service = OrganizationService()
     
     @app.before_request
     def resolve_tenant():
@@ -14,10 +18,9 @@ def setup_tenant_middleware(app):
             return
             
         host = request.host.split(':')[0]  # Enlever le port s'il est présent
-        organization_service = OrganizationService()
         
-        # Chercher l'organisation correspondant au domaine
-        organization = organization_service.get_organization_by_domain(host)
+        # Chercher l'organisation correspondant au domaine (mise en cache par hôte)
+        organization = tenant_cache.get_organization(host, organization_service.get_organization_by_domain)
         
         # Ajouter l'organisation au contexte global de Flask
         g.organization = organization
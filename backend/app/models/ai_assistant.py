@@ -1,7 +1,7 @@
 # backend/app/models/ai_assistant.py
 from datetime import datetime
 import uuid
-from sqlalchemy import CHAR, TypeDecorator
+from sqlalchemy import CHAR, DDL, TypeDecorator, event
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 
@@ -131,6 +131,7 @@ class AIAssistantDocument(db.Model):
     description = db.Column(db.Text, nullable=True)
     
     vector_index_status = db.Column(db.String(20), default='pending')  # pending, processing, completed, failed
+    chunk_count = db.Column(db.Integer, default=0)  # Nombre de chunks indexés
     
     # Horodatage
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -154,11 +155,98 @@ class AIAssistantDocument(db.Model):
             'documentType': self.document_type,
             'description': self.description,
             'vectorIndexStatus': self.vector_index_status,
+            'chunkCount': self.chunk_count or 0,
             'createdAt': self.created_at.isoformat(),
             'updatedAt': self.updated_at.isoformat()
         }
 
 
+class AIConversation(db.Model):
+    """Conversation d'un utilisateur avec un assistant IA (résumé glissant inclus)"""
+    __tablename__ = 'ai_conversations'
+
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
+    assistant_id = db.Column(GUID(), db.ForeignKey('ai_assistants.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
+    title = db.Column(db.String(255), nullable=True)
+    
+    # Résumé des messages 1..summary_through, remplacés dans les prompts
+    summary = db.Column(db.Text, nullable=True)
+    summary_through = db.Column(db.Integer, nullable=False, default=0)
+    
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    pending_tokens = db.Column(db.Integer, nullable=False, default=0)  # Tokens estimés des messages non résumés
+    
+    # Horodatage
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Historique d'un utilisateur pour un assistant, du plus récent au plus ancien
+        db.Index('ix_ai_conversations_assistant_user_updated', 'assistant_id', 'user_id', 'updated_at', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<AIConversation {self.id}>'
+    
+    def to_dict(self):
+        """Convertit la conversation en dictionnaire pour l'API"""
+        return {
+            'id': str(self.id),
+            'assistantId': str(self.assistant_id),
+            'title': self.title,
+            'summary': self.summary,
+            'messageCount': self.message_count or 0,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class AIConversationMessage(db.Model):
+    """
+    Message d'une conversation (table en ajout seul).
+    
+    Sur PostgreSQL la table est partitionnée par hachage sur assistant_id ;
+    la clé primaire (assistant_id, conversation_id, sequence) contient donc
+    la clé de partitionnement.
+    """
+    __tablename__ = 'ai_conversation_messages'
+
+    assistant_id = db.Column(GUID(), primary_key=True)
+    conversation_id = db.Column(GUID(), db.ForeignKey('ai_conversations.id', ondelete='CASCADE'), primary_key=True)
+    sequence = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    
+    role = db.Column(db.String(20), nullable=False)  # user, assistant
+    content = db.Column(db.Text, nullable=False)
+    token_count = db.Column(db.Integer, nullable=False, default=0)  # Estimation
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = {'postgresql_partition_by': 'HASH (assistant_id)'}
+    
+    def to_dict(self):
+        """Convertit le message en dictionnaire pour l'API"""
+        return {
+            'conversationId': str(self.conversation_id),
+            'sequence': self.sequence,
+            'role': self.role,
+            'content': self.content,
+            'tokenCount': self.token_count,
+            'createdAt': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+# Partitions des messages (PostgreSQL) : créées ici avec create_all ; la migration
+# c58e13a7f6b2 crée les tables et les partitions sur les bases existantes
+CONVERSATION_MESSAGE_PARTITIONS = 16
+
+for _remainder in range(CONVERSATION_MESSAGE_PARTITIONS):
+    event.listen(AIConversationMessage.__table__, 'after_create', DDL(
+        f"CREATE TABLE IF NOT EXISTS ai_conversation_messages_p{_remainder} "
+        f"PARTITION OF ai_conversation_messages "
+        f"FOR VALUES WITH (MODULUS {CONVERSATION_MESSAGE_PARTITIONS}, REMAINDER {_remainder})"
+    ).execute_if(dialect='postgresql'))
+
+
 class TeamAIAssistant(db.Model):
     """Association entre une équipe et un assistant IA"""
     __tablename__ = 'team_ai_assistants'
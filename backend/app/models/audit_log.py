@@ -1,6 +1,7 @@
 from datetime import datetime
 import uuid
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 from app import db
 
 class AuditLog(db.Model):
@@ -18,6 +19,16 @@ class AuditLog(db.Model):
     user_agent = db.Column(db.String(255), nullable=True)  # User-Agent du navigateur
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Écrans d'audit : liste paginée par organisation et historique d'une entité
+        db.Index('ix_audit_logs_org_created', 'organization_id', 'created_at', 'id'),
+        db.Index('ix_audit_logs_org_entity', 'organization_id', 'entity_type', 'entity_id', 'created_at'),
+        db.Index('ix_audit_logs_created', 'created_at'),
+        # Recherche (PostgreSQL) : index trigramme utilisé par ILIKE '%terme%'
+        db.Index('ix_audit_logs_description_trgm', 'description',
+                 postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}),
+    )
+    
     # Relations
     organization = db.relationship('Organization', backref=db.backref('audit_logs', lazy=True))
     user = db.relationship('User', backref=db.backref('audit_logs', lazy=True))
@@ -41,4 +52,59 @@ class AuditLog(db.Model):
                 'name': self.user.name,
                 'email': self.user.email
             } if self.user else None
-        }
\ No newline at end of file
+        }
+
+
+class AuditLogArchive(db.Model):
+    """
+    Logs d'audit archivés (au-delà de la fenêtre chaude de audit_logs).
+    
+    Pas de clés étrangères : l'archive doit survivre à la suppression des
+    utilisateurs ou organisations référencés.
+    """
+    __tablename__ = 'audit_logs_archive'
+
+    id = db.Column(db.String(36), primary_key=True)
+    organization_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(50), nullable=False)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.String(50), nullable=True)
+    description = db.Column(db.Text, nullable=False)
+    data = db.Column(db.JSON, nullable=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    user_agent = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_audit_logs_archive_org_created', 'organization_id', 'created_at', 'id'),
+        db.Index('ix_audit_logs_archive_org_entity', 'organization_id', 'entity_type', 'entity_id', 'created_at'),
+        db.Index('ix_audit_logs_archive_created', 'created_at'),
+        db.Index('ix_audit_logs_archive_description_trgm', 'description',
+                 postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}),
+    )
+    
+    def to_dict(self):
+        """Convertit l'objet en dictionnaire pour l'API"""
+        return {
+            'id': self.id,
+            'organization_id': self.organization_id,
+            'user_id': self.user_id,
+            'action': self.action,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'description': self.description,
+            'data': self.data,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'created_at': self.created_at.isoformat(),
+            'user': None,
+            'archived': True
+        }
+
+
+# L'extension doit exister avant les index trigramme (create_all ; migration
+# 3f2a9c7d1e04 pour les bases existantes)
+for _table in (AuditLog.__table__, AuditLogArchive.__table__):
+    event.listen(_table, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
@@ -52,4 +52,45 @@ class BiometricSummary(db.Model):
             'confidence_indicators': self.confidence_indicators,
             'key_moments': self.key_moments,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+class FacialAnalysisChunk(db.Model):
+    """
+    Stockage colonnaire des frames d'analyse faciale.
+
+    Chaque ligne couvre une tranche de temps d'un entretien : les positions
+    (int32) et les valeurs d'émotions (float32, une colonne par émotion) sont
+    empaquetées en tableaux puis compressées, au lieu d'une ligne JSON par frame.
+    """
+    __tablename__ = 'facial_analysis_chunks'
+    __table_args__ = (
+        db.UniqueConstraint('interview_id', 'chunk_index', name='uq_facial_chunk_interview_index'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.id', ondelete='CASCADE'), nullable=False, index=True)
+    chunk_index = db.Column(db.Integer, nullable=False)  # timestamp // durée d'un chunk
+    start_timestamp = db.Column(db.Integer, nullable=False)  # Première frame (secondes)
+    end_timestamp = db.Column(db.Integer, nullable=False)  # Dernière frame (secondes)
+    frame_count = db.Column(db.Integer, nullable=False, default=0)
+    emotion_columns = db.Column(db.JSON, nullable=False)  # ["angry", "disgusted", ...]
+    timestamps_blob = db.Column(db.LargeBinary, nullable=False)  # int32 compressés
+    values_blob = db.Column(db.LargeBinary, nullable=False)  # float32 (frames x émotions) compressés
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relations
+    interview = db.relationship('Interview', back_populates='facial_analysis_chunks')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'interview_id': self.interview_id,
+            'chunk_index': self.chunk_index,
+            'start_timestamp': self.start_timestamp,
+            'end_timestamp': self.end_timestamp,
+            'frame_count': self.frame_count,
+            'emotion_columns': self.emotion_columns,
+            'compressed_bytes': len(self.timestamps_blob or b'') + len(self.values_blob or b''),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -154,3 +154,31 @@ class TeamNote(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class InterviewAccessEntry(db.Model):
+    """
+    Table d'accès dénormalisée (une ligne par utilisateur, entretien et origine du droit).
+    
+    Maintenue par CollaborationService à chaque partage individuel ou d'équipe
+    et à chaque changement de composition d'équipe ; la propriété reste portée
+    par Interview.recruiter_id.
+    """
+    __tablename__ = 'interview_access_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.id', ondelete='CASCADE'), nullable=False)
+    permission_level = db.Column(db.String(20), nullable=False, default='viewer')
+    source_type = db.Column(db.String(10), nullable=False)  # 'share', 'team'
+    source_id = db.Column(db.String(36), nullable=False)  # ID du partage ou de l'équipe
+    expires_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'interview_id', 'source_type', 'source_id', name='unique_interview_access_source'),
+        db.Index('ix_interview_access_user_interview', 'user_id', 'interview_id'),
+        db.Index('ix_interview_access_expires', 'expires_at'),
+    )
+    
+    def __repr__(self):
+        return f"<InterviewAccessEntry User:{self.user_id} Interview:{self.interview_id} {self.permission_level}>"
@@ -1,7 +1,10 @@
 # backend/models/interview.py
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property
 from app import db
 from ..models.organization import GUID
+from .biometric import FacialAnalysis, FacialAnalysisChunk
 
 class Interview(db.Model):
     __tablename__ = 'interviews'
@@ -46,6 +49,7 @@ class Interview(db.Model):
     interview_questions = db.relationship('InterviewQuestion', back_populates='interview_ref', cascade="all, delete-orphan")
     interview_responses = db.relationship('InterviewResponse', back_populates='interview_ref', cascade="all, delete-orphan")
     facial_analyses = db.relationship('FacialAnalysis', back_populates='interview', cascade="all, delete-orphan")
+    facial_analysis_chunks = db.relationship('FacialAnalysisChunk', back_populates='interview', cascade="all, delete-orphan")
     biometric_data = db.relationship('BiometricData', back_populates='interview', cascade="all, delete-orphan")
     ai_assistant = db.relationship(
     'AIAssistant',
@@ -58,6 +62,20 @@ class Interview(db.Model):
     
     # Relation avec User
     creator = db.relationship('User', back_populates='created_interviews', foreign_keys=[created_by])
+    
+    # Nombre de frames d'analyse faciale (lignes historiques + chunks), chargé à la demande :
+    # les listes l'incluent dans leur requête avec undefer(Interview.facial_frame_count)
+    facial_frame_count = column_property(
+        select(func.coalesce(func.sum(FacialAnalysisChunk.frame_count), 0))
+        .where(FacialAnalysisChunk.interview_id == id)
+        .correlate_except(FacialAnalysisChunk)
+        .scalar_subquery()
+        + select(func.count(FacialAnalysis.id))
+        .where(FacialAnalysis.interview_id == id)
+        .correlate_except(FacialAnalysis)
+        .scalar_subquery(),
+        deferred=True
+    )
 
     
     def to_dict(self):
@@ -93,9 +111,11 @@ class Interview(db.Model):
         base_dict['biometric_summary'] = self.biometric_summary.to_dict() if hasattr(self, 'biometric_summary') and self.biometric_summary else None
         
         # Ajouter les données biométriques (version simplifiée pour éviter trop de données)
-        if hasattr(self, 'facial_analyses') and self.facial_analyses:
+        # Frames historiques (facial_analyses) et chunks, comptées sans décompresser
+        facial_frames = self.facial_frame_count
+        if facial_frames:
             base_dict['has_facial_analyses'] = True
-            base_dict['facial_analyses_count'] = len(self.facial_analyses)
+            base_dict['facial_analyses_count'] = int(facial_frames)
         else:
             base_dict['has_facial_analyses'] = False
             
@@ -14,4 +14,42 @@ class Invitation(db.Model):
     token= db.Column(db.String(255), nullable=False)
     status= db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'accepted', 'declined'
     created_at= db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at= db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at= db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    batch_id= db.Column(db.String(36), db.ForeignKey('invitation_batches.id'), nullable=True, index=True)
+    email_sent_at= db.Column(db.DateTime, nullable=True)  # None tant que l'email n'est pas parti
+    
+    __table_args__ = (
+        db.Index('ix_invitations_org_email_status', 'organization_id', 'email', 'status'),
+    )
+
+
+class InvitationBatch(db.Model):
+    """Invitation groupée : suivi de l'avancement et des résultats par email (reprise possible)"""
+    __tablename__ = 'invitation_batches'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    organization_id = db.Column(db.String(36), nullable=False, index=True)
+    created_by = db.Column(db.Integer, nullable=False)
+    role = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='processing')  # processing, completed, partial
+    total = db.Column(db.Integer, default=0)
+    created_count = db.Column(db.Integer, default=0)
+    sent_count = db.Column(db.Integer, default=0)
+    results = db.Column(db.JSON, nullable=True)  # {email: {"status": ..., "invitation_id": ..., "error": ...}}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'organization_id': self.organization_id,
+            'role': self.role,
+            'status': self.status,
+            'total': self.total,
+            'created_count': self.created_count,
+            'sent_count': self.sent_count,
+            'results': self.results or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
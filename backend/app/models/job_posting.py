@@ -1,7 +1,7 @@
 # backend/models/job_posting.py
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, JSON, Integer
+from sqlalchemy import DDL, Column, String, Text, DateTime, Boolean, ForeignKey, JSON, Integer, event
 from sqlalchemy.orm import relationship
 from app import db
 
@@ -33,6 +33,9 @@ class JobPosting(db.Model):
     closes_at = Column(DateTime, nullable=True)
     is_featured = Column(Boolean, default=False)
     
+    # Compteur dénormalisé (maintenu par JobPostingService.create_application)
+    application_count = Column(Integer, nullable=False, default=0, server_default='0')
+    
     # Données structurées pour IA
     keywords = Column(JSON, nullable=True)  # Mots-clés extraits automatiquement
     skills = Column(JSON, nullable=True)  # Compétences requises
@@ -48,6 +51,10 @@ class JobPosting(db.Model):
     interview_schedules = relationship("InterviewSchedule", secondary="job_applications",viewonly=True)
     applications = relationship("JobApplication", back_populates="job_posting", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        db.Index('ix_job_postings_status_published', 'status', 'published_at', 'id'),
+    )
+    
     def __repr__(self):
         return f"<JobPosting {self.title}>"
     
@@ -78,7 +85,7 @@ class JobPosting(db.Model):
             'updated_at': self.updated_at.isoformat(),
             'organization_name': self.organization.name if self.organization else None,
             'creator_name': creator_name,
-            'application_count': len(self.applications) if self.applications else 0
+            'application_count': self.application_count or 0
         }
 
 
@@ -106,4 +113,48 @@ class JobApplication(db.Model):
     
     # Relations
     job_posting = relationship("JobPosting", back_populates="applications")
-    interview_schedule = relationship("InterviewSchedule", back_populates="job_application")
\ No newline at end of file
+    interview_schedule = relationship("InterviewSchedule", back_populates="job_application")
+    
+    __table_args__ = (
+        db.Index('ix_job_applications_job_created', 'job_posting_id', 'created_at', 'id'),
+        db.Index('ix_job_applications_job_status', 'job_posting_id', 'status'),
+    )
+
+class JobSearchDocument(db.Model):
+    """Document indexé d'une offre (maintenu par JobSearchIndex)"""
+    __tablename__ = 'job_search_documents'
+    
+    job_posting_id = Column(String(36), ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(Text, nullable=True)
+    skills = Column(Text, nullable=True)
+    body = Column(Text, nullable=True)  # Description, exigences et responsabilités
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Index inversé des offres : tsvector pondéré (PostgreSQL) ou table FTS5 synchronisée par triggers (SQLite).
+# Créé ici avec create_all ; la migration 7b41d0c2e9a5 le crée et indexe les offres sur les bases existantes.
+JOB_SEARCH_VECTOR = (
+    "setweight(to_tsvector('french', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('french', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('french', coalesce(body, '')), 'C')"
+)
+
+_search_table = JobSearchDocument.__table__
+event.listen(_search_table, 'after_create', DDL(
+    f"CREATE INDEX IF NOT EXISTS ix_job_search_documents_vector ON job_search_documents USING gin (({JOB_SEARCH_VECTOR}))"
+).execute_if(dialect='postgresql'))
+
+for _statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS job_search_fts USING fts5("
+    "job_posting_id UNINDEXED, title, skills, body, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_ai AFTER INSERT ON job_search_documents BEGIN "
+    "INSERT INTO job_search_fts(job_posting_id, title, skills, body) "
+    "VALUES (new.job_posting_id, new.title, new.skills, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_au AFTER UPDATE ON job_search_documents BEGIN "
+    "DELETE FROM job_search_fts WHERE job_posting_id = old.job_posting_id; "
+    "INSERT INTO job_search_fts(job_posting_id, title, skills, body) "
+    "VALUES (new.job_posting_id, new.title, new.skills, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_ad AFTER DELETE ON job_search_documents BEGIN "
+    "DELETE FROM job_search_fts WHERE job_posting_id = old.job_posting_id; END",
+):
+    event.listen(_search_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
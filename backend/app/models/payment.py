@@ -12,7 +12,7 @@ class Payment(db.Model):
     currency = db.Column(db.String(3), nullable=False, default='EUR')
     payment_method = db.Column(db.String(50), nullable=False)  # stripe, paypal, etc.
     payment_status = db.Column(db.String(20), nullable=False)  # completed, pending, failed
-    external_payment_id = db.Column(db.String(100), nullable=True)
+    external_payment_id = db.Column(db.String(100), nullable=True, index=True)
     payment_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     invoice_url = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -32,4 +32,49 @@ class Payment(db.Model):
             'payment_date': self.payment_date.isoformat() if self.payment_date else None,
             'invoice_url': self.invoice_url,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+class StripeWebhookEvent(db.Model):
+    """
+    Événement webhook Stripe reçu (journal d'ingestion).
+    
+    L'ID Stripe de l'événement est la clé primaire : une nouvelle livraison
+    du même événement est ignorée. Les événements d'un même customer sont
+    traités dans l'ordre de création côté Stripe.
+    """
+    __tablename__ = 'stripe_webhook_events'
+    
+    id = db.Column(db.String(255), primary_key=True)  # evt_...
+    type = db.Column(db.String(100), nullable=False)
+    customer_id = db.Column(db.String(255), nullable=True)  # Clé d'ordonnancement (cus_...)
+    payload = db.Column(db.Text, nullable=False)  # Corps brut vérifié
+    stripe_created_at = db.Column(db.DateTime, nullable=False)
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, processed, failed, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    __table_args__ = (
+        # File de traitement : événements non terminés dans l'ordre Stripe
+        db.Index('ix_stripe_webhook_events_queue', 'status', 'stripe_created_at', 'received_at'),
+        db.Index('ix_stripe_webhook_events_customer', 'customer_id', 'stripe_created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'customer_id': self.customer_id,
+            'stripe_created_at': self.stripe_created_at.isoformat() if self.stripe_created_at else None,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None,
+            'result': self.result,
+            'last_error': self.last_error
+        }
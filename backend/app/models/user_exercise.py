@@ -44,6 +44,10 @@ class UserExercise(db.Model):
     total_score = db.Column(db.Integer, default=0)
     exercises_completed = db.Column(db.Integer, default=0)
     total_exercises = db.Column(db.Integer, default=0)
+    exercises_attempted = db.Column(db.Integer, default=0)
+    max_score = db.Column(db.Integer, default=0)
+    exercise_stats = db.Column(db.JSON, nullable=True)  # {exercise_id: {attempted, completed, score, max_score}}
+    stats_updated_at = db.Column(db.DateTime, nullable=True)
     
     # Suivi administratif
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -72,6 +76,9 @@ class UserExercise(db.Model):
             'total_score': self.total_score,
             'exercises_completed': self.exercises_completed,
             'total_exercises': self.total_exercises,
+            'exercises_attempted': self.exercises_attempted or 0,
+            'max_score': self.max_score or 0,
+            'exercise_stats': self.exercise_stats or {},
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
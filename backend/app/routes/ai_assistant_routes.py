@@ -319,9 +319,10 @@ def test_assistant(assistant_id):
         json:
             question (str): Question à poser
             assistant (obj, optional): Données de l'assistant pour le mode aperçu
+            conversationId (str, optional): Conversation à poursuivre
     
     Returns:
-        json: Réponse de l'assistant
+        json: Réponse de l'assistant et ID de la conversation
     """
     try:
         data = request.json
@@ -361,14 +362,18 @@ def get_history(assistant_id):
     Query parameters:
         start_date (str, optional): Date de début
         end_date (str, optional): Date de fin
+        cursor (str, optional): Curseur de la dernière conversation de la page précédente
+        limit (int, optional): Nombre de conversations (20 par défaut, 100 maximum)
     
     Returns:
-        json: Historique des conversations
+        json: Conversations, de la plus récente à la plus ancienne
     """
     try:
         filters = {
             'start_date': request.args.get('start_date'),
-            'end_date': request.args.get('end_date')
+            'end_date': request.args.get('end_date'),
+            'cursor': request.args.get('cursor'),
+            'limit': min(request.args.get('limit', 20, type=int), 100)
         }
         
         history = ai_assistant_service.get_assistant_history(
@@ -381,10 +386,46 @@ def get_history(assistant_id):
         return jsonify({"error": "Assistant non trouvé"}), 404
     except PermissionError as e:
         return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Erreur lors de la récupération de l'historique: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@ai_assistant_bp.route('/<uuid:assistant_id>/conversations/<uuid:conversation_id>/messages', methods=['GET'])
+@token_required
+def get_conversation_messages(assistant_id, conversation_id):
+    """
+    Récupère les messages d'une conversation
+    
+    Args:
+        assistant_id (uuid): ID de l'assistant
+        conversation_id (uuid): ID de la conversation
+    
+    Query parameters:
+        cursor (str, optional): Curseur renvoyé par la page précédente (messages plus anciens)
+        limit (int, optional): Nombre de messages (50 par défaut, 200 maximum)
+    
+    Returns:
+        json: Messages en ordre chronologique, conversation et pagination
+    """
+    try:
+        messages = ai_assistant_service.get_conversation_messages(
+            assistant_id=str(assistant_id),
+            conversation_id=str(conversation_id),
+            user_id=g.current_user.id,
+            cursor=request.args.get('cursor'),
+            limit=min(request.args.get('limit', 50, type=int), 200)
+        )
+        return jsonify(messages)
+    except NoResultFound as e:
+        return jsonify({"error": str(e) or "Conversation non trouvée"}), 404
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des messages: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 # Enregistrement du Blueprint
 def register_ai_assistant_routes(app):
     """
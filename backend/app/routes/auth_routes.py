@@ -5,6 +5,7 @@ from flask import Blueprint, request, jsonify, g
 
 from ..services.user_service import UserService
 from ..services.auth_service import AuthService
+from ..services.password_hasher import PasswordHasherBusy, get_password_hasher
 from ..middleware.auth_middleware import token_required
 from ..middleware.rate_limit import auth_limit, standard_limit
 from .. import db  # Importation de l'instance db
@@ -117,12 +118,16 @@ def login():
     if not data or 'email' not in data or 'password' not in data:
         return jsonify({'message': 'Email et mot de passe requis'}), 400
     
-    success, tokens, user, message = AuthService.login(data['email'], data['password'])
+    try:
+        success, tokens, user, message = AuthService.login(data['email'], data['password'])
+    except PasswordHasherBusy as e:
+        response = jsonify({'message': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     
     if not success:
-        # Utiliser un délai pour prévenir le timing attack
-        import time
-        time.sleep(0.5)
+        # Utiliser un délai pour prévenir le timing attack (pause coopérative)
+        get_password_hasher().sleep(0.5)
         return jsonify({'message': message}), 401
       
     print(user['id'])
@@ -1,6 +1,7 @@
 # backend/app/routes/avatar_routes.py - VERSION SIMPLIFIÉE
 from flask import Blueprint, request, jsonify, render_template
 from app.services.avatar_service import get_avatar_service
+from app.middleware.auth_middleware import admin_required
 import logging
 
 avatar_bp = Blueprint('avatar', __name__)
@@ -66,6 +67,30 @@ def get_interview_avatar_status(interview_id):
             'error': str(e)
         }), 500
 
+@avatar_bp.route('/pool', methods=['GET'])
+@admin_required
+def get_browser_pool_status():
+    """État du pool de navigateurs partagés (mémoire par contexte) - réservé aux administrateurs"""
+    try:
+        avatar_service = get_avatar_service()
+        if not avatar_service:
+            return jsonify({
+                'success': False,
+                'error': 'Service avatar non disponible'
+            }), 503
+        
+        return jsonify({
+            'success': True,
+            'pool': avatar_service.get_browser_pool_report()
+        })
+        
+    except Exception as e:
+        logger.error(f"Erreur statut pool navigateurs: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # ROUTES DE DEBUG (à supprimer en production)
 @avatar_bp.route('/debug/force-launch', methods=['POST'])
 def debug_force_launch():
@@ -1,5 +1,5 @@
 # backend/routes/biometric_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..services.biometric_service import BiometricService
 from ..models.interview import Interview
@@ -48,7 +48,7 @@ def save_facial_analysis(interview_id):
         return jsonify({
             'status': 'success',
             'message': 'Analyse faciale enregistrée avec succès',
-            'data': analysis.to_dict()
+            'data': analysis
         }), 201
     except Exception as e:
         return jsonify({
@@ -97,6 +97,37 @@ def batch_save_facial_analyses(interview_id):
             'message': f'Une erreur s\'est produite: {str(e)}'
         }), 500
 
+@biometric_bp.route('/interviews/<int:interview_id>/facial-analysis', methods=['GET'])
+@jwt_required()
+def get_facial_analysis_frames(interview_id):
+    """Récupère les frames d'analyse faciale sur un intervalle (?start=&end= en secondes)"""
+    user_id = get_jwt_identity()
+    
+    # Vérifier que l'utilisateur a accès à l'entretien
+    interview = Interview.query.get(interview_id)
+    if not interview or interview.recruiter_id != user_id:
+        return jsonify({
+            'status': 'error',
+            'message': 'Entretien non trouvé ou accès non autorisé'
+        }), 404
+    
+    try:
+        frames = biometric_service.get_facial_frames(
+            interview_id,
+            request.args.get('start', type=int),
+            request.args.get('end', type=int)
+        )
+        
+        return jsonify({
+            'status': 'success',
+            'data': frames
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Une erreur s\'est produite: {str(e)}'
+        }), 500
+
 @biometric_bp.route('/interviews/<int:interview_id>/biometric-summary', methods=['GET'])
 @jwt_required()
 def get_biometric_summary(interview_id):
@@ -173,7 +204,12 @@ def generate_biometric_summary(interview_id):
         }), 403
     
     try:
-        summary = biometric_service.generate_summary(interview_id)
+        # Finaliser depuis le flux temps réel s'il existe, sinon recalcul complet
+        stream_service = getattr(current_app, 'biometric_stream_service', None)
+        if stream_service:
+            summary = stream_service.finalize(interview_id)
+        else:
+            summary = biometric_service.generate_summary(interview_id)
         
         return jsonify({
             'status': 'success',
@@ -388,12 +388,12 @@ def submit_code_for_candidate(access_token, exercise_id, challenge_id, step_id):
             challenge_id, step_id, session_info, data['code'], data['language']
         )
         
-        # Mettre à jour le progrès si l'étape est complétée
-        if response.get('summary', {}).get('all_passed', False):
-            exercise_service.update_exercise_progress(
-                access_token, exercise_id, completed=True, 
-                score=response.get('summary', {}).get('passed', 0)
-            )
+        # Mettre à jour les statistiques de l'exercice soumis
+        exercise_service.update_exercise_progress(
+            access_token, exercise_id,
+            completed=response.get('summary', {}).get('all_passed', False),
+            score=response.get('summary', {}).get('passed', 0)
+        )
         
         return jsonify({'status': 'success', 'data': response}), 200
         
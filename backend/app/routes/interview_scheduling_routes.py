@@ -406,6 +406,142 @@ def get_organization_schedules():
         'data': [schedule.to_dict() for schedule in schedules]
     }), 200
 
+def parse_availability_request(args):
+    """
+    Recruteurs et fenêtre d'une requête de disponibilités.
+
+    Les recruteurs (paramètre interviewers, séparés par des virgules, par
+    défaut l'utilisateur connecté) doivent appartenir à l'organisation
+    courante. Les dates sans décalage sont lues dans le fuseau `timezone`
+    (par défaut celui des entretiens), qui est aussi celui des résultats.
+
+    Returns:
+        tuple: (IDs des recruteurs, début, fin, fuseau)
+
+    Raises:
+        ValueError: Paramètres invalides
+        PermissionError: Recruteur hors de l'organisation
+    """
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    from ..models.organization import OrganizationMember
+    from ..services.availability_service import DEFAULT_TIMEZONE
+
+    user_id = get_current_user_id()
+    raw_ids = args.get('interviewers') or ''
+    raw_ids = raw_ids if isinstance(raw_ids, list) else str(raw_ids).split(',')
+    interviewer_ids = [str(value).strip() for value in raw_ids if str(value).strip()]
+    interviewer_ids = list(dict.fromkeys(interviewer_ids or [user_id]))
+    if len(interviewer_ids) > 50:
+        raise ValueError("50 recruteurs au maximum par recherche")
+
+    others = [interviewer_id for interviewer_id in interviewer_ids if interviewer_id != user_id]
+    if others:
+        members = {
+            str(member_id) for (member_id,) in db.session.query(OrganizationMember.user_id).filter(
+                OrganizationMember.organization_id == g.current_user.current_organization_id,
+                OrganizationMember.user_id.in_(others)
+            ).all()
+        }
+        if len(members) != len(others):
+            raise PermissionError("Certains recruteurs n'appartiennent pas à votre organisation")
+
+    tz = args.get('timezone') or DEFAULT_TIMEZONE
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Fuseau horaire inconnu: {tz}")
+
+    try:
+        start = datetime.fromisoformat(args['start']) if args.get('start') else datetime.now(ZoneInfo(tz))
+        end = datetime.fromisoformat(args['end']) if args.get('end') else start + timedelta(days=14)
+    except ValueError:
+        raise ValueError("Format de date invalide pour start ou end")
+
+    return interviewer_ids, start, end, tz
+
+@scheduling_bp.route('/availability', methods=['GET'])
+@token_required
+def get_availability():
+    """Prochains créneaux libres communs à un ou plusieurs recruteurs (panel)"""
+    from ..services.availability_service import get_availability_engine
+
+    try:
+        interviewer_ids, start, end, tz = parse_availability_request(request.args)
+        duration = int(request.args.get('duration', 30))
+        count = min(int(request.args.get('count', 10)), 100)
+        step = int(request.args['step']) if request.args.get('step') else None
+        if duration <= 0 or count <= 0 or (step is not None and step <= 0):
+            raise ValueError("duration, count et step doivent être positifs")
+
+        slots = get_availability_engine().find_slots(
+            interviewer_ids,
+            start,
+            end,
+            duration_minutes=duration,
+            count=count,
+            step_minutes=step,
+            sync_calendars=request.args.get('sync', 'false').lower() == 'true',
+            tz=tz
+        )
+    except PermissionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'interviewers': interviewer_ids,
+            'duration_minutes': duration,
+            'timezone': tz,
+            'slots': slots
+        }
+    }), 200
+
+@scheduling_bp.route('/availability/conflicts', methods=['GET'])
+@token_required
+def get_availability_conflicts():
+    """Créneaux occupés des recruteurs qui chevauchent une période"""
+    from ..services.availability_service import get_availability_engine
+
+    try:
+        interviewer_ids, start, end, tz = parse_availability_request(request.args)
+        conflicts = get_availability_engine().conflicts(interviewer_ids, start, end, tz=tz)
+    except PermissionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'data': conflicts
+    }), 200
+
+@scheduling_bp.route('/availability/sync', methods=['POST'])
+@token_required
+def sync_availability():
+    """Resynchronise le Google Calendar des recruteurs sur la période"""
+    from ..services.availability_service import get_availability_engine
+
+    try:
+        interviewer_ids, start, end, tz = parse_availability_request(request.get_json(silent=True) or request.args)
+    except PermissionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    engine = get_availability_engine()
+    results = {}
+    for interviewer_id in interviewer_ids:
+        count, error = engine.sync_calendar(interviewer_id, start, end, tz)
+        results[interviewer_id] = {'events': count, 'error': error}
+
+    return jsonify({
+        'status': 'success',
+        'data': results
+    }), 200
+
 @scheduling_bp.route('/schedules/access/<access_token>', methods=['GET'])
 def get_schedule_by_token(access_token):
     """Récupère les détails d'une planification par son token d'accès (pour le candidat)"""
@@ -5,6 +5,7 @@ from flask import g, request, jsonify, abort, current_app, send_from_directory,
 from app.models.job_posting import JobPosting, JobApplication
 from app.routes.user import token_required
 from app.services.job_posting_service import JobPostingService
+from app.services.job_search_service import get_job_search_index
 from . import job_postings_bp
 from werkzeug.utils import secure_filename
 
@@ -47,7 +48,8 @@ def get_job_postings():
         status=status,
         user_id=user_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        search=request.args.get('q')
     )
     
     result = {
@@ -129,8 +131,9 @@ def close_job_posting(job_id):
 def get_public_job_postings():
     """Récupère les offres d'emploi publiques (sans authentification)"""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
+        page = int(request.args['page']) if request.args.get('page') else None
+        per_page = int(request.args.get('limit', request.args.get('per_page', 20)))
+        cursor = request.args.get('cursor')
         
         # Récupérer les filtres
         filters = {}
@@ -147,13 +150,38 @@ def get_public_job_postings():
         if request.args.get('keywords'):
             filters['keywords'] = request.args.get('keywords')
         
-        result = job_posting_service.get_public_job_postings(page, per_page, filters)
+        result = job_posting_service.get_public_job_postings(page, per_page, filters, cursor=cursor)
         return jsonify(result), 200
             
     except Exception as e:
         print(f"Erreur dans get_public_job_postings: {e}")
         return jsonify({'error': 'Erreur lors de la récupération des offres'}), 500
 
+@job_postings_bp.route('/public/search', methods=['GET'])
+def search_public_job_postings():
+    """Recherche plein texte des offres publiques, classée par pertinence, avec facettes"""
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+        offset = int(request.args.get('offset', 0))
+        
+        filters = {
+            name: request.args.get(name)
+            for name in ('location', 'employment_type', 'remote_policy', 'salary_bucket')
+            if request.args.get(name)
+        }
+        
+        result = get_job_search_index().search(
+            query_text=request.args.get('q'),
+            filters=filters,
+            limit=limit,
+            offset=offset
+        )
+        return jsonify(result), 200
+            
+    except Exception as e:
+        print(f"Erreur dans search_public_job_postings: {e}")
+        return jsonify({'error': 'Erreur lors de la recherche des offres'}), 500
+
 @job_postings_bp.route('/public/<job_id>', methods=['GET'])
 def get_public_job_posting_details(job_id):
     """Récupère les détails d'une offre d'emploi publique (sans authentification)"""
@@ -200,40 +228,16 @@ def get_job_posting_applications(job_id):
     """Récupère les candidatures pour une offre d'emploi (authentifié)"""
     try:
         user_id = get_current_user_id()
-        limit = int(request.args.get('limit', 20))
+        limit = min(int(request.args.get('limit', 20)), 200)
         offset = int(request.args.get('offset', 0))
         
-        applications, total = job_posting_service.get_applications_for_job(
-            job_id, user_id, limit, offset
+        job, page = job_posting_service.get_applications_for_job(
+            job_id, user_id, limit, offset,
+            cursor=request.args.get('cursor'),
+            status=request.args.get('status')
         )
         
-        # Récupérer aussi les détails de l'offre d'emploi
-        job = JobPosting.query.get(job_id)
-        
-        result = {
-            'data': [
-                {
-                    'id': app.id,
-                    'candidate_name': app.candidate_name,
-                    'candidate_email': app.candidate_email,
-                    'candidate_phone': app.candidate_phone,
-                    'resume_url': app.resume_url,
-                    'cover_letter': app.cover_letter,
-                    'status': app.status,
-                    'notes': app.notes,
-                    'source': app.source,
-                    'created_at': app.created_at.isoformat(),
-                    'updated_at': app.updated_at.isoformat()
-                }
-                for app in applications
-            ],
-            'job_posting': job.to_dict() if job else None,
-            'pagination': {
-                'total': total,
-                'limit': limit,
-                'offset': offset
-            }
-        }
+        result = dict(page, job_posting=job.to_dict())
         
         return jsonify(result), 200
             
@@ -10,7 +10,9 @@ from ..models.user import User
 from ..models.organization import Organization, OrganizationDomain, OrganizationMember
 from app import db
 from ..services.organization_service import OrganizationService
-from ..middleware.auth_middleware import token_required
+from ..services.tenant_cache import get_tenant_cache
+from ..services.organization_metrics_service import get_organization_metrics_service
+from ..middleware.auth_middleware import admin_required, token_required
 from ..middleware.tenant_middleware import organization_required, get_current_organization
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 from werkzeug.utils import secure_filename
@@ -252,6 +254,8 @@ def verify_domain_dns(domain_id):
             # Marquer le domaine comme vérifié
             domain.is_verified = True
             db.session.commit()
+            get_tenant_cache().invalidate_host(domain.domain)
+            get_organization_metrics_service().invalidate(organization.id, 'domains')
             
             # Lancer le script pour générer la configuration Nginx
             # (ceci devrait être fait de manière asynchrone)
@@ -321,6 +325,8 @@ def delete_domain(domain_id):
     
     db.session.delete(domain)
     db.session.commit()
+    get_tenant_cache().invalidate_host(domain.domain)
+    get_organization_metrics_service().invalidate(organization.id, 'domains')
     
     return jsonify({"message": "Domain deleted successfully"})
 
@@ -357,6 +363,7 @@ def set_primary_domain(domain_id):
     # Définir le nouveau domaine primaire
     domain.is_primary = True
     db.session.commit()
+    get_tenant_cache().invalidate_organization(organization.id)
     
     return jsonify({
         "id": domain.id,
@@ -644,6 +651,69 @@ def invite_user_to_organization():
         "invitation_token": invitation_token  # En production, ne pas exposer ce token
     }), 201
 
+@organizations_bp.route('/current/invitations/bulk', methods=['POST'])
+@token_required
+@organization_required
+def create_bulk_invitations():
+    """Invite une liste d'emails dans l'organisation active (résultat par email)"""
+    user_id = g.current_user.user_id
+    organization = get_current_organization()
+    
+    require_admin(organization.id, user_id)
+    
+    data = request.get_json() or {}
+    emails = data.get('emails') or []
+    if not isinstance(emails, list) or not emails:
+        abort(400, description="A non-empty 'emails' list is required")
+    
+    from ..services.invitation_service import InvitationService
+    invitation_service = InvitationService()
+    
+    try:
+        result = invitation_service.create_bulk_invitations(
+            organization_id=organization.id,
+            emails=emails,
+            role=data.get('role', 'member'),
+            created_by=user_id,
+            message=data.get('message')
+        )
+    except ValueError as e:
+        abort(400, description=str(e))
+    
+    return jsonify(result), 201
+
+@organizations_bp.route('/current/invitations/bulk/<batch_id>', methods=['GET'])
+@token_required
+@organization_required
+def get_bulk_invitation_batch(batch_id):
+    """Récupère l'avancement d'un lot d'invitations"""
+    organization = get_current_organization()
+    require_admin(organization.id, g.current_user.user_id)
+    
+    from ..services.bulk_invitation_service import BulkInvitationService
+    batch = BulkInvitationService().get_batch(batch_id)
+    if not batch or str(batch.organization_id) != str(organization.id):
+        abort(404, description="Invitation batch not found")
+    
+    return jsonify(batch.to_dict())
+
+@organizations_bp.route('/current/invitations/bulk/<batch_id>/resume', methods=['POST'])
+@token_required
+@organization_required
+def resume_bulk_invitation_batch(batch_id):
+    """Reprend l'envoi des emails non partis d'un lot d'invitations"""
+    organization = get_current_organization()
+    require_admin(organization.id, g.current_user.user_id)
+    
+    from ..services.invitation_service import InvitationService
+    invitation_service = InvitationService()
+    
+    batch = invitation_service.bulk_service.get_batch(batch_id)
+    if not batch or str(batch.organization_id) != str(organization.id):
+        abort(404, description="Invitation batch not found")
+    
+    return jsonify(invitation_service.resume_bulk_invitations(batch_id))
+
 @organizations_bp.route('/api/invitations/<token>/accept', methods=['POST'])
 def accept_invitation(token):
     # Récupérer l'ID utilisateur depuis le token JWT si connecté
@@ -686,7 +756,7 @@ def list_invitations(org_id):
 @organization_required
 def get_organization_stats():
     """Obtient des statistiques sur l'organisation active"""
-    user_id = get_jwt_identity()
+    user_id = g.current_user.user_id
     organization = get_current_organization()
     
     # Vérifier que l'utilisateur est membre
@@ -698,44 +768,14 @@ def get_organization_stats():
     if not member:
         abort(403, description="You are not a member of this organization")
     
-    # Récupérer les statistiques de base
-    member_count = OrganizationMember.query.filter_by(
-        organization_id=organization.id
-    ).count()
-    
-    domain_count = OrganizationDomain.query.filter_by(
-        organization_id=organization.id
-    ).count()
-    
-    verified_domain_count = OrganizationDomain.query.filter_by(
-        organization_id=organization.id,
-        is_verified=True
-    ).count()
-    
-    # Récupérer le compte des assistants IA (si vous avez cette relation)
-    ai_assistant_count = 0
-    from models.ai_assistant import AIAssistant
-    if hasattr(AIAssistant, 'organization_id'):
-        ai_assistant_count = AIAssistant.query.filter_by(
-            organization_id=organization.id
-        ).count()
+    # Statistiques calculées par requêtes groupées et mises en cache par organisation
+    metrics = request.args.get('metrics')
+    stats = get_organization_metrics_service().get_stats(
+        organization.id,
+        metrics.split(',') if metrics else None
+    )
     
-    return jsonify({
-        "members": {
-            "total": member_count,
-            "by_role": {
-                "owner": OrganizationMember.query.filter_by(organization_id=organization.id, role="owner").count(),
-                "admin": OrganizationMember.query.filter_by(organization_id=organization.id, role="admin").count(),
-                "member": OrganizationMember.query.filter_by(organization_id=organization.id, role="member").count()
-            }
-        },
-        "domains": {
-            "total": domain_count,
-            "verified": verified_domain_count
-        },
-        "ai_assistants": ai_assistant_count,
-        # Vous pouvez ajouter d'autres statistiques spécifiques à votre application
-    })
+    return jsonify(stats)
     
 
 @organizations_bp.route('/api/organizations/<org_id>/audit-logs', methods=['GET'])
@@ -765,7 +805,24 @@ def get_audit_logs(org_id):
         except ValueError:
             return jsonify({"error": "Format de date invalide pour date_to"}), 400
     
+    if 'search' in request.args:
+        filters['search'] = request.args.get('search')
+    
     audit_service = AuditService()
+    
+    # Pagination par curseur (?cursor= pour la première page), recommandée pour les gros volumes
+    if 'cursor' in request.args:
+        logs, next_cursor = audit_service.get_organization_logs_page(
+            org_id, filters,
+            cursor=request.args.get('cursor') or None,
+            limit=min(per_page, 200),
+            archived=request.args.get('archived', 'false').lower() == 'true'
+        )
+        return jsonify({
+            "items": [log.to_dict() for log in logs],
+            "next_cursor": next_cursor
+        })
+    
     logs = audit_service.get_organization_logs(org_id, filters, page, per_page)
     
     # Transformation en dictionnaire pour la réponse JSON
@@ -780,11 +837,25 @@ def get_audit_logs(org_id):
 @token_required
 @organization_required
 def get_entity_history(org_id, entity_type, entity_id):
-    """Récupère l'historique complet d'une entité spécifique."""
+    """Récupère l'historique d'une entité spécifique (page suivante via l'en-tête X-Next-Cursor)."""
     audit_service = AuditService()
-    logs = audit_service.get_entity_history(org_id, entity_type, entity_id)
-    
-    return jsonify([log.to_dict() for log in logs])
+    logs, next_cursor = audit_service.get_entity_history(
+        org_id, entity_type, entity_id,
+        cursor=request.args.get('cursor'),
+        limit=min(request.args.get('limit', 200, type=int), 1000)
+    )
+    
+    response = jsonify([log.to_dict() for log in logs])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@organizations_bp.route('/audit-logs/pipeline', methods=['GET'])
+@admin_required
+def get_audit_pipeline_stats():
+    """Compteurs de l'écriture asynchrone des logs d'audit (file, lots, journal local) - réservé aux administrateurs"""
+    audit_service = AuditService()
+    return jsonify(audit_service.get_pipeline_stats())
 
 @organizations_bp.route('/upload-logo', methods=['POST'])
 @token_required
@@ -5,6 +5,7 @@ from ..models.user import User
 from ..models.plan import Plan, PlanFeature
 from ..models.subscription import Subscription
 from ..services.payment_service import PaymentService
+from ..services.stripe_webhook_service import get_stripe_webhook_processor
 from app import db
 import stripe
 
@@ -161,9 +162,15 @@ def stripe_webhook():
     payload = request.data
     sig_header = request.headers.get('Stripe-Signature')
     
+    # Vérification et enregistrement seulement : le traitement est différé
     try:
-        result = payment_service.process_webhook_event(payload, sig_header)
-        return jsonify(result), 200
+        event_id, duplicate = get_stripe_webhook_processor().ingest(payload, sig_header)
+        return jsonify({'status': 'received', 'id': event_id, 'duplicate': duplicate}), 200
+    except (ValueError, stripe.error.SignatureVerificationError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid signature' if isinstance(e, stripe.error.SignatureVerificationError) else 'Invalid payload'
+        }), 400
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -8,12 +8,16 @@ from sqlalchemy.orm.exc import NoResultFound
 from app import db
 from ..models.ai_assistant import AIAssistant, AIAssistantDocument
 from ..models.user import User
+from .organization_metrics_service import get_organization_metrics_service
+from .assistant_document_index import get_assistant_document_index
+from .assistant_prompt_builder import get_assistant_prompt_builder
+from .assistant_conversation_service import get_assistant_conversation_store
 # Import corrigé - s'assurer que cette fonction existe
 try:
     from ..services.llm_service import get_llm_response
 except ImportError:
     # Fonction de fallback si le service LLM n'existe pas encore
-    def get_llm_response(prompt, model="claude-3-7-sonnet"):
+    def get_llm_response(prompt, model="claude-3-7-sonnet", cached_prefix=None):
         return f"Réponse simulée pour le prompt: {prompt[:100]}..."
 
 class AIAssistantService:
@@ -23,6 +27,12 @@ class AIAssistantService:
         # Créer le dossier d'upload s'il n'existe pas
         if not os.path.exists(self.upload_folder):
             os.makedirs(self.upload_folder)
+
+        # Index local des documents de connaissance
+        self.document_index = get_assistant_document_index()
+        self.context_char_budget = int(os.getenv('ASSISTANT_CONTEXT_CHAR_BUDGET', '4000'))
+        self.prompt_builder = get_assistant_prompt_builder()
+        self.conversations = get_assistant_conversation_store()
     
     def get_all_assistants(self, user_id, include_templates=False):
         """
@@ -149,6 +159,7 @@ class AIAssistantService:
             db.session.commit()
             
             print(f"Assistant sauvegardé avec ID: {assistant.id}")
+            get_organization_metrics_service().invalidate(assistant.organization_id, 'ai_assistants')
             
             return assistant.to_dict()
             
@@ -200,6 +211,7 @@ class AIAssistantService:
             
             assistant.updated_at = datetime.utcnow()
             db.session.commit()
+            self.prompt_builder.invalidate(assistant.id)
             
             return assistant.to_dict()
         except NoResultFound:
@@ -234,9 +246,13 @@ class AIAssistantService:
                     # Log l'erreur mais continuer
                     print(f"Erreur lors de la suppression du fichier {file_path}: {str(e)}")
             
-            # Supprimer l'assistant
+            # Supprimer l'assistant et ses conversations
+            self.conversations.delete_for_assistant(assistant.id)
             db.session.delete(assistant)
             db.session.commit()
+            self.document_index.drop_assistant(assistant_id)
+            self.prompt_builder.invalidate(assistant_id)
+            get_organization_metrics_service().invalidate(assistant.organization_id, 'ai_assistants')
         except NoResultFound:
             raise NoResultFound("Assistant non trouvé.")
     
@@ -379,6 +395,8 @@ class AIAssistantService:
             
             db.session.add(new_assistant)
             db.session.commit()
+            if new_assistant.organization_id:
+                get_organization_metrics_service().invalidate(new_assistant.organization_id, 'ai_assistants')
             
             return new_assistant.to_dict()
         except NoResultFound:
@@ -441,46 +459,13 @@ class AIAssistantService:
             db.session.add(document)
             db.session.commit()
             
-            # Lancer l'indexation du document en arrière-plan (dans un vrai système, ce serait une tâche asynchrone)
-            self._index_document(document.id)
+            # Indexation (extraction, découpage, BM25) par le thread d'indexation
+            self.document_index.enqueue_document(assistant_id, document.id)
             
             return document.to_dict()
         except NoResultFound:
             raise NoResultFound("Assistant non trouvé.")
     
-    def _index_document(self, document_id):
-        """
-        Indexe un document pour la recherche vectorielle
-        
-        Args:
-            document_id (str): ID du document
-            
-        Note:
-            Dans un système réel, cette méthode serait exécutée de manière asynchrone
-        """
-        try:
-            document = AIAssistantDocument.query.filter_by(id=document_id).one()
-            document.vector_index_status = 'processing'
-            db.session.commit()
-            
-            # Logique d'indexation ici...
-            # Dans un système réel, on utiliserait un service d'embeddings
-            # pour créer des vecteurs à partir du contenu du document
-            
-            # Simuler un traitement réussi
-            document.vector_index_status = 'completed'
-            db.session.commit()
-        except Exception as e:
-            try:
-                document = AIAssistantDocument.query.filter_by(id=document_id).one()
-                document.vector_index_status = 'failed'
-                db.session.commit()
-            except:
-                pass
-            
-            # Log l'erreur
-            print(f"Erreur lors de l'indexation du document {document_id}: {str(e)}")
-    
     def get_assistant_documents(self, assistant_id, user_id):
         """
         Récupère la liste des documents associés à un assistant
@@ -540,6 +525,7 @@ class AIAssistantService:
             # Supprimer l'enregistrement
             db.session.delete(document)
             db.session.commit()
+            self.document_index.enqueue_removal(assistant_id, document_id)
         except NoResultFound:
             raise NoResultFound("Assistant ou document non trouvé.")
     
@@ -565,12 +551,16 @@ class AIAssistantService:
                 raise ValueError("Données d'assistant manquantes pour le mode aperçu.")
             
             assistant_data = params['assistant']
-            prompt = self._generate_prompt(assistant_data, params.get('question', ''))
+            prompt = self.prompt_builder.build(
+                self.prompt_builder.prefix_for_data(assistant_data),
+                params.get('question', '')
+            )
             
-            # Appeler le service LLM
+            # Appeler le service LLM (préfixe stable transmis séparément)
             response = get_llm_response(
-                prompt=prompt,
-                model=assistant_data.get('model', 'claude-3-7-sonnet')
+                prompt=prompt.suffix,
+                model=assistant_data.get('model', 'claude-3-7-sonnet'),
+                cached_prefix=prompt.prefix
             )
             
             return {
@@ -586,105 +576,70 @@ class AIAssistantService:
             if not assistant.is_template and user_id and str(assistant.user_id) != str(user_id):
                 raise PermissionError("Vous n'avez pas accès à cet assistant.")
             
-            prompt = self._generate_prompt(assistant.to_dict(), params.get('question', ''))
+            question = params.get('question', '')
+            
+            # Conversation en cours : résumé glissant et derniers échanges
+            conversation = None
+            conversation_id = params.get('conversationId') or params.get('conversation_id')
+            if conversation_id and user_id:
+                conversation = self.conversations.get(conversation_id, assistant.id, user_id)
+            
+            prompt = self.prompt_builder.build(
+                self.prompt_builder.prefix_for_assistant(assistant),
+                question,
+                self._document_context(assistant.id, question),
+                self.conversations.context(conversation) if conversation else ''
+            )
             
-            # Appeler le service LLM
+            # Appeler le service LLM (préfixe stable transmis séparément)
             response = get_llm_response(
-                prompt=prompt,
-                model=assistant.model
+                prompt=prompt.suffix,
+                model=assistant.model,
+                cached_prefix=prompt.prefix
             )
             
+            # Enregistrer l'échange (les erreurs du fournisseur ne sont pas conservées)
+            if user_id and not self.conversations.is_llm_error(response):
+                if conversation is None:
+                    conversation = self.conversations.start(assistant.id, user_id, title=question[:100])
+                self.conversations.append_exchange(conversation, question, response)
+                self.conversations.schedule_compaction(conversation, model=assistant.model)
+            
             return {
                 'content': response,
-                'model': assistant.model
+                'model': assistant.model,
+                'conversationId': str(conversation.id) if conversation else None
             }
         except NoResultFound:
             raise NoResultFound("Assistant non trouvé.")
     
-    def _generate_prompt(self, assistant_data, question):
+    def _document_context(self, assistant_id, question):
         """
-        Génère le prompt pour l'assistant IA
+        Extraits des documents de l'assistant les plus pertinents pour la question
         
-        Args:
-            assistant_data (dict): Données de l'assistant
-            question (str): Question posée
-            
-        Returns:
-            str: Prompt complet
+        Seuls les meilleurs chunks sont injectés, dans la limite de
+        ASSISTANT_CONTEXT_CHAR_BUDGET caractères.
         """
-        # Récupérer les paramètres de personnalité
-        personality = assistant_data.get('personality', {})
-        friendliness = personality.get('friendliness', 3)
-        formality = personality.get('formality', 3)
-        technical_depth = personality.get('technicalDepth', 3)
-        follow_up_intensity = personality.get('followUpIntensity', 3)
-        
-        # Récupérer les paramètres de connaissances
-        base_knowledge = assistant_data.get('baseKnowledge', {})
-        
-        # Construire le prompt de base
-        industry_mapping = {
-            'technology': 'technologie',
-            'finance': 'finance',
-            'healthcare': 'santé',
-            'education': 'éducation',
-            'retail': 'commerce de détail',
-            'manufacturing': 'industrie'
-        }
-        
-        role_mapping = {
-            'software-engineer': 'ingénieur logiciel',
-            'data-scientist': 'data scientist',
-            'product-manager': 'chef de produit',
-            'designer': 'designer',
-            'marketing': 'spécialiste marketing',
-            'sales': 'commercial',
-            'customer-support': 'agent de support client'
-        }
-        
-        seniority_mapping = {
-            'entry-level': 'débutant',
-            'mid-level': 'intermédiaire',
-            'senior': 'senior',
-            'management': 'manager',
-            'executive': 'cadre dirigeant'
-        }
-        
-        industry = industry_mapping.get(assistant_data.get('industry', ''), assistant_data.get('industry', ''))
-        job_role = role_mapping.get(assistant_data.get('jobRole', ''), assistant_data.get('jobRole', ''))
-        seniority = seniority_mapping.get(assistant_data.get('seniority', ''), assistant_data.get('seniority', ''))
+        if not assistant_id or not question:
+            return ''
         
-        prompt = f"""Vous êtes un assistant d'entretien professionnel spécialisé dans le secteur de {industry} pour le poste de {job_role} de niveau {seniority}.
-
-PARAMÈTRES DE PERSONNALITÉ:
-- Convivialité: {friendliness}/5 ({"très formel et direct" if friendliness == 1 else "plutôt formel" if friendliness == 2 else "équilibré" if friendliness == 3 else "chaleureux" if friendliness == 4 else "très chaleureux et détendu"})
-- Formalité: {formality}/5 ({"très conversationnel" if formality == 1 else "plutôt informel" if formality == 2 else "équilibré" if formality == 3 else "formel" if formality == 4 else "très formel"})
-- Profondeur technique: {technical_depth}/5 ({"conceptuel et général" if technical_depth == 1 else "notions de base" if technical_depth == 2 else "équilibré" if technical_depth == 3 else "détaillé" if technical_depth == 4 else "très technique et détaillé"})
-- Questions de suivi: {follow_up_intensity}/5 ({"basiques" if follow_up_intensity == 1 else "occasionnelles" if follow_up_intensity == 2 else "équilibrées" if follow_up_intensity == 3 else "approfondies" if follow_up_intensity == 4 else "très approfondies et challenging"})
-
-DOMAINES DE CONNAISSANCES:"""
-        
-        if base_knowledge.get('technicalSkills', True):
-            prompt += "\n- Compétences techniques pertinentes pour le poste"
-        
-        if base_knowledge.get('softSkills', True):
-            prompt += "\n- Compétences comportementales et interpersonnelles"
-        
-        if base_knowledge.get('companyValues', False):
-            prompt += "\n- Valeurs et culture d'entreprise"
-        
-        if base_knowledge.get('industryTrends', False):
-            prompt += "\n- Tendances actuelles du secteur"
-        
-        # Ajouter le prompt personnalisé s'il existe
-        custom_prompt = assistant_data.get('customPrompt', '')
-        if custom_prompt:
-            prompt += f"\n\nINSTRUCTIONS PERSONNALISÉES:\n{custom_prompt}"
-        
-        # Ajouter la question
-        prompt += f"\n\nQUESTION DU CANDIDAT: {question}\n\nVotre réponse:"
-        
-        return prompt
+        try:
+            chunks = self.document_index.search(assistant_id, question)
+        except Exception as e:
+            print(f"Erreur lors de la recherche dans les documents de l'assistant {assistant_id}: {str(e)}")
+            return ''
+        
+        parts = []
+        remaining = self.context_char_budget
+        for position, chunk in enumerate(chunks, start=1):
+            header = f"[{position}] {chunk['filename']}\n"
+            if remaining <= len(header):
+                break
+            text = chunk['text'][:remaining - len(header)]
+            parts.append(header + text)
+            remaining -= len(header) + len(text)
+        
+        return '\n\n'.join(parts)
     
     def get_assistant_history(self, assistant_id, user_id, filters=None):
         """
@@ -693,28 +648,61 @@ DOMAINES DE CONNAISSANCES:"""
         Args:
             assistant_id (str): ID de l'assistant
             user_id (str): ID de l'utilisateur
-            filters (dict, optional): Filtres optionnels (dates, etc.)
+            filters (dict, optional): start_date, end_date, cursor (curseur de la
+                dernière conversation de la page précédente) et limit
             
         Returns:
-            list: Historique des conversations
+            list: Conversations, de la plus récente à la plus ancienne
             
         Raises:
             NoResultFound: Si l'assistant n'existe pas
             PermissionError: Si l'utilisateur n'a pas accès à cet assistant
+            ValueError: Si une date est invalide
         """
-        # Cette méthode serait implémentée avec un modèle supplémentaire pour les conversations
-        # Pour l'instant, nous retournons un tableau vide
-        try:
-            assistant = AIAssistant.query.filter_by(id=assistant_id).one()
+        filters = filters or {}
+        assistant = self._get_accessible_assistant(assistant_id, user_id)
+        
+        return self.conversations.list_conversations(
+            assistant.id,
+            user_id,
+            cursor=filters.get('cursor'),
+            limit=filters.get('limit') or 20,
+            start_date=filters.get('start_date'),
+            end_date=filters.get('end_date')
+        )
+    
+    def get_conversation_messages(self, assistant_id, conversation_id, user_id, cursor=None, limit=50):
+        """
+        Récupère les messages d'une conversation, page par page
+        
+        Args:
+            assistant_id (str): ID de l'assistant
+            conversation_id (str): ID de la conversation
+            user_id (str): ID de l'utilisateur
+            cursor (str, optional): Curseur renvoyé par la page précédente
+            limit (int): Nombre maximum de messages
             
-            # Vérifier les permissions
-            if str(assistant.user_id) != str(user_id):
-                raise PermissionError("Vous n'avez pas accès à cet assistant.")
+        Returns:
+            dict: Messages (ordre chronologique), conversation et pagination
             
-            # Dans un système réel, nous interrogerions la table des conversations
-            return []
+        Raises:
+            NoResultFound: Si l'assistant ou la conversation n'existe pas
+            PermissionError: Si l'utilisateur n'a pas accès à la conversation
+        """
+        assistant = self._get_accessible_assistant(assistant_id, user_id)
+        conversation = self.conversations.get(conversation_id, assistant.id, user_id)
+        return self.conversations.messages(conversation, cursor=cursor, limit=limit)
+    
+    def _get_accessible_assistant(self, assistant_id, user_id):
+        """Assistant de l'utilisateur ou modèle public"""
+        try:
+            assistant = AIAssistant.query.filter_by(id=assistant_id).one()
         except NoResultFound:
             raise NoResultFound("Assistant non trouvé.")
+        
+        if not assistant.is_template and str(assistant.user_id) != str(user_id):
+            raise PermissionError("Vous n'avez pas accès à cet assistant.")
+        return assistant
 
 # Créer une instance du service
 ai_assistant_service = AIAssistantService()
\ No newline at end of file
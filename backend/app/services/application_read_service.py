@@ -0,0 +1,192 @@
+# backend/app/services/application_read_service.py
+import base64
+from datetime import datetime
+
+from flask import g, has_request_context
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import selectinload
+
+from ..models.job_posting import JobApplication, JobPosting
+from ..models.organization import OrganizationMember
+from app import db
+
+# Longueur de l'extrait de lettre de motivation renvoyé dans les listes
+COVER_LETTER_EXCERPT = 200
+
+# Colonnes de la projection de liste (extrait de lettre de motivation)
+LIST_COLUMNS = (
+    JobApplication.id,
+    JobApplication.candidate_name,
+    JobApplication.candidate_email,
+    JobApplication.candidate_phone,
+    JobApplication.resume_url,
+    # Un caractère de plus que l'extrait pour savoir s'il est tronqué
+    func.substr(JobApplication.cover_letter, 1, COVER_LETTER_EXCERPT + 1).label('cover_letter'),
+    JobApplication.status,
+    JobApplication.notes,
+    JobApplication.source,
+    JobApplication.interview_schedule_id,
+    JobApplication.created_at,
+    JobApplication.updated_at,
+)
+
+
+class ApplicationReadModel:
+    """
+    Modèle de lecture des candidatures (pipelines recruteur).
+
+    Les listes sont des projections compactes paginées par curseur sur
+    (created_at, id), accompagnées des comptes par statut en une requête
+    groupée. Les droits (créateur de l'offre ou membre de son organisation)
+    sont résolus une fois par requête HTTP : les organisations de
+    l'utilisateur sont chargées en une requête et mises en cache dans `g`.
+    """
+
+    # ------------------------------------------------------------------
+    # Permissions
+    # ------------------------------------------------------------------
+
+    def organization_ids(self, user_id):
+        """Organisations de l'utilisateur (mises en cache pour la requête)"""
+        cache = self._request_cache()
+        key = str(user_id)
+        if cache is not None and key in cache:
+            return cache[key]
+
+        organization_ids = {
+            str(row[0]) for row in db.session.query(OrganizationMember.organization_id).filter(
+                OrganizationMember.user_id == user_id
+            ).all()
+        }
+
+        if cache is not None:
+            cache[key] = organization_ids
+        return organization_ids
+
+    def can_access_job(self, user_id, job):
+        """L'utilisateur est le créateur de l'offre ou membre de son organisation"""
+        if job is None:
+            return False
+        return str(job.created_by) == str(user_id) or str(job.organization_id) in self.organization_ids(user_id)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def list_for_job(self, job, status=None, cursor=None, limit=50, offset=None):
+        """
+        Candidatures d'une offre, de la plus récente à la plus ancienne.
+
+        Args:
+            job: JobPosting (droits déjà vérifiés)
+            status (str): Restreindre à une colonne du pipeline
+            cursor (str): Curseur renvoyé par l'appel précédent
+            limit (int): Nombre maximum de candidatures
+            offset (int): Décalage (compatibilité, ignoré si un curseur est fourni)
+
+        Returns:
+            dict: {'data': [...], 'status_counts': {...}, 'pagination': {...}}
+        """
+        query = db.session.query(*LIST_COLUMNS).filter(JobApplication.job_posting_id == job.id)
+        if status:
+            query = query.filter(JobApplication.status == status)
+
+        position = self.decode_cursor(cursor)
+        if position:
+            created_at, application_id = position
+            query = query.filter(or_(
+                JobApplication.created_at < created_at,
+                and_(JobApplication.created_at == created_at, JobApplication.id < application_id)
+            ))
+
+        query = query.order_by(JobApplication.created_at.desc(), JobApplication.id.desc())
+        if offset and not position:
+            query = query.offset(offset)
+
+        rows = query.limit(limit + 1).all()
+
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        status_counts = self.status_counts(job.id)
+        total = status_counts.get(status, 0) if status else sum(status_counts.values())
+
+        return {
+            'data': [self._serialize_row(row) for row in rows],
+            'status_counts': status_counts,
+            'pagination': {
+                'total': total,
+                'limit': limit,
+                'offset': offset or 0,
+                'has_next': has_next,
+                'next_cursor': self.encode_cursor(rows[-1]) if has_next and rows else None
+            }
+        }
+
+    def status_counts(self, job_id):
+        """Nombre de candidatures par statut (colonnes du pipeline) en une requête"""
+        rows = db.session.query(JobApplication.status, func.count(JobApplication.id)).filter(
+            JobApplication.job_posting_id == job_id
+        ).group_by(JobApplication.status).all()
+        return {status or 'new': count for status, count in rows}
+
+    def get_application(self, application_id):
+        """Candidature avec son offre, son organisation et son créateur chargés d'avance"""
+        return JobApplication.query.options(
+            selectinload(JobApplication.job_posting).selectinload(JobPosting.organization),
+            selectinload(JobApplication.job_posting).selectinload(JobPosting.creator)
+        ).filter(JobApplication.id == application_id).first()
+
+    # ------------------------------------------------------------------
+    # Curseurs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(row):
+        raw = f"{row.created_at.isoformat()}|{row.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Décode un curseur ; un curseur invalide est ignoré (première page)"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, application_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+            return datetime.fromisoformat(created_at), application_id
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _serialize_row(row):
+        cover_letter = row.cover_letter
+        truncated = bool(cover_letter) and len(cover_letter) > COVER_LETTER_EXCERPT
+        return {
+            'id': row.id,
+            'candidate_name': row.candidate_name,
+            'candidate_email': row.candidate_email,
+            'candidate_phone': row.candidate_phone,
+            'resume_url': row.resume_url,
+            'has_resume': bool(row.resume_url),
+            'cover_letter': cover_letter[:COVER_LETTER_EXCERPT] if truncated else cover_letter,
+            'cover_letter_truncated': truncated,
+            'status': row.status,
+            'notes': row.notes,
+            'source': row.source,
+            'interview_schedule_id': row.interview_schedule_id,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None
+        }
+
+    @staticmethod
+    def _request_cache():
+        if not has_request_context():
+            return None
+        if not hasattr(g, '_application_access'):
+            g._application_access = {}
+        return g._application_access
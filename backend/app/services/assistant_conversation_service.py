@@ -0,0 +1,422 @@
+# backend/app/services/assistant_conversation_service.py
+import atexit
+import base64
+import logging
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm.exc import NoResultFound
+
+from ..models.ai_assistant import AIConversation, AIConversationMessage
+from app import db
+
+logger = logging.getLogger(__name__)
+
+ROLE_LABELS = {'user': 'Candidat', 'assistant': 'Assistant'}
+
+# Préfixe des réponses d'erreur renvoyées par llm_service
+LLM_ERROR_PREFIX = "Erreur de l'API"
+
+
+def estimate_tokens(text):
+    """Estimation du nombre de tokens (environ 4 caractères par token)"""
+    return (len(text or '') + 3) // 4
+
+
+class AssistantConversationStore:
+    """
+    Historique persistant des conversations avec les assistants IA.
+
+    Les messages sont ajoutés (jamais modifiés) dans une table partitionnée
+    par assistant sur PostgreSQL, numérotés par conversation et lus par
+    curseur. Quand les messages non résumés dépassent le budget de tokens,
+    les plus anciens sont condensés dans le résumé glissant de la
+    conversation : le prompt ne contient que ce résumé et les derniers
+    échanges, sa taille reste bornée quelle que soit la longueur de la
+    conversation.
+
+    Le résumé (appel LLM) est mis à jour par un thread dédié alimenté par
+    une file bornée, hors de la requête ; en attendant, le contexte est
+    tronqué au budget. Sans thread démarré (scripts), il est synchrone.
+    """
+
+    def __init__(self, token_budget=None, keep_recent=None, summary_tokens=None, queue_size=None):
+        self.token_budget = token_budget or int(os.getenv('ASSISTANT_HISTORY_TOKEN_BUDGET', '1500'))
+        self.keep_recent = keep_recent or int(os.getenv('ASSISTANT_HISTORY_KEEP_RECENT', '4'))
+        self.summary_tokens = summary_tokens or int(os.getenv('ASSISTANT_SUMMARY_MAX_TOKENS', '300'))
+        self.queue_size = queue_size or int(os.getenv('ASSISTANT_SUMMARY_QUEUE_SIZE', '1000'))
+
+        self.app = None
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._queued = set()  # Conversations déjà en file
+        self._queued_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        """Démarre le thread de résumé des conversations pour l'application"""
+        self.app = app
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='assistant-summarizer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=10):
+        """Arrête le thread de résumé après avoir traité la file"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Conversations
+    # ------------------------------------------------------------------
+
+    def start(self, assistant_id, user_id, title=None):
+        """Crée une conversation"""
+        conversation = AIConversation(
+            assistant_id=assistant_id,
+            user_id=user_id,
+            title=(title or '')[:255] or None
+        )
+        db.session.add(conversation)
+        db.session.commit()
+        return conversation
+
+    def get(self, conversation_id, assistant_id, user_id):
+        """
+        Conversation d'un utilisateur avec un assistant.
+
+        Raises:
+            NoResultFound: Si la conversation n'existe pas pour cet assistant
+            PermissionError: Si elle appartient à un autre utilisateur
+        """
+        try:
+            conversation = AIConversation.query.filter_by(
+                id=uuid.UUID(str(conversation_id)), assistant_id=assistant_id
+            ).first()
+        except ValueError:
+            conversation = None
+        if conversation is None:
+            raise NoResultFound("Conversation non trouvée.")
+        if str(conversation.user_id) != str(user_id):
+            raise PermissionError("Vous n'avez pas accès à cette conversation.")
+        return conversation
+
+    def list_conversations(self, assistant_id, user_id, cursor=None, limit=20, start_date=None, end_date=None):
+        """
+        Conversations d'un utilisateur, de la plus récente à la plus ancienne.
+
+        Args:
+            cursor (str): Curseur de la dernière conversation de la page précédente
+            start_date (str): Date ISO minimale de dernière activité
+            end_date (str): Date ISO maximale de dernière activité
+
+        Returns:
+            list: Conversations, chacune avec son curseur
+        """
+        query = AIConversation.query.filter(
+            AIConversation.assistant_id == assistant_id,
+            AIConversation.user_id == user_id
+        )
+        if start_date:
+            query = query.filter(AIConversation.updated_at >= datetime.fromisoformat(start_date))
+        if end_date:
+            query = query.filter(AIConversation.updated_at <= datetime.fromisoformat(end_date))
+
+        position = self.decode_cursor(cursor)
+        if position:
+            updated_at, conversation_id = position
+            query = query.filter(or_(
+                AIConversation.updated_at < updated_at,
+                and_(AIConversation.updated_at == updated_at, AIConversation.id < conversation_id)
+            ))
+
+        conversations = query.order_by(
+            AIConversation.updated_at.desc(), AIConversation.id.desc()
+        ).limit(limit).all()
+
+        result = []
+        for conversation in conversations:
+            item = conversation.to_dict()
+            item['cursor'] = self.encode_cursor(conversation)
+            result.append(item)
+        return result
+
+    def delete_for_assistant(self, assistant_id):
+        """Supprime les conversations d'un assistant (sans commit)"""
+        AIConversationMessage.query.filter_by(assistant_id=assistant_id).delete(synchronize_session=False)
+        AIConversation.query.filter_by(assistant_id=assistant_id).delete(synchronize_session=False)
+
+    # ------------------------------------------------------------------
+    # Messages
+    # ------------------------------------------------------------------
+
+    def append_exchange(self, conversation, question, answer):
+        """Ajoute une question et sa réponse à la suite de la conversation"""
+        # Verrou sur la conversation : numérotation sans trou ni doublon
+        db.session.refresh(conversation, with_for_update=True)
+
+        sequence = conversation.message_count or 0
+        tokens = 0
+        for role, content in (('user', question), ('assistant', answer)):
+            sequence += 1
+            token_count = estimate_tokens(content)
+            db.session.add(AIConversationMessage(
+                assistant_id=conversation.assistant_id,
+                conversation_id=conversation.id,
+                sequence=sequence,
+                role=role,
+                content=content,
+                token_count=token_count
+            ))
+            tokens += token_count
+
+        conversation.message_count = sequence
+        conversation.pending_tokens = (conversation.pending_tokens or 0) + tokens
+        conversation.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    def messages(self, conversation, cursor=None, limit=50):
+        """
+        Messages d'une conversation, page par page en remontant dans le temps.
+
+        Args:
+            cursor (str): Curseur renvoyé par la page précédente (plus récente)
+            limit (int): Nombre maximum de messages
+
+        Returns:
+            dict: {'data': [...] (ordre chronologique), 'pagination': {...}}
+        """
+        query = self._messages_query(conversation)
+        before = self._decode_sequence(cursor)
+        if before is not None:
+            query = query.filter(AIConversationMessage.sequence < before)
+
+        rows = query.order_by(AIConversationMessage.sequence.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+
+        return {
+            'data': [message.to_dict() for message in rows],
+            'conversation': conversation.to_dict(),
+            'pagination': {
+                'limit': limit,
+                'has_more': has_more,
+                'next_cursor': str(rows[0].sequence) if has_more and rows else None
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Fenêtre de contexte
+    # ------------------------------------------------------------------
+
+    def context(self, conversation):
+        """
+        Historique à injecter dans le prompt : résumé glissant puis derniers
+        échanges, tronqués au budget de tokens.
+        """
+        parts = []
+        if conversation.summary:
+            parts.append(f"Résumé des échanges précédents:\n{conversation.summary}")
+
+        remaining = self.token_budget * 4
+        recent = []
+        for message in self._pending_messages(conversation, newest_first=True):
+            line = f"{ROLE_LABELS.get(message.role, message.role)}: {message.content}"
+            if len(line) > remaining:
+                if remaining > 0:
+                    recent.append('…' + line[-remaining:])
+                break
+            recent.append(line)
+            remaining -= len(line)
+
+        if recent:
+            parts.append('\n'.join(reversed(recent)))
+        return '\n\n'.join(parts)
+
+    def schedule_compaction(self, conversation, model=None):
+        """
+        Planifie la mise à jour du résumé si le budget est dépassé.
+
+        Returns:
+            bool: True si une mise à jour a été planifiée (ou faite, sans thread)
+        """
+        if (conversation.pending_tokens or 0) <= self.token_budget:
+            return False
+
+        conversation_id = conversation.id
+        if not self.running:
+            return self.compact(conversation, model)
+
+        with self._queued_lock:
+            if conversation_id in self._queued:
+                return True
+            try:
+                self._queue.put_nowait((conversation_id, model))
+            except queue.Full:
+                logger.warning("File de résumé des conversations pleine, résumé reporté au prochain échange")
+                return False
+            self._queued.add(conversation_id)
+        return True
+
+    def compact(self, conversation, model=None):
+        """
+        Condense les plus anciens messages non résumés si le budget est dépassé.
+
+        Le résumé est calculé sans verrou ; il n'est enregistré que si aucune
+        autre mise à jour n'a eu lieu entre-temps, et les tokens en attente
+        sont recomptés sous verrou pour inclure les messages ajoutés pendant
+        l'appel au LLM.
+
+        Returns:
+            bool: True si le résumé a été mis à jour
+        """
+        if (conversation.pending_tokens or 0) <= self.token_budget:
+            return False
+
+        pending = self._pending_messages(conversation)
+        folded = pending[:-self.keep_recent] if len(pending) > self.keep_recent else []
+        if not folded:
+            return False
+
+        summary_through = conversation.summary_through or 0
+        summary = self._summarize(conversation.summary, folded, model)
+
+        db.session.refresh(conversation, with_for_update=True)
+        if (conversation.summary_through or 0) != summary_through:
+            db.session.rollback()
+            return False
+
+        conversation.summary = summary
+        conversation.summary_through = folded[-1].sequence
+        conversation.pending_tokens = self._messages_query(conversation).filter(
+            AIConversationMessage.sequence > conversation.summary_through
+        ).with_entities(func.coalesce(func.sum(AIConversationMessage.token_count), 0)).scalar()
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def is_llm_error(text):
+        return not text or text.startswith(LLM_ERROR_PREFIX)
+
+    # ------------------------------------------------------------------
+    # Curseurs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(conversation):
+        raw = f"{conversation.updated_at.isoformat()}|{conversation.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Décode un curseur ; un curseur invalide est ignoré (première page)"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            updated_at, conversation_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+            return datetime.fromisoformat(updated_at), uuid.UUID(conversation_id)
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def _decode_sequence(cursor):
+        try:
+            return int(cursor) if cursor else None
+        except ValueError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Boucle de résumé
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping.is_set() or not self._queue.empty():
+            try:
+                conversation_id, model = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            with self._queued_lock:
+                self._queued.discard(conversation_id)
+
+            try:
+                with self.app.app_context():
+                    conversation = AIConversation.query.get(conversation_id)
+                    if conversation is not None:
+                        self.compact(conversation, model)
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Échec du résumé de la conversation {conversation_id}: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _messages_query(conversation):
+        # assistant_id dans le filtre : une seule partition parcourue
+        return AIConversationMessage.query.filter(
+            AIConversationMessage.assistant_id == conversation.assistant_id,
+            AIConversationMessage.conversation_id == conversation.id
+        )
+
+    def _pending_messages(self, conversation, newest_first=False):
+        order = AIConversationMessage.sequence.desc() if newest_first else AIConversationMessage.sequence
+        return self._messages_query(conversation).filter(
+            AIConversationMessage.sequence > (conversation.summary_through or 0)
+        ).order_by(order).all()
+
+    def _summarize(self, previous_summary, messages, model=None):
+        """Nouveau résumé (LLM), ou résumé extractif si l'appel échoue"""
+        transcript = '\n'.join(
+            f"{ROLE_LABELS.get(message.role, message.role)}: {message.content}" for message in messages
+        )
+        prompt = (
+            "Mettez à jour le résumé d'une conversation entre un candidat et un assistant d'entretien. "
+            "Conservez les faits, questions posées, réponses données et points en suspens, "
+            f"en {self.summary_tokens * 3 // 4} mots au maximum.\n\n"
+            f"RÉSUMÉ ACTUEL:\n{previous_summary or '(aucun)'}\n\n"
+            f"NOUVEAUX ÉCHANGES:\n{transcript}\n\nRésumé mis à jour:"
+        )
+
+        try:
+            from .llm_service import get_llm_response
+            summary = get_llm_response(prompt=prompt, model=model, temperature=0.2, max_tokens=self.summary_tokens)
+        except Exception:
+            summary = None
+
+        if self.is_llm_error(summary):
+            lines = [previous_summary] if previous_summary else []
+            lines.extend(
+                f"- {ROLE_LABELS.get(message.role, message.role)}: {message.content[:200]}" for message in messages
+            )
+            summary = '\n'.join(lines)
+
+        # Le résumé reste borné même si le modèle dépasse la consigne
+        return summary.strip()[-self.summary_tokens * 4:]
+
+
+assistant_conversation_store = None
+
+
+def get_assistant_conversation_store():
+    """Récupère (ou crée) le magasin de conversations partagé"""
+    global assistant_conversation_store
+    if assistant_conversation_store is None:
+        assistant_conversation_store = AssistantConversationStore()
+    return assistant_conversation_store
@@ -0,0 +1,523 @@
+# backend/app/services/assistant_document_index.py
+import atexit
+import json
+import logging
+import math
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import unicodedata
+import uuid
+from collections import Counter, OrderedDict, defaultdict
+
+import numpy as np
+from flask import current_app
+
+from ..models.ai_assistant import AIAssistantDocument
+from app import db
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9#+]+')
+
+# Mots outils ignorés à l'indexation comme à la recherche
+STOPWORDS = frozenset("""
+a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me meme mes moi mon ne nos
+notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous est sont
+the and or of to in for on with is are be by an as at it this that from
+""".split())
+
+# Paramètres BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Fichiers d'une version compilée de l'index d'un assistant
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+ARRAY_FILES = ('chunk_ptr', 'terms', 'freqs', 'lengths', 'idf', 'chunk_documents', 'text_ptr')
+TEXT_FILE = 'texts.bin'
+
+# Délai avant suppression d'une ancienne version (lecteurs d'autres processus)
+STALE_VERSION_SECONDS = 300
+
+
+def tokenize(text):
+    """Tokens normalisés (minuscules, sans accents, sans mots outils)"""
+    if not text:
+        return []
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(char for char in normalized if not unicodedata.combining(char))
+    return [token for token in TOKEN_PATTERN.findall(normalized) if token not in STOPWORDS]
+
+
+def extract_text(file_path):
+    """Texte brut d'un document (.txt, .md, .pdf, .docx)"""
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension in ('.txt', '.md'):
+        with open(file_path, encoding='utf-8', errors='replace') as handle:
+            return handle.read()
+
+    if extension == '.pdf':
+        from PyPDF2 import PdfReader
+        reader = PdfReader(file_path)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+    if extension == '.docx':
+        import docx
+        document = docx.Document(file_path)
+        return '\n'.join(paragraph.text for paragraph in document.paragraphs)
+
+    raise ValueError(f"Type de fichier non indexable: {extension}")
+
+
+def chunk_text(text, size, overlap):
+    """Découpe un texte en fenêtres de `size` mots se chevauchant de `overlap` mots"""
+    words = text.split()
+    if not words:
+        return []
+
+    step = max(size - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(' '.join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+class CompiledIndex:
+    """Version compilée et projetée en mémoire (np.load mmap) de l'index d'un assistant"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as handle:
+            meta = json.load(handle)
+
+        self.vocabulary = meta['vocabulary']
+        self.documents = meta['documents']
+        self.average_length = meta['average_length']
+        self.arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in ARRAY_FILES
+        }
+        self.texts = np.memmap(os.path.join(path, TEXT_FILE), dtype=np.uint8, mode='r')
+
+    @property
+    def chunk_count(self):
+        return len(self.arrays['lengths'])
+
+    def search(self, query_tokens, limit):
+        """[(score, position du chunk)] des `limit` meilleurs chunks"""
+        term_ids = sorted({self.vocabulary[token] for token in query_tokens if token in self.vocabulary})
+        if not term_ids:
+            return []
+
+        terms = self.arrays['terms']
+        positions = np.flatnonzero(np.isin(terms, term_ids))
+        if not len(positions):
+            return []
+
+        chunks = np.searchsorted(self.arrays['chunk_ptr'], positions, side='right') - 1
+        frequencies = self.arrays['freqs'][positions]
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * self.arrays['lengths'][chunks] / self.average_length)
+        contributions = self.arrays['idf'][terms[positions]] * frequencies * (BM25_K1 + 1) / (frequencies + norms)
+
+        scores = np.zeros(self.chunk_count, dtype=np.float32)
+        np.add.at(scores, chunks, contributions)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(float(scores[position]), int(position)) for position in ordered]
+
+    def chunk(self, position):
+        """Texte et document d'origine d'un chunk"""
+        start, end = self.arrays['text_ptr'][position], self.arrays['text_ptr'][position + 1]
+        document = self.documents[int(self.arrays['chunk_documents'][position])]
+        return {
+            'text': bytes(self.texts[start:end]).decode('utf-8'),
+            'document_id': document['id'],
+            'filename': document['filename'],
+            'document_type': document['document_type']
+        }
+
+
+class AssistantDocumentIndex:
+    """
+    Index local des documents de connaissance des assistants IA.
+
+    Chaque document téléchargé est extrait puis découpé en fenêtres de mots
+    qui se chevauchent ; les chunks d'un document sont conservés dans un
+    fichier source par document. L'index d'un assistant (BM25 : postings en
+    CSR, fréquences, longueurs, idf et textes) est compilé à partir de ces
+    sources dans un répertoire versionné de fichiers .npy, projetés en
+    mémoire à la lecture, et publié en remplaçant atomiquement le fichier
+    CURRENT. L'indexation est faite par un thread dédié alimenté par une file
+    bornée : les tâches d'un même assistant sont regroupées pour ne compiler
+    qu'une fois. Sans thread démarré (scripts), l'indexation est synchrone.
+    """
+
+    def __init__(self, root=None, chunk_words=None, chunk_overlap=None, queue_size=None, cache_size=None):
+        self.root = root or os.getenv('ASSISTANT_INDEX_DIR')
+        self.chunk_words = chunk_words or int(os.getenv('ASSISTANT_CHUNK_WORDS', '180'))
+        self.chunk_overlap = chunk_overlap if chunk_overlap is not None else int(os.getenv('ASSISTANT_CHUNK_OVERLAP', '30'))
+        self.queue_size = queue_size or int(os.getenv('ASSISTANT_INDEX_QUEUE_SIZE', '1000'))
+        self.cache_size = cache_size or int(os.getenv('ASSISTANT_INDEX_CACHE_SIZE', '64'))
+
+        self.app = None
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._compile_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._loaded = OrderedDict()  # assistant_id -> (version, CompiledIndex)
+
+    def init_app(self, app):
+        """Démarre le thread d'indexation pour l'application"""
+        self.app = app
+        if not self.root:
+            self.root = os.path.join(app.instance_path, 'assistant_index')
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='assistant-indexer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=10):
+        """Arrête le thread d'indexation après avoir traité la file"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Tâches
+    # ------------------------------------------------------------------
+
+    def enqueue_document(self, assistant_id, document_id):
+        """Planifie l'indexation d'un document"""
+        self._submit(('index', str(assistant_id), str(document_id)))
+
+    def enqueue_removal(self, assistant_id, document_id):
+        """Planifie le retrait d'un document de l'index"""
+        self._submit(('remove', str(assistant_id), str(document_id)))
+
+    def drop_assistant(self, assistant_id):
+        """Supprime tout l'index d'un assistant"""
+        assistant_id = str(assistant_id)
+        with self._cache_lock:
+            self._loaded.pop(assistant_id, None)
+        shutil.rmtree(self._assistant_path(assistant_id), ignore_errors=True)
+
+    def rebuild(self, assistant_id):
+        """
+        Réextrait et recompile tous les documents d'un assistant.
+
+        Returns:
+            int: Nombre de chunks indexés
+        """
+        assistant_id = str(assistant_id)
+        shutil.rmtree(self._sources_path(assistant_id), ignore_errors=True)
+        documents = AIAssistantDocument.query.filter_by(assistant_id=assistant_id).all()
+        self._process([('index', assistant_id, str(document.id)) for document in documents])
+        return self.chunk_count(assistant_id)
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def search(self, assistant_id, query, limit=None):
+        """
+        Chunks les plus pertinents des documents d'un assistant.
+
+        Args:
+            assistant_id (str): ID de l'assistant
+            query (str): Question posée
+            limit (int): Nombre maximum de chunks
+
+        Returns:
+            list: [{'text', 'document_id', 'filename', 'document_type', 'score'}]
+        """
+        limit = limit or int(os.getenv('ASSISTANT_CONTEXT_TOP_K', '4'))
+        tokens = tokenize(query)
+        if not tokens or not assistant_id:
+            return []
+
+        index = self._load(str(assistant_id))
+        if index is None:
+            return []
+
+        results = []
+        for score, position in index.search(tokens, limit):
+            chunk = index.chunk(position)
+            chunk['score'] = round(score, 4)
+            results.append(chunk)
+        return results
+
+    def chunk_count(self, assistant_id):
+        index = self._load(str(assistant_id))
+        return index.chunk_count if index is not None else 0
+
+    # ------------------------------------------------------------------
+    # Boucle d'indexation
+    # ------------------------------------------------------------------
+
+    def _submit(self, job):
+        if self.running:
+            try:
+                self._queue.put_nowait(job)
+                return
+            except queue.Full:
+                logger.warning("File d'indexation des documents pleine, indexation synchrone")
+        self._process([job])
+
+    def _run(self):
+        while not self._stopping.is_set() or not self._queue.empty():
+            try:
+                jobs = [self._queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+
+            while True:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with self.app.app_context():
+                    self._process(jobs)
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Échec du traitement de {len(jobs)} tâches d'indexation: {str(e)}")
+
+    def _process(self, jobs):
+        """Applique les tâches puis compile une fois chaque assistant concerné"""
+        if self.root is None:
+            self.root = os.path.join(current_app.instance_path, 'assistant_index')
+
+        by_assistant = defaultdict(list)
+        for action, assistant_id, document_id in jobs:
+            by_assistant[assistant_id].append((action, document_id))
+
+        for assistant_id, assistant_jobs in by_assistant.items():
+            ingested = {}
+            for action, document_id in assistant_jobs:
+                if action == 'remove':
+                    ingested.pop(document_id, None)
+                    self._remove_source(assistant_id, document_id)
+                    continue
+                document = AIAssistantDocument.query.filter_by(id=document_id).first()
+                if document is None:
+                    continue
+                try:
+                    self._set_status(document, 'processing')
+                    ingested[document_id] = (document, self._ingest(assistant_id, document))
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'indexation du document {document_id}: {str(e)}")
+                    self._set_status(document, 'failed')
+
+            try:
+                self._compile(assistant_id)
+            except Exception as e:
+                logger.error(f"Erreur lors de la compilation de l'index de l'assistant {assistant_id}: {str(e)}")
+                for document, _ in ingested.values():
+                    self._set_status(document, 'failed')
+                continue
+
+            for document, chunk_count in ingested.values():
+                document.chunk_count = chunk_count
+                self._set_status(document, 'completed')
+
+    def _ingest(self, assistant_id, document):
+        """Extrait et découpe un document dans son fichier source"""
+        chunks = chunk_text(extract_text(document.file_path), self.chunk_words, self.chunk_overlap)
+        source = {
+            'id': str(document.id),
+            'filename': document.original_filename,
+            'document_type': document.document_type,
+            'chunks': chunks
+        }
+
+        sources_path = self._sources_path(assistant_id)
+        os.makedirs(sources_path, exist_ok=True)
+        target = os.path.join(sources_path, f'{document.id}.json')
+        temporary = f'{target}.{uuid.uuid4().hex}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(source, handle, ensure_ascii=False)
+        os.replace(temporary, target)
+        return len(chunks)
+
+    def _remove_source(self, assistant_id, document_id):
+        try:
+            os.remove(os.path.join(self._sources_path(assistant_id), f'{document_id}.json'))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _set_status(document, status):
+        document.vector_index_status = status
+        db.session.commit()
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    def _compile(self, assistant_id):
+        """Compile les sources d'un assistant dans une nouvelle version de l'index"""
+        with self._compile_lock:
+            documents, chunk_documents, chunk_texts = [], [], []
+            sources_path = self._sources_path(assistant_id)
+            for name in sorted(os.listdir(sources_path)) if os.path.isdir(sources_path) else []:
+                if not name.endswith('.json'):
+                    continue
+                with open(os.path.join(sources_path, name), encoding='utf-8') as handle:
+                    source = json.load(handle)
+                position = len(documents)
+                documents.append({key: source[key] for key in ('id', 'filename', 'document_type')})
+                for text in source['chunks']:
+                    chunk_documents.append(position)
+                    chunk_texts.append(text)
+
+            assistant_path = self._assistant_path(assistant_id)
+            os.makedirs(assistant_path, exist_ok=True)
+            if not chunk_texts:
+                self._publish(assistant_id, None)
+                return
+
+            vocabulary = {}
+            document_frequency = Counter()
+            chunk_ptr, terms, freqs, lengths = [0], [], [], []
+            for text in chunk_texts:
+                counts = Counter(tokenize(text))
+                for token, count in counts.items():
+                    term_id = vocabulary.setdefault(token, len(vocabulary))
+                    document_frequency[term_id] += 1
+                    terms.append(term_id)
+                    freqs.append(count)
+                chunk_ptr.append(len(terms))
+                lengths.append(sum(counts.values()))
+
+            total = len(chunk_texts)
+            idf = [
+                math.log(1 + (total - document_frequency[term_id] + 0.5) / (document_frequency[term_id] + 0.5))
+                for term_id in range(len(vocabulary))
+            ]
+
+            encoded = [text.encode('utf-8') for text in chunk_texts]
+            text_ptr = np.zeros(total + 1, dtype=np.int64)
+            np.cumsum([len(text) for text in encoded], out=text_ptr[1:])
+
+            arrays = {
+                'chunk_ptr': np.asarray(chunk_ptr, dtype=np.int64),
+                'terms': np.asarray(terms, dtype=np.int32),
+                'freqs': np.asarray(freqs, dtype=np.float32),
+                'lengths': np.asarray(lengths, dtype=np.float32),
+                'idf': np.asarray(idf, dtype=np.float32),
+                'chunk_documents': np.asarray(chunk_documents, dtype=np.int32),
+                'text_ptr': text_ptr
+            }
+
+            version = f'index-{int(time.time())}-{uuid.uuid4().hex[:8]}'
+            staging = os.path.join(assistant_path, f'.{version}.tmp')
+            os.makedirs(staging)
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f'{name}.npy'), array)
+            with open(os.path.join(staging, TEXT_FILE), 'wb') as handle:
+                handle.write(b''.join(encoded) or b'\0')
+            with open(os.path.join(staging, META_FILE), 'w', encoding='utf-8') as handle:
+                json.dump({
+                    'vocabulary': vocabulary,
+                    'documents': documents,
+                    'average_length': max(sum(lengths) / total, 1.0)
+                }, handle, ensure_ascii=False)
+            os.replace(staging, os.path.join(assistant_path, version))
+
+            self._publish(assistant_id, version)
+
+    def _publish(self, assistant_id, version):
+        """Remplace atomiquement la version courante puis purge les anciennes"""
+        assistant_path = self._assistant_path(assistant_id)
+        current = os.path.join(assistant_path, CURRENT_FILE)
+        if version is None:
+            try:
+                os.remove(current)
+            except FileNotFoundError:
+                pass
+        else:
+            temporary = f'{current}.{uuid.uuid4().hex}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as handle:
+                handle.write(version)
+            os.replace(temporary, current)
+
+        with self._cache_lock:
+            self._loaded.pop(assistant_id, None)
+
+        threshold = time.time() - STALE_VERSION_SECONDS
+        for name in os.listdir(assistant_path):
+            path = os.path.join(assistant_path, name)
+            if name.startswith('index-') and name != version and os.path.getmtime(path) < threshold:
+                shutil.rmtree(path, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _load(self, assistant_id):
+        """Version courante de l'index (rechargée si un autre processus l'a remplacée)"""
+        if self.root is None:
+            return None
+        try:
+            with open(os.path.join(self._assistant_path(assistant_id), CURRENT_FILE), encoding='utf-8') as handle:
+                version = handle.read().strip()
+        except FileNotFoundError:
+            return None
+
+        with self._cache_lock:
+            cached = self._loaded.get(assistant_id)
+            if cached and cached[0] == version:
+                self._loaded.move_to_end(assistant_id)
+                return cached[1]
+
+        try:
+            index = CompiledIndex(os.path.join(self._assistant_path(assistant_id), version))
+        except (OSError, ValueError) as e:
+            logger.error(f"Index de l'assistant {assistant_id} illisible: {str(e)}")
+            return None
+
+        with self._cache_lock:
+            self._loaded[assistant_id] = (version, index)
+            self._loaded.move_to_end(assistant_id)
+            while len(self._loaded) > self.cache_size:
+                self._loaded.popitem(last=False)
+        return index
+
+    def _assistant_path(self, assistant_id):
+        return os.path.join(self.root, str(assistant_id))
+
+    def _sources_path(self, assistant_id):
+        return os.path.join(self._assistant_path(assistant_id), 'documents')
+
+
+assistant_document_index = None
+
+
+def get_assistant_document_index():
+    """Récupère (ou crée) l'index des documents d'assistants partagé"""
+    global assistant_document_index
+    if assistant_document_index is None:
+        assistant_document_index = AssistantDocumentIndex()
+    return assistant_document_index
@@ -0,0 +1,193 @@
+# backend/app/services/assistant_prompt_builder.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+INDUSTRY_LABELS = {
+    'technology': 'technologie',
+    'finance': 'finance',
+    'healthcare': 'santé',
+    'education': 'éducation',
+    'retail': 'commerce de détail',
+    'manufacturing': 'industrie'
+}
+
+ROLE_LABELS = {
+    'software-engineer': 'ingénieur logiciel',
+    'data-scientist': 'data scientist',
+    'product-manager': 'chef de produit',
+    'designer': 'designer',
+    'marketing': 'spécialiste marketing',
+    'sales': 'commercial',
+    'customer-support': 'agent de support client'
+}
+
+SENIORITY_LABELS = {
+    'entry-level': 'débutant',
+    'mid-level': 'intermédiaire',
+    'senior': 'senior',
+    'management': 'manager',
+    'executive': 'cadre dirigeant'
+}
+
+# Traits de personnalité : (clé, libellé, {niveau: description}, description au-delà de 4)
+PERSONALITY_TRAITS = (
+    ('friendliness', 'Convivialité',
+     {1: 'très formel et direct', 2: 'plutôt formel', 3: 'équilibré', 4: 'chaleureux'},
+     'très chaleureux et détendu'),
+    ('formality', 'Formalité',
+     {1: 'très conversationnel', 2: 'plutôt informel', 3: 'équilibré', 4: 'formel'},
+     'très formel'),
+    ('technicalDepth', 'Profondeur technique',
+     {1: 'conceptuel et général', 2: 'notions de base', 3: 'équilibré', 4: 'détaillé'},
+     'très technique et détaillé'),
+    ('followUpIntensity', 'Questions de suivi',
+     {1: 'basiques', 2: 'occasionnelles', 3: 'équilibrées', 4: 'approfondies'},
+     'très approfondies et challenging'),
+)
+
+# Domaines de connaissances : (clé, valeur par défaut, ligne du prompt)
+KNOWLEDGE_AREAS = (
+    ('technicalSkills', True, 'Compétences techniques pertinentes pour le poste'),
+    ('softSkills', True, 'Compétences comportementales et interpersonnelles'),
+    ('companyValues', False, "Valeurs et culture d'entreprise"),
+    ('industryTrends', False, 'Tendances actuelles du secteur'),
+)
+
+# Champs de l'assistant qui entrent dans le préfixe (clé d'un aperçu)
+PERSONA_FIELDS = ('industry', 'jobRole', 'seniority', 'personality', 'baseKnowledge', 'customPrompt')
+
+AssistantPrompt = namedtuple('AssistantPrompt', ['prefix', 'suffix'])
+
+
+class AssistantPromptBuilder:
+    """
+    Assemblage des prompts des assistants IA.
+
+    Le préfixe stable (persona, personnalité, domaines de connaissances et
+    instructions personnalisées) est compilé une fois par version
+    d'assistant (id, updated_at) ou, en mode aperçu, par empreinte de la
+    configuration, et conservé dans un cache LRU en mémoire. Seul le
+    suffixe (extraits de documents, historique et question) est construit
+    à chaque appel ; le préfixe est transmis tel quel aux fournisseurs LLM
+    qui savent le mettre en cache.
+    """
+
+    def __init__(self, cache_size=None):
+        self.cache_size = cache_size or int(os.getenv('ASSISTANT_PROMPT_CACHE_SIZE', '256'))
+        self._lock = threading.Lock()
+        self._prefixes = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    # ------------------------------------------------------------------
+    # Assemblage
+    # ------------------------------------------------------------------
+
+    def prefix_for_assistant(self, assistant):
+        """Préfixe d'un assistant enregistré (compilé au premier appel de chaque version)"""
+        key = ('assistant', str(assistant.id), assistant.updated_at.isoformat() if assistant.updated_at else None)
+        return self._cached(key, lambda: assistant.to_dict())
+
+    def prefix_for_data(self, assistant_data):
+        """Préfixe d'une configuration non enregistrée (mode aperçu)"""
+        persona = {field: assistant_data.get(field) for field in PERSONA_FIELDS}
+        fingerprint = hashlib.sha1(json.dumps(persona, sort_keys=True, default=str).encode()).hexdigest()
+        return self._cached(('preview', fingerprint), lambda: assistant_data)
+
+    def build(self, prefix, question, context='', history=''):
+        """
+        Assemble le prompt d'une question.
+
+        Args:
+            prefix (str): Préfixe compilé
+            question (str): Question posée
+            context (str): Extraits de documents à injecter
+            history (str): Historique borné de la conversation (résumé et derniers échanges)
+
+        Returns:
+            AssistantPrompt: (prefix, suffix) ; prefix + suffix est le prompt complet
+        """
+        suffix = ''
+        if context:
+            suffix += f"\n\nDOCUMENTS DE RÉFÉRENCE (à utiliser si pertinents):\n{context}"
+        if history:
+            suffix += f"\n\nHISTORIQUE DE LA CONVERSATION:\n{history}"
+        suffix += f"\n\nQUESTION DU CANDIDAT: {question}\n\nVotre réponse:"
+        return AssistantPrompt(prefix, suffix)
+
+    def invalidate(self, assistant_id):
+        """Retire les préfixes compilés d'un assistant"""
+        assistant_id = str(assistant_id)
+        with self._lock:
+            for key in [key for key in self._prefixes if key[0] == 'assistant' and key[1] == assistant_id]:
+                del self._prefixes[key]
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compile(assistant_data):
+        """Compile le préfixe stable d'un assistant"""
+        personality = assistant_data.get('personality') or {}
+        base_knowledge = assistant_data.get('baseKnowledge') or {}
+
+        industry = INDUSTRY_LABELS.get(assistant_data.get('industry', ''), assistant_data.get('industry', ''))
+        job_role = ROLE_LABELS.get(assistant_data.get('jobRole', ''), assistant_data.get('jobRole', ''))
+        seniority = SENIORITY_LABELS.get(assistant_data.get('seniority', ''), assistant_data.get('seniority', ''))
+
+        lines = [
+            f"Vous êtes un assistant d'entretien professionnel spécialisé dans le secteur de {industry} "
+            f"pour le poste de {job_role} de niveau {seniority}.",
+            '',
+            'PARAMÈTRES DE PERSONNALITÉ:'
+        ]
+        for key, label, descriptions, highest in PERSONALITY_TRAITS:
+            level = personality.get(key, 3)
+            lines.append(f"- {label}: {level}/5 ({descriptions.get(level, highest)})")
+
+        lines.append('')
+        lines.append('DOMAINES DE CONNAISSANCES:')
+        lines.extend(f"- {text}" for key, default, text in KNOWLEDGE_AREAS if base_knowledge.get(key, default))
+
+        prompt = '\n'.join(lines)
+
+        custom_prompt = assistant_data.get('customPrompt', '')
+        if custom_prompt:
+            prompt += f"\n\nINSTRUCTIONS PERSONNALISÉES:\n{custom_prompt}"
+
+        return prompt
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _cached(self, key, load_data):
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                self.stats['hits'] += 1
+                return prefix
+            self.stats['misses'] += 1
+
+        prefix = self.compile(load_data())
+
+        with self._lock:
+            self._prefixes[key] = prefix
+            while len(self._prefixes) > self.cache_size:
+                self._prefixes.popitem(last=False)
+        return prefix
+
+
+assistant_prompt_builder = None
+
+
+def get_assistant_prompt_builder():
+    """Récupère (ou crée) l'assembleur de prompts partagé"""
+    global assistant_prompt_builder
+    if assistant_prompt_builder is None:
+        assistant_prompt_builder = AssistantPromptBuilder()
+    return assistant_prompt_builder
@@ -1,7 +1,16 @@
+import json
+import uuid
+from datetime import datetime
+
 from ..models.audit_log import AuditLog
+from .audit_storage import AuditLogStore
+from .audit_writer import get_audit_writer
 from app import db
 
 class AuditService:
+    def __init__(self):
+        self.store = AuditLogStore()
+    
     def log_action(self, organization_id, user_id, action, entity_type, entity_id=None, 
                    description=None, metadata=None, request=None):
         """
@@ -24,83 +33,68 @@ class AuditService:
             ip_address = request.remote_addr
             user_agent = request.headers.get('User-Agent', '')
         
-        audit_log = AuditLog(
-            organization_id=organization_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            description=description,
-            metadata=metadata,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
+        values = {
+            'id': str(uuid.uuid4()),
+            'organization_id': organization_id,
+            'user_id': user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': str(entity_id) if entity_id is not None else None,
+            'description': description or f"{action} {entity_type}",
+            'data': metadata,
+            'ip_address': ip_address,
+            'user_agent': user_agent[:255] if user_agent else user_agent,
+            'created_at': datetime.utcnow()
+        }
+        
+        # Écriture différée par lots : pas de commit dans la transaction de l'appelant
+        writer = get_audit_writer()
+        if writer.running:
+            writer.enqueue(values)
+            return AuditLog(**values)
+        
+        audit_log = AuditLog(**values)
         db.session.add(audit_log)
         db.session.commit()
         
         return audit_log
     
+    def get_pipeline_stats(self):
+        """Compteurs de l'écriture asynchrone des logs d'audit"""
+        return get_audit_writer().get_stats()
+    
     def get_organization_logs(self, organization_id, filters=None, page=1, per_page=50):
         """
         Récupère les logs d'audit d'une organisation avec possibilité de filtrage.
-        """
-        query = AuditLog.query.filter_by(organization_id=organization_id)
         
-        if filters:
-            if 'user_id' in filters:
-                query = query.filter_by(user_id=filters['user_id'])
-            if 'action' in filters:
-                query = query.filter_by(action=filters['action'])
-            if 'entity_type' in filters:
-                query = query.filter_by(entity_type=filters['entity_type'])
-            if 'entity_id' in filters:
-                query = query.filter_by(entity_id=filters['entity_id'])
-            if 'date_from' in filters and filters['date_from']:
-                from datetime import datetime
-                try:
-                    date_from = datetime.fromisoformat(filters['date_from'])
-                    query = query.filter(AuditLog.created_at >= date_from)
-                except ValueError:
-                    pass
-            
-            if 'date_to' in filters and filters['date_to']:
-                from datetime import datetime
-                try:
-                    date_to = datetime.fromisoformat(filters['date_to'])
-                    query = query.filter(AuditLog.created_at <= date_to)
-                except ValueError:
-                    pass
-            
-            if 'search' in filters and filters['search']:
-                search = f"%{filters['search']}%"
-                query = query.filter(AuditLog.description.ilike(search))
-                
-        # Tri par date (plus récent d'abord)
-        query = query.order_by(AuditLog.created_at.desc())
-        
-        # Pagination
-        paginated_logs = query.paginate(page=page, per_page=per_page)
+        Les pages au-delà de la fenêtre chaude se poursuivent dans l'archive.
+        """
+        return self.store.paginate_logs(organization_id, filters, page=page, per_page=per_page)
+    
+    def get_organization_logs_page(self, organization_id, filters=None, cursor=None, limit=50, archived=False):
+        """
+        Récupère une page de logs par curseur (temps constant quelle que soit la profondeur).
         
-        return paginated_logs
+        Returns:
+            tuple: (liste des logs, curseur de la page suivante ou None)
+        """
+        return self.store.list_logs(organization_id, filters, cursor=cursor, limit=limit, archived=archived)
     
-    def get_entity_history(self, organization_id, entity_type, entity_id):
+    def get_entity_history(self, organization_id, entity_type, entity_id, cursor=None, limit=200):
         """
-        Récupère l'historique complet d'une entité spécifique.
+        Récupère l'historique d'une entité spécifique, par pages de `limit` logs.
         
         Args:
             organization_id: ID de l'organisation
             entity_type: Type d'entité (user, interview, invitation, etc.)
             entity_id: ID de l'entité
+            cursor: Curseur renvoyé par l'appel précédent (optionnel)
+            limit: Nombre maximum de logs (par défaut: 200)
             
         Returns:
-            Liste des logs concernant cette entité, triés par date
+            tuple: (liste des logs triés par date, curseur suivant ou None)
         """
-        return AuditLog.query.filter_by(
-            organization_id=organization_id,
-            entity_type=entity_type,
-            entity_id=entity_id
-        ).order_by(AuditLog.created_at).all()
+        return self.store.entity_history(organization_id, entity_type, entity_id, cursor=cursor, limit=limit)
     
     def get_user_actions(self, organization_id, user_id, page=1, per_page=50):
         """
@@ -113,14 +107,9 @@ class AuditService:
             per_page: Nombre d'éléments par page (par défaut: 50)
             
         Returns:
-            Objet de pagination contenant les logs
+            Objet de pagination contenant les logs (archive comprise)
         """
-        query = AuditLog.query.filter_by(
-            organization_id=organization_id,
-            user_id=user_id
-        ).order_by(AuditLog.created_at.desc())
-        
-        return query.paginate(page=page, per_page=per_page)
+        return self.store.paginate_logs(organization_id, {'user_id': user_id}, page=page, per_page=per_page)
     
     def get_recent_actions(self, organization_id, limit=10):
         """
@@ -151,32 +140,7 @@ class AuditService:
         """
         # Récupérer tous les logs sans pagination
         query = AuditLog.query.filter_by(organization_id=organization_id)
-        
-        if filters:
-            if 'user_id' in filters and filters['user_id']:
-                query = query.filter_by(user_id=filters['user_id'])
-            
-            if 'action' in filters and filters['action']:
-                query = query.filter_by(action=filters['action'])
-            
-            if 'entity_type' in filters and filters['entity_type']:
-                query = query.filter_by(entity_type=filters['entity_type'])
-            
-            if 'date_from' in filters and filters['date_from']:
-                from datetime import datetime
-                try:
-                    date_from = datetime.fromisoformat(filters['date_from'])
-                    query = query.filter(AuditLog.created_at >= date_from)
-                except ValueError:
-                    pass
-            
-            if 'date_to' in filters and filters['date_to']:
-                from datetime import datetime
-                try:
-                    date_to = datetime.fromisoformat(filters['date_to'])
-                    query = query.filter(AuditLog.created_at <= date_to)
-                except ValueError:
-                    pass
+        query = self.store.apply_filters(query, AuditLog, filters or {})
         
         logs = query.order_by(AuditLog.created_at.desc()).all()
         
@@ -245,4 +209,7 @@ class AuditService:
             
             db.session.commit()
         
+        # Appliquer la même limite à l'archive de l'organisation
+        count_to_delete += self.store.purge_archive(days_to_keep, organization_id=organization_id)
+        
         return count_to_delete
\ No newline at end of file
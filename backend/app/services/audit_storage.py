@@ -0,0 +1,253 @@
+# backend/app/services/audit_storage.py
+import base64
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select
+
+from ..models.audit_log import AuditLog, AuditLogArchive
+from app import db
+
+# Page de la liste paginée par numéro (mêmes attributs que la pagination Flask-SQLAlchemy utilisés par les routes)
+AuditLogPage = namedtuple('AuditLogPage', ['items', 'total', 'pages', 'page', 'per_page'])
+
+
+class AuditLogStore:
+    """
+    Couche de stockage et de requête des logs d'audit.
+
+    La table audit_logs ne conserve qu'une fenêtre chaude
+    (AUDIT_HOT_RETENTION_DAYS) ; les logs plus anciens sont déplacés par lots
+    dans audit_logs_archive, elle-même purgée après AUDIT_RETENTION_DAYS.
+    Les listes sont paginées par curseur (created_at, id) pour rester en temps
+    constant quelle que soit la profondeur de page. L'historique d'une entité
+    et la liste paginée par numéro couvrent les deux tables.
+    """
+
+    def __init__(self, hot_retention_days=None, retention_days=None, batch_size=None):
+        self.hot_retention_days = hot_retention_days or int(os.getenv('AUDIT_HOT_RETENTION_DAYS', '180'))
+        self.retention_days = retention_days or int(os.getenv('AUDIT_RETENTION_DAYS', '1095'))
+        self.batch_size = batch_size or int(os.getenv('AUDIT_ARCHIVE_BATCH_SIZE', '5000'))
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def list_logs(self, organization_id, filters=None, cursor=None, limit=50, archived=False):
+        """
+        Liste les logs d'une organisation, du plus récent au plus ancien.
+
+        Args:
+            organization_id: ID de l'organisation
+            filters (dict): user_id, action, entity_type, entity_id, date_from, date_to, search
+            cursor (str): Curseur renvoyé par l'appel précédent
+            limit (int): Nombre maximum de logs
+            archived (bool): Interroger l'archive au lieu de la fenêtre chaude
+
+        Returns:
+            tuple: (liste des logs, curseur suivant ou None)
+        """
+        model = AuditLogArchive if archived else AuditLog
+        query = model.query.filter(model.organization_id == organization_id)
+        query = self.apply_filters(query, model, filters or {})
+
+        position = self.decode_cursor(cursor)
+        if position:
+            created_at, log_id = position
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < log_id)
+            ))
+
+        logs = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+        return self._page(logs, limit)
+
+    def paginate_logs(self, organization_id, filters=None, page=1, per_page=50):
+        """
+        Liste paginée par numéro de page, du plus récent au plus ancien.
+
+        Les logs archivés (plus anciens que la fenêtre chaude) suivent ceux de
+        audit_logs : une page qui dépasse la table chaude se poursuit dans
+        l'archive.
+
+        Returns:
+            AuditLogPage: items, total, pages, page, per_page
+        """
+        page = max(page or 1, 1)
+        per_page = max(per_page or 1, 1)
+        offset = (page - 1) * per_page
+
+        queries = []
+        for model in (AuditLog, AuditLogArchive):
+            query = model.query.filter(model.organization_id == organization_id)
+            query = self.apply_filters(query, model, filters or {})
+            queries.append((model, query, query.order_by(None).count()))
+
+        items = []
+        for model, query, count in queries:
+            if len(items) < per_page and offset < count:
+                items.extend(query.order_by(model.created_at.desc(), model.id.desc()).offset(offset).limit(
+                    per_page - len(items)
+                ).all())
+            offset = max(offset - count, 0)
+
+        total = sum(count for _, _, count in queries)
+        return AuditLogPage(items, total, -(-total // per_page), page, per_page)
+
+    def entity_history(self, organization_id, entity_type, entity_id, cursor=None, limit=200):
+        """
+        Historique d'une entité, du plus ancien au plus récent, borné à `limit` logs.
+
+        Les logs archivés et ceux de la fenêtre chaude sont fusionnés par
+        (created_at, id) : le curseur vaut pour les deux tables.
+
+        Returns:
+            tuple: (liste des logs, curseur suivant ou None)
+        """
+        position = self.decode_cursor(cursor)
+
+        logs = []
+        for model in (AuditLogArchive, AuditLog):
+            query = model.query.filter(
+                model.organization_id == organization_id,
+                model.entity_type == entity_type,
+                model.entity_id == str(entity_id)
+            )
+            if position:
+                created_at, log_id = position
+                query = query.filter(or_(
+                    model.created_at > created_at,
+                    and_(model.created_at == created_at, model.id > log_id)
+                ))
+            logs.extend(query.order_by(model.created_at, model.id).limit(limit + 1).all())
+
+        logs.sort(key=lambda log: (log.created_at, log.id))
+        return self._page(logs[:limit + 1], limit)
+
+    # ------------------------------------------------------------------
+    # Archivage et rétention
+    # ------------------------------------------------------------------
+
+    def archive_old_logs(self, older_than_days=None, max_batches=None):
+        """
+        Déplace les logs antérieurs à la fenêtre chaude dans audit_logs_archive.
+
+        Chaque lot est copié puis supprimé dans la même transaction.
+
+        Returns:
+            int: Nombre de logs archivés
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days or self.hot_retention_days)
+        source = AuditLog.__table__
+        target = AuditLogArchive.__table__
+        columns = [column.name for column in source.columns]
+
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            ids = [row[0] for row in db.session.query(AuditLog.id).filter(
+                AuditLog.created_at < cutoff
+            ).order_by(AuditLog.created_at).limit(self.batch_size).all()]
+
+            if not ids:
+                break
+
+            db.session.execute(target.insert().from_select(
+                columns,
+                select(*[source.c[name] for name in columns]).where(source.c.id.in_(ids))
+            ))
+            db.session.execute(source.delete().where(source.c.id.in_(ids)))
+            db.session.commit()
+
+            archived += len(ids)
+            batches += 1
+
+        return archived
+
+    def purge_archive(self, older_than_days=None, organization_id=None):
+        """
+        Supprime définitivement les logs archivés au-delà de la durée de rétention.
+
+        Returns:
+            int: Nombre de logs supprimés
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days or self.retention_days)
+        table = AuditLogArchive.__table__
+
+        deleted = 0
+        while True:
+            query = db.session.query(AuditLogArchive.id).filter(AuditLogArchive.created_at < cutoff)
+            if organization_id is not None:
+                query = query.filter(AuditLogArchive.organization_id == organization_id)
+            ids = [row[0] for row in query.limit(self.batch_size).all()]
+
+            if not ids:
+                break
+
+            db.session.execute(table.delete().where(table.c.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+
+        return deleted
+
+    # ------------------------------------------------------------------
+    # Curseurs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(log):
+        raw = f"{log.created_at.isoformat()}|{log.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Décode un curseur ; un curseur invalide est ignoré (première page)"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, log_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+            return datetime.fromisoformat(created_at), log_id
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _page(self, logs, limit):
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = self.encode_cursor(logs[-1])
+        return logs, next_cursor
+
+    def apply_filters(self, query, model, filters):
+        """Applique les filtres des écrans d'audit à une requête sur AuditLog ou AuditLogArchive"""
+        for field in ('user_id', 'action', 'entity_type', 'entity_id'):
+            if filters.get(field):
+                query = query.filter(getattr(model, field) == filters[field])
+
+        date_from = self._parse_date(filters.get('date_from'))
+        if date_from:
+            query = query.filter(model.created_at >= date_from)
+
+        date_to = self._parse_date(filters.get('date_to'))
+        if date_to:
+            query = query.filter(model.created_at <= date_to)
+
+        if filters.get('search'):
+            # Servi par l'index trigramme sur PostgreSQL
+            query = query.filter(model.description.ilike(f"%{filters['search']}%"))
+
+        return query
+
+    @staticmethod
+    def _parse_date(value):
+        if not value or isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
@@ -0,0 +1,365 @@
+# backend/app/services/audit_writer.py
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+
+from ..models.audit_log import AuditLog
+from app import db
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrous limités au processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Nombre de rejeus en échec d'un enregistrement, conservé dans le journal local
+WAL_ATTEMPTS_KEY = '__wal_attempts__'
+
+# Erreurs de disponibilité de la base : le rejeu est reporté sans être compté
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+
+class AuditLogWriter:
+    """
+    Écriture asynchrone et groupée des logs d'audit.
+
+    Les enregistrements sont placés dans une file bornée puis insérés par lots
+    (taille ou délai atteint) par un thread dédié, sur sa propre connexion :
+    l'appelant ne paie plus de commit supplémentaire. En cas d'échec de la base
+    ou de file pleine, les enregistrements sont ajoutés à un journal local
+    (write-ahead file, JSON lines) rejoué au prochain lot réussi.
+
+    Le journal est partagé par les processus d'une même instance : les
+    ajouts et la prise du journal sont protégés par un verrou fcntl, et un
+    seul processus rejoue à la fois. Un lot rejeté par la base (hors
+    indisponibilité) est réessayé enregistrement par enregistrement ; un
+    enregistrement refusé AUDIT_WAL_MAX_ATTEMPTS fois est mis en quarantaine
+    (fichier .quarantine à côté du journal) au lieu de bloquer ceux qui le
+    suivent.
+
+    Les sous-classes réutilisent le pipeline pour d'autres tables en
+    redéfinissant les attributs de classe ci-dessous.
+    """
+
+    table = AuditLog.__table__
+    env_prefix = 'AUDIT'
+    thread_name = 'audit-writer'
+    wal_filename = 'audit_wal.jsonl'
+    datetime_fields = ('created_at',)
+    label = "logs d'audit"
+
+    def __init__(self, queue_size=None, flush_size=None, flush_interval=None, wal_path=None):
+        self.queue_size = queue_size or int(os.getenv(f'{self.env_prefix}_QUEUE_SIZE', '10000'))
+        self.flush_size = flush_size or int(os.getenv(f'{self.env_prefix}_FLUSH_SIZE', '200'))
+        self.flush_interval = flush_interval or float(os.getenv(f'{self.env_prefix}_FLUSH_INTERVAL', '2'))
+        self.wal_path = wal_path or os.getenv(f'{self.env_prefix}_WAL_PATH')
+        self.wal_max_attempts = int(os.getenv(f'{self.env_prefix}_WAL_MAX_ATTEMPTS', '5'))
+
+        self.app = None
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._wal_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'flushes': 0,
+            'failures': 0,
+            'spilled_to_wal': 0,
+            'replayed_from_wal': 0,
+            'quarantined': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    def init_app(self, app):
+        """Démarre le thread d'écriture pour l'application"""
+        self.app = app
+        if not self.wal_path:
+            self.wal_path = os.path.join(app.instance_path, self.wal_filename)
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, record):
+        """
+        Ajoute un enregistrement d'audit à la file.
+
+        Args:
+            record (dict): Valeurs des colonnes de AuditLog (id et created_at inclus)
+        """
+        try:
+            self._queue.put_nowait(record)
+            self._count('enqueued')
+        except queue.Full:
+            # Ne jamais bloquer l'appelant : le journal local sera rejoué plus tard
+            self._spill([record])
+
+    def flush(self):
+        """Écrit immédiatement le contenu de la file (appel synchrone)"""
+        batch = self._drain(self._queue.qsize())
+        if batch:
+            self._write(batch)
+
+    def stop(self, timeout=10):
+        """Arrête le thread d'écriture après avoir vidé la file"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self):
+        """Compteurs du pipeline (profondeur de file, latence des lots, journal local)"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        flushes = stats.pop('total_flush_ms')
+        stats['avg_flush_ms'] = round(flushes / stats['flushes'], 2) if stats['flushes'] else 0.0
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_size'] = self.queue_size
+        stats['wal_pending'] = self._wal_line_count()
+        stats['running'] = self.running
+        return stats
+
+    # ------------------------------------------------------------------
+    # Boucle d'écriture
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            batch = []
+
+            while len(batch) < self.flush_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            elif self._has_wal():
+                self._replay_wal()
+
+        # Vider la file avant l'arrêt
+        self.flush()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Insère un lot en une seule requête, ou le reporte dans le journal local"""
+        started = time.perf_counter()
+        try:
+            self._insert(batch)
+        except Exception as e:
+            logger.error(f"Échec d'écriture de {len(batch)} {self.label}: {str(e)}")
+            self._count('failures')
+            self._spill(batch)
+            return False
+
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.stats['written'] += len(batch)
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = round(elapsed, 2)
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], round(elapsed, 2))
+            self.stats['total_flush_ms'] += elapsed
+
+        # La base répond de nouveau : rejouer ce qui a été mis de côté
+        if self._has_wal():
+            self._replay_wal()
+        return True
+
+    def _insert(self, batch):
+        records = [{key: value for key, value in record.items() if key != WAL_ATTEMPTS_KEY} for record in batch]
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(self.table.insert(), records)
+
+    # ------------------------------------------------------------------
+    # Journal local (write-ahead file)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, suffix, blocking=True):
+        """Verrou exclusif entre processus sur {wal}.{suffix} ; rend False s'il est déjà pris"""
+        if fcntl is None:
+            yield True
+            return
+
+        os.makedirs(os.path.dirname(self.wal_path) or '.', exist_ok=True)
+        with open(f"{self.wal_path}.{suffix}", 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _spill(self, records):
+        self._append(self.wal_path, records)
+        self._count('spilled_to_wal', len(records))
+
+    def _append(self, path, records):
+        with self._wal_lock, self._file_lock('lock'):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as wal:
+                for record in records:
+                    wal.write(json.dumps(record, default=self._serialize) + '\n')
+                wal.flush()
+                os.fsync(wal.fileno())
+
+    def _has_wal(self):
+        return os.path.exists(self.wal_path) or bool(glob.glob(f"{glob.escape(self.wal_path)}.*.replay"))
+
+    def _replay_wal(self):
+        """Rejoue le journal local si aucun autre thread ou processus ne le fait déjà"""
+        if not self._replay_lock.acquire(blocking=False):
+            return
+        try:
+            with self._file_lock('replay.lock', blocking=False) as acquired:
+                if not acquired:
+                    return
+
+                with self._wal_lock, self._file_lock('lock'):
+                    if os.path.exists(self.wal_path):
+                        os.replace(self.wal_path, f"{self.wal_path}.{uuid.uuid4().hex}.replay")
+
+                # Y compris les fichiers d'un processus arrêté en cours de rejeu
+                replay_paths = sorted(glob.glob(f"{glob.escape(self.wal_path)}.*.replay"), key=os.path.getmtime)
+                for replay_path in replay_paths:
+                    if not self._replay_file(replay_path):
+                        break
+        finally:
+            self._replay_lock.release()
+
+    def _replay_file(self, replay_path):
+        """
+        Rejoue un fichier du journal par lots.
+
+        Returns:
+            bool: False si la base est indisponible (le reste retourne au journal)
+        """
+        records = []
+        with open(replay_path, encoding='utf-8') as wal:
+            for line in wal:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(self._deserialize(json.loads(line)))
+                except ValueError as e:
+                    self._quarantine([{'line': line.rstrip('\n')}], e)
+
+        for start in range(0, len(records), self.flush_size):
+            batch = records[start:start + self.flush_size]
+            try:
+                self._insert(batch)
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"Rejeu du journal local ({self.label}) reporté: {str(e)}")
+                self._append(self.wal_path, records[start:])
+                os.remove(replay_path)
+                return False
+            except Exception:
+                # Lot refusé par la base : isoler les enregistrements en cause
+                self._replay_records(batch)
+                continue
+            self._count('replayed_from_wal', len(batch))
+
+        os.remove(replay_path)
+        return True
+
+    def _replay_records(self, batch):
+        retry, rejected, error = [], [], None
+        for record in batch:
+            try:
+                self._insert([record])
+            except TRANSIENT_ERRORS:
+                retry.append(record)
+            except Exception as e:
+                error = e
+                record[WAL_ATTEMPTS_KEY] = record.get(WAL_ATTEMPTS_KEY, 0) + 1
+                (rejected if record[WAL_ATTEMPTS_KEY] >= self.wal_max_attempts else retry).append(record)
+            else:
+                self._count('replayed_from_wal')
+
+        if retry:
+            self._append(self.wal_path, retry)
+        if rejected:
+            self._quarantine(rejected, error)
+
+    def _quarantine(self, records, error):
+        logger.error(f"{len(records)} {self.label} mis en quarantaine après rejeu en échec: {str(error)}")
+        self._append(f"{self.wal_path}.quarantine", [dict(record, __wal_error__=str(error)[:500]) for record in records])
+        self._count('quarantined', len(records))
+
+    def _wal_line_count(self):
+        with self._wal_lock:
+            if not self.wal_path or not os.path.exists(self.wal_path):
+                return 0
+            with open(self.wal_path, encoding='utf-8') as wal:
+                return sum(1 for line in wal if line.strip())
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, datetime):
+            return {'__datetime__': value.isoformat()}
+        return str(value)
+
+    def _deserialize(self, record):
+        for field in self.datetime_fields:
+            value = record.get(field)
+            if isinstance(value, dict) and '__datetime__' in value:
+                record[field] = datetime.fromisoformat(value['__datetime__'])
+        return record
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+
+audit_writer = None
+
+
+def get_audit_writer():
+    """Récupère (ou crée) l'écrivain d'audit partagé"""
+    global audit_writer
+    if audit_writer is None:
+        audit_writer = AuditLogWriter()
+    return audit_writer
@@ -1,14 +1,12 @@
 # backend/app/services/auth_service.py
-import geoip2
 from .. import db
 from ..models.user import User
-from ..models.login_history import LoginHistory
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask import current_app, request
+from .login_telemetry import get_login_telemetry
+from .password_hasher import PasswordHasherBusy, get_password_hasher
+from flask import current_app
 from ..middleware.auth_middleware import create_token, revoke_token, record_login_attempt
 import datetime
 import uuid
-import os
 import jwt
 from datetime import datetime, timedelta
 
@@ -33,8 +31,8 @@ class AuthService:
         if existing_user:
             return None, "Un utilisateur avec cet email existe déjà"
         
-        # Hacher le mot de passe
-        hashed_password = generate_password_hash(password)
+        # Hacher le mot de passe (hors de la boucle d'événements)
+        hashed_password = get_password_hasher().hash(password)
         import app.models.organization
         # Créer un nouvel utilisateur
         user = User(
@@ -79,10 +77,11 @@ class AuthService:
             # Trouver l'utilisateur par email
             user = User.query.filter_by(email=email).first()
             
+            hasher = get_password_hasher()
+            
             if not user:
-                # Simuler un délai pour éviter les attaques temporelles
-                import time
-                time.sleep(0.5)
+                # Vérification factice : même durée que pour un compte existant
+                hasher.verify_dummy(password)
                 return False, None, None, "Email ou mot de passe incorrect"
             
             # Vérifier si le compte est actif
@@ -91,12 +90,16 @@ class AuthService:
                 record_login_attempt(user.id, 'failed', "Compte désactivé")
                 return False, None, None, "Ce compte a été désactivé"
             
-            # Vérifier le mot de passe
-            if not check_password_hash(user.password, password):
+            # Vérifier le mot de passe (et recalculer le hachage si ses paramètres sont dépassés)
+            valid, new_hash = hasher.verify_and_update(user.password, password)
+            if not valid:
                 # Enregistrer la tentative de connexion échouée
                 record_login_attempt(user.id, 'failed', "Mot de passe incorrect")
                 return False, None, None, "Email ou mot de passe incorrect"
             
+            if new_hash:
+                user.password = new_hash
+            
             # Mettre à jour la date de dernière connexion
             user.last_login = datetime.utcnow()
             db.session.commit()
@@ -111,6 +114,8 @@ class AuthService:
             user_data = user.to_dict()
             
             return True, {'access_token': access_token, 'refresh_token': refresh_token}, user_data, "Authentification réussie"
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
             current_app.logger.error(f"Erreur lors de la connexion: {str(e)}")
             return False, None, None, "Une erreur est survenue lors de la connexion"
@@ -118,45 +123,19 @@ class AuthService:
     @staticmethod
     def _record_login_attempt(user_id, status, error_message=None):
         """
-        Enregistre une tentative de connexion dans l'historique
+        Enregistre une tentative de connexion dans l'historique (écriture différée)
         
         Args:
             user_id (str): ID de l'utilisateur
             status (str): 'success' ou 'failed'
             error_message (str, optional): Message d'erreur en cas d'échec
         """
-        try:
-            # Récupérer l'adresse IP
-            ip_address = request.remote_addr
-            
-            # Déterminer l'appareil (user agent)
-            user_agent = request.headers.get('User-Agent', '')
-            device = AuthService._parse_user_agent(user_agent)
-            
-            # Déterminer la localisation (si possible)
-            location = AuthService._get_location_from_ip(ip_address)
-            
-            # Créer l'entrée d'historique
-            login_entry = LoginHistory(
-                user_id=user_id,
-                ip_address=ip_address,
-                device=device,
-                location=location,
-                status=status,
-                timestamp=datetime.datetime.now()
-            )
-            
-            db.session.add(login_entry)
-            db.session.commit()
-            
-        except Exception as e:
-            print(f"Erreur lors de l'enregistrement de la tentative de connexion: {str(e)}")
-            db.session.rollback()
+        record_login_attempt(user_id, status, error_message)
     
     @staticmethod
     def _parse_user_agent(user_agent_string):
         """
-        Analyse l'user agent pour déterminer l'appareil
+        Analyse l'user agent pour déterminer l'appareil (résultats en cache)
         
         Args:
             user_agent_string (str): Chaîne User-Agent
@@ -164,33 +143,12 @@ class AuthService:
         Returns:
             str: Description de l'appareil
         """
-        # Version simple pour la démonstration
-        # Dans une implémentation réelle, utilisez une bibliothèque comme user-agents
-        if 'Mobile' in user_agent_string:
-            if 'iPhone' in user_agent_string:
-                return 'iPhone'
-            elif 'Android' in user_agent_string:
-                return 'Android'
-            else:
-                return 'Mobile'
-        elif 'Tablet' in user_agent_string:
-            return 'Tablet'
-        else:
-            if 'Chrome' in user_agent_string:
-                return 'Chrome/Desktop'
-            elif 'Firefox' in user_agent_string:
-                return 'Firefox/Desktop'
-            elif 'Safari' in user_agent_string:
-                return 'Safari/Desktop'
-            elif 'Edge' in user_agent_string:
-                return 'Edge/Desktop'
-            else:
-                return 'Desktop'
+        return get_login_telemetry().device(user_agent_string or '')
     
     @staticmethod
     def _get_location_from_ip(ip_address):
         """
-        Détermine la localisation à partir de l'adresse IP
+        Détermine la localisation à partir de l'adresse IP (lecteur GeoIP partagé, résultats en cache)
         
         Args:
             ip_address (str): Adresse IP
@@ -198,28 +156,7 @@ class AuthService:
         Returns:
             str: Localisation (ville, pays)
         """
-        try:
-            # Pour une implémentation réelle, utilisez un service de géolocalisation comme MaxMind GeoIP
-            # Ici, une version simplifiée pour la démonstration
-            if ip_address == '127.0.0.1' or ip_address.startswith('192.168.') or ip_address.startswith('10.'):
-                return 'Local Network'
-            
-            # Exemple avec MaxMind GeoIP (nécessite un fichier de base de données)
-            geoip_db_path = os.path.join(os.path.dirname(__file__), '../data/GeoLite2-City.mmdb')
-            
-            if os.path.exists(geoip_db_path):
-                try:
-                    with geoip2.database.Reader(geoip_db_path) as reader:
-                        response = reader.city(ip_address)
-                        return f"{response.city.name}, {response.country.name}"
-                except:
-                    pass
-            
-            # Si la géolocalisation échoue, retourner une valeur par défaut
-            return 'Unknown Location'
-        except Exception as e:
-            print(f"Erreur lors de la géolocalisation: {str(e)}")
-            return 'Unknown Location'
+        return get_login_telemetry().locate(ip_address)
         
     @staticmethod
     def logout(token):
@@ -379,7 +316,7 @@ class AuthService:
                 return False, "Le mot de passe doit contenir au moins 8 caractères"
             
             # Mettre à jour le mot de passe
-            user.password = generate_password_hash(new_password)
+            user.password = get_password_hasher().hash(new_password)
             user.last_password_change = datetime.utcnow()
             db.session.commit()
             
@@ -413,7 +350,8 @@ class AuthService:
                 return False, "Utilisateur introuvable"
             
             # Vérifier le mot de passe actuel
-            if not check_password_hash(user.password, current_password):
+            hasher = get_password_hasher()
+            if not hasher.verify(user.password, current_password):
                 # Enregistrer la tentative échouée
                 record_login_attempt(user_id, 'password_change_failed', "Mot de passe actuel incorrect")
                 return False, "Mot de passe actuel incorrect"
@@ -423,7 +361,7 @@ class AuthService:
                 return False, "Le nouveau mot de passe doit contenir au moins 8 caractères"
             
             # Mettre à jour le mot de passe
-            user.password = generate_password_hash(new_password)
+            user.password = hasher.hash(new_password)
             user.last_password_change = datetime.utcnow()
             db.session.commit()
             
@@ -0,0 +1,591 @@
+# backend/app/services/availability_service.py
+import heapq
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..models.interview_scheduling import InterviewSchedule
+
+logger = logging.getLogger(__name__)
+
+# Statuts d'entretien qui occupent l'agenda du recruteur
+BUSY_STATUSES = ('scheduled', 'confirmed', 'in_progress')
+
+# Fuseau par défaut des heures murales (colonne InterviewSchedule.timezone)
+DEFAULT_TIMEZONE = 'Africa/Douala'
+
+# Marge des requêtes sur scheduled_at (heure murale) : décalage UTC maximal et durée d'un entretien
+LOAD_MARGIN = timedelta(days=1)
+
+
+def get_zone(name=None):
+    """Fuseau IANA (le fuseau par défaut si le nom est absent ou inconnu)"""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def to_seconds(moment, tz=None):
+    """Secondes UTC depuis l'epoch ; une date naïve est une heure murale du fuseau tz"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=get_zone(tz))
+    return int(moment.timestamp())
+
+
+def from_seconds(seconds, tz=None):
+    """Date avec fuseau (tz, par défaut DEFAULT_TIMEZONE) d'un instant en secondes UTC"""
+    return datetime.fromtimestamp(seconds, get_zone(tz))
+
+
+def utc_naive(seconds):
+    """Date UTC naïve (paramètres Google Calendar, bornes de requête)"""
+    return datetime.utcfromtimestamp(seconds)
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'key', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, start, end, key):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+
+    @property
+    def order(self):
+        return (self.start, self.end, self.key)
+
+
+class IntervalTree:
+    """
+    Arbre d'intervalles [start, end[ (treap trié par début, augmenté du
+    maximum des fins du sous-arbre).
+
+    Insertion et suppression en O(log n) ; la recherche des intervalles
+    chevauchant une fenêtre coûte O(log n + k) et les renvoie triés.
+    Chaque intervalle porte une clé unique (ex. ('schedule', id)).
+    """
+
+    def __init__(self):
+        self._root = None
+        self._intervals = {}  # clé -> (start, end)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __contains__(self, key):
+        return key in self._intervals
+
+    def add(self, key, start, end):
+        """Ajoute (ou déplace) l'intervalle d'une clé"""
+        if key in self._intervals:
+            self.remove(key)
+        if end <= start:
+            return
+        left, right = self._split(self._root, (start, end, key))
+        self._root = self._merge(self._merge(left, _Node(start, end, key)), right)
+        self._intervals[key] = (start, end)
+
+    def remove(self, key):
+        """Retire l'intervalle d'une clé (sans effet si elle est absente)"""
+        interval = self._intervals.pop(key, None)
+        if interval is not None:
+            self._root = self._remove(self._root, (interval[0], interval[1], key))
+
+    def keys(self, source=None):
+        """Clés présentes, éventuellement limitées à une source (premier élément de la clé)"""
+        return [key for key in self._intervals if source is None or key[0] == source]
+
+    def overlaps(self, start, end):
+        """Intervalles (start, end, key) chevauchant [start, end[, triés par début"""
+        result = []
+        stack = []
+        node = self._root
+        # Parcours infixe itératif, élagué par max_end et par le début
+        while stack or node:
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start >= end:
+                break
+            if node.end > start:
+                result.append((node.start, node.end, node.key))
+            node = node.right
+        return result
+
+    # ------------------------------------------------------------------
+    # Treap
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _update(node):
+        node.max_end = node.end
+        if node.left is not None and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right is not None and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+    def _split(self, node, order):
+        """Sépare en (clés < order, clés >= order)"""
+        if node is None:
+            return None, None
+        if node.order < order:
+            node.right, right = self._split(node.right, order)
+            self._update(node)
+            return node, right
+        left, node.left = self._split(node.left, order)
+        self._update(node)
+        return left, node
+
+    def _merge(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+
+    def _remove(self, node, order):
+        if node is None:
+            return None
+        if node.order == order:
+            return self._merge(node.left, node.right)
+        if order < node.order:
+            node.left = self._remove(node.left, order)
+        else:
+            node.right = self._remove(node.right, order)
+        self._update(node)
+        return node
+
+
+class _UserAgenda:
+    __slots__ = ('tree', 'schedules_loaded_at', 'loaded_range', 'calendar_loaded_at', 'event_ids')
+
+    def __init__(self):
+        self.tree = IntervalTree()
+        self.schedules_loaded_at = 0.0
+        self.loaded_range = (0, 0)  # Période (secondes UTC) dont les entretiens sont chargés
+        self.calendar_loaded_at = 0.0
+        self.event_ids = {}  # schedule_id -> google_event_id (exclu du calendrier)
+
+
+class AvailabilityEngine:
+    """
+    Disponibilités des recruteurs calculées en mémoire.
+
+    Chaque recruteur a un arbre d'intervalles de ses créneaux occupés : ses
+    entretiens actifs (InterviewSchedule) et, après synchronisation, les
+    événements de son Google Calendar. Les instants sont en secondes UTC :
+    scheduled_at est l'heure murale du fuseau de chaque entretien. Les
+    entretiens sont chargés en une requête pour tous les recruteurs
+    manquants d'une recherche, sur l'horizon courant étendu à la fenêtre
+    demandée (une fenêtre hors de la période chargée déclenche un
+    rechargement), puis tenus à jour à chaque création, modification et
+    annulation ; SCHEDULING_CACHE_TTL borne l'écart avec les autres
+    processus. Le calendrier n'est lu qu'à la demande (synchronisation),
+    jamais pendant une recherche ordinaire.
+
+    Les dates naïves des requêtes, les heures ouvrées et les résultats sont
+    exprimés dans le fuseau de la recherche (tz).
+
+    La recherche de créneaux fusionne les intervalles des K recruteurs sur
+    la fenêtre puis parcourt les plages ouvrées : quelques millisecondes,
+    sans appel réseau.
+    """
+
+    def __init__(self, cache_ttl=None, calendar_ttl=None, max_users=None, buffer_minutes=None,
+                 workday_hours=None, workdays=None, horizon_days=None, max_window_days=None):
+        self.cache_ttl = cache_ttl or int(os.getenv('SCHEDULING_CACHE_TTL', '300'))
+        self.calendar_ttl = calendar_ttl or int(os.getenv('SCHEDULING_CALENDAR_TTL', '900'))
+        self.max_users = max_users or int(os.getenv('SCHEDULING_CACHE_MAX_USERS', '5000'))
+        self.buffer = 60 * (buffer_minutes if buffer_minutes is not None
+                            else int(os.getenv('SCHEDULING_BUFFER_MINUTES', '0')))
+        self.horizon_days = horizon_days or int(os.getenv('SCHEDULING_HORIZON_DAYS', '90'))
+        self.max_window_days = max_window_days or int(os.getenv('SCHEDULING_MAX_WINDOW_DAYS', '60'))
+
+        hours = workday_hours or os.getenv('SCHEDULING_WORKDAY_HOURS', '08:00-18:00')
+        opening, closing = hours.split('-')
+        self.workday_start = self._parse_clock(opening)
+        self.workday_end = self._parse_clock(closing)
+        days = workdays or os.getenv('SCHEDULING_WORKDAYS', '0,1,2,3,4')
+        self.workdays = {int(day) for day in str(days).split(',') if day.strip()}
+
+        self._agendas = OrderedDict()  # user_id -> _UserAgenda
+        self._lock = threading.Lock()
+        self.stats = {'searches': 0, 'loads': 0, 'calendar_syncs': 0, 'conflict_checks': 0}
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def find_slots(self, user_ids, start, end, duration_minutes=30, count=10, step_minutes=None,
+                   sync_calendars=False, tz=None):
+        """
+        Prochains créneaux libres communs à plusieurs recruteurs.
+
+        Args:
+            user_ids (list): Recruteurs qui doivent tous être disponibles
+            start (datetime): Début de la fenêtre de recherche
+            end (datetime): Fin de la fenêtre de recherche
+            duration_minutes (int): Durée de l'entretien
+            count (int): Nombre maximum de créneaux
+            step_minutes (int): Pas entre deux débuts de créneau (par défaut la durée)
+            sync_calendars (bool): Resynchroniser d'abord les calendriers périmés
+            tz (str): Fuseau des dates naïves, des heures ouvrées et des résultats
+
+        Returns:
+            list: Créneaux {'start', 'end'} (ISO avec décalage) dans l'ordre chronologique
+        """
+        window_start, window_end = to_seconds(start, tz), to_seconds(end, tz)
+        if window_end <= window_start:
+            raise ValueError("La fin de la fenêtre doit être postérieure à son début")
+        if window_end - window_start > self.max_window_days * 86400:
+            raise ValueError(f"La fenêtre de recherche est limitée à {self.max_window_days} jours")
+
+        user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+        if sync_calendars:
+            for user_id in user_ids:
+                self._sync_if_stale(user_id, window_start, window_end, tz)
+        self._ensure_loaded(user_ids, window_start - self.buffer, window_end + self.buffer)
+
+        duration = int(duration_minutes) * 60
+        step = int(step_minutes or duration_minutes) * 60
+
+        with self._lock:
+            self.stats['searches'] += 1
+            per_user = [
+                self._agendas[user_id].tree.overlaps(window_start - self.buffer, window_end + self.buffer)
+                for user_id in user_ids if user_id in self._agendas
+            ]
+        busy = self._merge_busy(heapq.merge(*per_user))
+
+        slots = []
+        for day_start, opening, closing in self._open_ranges(window_start, window_end, tz):
+            for slot_start in self._free_starts(busy, day_start, opening, closing, duration, step):
+                slots.append({
+                    'start': from_seconds(slot_start, tz).isoformat(),
+                    'end': from_seconds(slot_start + duration, tz).isoformat()
+                })
+                if len(slots) >= count:
+                    return slots
+        return slots
+
+    def conflicts(self, user_ids, start, end, exclude_schedule_id=None, refresh=False, tz=None):
+        """
+        Créneaux occupés qui chevauchent [start, end[.
+
+        Args:
+            refresh (bool): Recharger d'abord les entretiens depuis la base
+                (contrôle à la création : les autres processus ont pu planifier)
+            tz (str): Fuseau des dates naïves et des résultats
+
+        Returns:
+            list: Conflits {'user_id', 'source', 'id', 'start', 'end'}
+        """
+        window_start, window_end = to_seconds(start, tz) - self.buffer, to_seconds(end, tz) + self.buffer
+        user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+        self._ensure_loaded(user_ids, window_start, window_end, force=refresh)
+        excluded = ('schedule', str(exclude_schedule_id)) if exclude_schedule_id else None
+
+        result = []
+        with self._lock:
+            self.stats['conflict_checks'] += 1
+            for user_id in user_ids:
+                agenda = self._agendas.get(user_id)
+                if agenda is None:
+                    continue
+                for busy_start, busy_end, key in agenda.tree.overlaps(window_start, window_end):
+                    if key == excluded:
+                        continue
+                    result.append({
+                        'user_id': user_id,
+                        'source': key[0],
+                        'id': key[1],
+                        'start': from_seconds(busy_start, tz).isoformat(),
+                        'end': from_seconds(busy_end, tz).isoformat()
+                    })
+        return result
+
+    # ------------------------------------------------------------------
+    # Mises à jour incrémentales
+    # ------------------------------------------------------------------
+
+    def sync_schedule(self, schedule):
+        """Reporte l'état d'un entretien (création, modification, annulation)"""
+        user_id = str(schedule.recruiter_id)
+        key = ('schedule', str(schedule.id))
+        with self._lock:
+            agenda = self._agendas.get(user_id)
+            if agenda is None:
+                return  # chargé à la prochaine recherche
+            if schedule.status in BUSY_STATUSES and schedule.scheduled_at:
+                start = to_seconds(schedule.scheduled_at, schedule.timezone)
+                agenda.tree.add(key, start, start + 60 * (schedule.duration_minutes or 30))
+                if schedule.google_event_id:
+                    agenda.event_ids[str(schedule.id)] = schedule.google_event_id
+                    agenda.tree.remove(('calendar', schedule.google_event_id))
+            else:
+                agenda.tree.remove(key)
+                agenda.event_ids.pop(str(schedule.id), None)
+
+    def sync_calendar(self, user_id, start=None, end=None, tz=None):
+        """
+        Remplace les événements Google Calendar d'un recruteur sur une période.
+
+        Args:
+            start, end: Période (datetime, naïve dans le fuseau tz, ou secondes UTC)
+            tz (str): Fuseau des dates naïves et des événements sur la journée
+
+        Returns:
+            tuple: (nombre d'événements occupés, erreur ou None)
+        """
+        from .google_calendar_service import GoogleCalendarService
+
+        user_id = str(user_id)
+        window_start = self._seconds(start, tz) if start is not None else int(time.time())
+        window_end = self._seconds(end, tz) if end is not None else window_start + self.horizon_days * 86400
+        events, error = GoogleCalendarService.get_events(
+            user_id, max_results=2500, start_date=utc_naive(window_start), end_date=utc_naive(window_end)
+        )
+        if events is None:
+            return 0, error
+
+        intervals = []
+        for event in events:
+            interval = self._event_interval(event, tz)
+            if interval:
+                intervals.append((('calendar', event['id']), interval))
+
+        self._ensure_loaded([user_id], window_start, window_end)
+        with self._lock:
+            agenda = self._agendas.get(user_id)
+            if agenda is None:
+                return 0, None
+            for busy_start, busy_end, key in agenda.tree.overlaps(window_start, window_end):
+                if key[0] == 'calendar':
+                    agenda.tree.remove(key)
+            # Les événements créés pour nos entretiens sont déjà comptés
+            own_events = set(agenda.event_ids.values())
+            added = 0
+            for key, (busy_start, busy_end) in intervals:
+                if key[1] not in own_events:
+                    agenda.tree.add(key, busy_start, busy_end)
+                    added += 1
+            agenda.calendar_loaded_at = time.monotonic()
+            self.stats['calendar_syncs'] += 1
+        return added, None
+
+    def invalidate(self, user_id=None):
+        """Oublie l'agenda d'un recruteur (ou de tous)"""
+        with self._lock:
+            if user_id is None:
+                self._agendas.clear()
+            else:
+                self._agendas.pop(str(user_id), None)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                **self.stats,
+                'users': len(self._agendas),
+                'intervals': sum(len(agenda.tree) for agenda in self._agendas.values())
+            }
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self, user_ids, window_start, window_end, force=False):
+        """
+        Charge en une requête les entretiens des recruteurs absents, périmés
+        ou dont la période chargée ne couvre pas [window_start, window_end[.
+        """
+        now = time.time()
+        horizon = (int(now) - 86400, int(now) + self.horizon_days * 86400)
+        monotonic = time.monotonic()
+
+        with self._lock:
+            missing = []
+            load_start, load_end = min(horizon[0], window_start), max(horizon[1], window_end)
+            for user_id in user_ids:
+                agenda = self._agendas.get(user_id)
+                fresh = agenda is not None and monotonic - agenda.schedules_loaded_at <= self.cache_ttl
+                if fresh and not force:
+                    loaded_start, loaded_end = agenda.loaded_range
+                    if loaded_start <= window_start and window_end <= loaded_end:
+                        continue
+                if fresh:
+                    # Étendre la période déjà chargée plutôt que la remplacer
+                    load_start = min(load_start, agenda.loaded_range[0])
+                    load_end = max(load_end, agenda.loaded_range[1])
+                missing.append(user_id)
+        if not missing:
+            return
+
+        # scheduled_at est une heure murale : la marge couvre décalages et durées
+        rows = InterviewSchedule.query.with_entities(
+            InterviewSchedule.id,
+            InterviewSchedule.recruiter_id,
+            InterviewSchedule.scheduled_at,
+            InterviewSchedule.duration_minutes,
+            InterviewSchedule.timezone,
+            InterviewSchedule.google_event_id
+        ).filter(
+            InterviewSchedule.recruiter_id.in_(missing),
+            InterviewSchedule.status.in_(BUSY_STATUSES),
+            InterviewSchedule.scheduled_at >= utc_naive(load_start) - LOAD_MARGIN,
+            InterviewSchedule.scheduled_at <= utc_naive(load_end) + LOAD_MARGIN
+        ).all()
+
+        by_user = {user_id: [] for user_id in missing}
+        for schedule_id, recruiter_id, scheduled_at, duration_minutes, zone, google_event_id in rows:
+            by_user.setdefault(str(recruiter_id), []).append(
+                (str(schedule_id), to_seconds(scheduled_at, zone), duration_minutes or 30, google_event_id)
+            )
+
+        with self._lock:
+            self.stats['loads'] += 1
+            for user_id, schedules in by_user.items():
+                agenda = self._agendas.get(user_id) or _UserAgenda()
+                # Les événements de calendrier synchronisés sont conservés
+                for key in agenda.tree.keys('schedule'):
+                    agenda.tree.remove(key)
+                agenda.event_ids = {}
+                for schedule_id, start, duration_minutes, google_event_id in schedules:
+                    agenda.tree.add(('schedule', schedule_id), start, start + 60 * duration_minutes)
+                    if google_event_id:
+                        agenda.event_ids[schedule_id] = google_event_id
+                        agenda.tree.remove(('calendar', google_event_id))
+                agenda.schedules_loaded_at = time.monotonic()
+                agenda.loaded_range = (load_start, load_end)
+
+                self._agendas[user_id] = agenda
+                self._agendas.move_to_end(user_id)
+            while len(self._agendas) > self.max_users:
+                self._agendas.popitem(last=False)
+
+    def _sync_if_stale(self, user_id, start, end, tz=None):
+        with self._lock:
+            agenda = self._agendas.get(user_id)
+            fresh = agenda is not None and time.monotonic() - agenda.calendar_loaded_at <= self.calendar_ttl
+        if not fresh:
+            _, error = self.sync_calendar(user_id, start, end, tz)
+            if error:
+                logger.info(f"Calendrier de {user_id} non synchronisé: {error}")
+
+    @staticmethod
+    def _seconds(moment, tz=None):
+        return moment if isinstance(moment, int) else to_seconds(moment, tz)
+
+    @staticmethod
+    def _event_interval(event, tz=None):
+        """Intervalle occupé d'un événement Google Calendar (None s'il ne bloque pas l'agenda)"""
+        if event.get('status') == 'cancelled' or event.get('transparency') == 'transparent':
+            return None
+        for attendee in event.get('attendees') or []:
+            if attendee.get('self') and attendee.get('responseStatus') == 'declined':
+                return None
+
+        event_start, event_end = event.get('start') or {}, event.get('end') or {}
+        try:
+            if 'dateTime' in event_start:
+                start = datetime.fromisoformat(event_start['dateTime'].replace('Z', '+00:00'))
+                end = datetime.fromisoformat(event_end['dateTime'].replace('Z', '+00:00'))
+            else:
+                # Événement sur la journée entière (fuseau du calendrier, sinon celui de la recherche)
+                tz = event_start.get('timeZone') or tz
+                start = datetime.fromisoformat(event_start['date'])
+                end = datetime.fromisoformat(event_end['date'])
+        except (KeyError, ValueError):
+            return None
+        return to_seconds(start, tz), to_seconds(end, tz)
+
+    # ------------------------------------------------------------------
+    # Calcul des créneaux
+    # ------------------------------------------------------------------
+
+    def _merge_busy(self, intervals):
+        """Union des intervalles triés, élargis de la marge entre entretiens"""
+        merged = []
+        for busy_start, busy_end, _ in intervals:
+            busy_start -= self.buffer
+            busy_end += self.buffer
+            if merged and busy_start <= merged[-1][1]:
+                if busy_end > merged[-1][1]:
+                    merged[-1][1] = busy_end
+            else:
+                merged.append([busy_start, busy_end])
+        return merged
+
+    def _open_ranges(self, window_start, window_end, tz=None):
+        """
+        Plages ouvrées (jours et heures de travail dans le fuseau tz) comprises
+        dans la fenêtre : (minuit local, ouverture, fermeture) en secondes UTC.
+        """
+        day = from_seconds(window_start, tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        while to_seconds(day) < window_end:
+            if day.weekday() in self.workdays:
+                # Heures murales : correctes aussi les jours de changement d'heure
+                opening = max(window_start, to_seconds(day + timedelta(seconds=self.workday_start)))
+                closing = min(window_end, to_seconds(day + timedelta(seconds=self.workday_end)))
+                if opening < closing:
+                    yield to_seconds(day), opening, closing
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _free_starts(busy, day_start, opening, closing, duration, step):
+        """Débuts de créneaux libres dans [opening, closing[, alignés sur le pas depuis minuit local"""
+        # Premier intervalle occupé susceptible de chevaucher la plage
+        low, high = 0, len(busy)
+        while low < high:
+            middle = (low + high) // 2
+            if busy[middle][1] <= opening:
+                low = middle + 1
+            else:
+                high = middle
+        index = low
+
+        candidate = day_start + -(-(opening - day_start) // step) * step
+        while candidate + duration <= closing:
+            while index < len(busy) and busy[index][1] <= candidate:
+                index += 1
+            if index < len(busy) and busy[index][0] < candidate + duration:
+                # Sauter après l'intervalle occupé, au prochain pas
+                skip = busy[index][1] - candidate
+                candidate += -(-skip // step) * step
+                continue
+            yield candidate
+            candidate += step
+
+    @staticmethod
+    def _parse_clock(value):
+        hours, _, minutes = value.strip().partition(':')
+        return int(hours) * 3600 + int(minutes or 0) * 60
+
+
+availability_engine = None
+
+
+def get_availability_engine():
+    """Récupère (ou crée) le moteur de disponibilités partagé"""
+    global availability_engine
+    if availability_engine is None:
+        availability_engine = AvailabilityEngine()
+    return availability_engine
@@ -0,0 +1,520 @@
+# backend/app/services/avatar_runtime.py
+import asyncio
+import os
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+from ..services.browser_pool import AsyncBrowserPool, BrowserPoolError, PLAYWRIGHT_AVAILABLE
+
+
+# Observateur injecté dans la page Meet : remonte les nouveaux messages du chat
+# vers Python via la binding `avatarNotify`, sans polling.
+CHAT_OBSERVER_SCRIPT = """
+(() => {
+    if (window.__avatarObserverInstalled) return;
+    window.__avatarObserverInstalled = true;
+
+    const seen = new WeakSet();
+    const messageSelectors = [
+        '[data-message-id]',
+        '[data-message-text]',
+        '[jsname="dTKtvb"]'
+    ];
+
+    const notify = (payload) => {
+        try { window.avatarNotify(payload); } catch (e) {}
+    };
+
+    const scan = (root) => {
+        for (const selector of messageSelectors) {
+            const nodes = root.querySelectorAll ? root.querySelectorAll(selector) : [];
+            for (const node of nodes) {
+                if (seen.has(node)) continue;
+                seen.add(node);
+                const text = (node.innerText || '').trim();
+                if (text && !text.startsWith('🤖')) {
+                    notify({ type: 'chat_message', text: text });
+                }
+            }
+        }
+    };
+
+    const start = () => {
+        scan(document);
+        new MutationObserver((mutations) => {
+            for (const mutation of mutations) {
+                for (const node of mutation.addedNodes) {
+                    if (node.nodeType === 1) scan(node.parentElement || node);
+                }
+            }
+        }).observe(document.body, { childList: true, subtree: true });
+    };
+
+    if (document.body) start();
+    else document.addEventListener('DOMContentLoaded', start);
+})();
+"""
+
+CHAT_BUTTON_SELECTORS = [
+    '[aria-label*="chat" i]',
+    '[data-tooltip*="chat" i]',
+    'button[data-panel-id="chat"]',
+    'button:has-text("Chat")',
+    'button:has-text("Discuter")'
+]
+
+CHAT_INPUT_SELECTORS = [
+    'textarea[placeholder*="message" i]',
+    'textarea[aria-label*="message" i]',
+    'textarea[placeholder*="Envoyer" i]',
+    '[role="textbox"]',
+    'input[placeholder*="message" i]'
+]
+
+JOIN_BUTTON_SELECTORS = [
+    'button:has-text("Join now")',
+    'button:has-text("Ask to join")',
+    'button:has-text("Participer")',
+    'button:has-text("Demander à participer")',
+    '[jsname="Qx7uuf"]'
+]
+
+
+# Messages envoyés par le bot mémorisés par session pour ignorer leur écho dans le chat
+SENT_MESSAGES_MEMORY = 50
+
+
+def normalize_chat_text(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+class AvatarRuntime:
+    """
+    Runtime avatar basé sur une seule boucle asyncio.
+
+    Toutes les pages Meet sont pilotées depuis la même boucle avec l'API async
+    de Playwright : celle du pool de navigateurs partagé (BrowserPool), dont
+    le runtime utilise directement le pool async. Les sessions réagissent aux
+    événements de page (nouveau message, navigation, fermeture, crash) au
+    lieu de dormir entre deux vérifications, et leur nettoyage est centralisé
+    dans _run_session.
+    """
+
+    def __init__(self, avatar_service):
+        self.avatar_service = avatar_service
+        self.socketio = avatar_service.socketio
+        self.browser_pool = avatar_service.browser_pool
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sessions: Dict[str, Dict] = {}
+        self.max_duration = int(os.getenv('AVATAR_MAX_DURATION_SECONDS', '1800'))
+        self.reply_delay = int(os.getenv('AVATAR_REPLY_DELAY_SECONDS', '20'))
+        self.supervision_interval = int(os.getenv('AVATAR_SUPERVISION_INTERVAL_SECONDS', '60'))
+        self._supervisor_task = None
+
+    @property
+    def pool(self) -> AsyncBrowserPool:
+        """Pool async du pool partagé (utilisable uniquement dans la boucle)"""
+        return self.browser_pool.async_pool
+
+    @property
+    def running(self) -> bool:
+        return bool(self.loop and self.loop.is_running() and self._supervisor_task
+                    and not self._supervisor_task.done())
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Rejoint la boucle du pool de navigateurs partagé et lance la supervision"""
+        if self.running:
+            return
+
+        self.loop = self.browser_pool.start_loop()
+        self._supervisor_task = self._submit(self._supervise())
+        print("✅ Runtime avatar asyncio démarré")
+
+    def stop(self, timeout: int = 30):
+        """Termine toutes les sessions ; la boucle et les navigateurs restent au pool partagé"""
+        if not self.loop or not self.loop.is_running():
+            return
+
+        try:
+            self._submit(self._shutdown()).result(timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ Erreur arrêt runtime avatar: {e}")
+
+        self.loop = None
+        print("✅ Runtime avatar arrêté")
+
+    # ------------------------------------------------------------------
+    # API thread-safe appelée par AvatarService
+    # ------------------------------------------------------------------
+
+    def launch(self, interview_id: str, interview_data: Dict, timeout: int = 120) -> Dict:
+        """Lance une session et attend la fin de la phase de connexion à Meet"""
+        if not PLAYWRIGHT_AVAILABLE:
+            return {'success': False, 'error': 'Playwright non disponible'}
+
+        if not self.running:
+            self.start()
+
+        try:
+            return self._submit(self._launch(interview_id, interview_data)).result(timeout=timeout)
+        except Exception as e:
+            print(f"❌ Erreur lancement runtime {interview_id}: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def stop_interview(self, interview_id: str) -> bool:
+        """Demande la fin d'une session ; le nettoyage est fait par la boucle"""
+        session = self.sessions.get(interview_id)
+        if not session or not self.loop:
+            return False
+
+        self.loop.call_soon_threadsafe(self._end_session, interview_id, 'stopped')
+        return True
+
+    def send_message(self, interview_id: str, message: str, timeout: int = 30) -> bool:
+        """Envoie un message dans le chat Meet d'une session"""
+        if interview_id not in self.sessions:
+            return False
+
+        try:
+            return self._submit(self._send_chat_message(interview_id, message)).result(timeout=timeout)
+        except Exception as e:
+            print(f"❌ Erreur envoi message runtime {interview_id}: {e}")
+            return False
+
+    def has_session(self, interview_id: str) -> bool:
+        return interview_id in self.sessions
+
+    def get_session_status(self, interview_id: str) -> Optional[Dict]:
+        """Statut d'une session pilotée par le runtime"""
+        session = self.sessions.get(interview_id)
+        if not session:
+            return None
+
+        return {
+            'started_at': session['started_at'],
+            'meet_joined': session['meet_joined'],
+            'questions_total': len(session['questions']),
+            'questions_sent': session['questions_sent'],
+            'candidate_messages': session['candidate_messages'],
+            'last_event_at': session['last_event_at'],
+            'browser_id': session['lease']['browser_id']
+        }
+
+    def get_stats(self) -> Dict:
+        # Navigateurs et contextes : voir BrowserPool.get_stats (pool commun)
+        return {
+            'running': self.running,
+            'sessions': len(self.sessions)
+        }
+
+    # ------------------------------------------------------------------
+    # Coroutines (exécutées dans la boucle du runtime)
+    # ------------------------------------------------------------------
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _launch(self, interview_id: str, interview_data: Dict) -> Dict:
+        meet_link = interview_data.get('meet_link')
+        if not meet_link:
+            return {'success': False, 'error': 'Lien Meet manquant'}
+
+        if interview_id in self.sessions:
+            return {'success': True, 'interview_id': interview_id, 'already_running': True}
+
+        try:
+            lease = await self.pool.acquire(
+                interview_id,
+                profile='meet',
+                cookies=self.avatar_service._read_bot_cookies()
+            )
+        except BrowserPoolError as e:
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            return {'success': False, 'error': f'Impossible de lancer Chrome: {str(e)}'}
+
+        page = lease['page']
+        questions_data = self.avatar_service._get_questions_for_position(interview_data.get('position', ''))
+
+        session = {
+            'interview_id': interview_id,
+            'interview_data': interview_data,
+            'lease': lease,
+            'page': page,
+            'ended': asyncio.Event(),
+            'reply_event': asyncio.Event(),
+            'end_reason': None,
+            'introduction': questions_data['introduction'],
+            'questions': list(questions_data['questions']),
+            'questions_sent': 0,
+            'candidate_messages': 0,
+            'sent_messages': deque(maxlen=SENT_MESSAGES_MEMORY),
+            'meet_joined': False,
+            'started_at': datetime.utcnow().isoformat(),
+            'last_event_at': None,
+            'tasks': []
+        }
+        self.sessions[interview_id] = session
+
+        try:
+            await page.expose_binding(
+                'avatarNotify',
+                lambda source, payload: self._on_page_event(interview_id, payload)
+            )
+            await page.add_init_script(CHAT_OBSERVER_SCRIPT)
+
+            page.on('close', lambda _: self._end_session(interview_id, 'page_closed'))
+            page.on('crash', lambda _: self._end_session(interview_id, 'page_crashed'))
+
+            await page.goto(f"{meet_link}?authuser=0&hl=en", wait_until='domcontentloaded', timeout=30000)
+            session['meet_joined'] = await self._join_meeting(page)
+            await self._open_chat(page)
+
+            # Surveillance de sortie de réunion une fois la page Meet chargée
+            page.on('framenavigated', lambda frame: self._on_navigation(interview_id, frame))
+        except Exception as e:
+            print(f"❌ Erreur connexion Meet {interview_id}: {e}")
+            await self._cleanup(interview_id, 'launch_failed')
+            return {'success': False, 'error': str(e)}
+
+        session['tasks'].append(asyncio.ensure_future(self._run_session(interview_id)))
+
+        config = {
+            'interview_id': interview_id,
+            'candidate_name': interview_data.get('candidate_name'),
+            'position': interview_data.get('position'),
+            'mode': interview_data.get('mode', 'autonomous'),
+            'meet_link': meet_link,
+            'browser': 'chrome_playwright',
+            'status': 'async_runtime'
+        }
+
+        return {
+            'success': True,
+            'avatar_id': f"avatar_rt_{interview_id}",
+            'config': config,
+            'started_at': session['started_at'],
+            'meet_joined': session['meet_joined'],
+            'browser': 'chrome_playwright',
+            'mode': 'async_runtime'
+        }
+
+    async def _run_session(self, interview_id: str):
+        """Déroule l'entretien et attend un événement de fin (ou la durée maximale)"""
+        session = self.sessions.get(interview_id)
+        if not session:
+            return
+
+        questions_task = asyncio.ensure_future(self._ask_questions(interview_id))
+        session['tasks'].append(questions_task)
+
+        reason = 'max_duration'
+        try:
+            await asyncio.wait_for(session['ended'].wait(), timeout=self.max_duration)
+            reason = session['end_reason'] or 'ended'
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            questions_task.cancel()
+            await self._cleanup(interview_id, reason)
+
+    async def _ask_questions(self, interview_id: str):
+        """
+        Pose les questions à leur horaire prévu ; une réponse du candidat
+        avance la question suivante à reply_delay secondes.
+        """
+        session = self.sessions[interview_id]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        await asyncio.sleep(10)  # Laisser Meet se stabiliser
+        await self._send_chat_message(interview_id, session['introduction'])
+
+        for question in session['questions']:
+            while True:
+                remaining = question['timing'] - (loop.time() - started)
+                if remaining <= 0:
+                    break
+
+                session['reply_event'].clear()
+                try:
+                    await asyncio.wait_for(session['reply_event'].wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+                # Le candidat a répondu : on n'attend plus que le délai de réponse
+                if remaining > self.reply_delay:
+                    await asyncio.sleep(self.reply_delay)
+                    break
+
+            if await self._send_chat_message(interview_id, question['question']):
+                session['questions_sent'] += 1
+                self.socketio.emit('avatar_question_asked', {
+                    'interview_id': interview_id,
+                    'question': question['question'],
+                    'timing': question['timing'],
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'browser': 'chrome_playwright'
+                })
+
+        await self._send_chat_message(
+            interview_id,
+            "Merci pour vos réponses. Avez-vous des questions sur le poste ou l'entreprise ?"
+        )
+
+    async def _send_chat_message(self, interview_id: str, message: str) -> bool:
+        session = self.sessions.get(interview_id)
+        if not session:
+            return False
+
+        # Le chat réaffiche nos propres messages : ils ne doivent pas compter comme réponses
+        session['sent_messages'].append(normalize_chat_text(message))
+
+        page = session['page']
+        for selector in CHAT_INPUT_SELECTORS:
+            try:
+                text_input = page.locator(selector).first
+                if await text_input.is_visible():
+                    await text_input.fill(message)
+                    await text_input.press('Enter')
+                    print(f"💬 Message envoyé ({interview_id}): {message[:50]}...")
+                    return True
+            except Exception:
+                continue
+
+        # Le panneau de chat a pu être fermé : on le rouvre une fois
+        if await self._open_chat(page):
+            try:
+                await page.keyboard.type(message)
+                await page.keyboard.press('Enter')
+                return True
+            except Exception:
+                pass
+
+        print(f"❌ Zone de chat introuvable pour {interview_id}")
+        return False
+
+    async def _join_meeting(self, page) -> bool:
+        for selector in JOIN_BUTTON_SELECTORS:
+            try:
+                button = page.locator(selector).first
+                await button.wait_for(state='visible', timeout=5000)
+                await button.click()
+                return True
+            except Exception:
+                continue
+        return False
+
+    async def _open_chat(self, page) -> bool:
+        for selector in CHAT_BUTTON_SELECTORS:
+            try:
+                button = page.locator(selector).first
+                if await button.is_visible():
+                    await button.click()
+                    return True
+            except Exception:
+                continue
+        return False
+
+    async def _supervise(self):
+        """Tâche unique de supervision : statut des sessions (le pool partagé est recyclé par AvatarService)"""
+        while True:
+            await asyncio.sleep(self.supervision_interval)
+            try:
+                for interview_id, session in list(self.sessions.items()):
+                    self.socketio.emit('avatar_status', {
+                        'interview_id': interview_id,
+                        'questions_sent': session['questions_sent'],
+                        'questions_total': len(session['questions']),
+                        'timestamp': datetime.utcnow().isoformat()
+                    })
+            except Exception as e:
+                print(f"⚠️ Erreur supervision runtime avatar: {e}")
+
+    async def _cleanup(self, interview_id: str, reason: str):
+        """Point unique de nettoyage d'une session"""
+        session = self.sessions.pop(interview_id, None)
+        if not session:
+            return
+
+        current = asyncio.current_task()
+        for task in session['tasks']:
+            if task is not current:
+                task.cancel()
+
+        await self.pool.release(interview_id)
+
+        self.avatar_service.active_avatars.pop(interview_id, None)
+        if interview_id in self.avatar_service.scheduled_launches:
+            self.avatar_service.scheduled_launches[interview_id]['status'] = 'completed'
+
+        # Accès BDD synchrone hors de la boucle
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.avatar_service._update_interview_ai_status, interview_id, False)
+
+        self.socketio.emit('avatar_ended', {
+            'interview_id': interview_id,
+            'reason': reason,
+            'questions_sent': session['questions_sent'],
+            'timestamp': datetime.utcnow().isoformat(),
+            'browser': 'chrome_playwright'
+        })
+
+        print(f"🧹 Session avatar {interview_id} terminée ({reason})")
+
+    async def _shutdown(self):
+        for interview_id in list(self.sessions.keys()):
+            await self._cleanup(interview_id, 'runtime_stopped')
+
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+
+    # ------------------------------------------------------------------
+    # Callbacks d'événements de page (exécutés dans la boucle)
+    # ------------------------------------------------------------------
+
+    def _on_page_event(self, interview_id: str, payload: Dict):
+        session = self.sessions.get(interview_id)
+        if not session or not isinstance(payload, dict):
+            return
+
+        session['last_event_at'] = datetime.utcnow().isoformat()
+
+        if payload.get('type') == 'chat_message':
+            if self._is_own_message(session, payload.get('text', '')):
+                return
+
+            session['candidate_messages'] += 1
+            session['reply_event'].set()
+
+            self.socketio.emit('avatar_chat_message', {
+                'interview_id': interview_id,
+                'message': payload.get('text', ''),
+                'timestamp': session['last_event_at']
+            })
+
+    @staticmethod
+    def _is_own_message(session: Dict, text: str) -> bool:
+        """Écho d'un message envoyé par le bot (le nœud peut contenir l'expéditeur et l'heure)"""
+        text = normalize_chat_text(text)
+        return any(sent and (sent == text or sent in text) for sent in session['sent_messages'])
+
+    def _on_navigation(self, interview_id: str, frame):
+        session = self.sessions.get(interview_id)
+        if not session or frame != session['page'].main_frame:
+            return
+
+        url = frame.url
+        if 'meet.google.com' not in url or '/lookup/' in url:
+            self._end_session(interview_id, 'meeting_left')
+
+    def _end_session(self, interview_id: str, reason: str):
+        session = self.sessions.get(interview_id)
+        if session and not session['ended'].is_set():
+            session['end_reason'] = reason
+            session['ended'].set()
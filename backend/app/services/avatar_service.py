@@ -1,4 +1,3 @@
-import asyncio
 import os
 import platform
 import threading
@@ -7,6 +6,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional
 from flask import abort
 from ..services.meet_chat_manager import MeetChatManager
+from ..services.browser_pool import get_browser_pool, BrowserPoolError
+from ..services.avatar_runtime import AvatarRuntime
 
 try:
     from playwright.async_api import async_playwright
@@ -26,8 +27,11 @@ class AvatarService:
         self.scheduled_launches = {} 
         self.monitor_thread = None
         self.running = False
-        self.avatar_browsers = {}  # Stocke les browsers Playwright
+        self.avatar_browsers = {}  # Stocke les browsers Playwright (partagés via le pool)
         self.avatar_pages = {}     # Stocke les pages Meet
+        self.avatar_contexts = {}  # Stocke les contextes isolés par entretien
+        self.browser_pool = get_browser_pool()
+        self.runtime = AvatarRuntime(self)  # Boucle asyncio unique pour les lancements programmés
         self.avatar_timers = {}
         self.launch_logs = {}
         self.meet_chat_manager = MeetChatManager(self)
@@ -248,6 +252,8 @@ class AvatarService:
             self.meet_chat_manager.start()
     
         self.running = True
+        if PLAYWRIGHT_AVAILABLE:
+            self.runtime.start()
         self.monitor_thread = threading.Thread(target=self._monitor_scheduled_launches)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -259,13 +265,16 @@ class AvatarService:
         
         if hasattr(self, 'meet_chat_manager'):
                     self.meet_chat_manager.stop()   
-        # Fermer tous les browsers actifs
-        for interview_id, browser in self.avatar_browsers.items():
-            try:
-                asyncio.run(browser.close())
-                    
-            except:
-                pass
+        # Terminer les sessions du runtime asyncio
+        self.runtime.stop()
+        
+        # Fermer tous les contextes et les navigateurs du pool
+        try:
+            self.browser_pool.shutdown()
+        except Exception as e:
+            print(f"⚠️ Erreur arrêt pool navigateurs: {e}")
+        self.avatar_browsers.clear()
+        self.avatar_contexts.clear()
         
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
@@ -333,8 +342,8 @@ class AvatarService:
             
             data['status'] = 'launching'
             
-            # Créer la session avatar avec Playwright
-            avatar_data = self._create_playwright_session(interview_id, interview_data)
+            # Créer la session avatar dans le runtime asyncio (une seule boucle pour tous les entretiens)
+            avatar_data = self.runtime.launch(interview_id, interview_data)
             
             if avatar_data['success']:
                 data['status'] = 'active'
@@ -394,96 +403,38 @@ class AvatarService:
 
             log_step("Initialisation", True, f"Début session Playwright sur {self.system}")
 
-            # Initialiser les conteneurs s'ils n'existent pas
-            if not hasattr(self, 'avatar_contexts'):
-                self.avatar_contexts = {}
-            if not hasattr(self, 'avatar_playwrights'):
-                self.avatar_playwrights = {}
-
             try:
-                from playwright.sync_api import sync_playwright
-
-                # ÉTAPE 1 : Créer instance Playwright
-                log_step("Playwright start", True, "Création instance Playwright...")
-                p = sync_playwright().start()
-                log_step("Playwright OK", True, "Instance Playwright créée")
-
-                # ÉTAPE 2 : Configuration Chrome
-                chrome_args = [
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-web-security',
-                    '--use-fake-ui-for-media-stream',
-                    '--allow-running-insecure-content',
-                    '--autoplay-policy=no-user-gesture-required'
-                ]
-
-                log_step("Configuration Chrome", True, "Arguments Chrome préparés")
-
-                # ÉTAPE 3 : Lancer browser
+                # ÉTAPES 1-5 : Contexte isolé sur un navigateur partagé du pool
+                log_step("Pool navigateurs", True, "Demande d'un contexte isolé...")
                 try:
-                    browser = p.chromium.launch(
-                        headless=True,
-                        args=chrome_args
-                    )
-                    log_step("Browser lancé", True, "Chrome démarré")
+                    lease = self.browser_pool.acquire(interview_id, profile='meet')
+                except BrowserPoolError as e:
+                    log_step("Pool navigateurs", False, str(e))
+                    return {'success': False, 'error': str(e)}
                 except Exception as e:
-                    log_step("Browser lancé", False, f"Erreur launch: {str(e)}")
-                    p.stop()
+                    log_step("Pool navigateurs", False, f"Erreur launch: {str(e)}")
                     return {'success': False, 'error': f'Impossible de lancer Chrome: {str(e)}'}
 
-                # ÉTAPE 4 : Vérifier browser
-                try:
-                    browser_version = browser.version
-                    log_step("Browser test", True, f"Version: {browser_version}")
-                except Exception as e:
-                    log_step("Browser test", False, f"Browser mort: {str(e)}")
-                    try:
-                        browser.close()
-                    except:
-                        pass
-                    p.stop()
-                    return {'success': False, 'error': 'Browser fermé immédiatement'}
+                browser = lease['browser']
+                context = lease['context']
+                page = lease['page']
+                log_step("Contexte créé", True, f"Contexte sur navigateur {lease['browser_id']}")
 
-                # ÉTAPE 5 : Créer contexte
+                # ÉTAPE 6 : Tester la page
                 try:
-                    context = browser.new_context(
-                        viewport={'width': 1920, 'height': 1080},
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                    )
-                    log_step("Contexte créé", True, "Contexte browser créé")
-                except Exception as e:
-                    log_step("Contexte créé", False, f"Erreur contexte: {str(e)}")
-                    browser.close()
-                    p.stop()
-                    return {'success': False, 'error': f'Erreur contexte: {str(e)}'}
-
-                # ÉTAPE 6 : Créer page et tester
-                try:
-                    page = context.new_page()
-                    log_step("Page créée", True, "Page browser créée")
-
-                    # Test avec page simple
                     page.goto("data:text/html,<html><body><h1>Test</h1></body></html>", timeout=10000)
                     test_title = page.title()
                     log_step("Page test", True, f"Test OK: {test_title}")
 
                 except Exception as e:
                     log_step("Page test", False, f"Page fermée: {str(e)}")
-                    try:
-                        context.close()
-                        browser.close()
-                    except:
-                        pass
-                    p.stop()
+                    self.browser_pool.release(interview_id)
                     return {'success': False, 'error': f'Page se ferme: {str(e)}'}
 
                 # STOCKER LES RÉFÉRENCES
                 self.avatar_browsers[interview_id] = browser
                 self.avatar_pages[interview_id] = page  
                 self.avatar_contexts[interview_id] = context
-                self.avatar_playwrights[interview_id] = p
 
                 log_step("Références stockées", True, "Browser, page, contexte sauvegardés")
 
@@ -1283,15 +1234,13 @@ class AvatarService:
         thread.start()
     
     def _is_browser_alive(self, interview_id: str) -> bool:
-        """Vérifie si le browser est encore vivant"""
+        """Vérifie si le contexte de l'entretien est encore vivant"""
         try:
             if interview_id not in self.avatar_browsers:
                 return False
             
-            browser = self.avatar_browsers[interview_id]
-            # Test simple pour voir si le browser répond
-            contexts = browser.contexts
-            return len(contexts) > 0
+            # Le navigateur est partagé : on teste le contexte propre à l'entretien
+            return self.browser_pool.is_context_alive(interview_id)
             
         except Exception as e:
             print(f"⚠️ Browser {interview_id} semble mort: {e}")
@@ -1626,15 +1575,10 @@ class AvatarService:
         """Nettoie les ressources Playwright d'un avatar"""
         
         try:
-            # Fermer le browser
-            if interview_id in self.avatar_browsers:
-                browser = self.avatar_browsers[interview_id]
-                try:
-                    # Fermer de manière synchrone
-                    browser.close()
-                except:
-                    pass
-                del self.avatar_browsers[interview_id]
+            # Rendre le contexte au pool (le navigateur partagé reste ouvert)
+            self.browser_pool.release(interview_id)
+            self.avatar_browsers.pop(interview_id, None)
+            self.avatar_contexts.pop(interview_id, None)
             
             # Nettoyer les pages
             if interview_id in self.avatar_pages:
@@ -1689,6 +1633,9 @@ class AvatarService:
         inactive_avatars = []
         
         for interview_id, avatar_data in self.active_avatars.items():
+            # Les sessions du runtime asyncio gèrent elles-mêmes leur fin
+            if self.runtime.has_session(interview_id):
+                continue
             if interview_id in self.avatar_pages:
                 page = self.avatar_pages[interview_id]
                 if not self._is_playwright_meeting_active(page):
@@ -1696,10 +1643,54 @@ class AvatarService:
         
         for interview_id in inactive_avatars:
             self._cleanup_playwright_avatar(interview_id)
+        
+        # Recycler les navigateurs du pool qui fuient ou sont morts
+        try:
+            self.browser_pool.recycle_leaking_browsers()
+        except Exception as e:
+            print(f"⚠️ Erreur recyclage pool navigateurs: {e}")
+    
+    def get_browser_pool_report(self) -> Dict:
+        """Récupère l'état du pool de navigateurs et la mémoire par contexte"""
+        
+        return {
+            'stats': self.browser_pool.get_stats(),
+            'memory': self.browser_pool.get_memory_report(),
+            'runtime': self.runtime.get_stats()
+        }
+    
+    def stop_avatar(self, interview_id: str) -> Dict:
+        """Arrête l'avatar d'un entretien (runtime asyncio ou session Playwright historique)"""
+        
+        if self.runtime.stop_interview(interview_id):
+            return {'success': True, 'interview_id': interview_id, 'runtime': 'asyncio'}
+        
+        if interview_id in self.active_avatars or interview_id in self.avatar_browsers:
+            self._cleanup_playwright_avatar(interview_id)
+            return {'success': True, 'interview_id': interview_id, 'runtime': 'threads'}
+        
+        if interview_id in self.sessions:
+            self._cleanup_session(interview_id)
+            return {'success': True, 'interview_id': interview_id, 'runtime': 'threads'}
+        
+        return {'success': False, 'error': 'Aucun avatar actif pour cet entretien'}
     
     def get_avatar_status(self, interview_id: str) -> Dict:
         """Récupère le statut détaillé d'un avatar"""
         
+        runtime_status = self.runtime.get_session_status(interview_id)
+        if runtime_status:
+            return {
+                'status': 'active',
+                'mode': 'simulation' if self.simulation_mode else 'ai',
+                'browser': 'chrome_playwright',
+                'system': self.system,
+                'data': self.active_avatars.get(interview_id),
+                'meeting_active': True,
+                'browser_running': True,
+                'runtime': runtime_status
+            }
+        
         if interview_id in self.active_avatars:
             avatar_data = self.active_avatars[interview_id]
             is_meeting_active = False
@@ -1768,6 +1759,8 @@ class AvatarService:
             'active_count': len(self.active_avatars),
             'scheduled_count': len(self.scheduled_launches),
             'browser_sessions': len(self.avatar_browsers),
+            'browser_pool': self.browser_pool.get_stats(),
+            'runtime': self.runtime.get_stats(),
             'advantages': [
                 'Chrome plus stable que Firefox',
                 'Playwright plus moderne que Selenium',
@@ -1961,18 +1954,30 @@ class AvatarService:
         except Exception as e:
             print(f"⚠️ Erreur sauvegarde cookies: {e}")
 
-    def _load_bot_cookies(self, context):
-        """📖 CHARGE LES COOKIES SAUVEGARDÉS DU BOT"""
+    def _read_bot_cookies(self):
+        """📖 LIT LES COOKIES SAUVEGARDÉS DU BOT (liste vide si absents)"""
         
         try:
             import json
             cookie_file = '/tmp/bot_google_cookies.json'
             
             if not os.path.exists(cookie_file):
-                return False
+                return []
             
             with open(cookie_file, 'r') as f:
-                cookie_data = json.load(f)
+                return json.load(f)
+            
+        except Exception as e:
+            print(f"⚠️ Erreur lecture cookies: {e}")
+            return []
+
+    def _load_bot_cookies(self, context):
+        """📖 CHARGE LES COOKIES SAUVEGARDÉS DU BOT"""
+        
+        try:
+            cookie_data = self._read_bot_cookies()
+            if not cookie_data:
+                return False
             
             # Ajouter les cookies au contexte
             context.add_cookies(cookie_data)
@@ -1993,39 +1998,17 @@ class AvatarService:
             print(f"{status} {step}: {message}")
         
         try:
-            from playwright.sync_api import sync_playwright
-            
             log_step("Initialisation Bot", True, "Démarrage avec identité Google...")
             
-            # Configuration Chrome avec persistance
-            p = sync_playwright().start()
-            print('........................kkdkd.')
-            
-            
-            user_data_dir = f'/home/{os.getenv("USER", "user")}/chrome_bot_persistent'
-            os.makedirs(user_data_dir, exist_ok=True)
-        
-            # ⚠️ CORRECTION: launch_persistent_context retourne directement un BrowserContext
-            context = p.chromium.launch_persistent_context(
-                user_data_dir=user_data_dir,  # Data persistence directory
-                headless=False,  # Visible for debug
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled', 
-                    '--exclude-switches=enable-automation',
-                    '--disable-web-security',
-                    '--window-size=1920,1080',
-                    '--start-maximized'
-                ]
-            )
-            print('........................kkdkd.')
-            
-            
-                # Créer une page directement depuis le context persistant
-            page = context.new_page()
-            page.add_init_script("""
+            # Contexte isolé sur un navigateur partagé, identité portée par les cookies du bot
+            lease = self.browser_pool.acquire(
+                interview_id,
+                profile='interactive',
+                context_options={
+                    'user_agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"
+                },
+                cookie_loader=self._load_bot_cookies,
+                init_script="""
                 // Supprimer toutes traces d'automation
                 Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
                 Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
@@ -2048,12 +2031,13 @@ class AvatarService:
                         }));
                     }, 1000);
                 });
-            """)
-            
-            
+            """
+            )
+            context = lease['context']
+            page = lease['page']
             
-            # Charger les cookies existants
-            cookies_loaded = self._load_bot_cookies(context)
+            # Cookies chargés par le pool à la création du contexte
+            cookies_loaded = lease['cookies_loaded']
             
             if not cookies_loaded:
                 log_step("Première Auth", True, "Première authentification du bot...")
@@ -2066,8 +2050,7 @@ class AvatarService:
             
             # Stocker les références
             self.sessions[interview_id] = {
-                'playwright': p,
-                'browser': None,  # ⚠️ Pas de browser avec persistent context
+                'browser': lease['browser'],
                 'context': context, 
                 'page': page,
                 'status': 'authenticated',
@@ -2078,17 +2061,9 @@ class AvatarService:
             return self._join_meet_as_authenticated_bot(interview_id, interview_data, page, log_step)
         except Exception as e:
             log_step("Erreur Bot Identity", False, str(e))
-            # ⚠️ Cleanup en cas d'erreur
-            if 'context' in locals():
-                try:
-                    context.close()
-                except:
-                    pass
-            if 'p' in locals():
-                try:
-                    p.stop()
-                except:
-                    pass
+            # ⚠️ Cleanup en cas d'erreur : le contexte retourne au pool
+            self.browser_pool.release(interview_id)
+            self.sessions.pop(interview_id, None)
             raise
     
     def _cleanup_session(self, interview_id):
@@ -2097,17 +2072,10 @@ class AvatarService:
             session = self.sessions[interview_id]
             
             try:
-                # Fermer la page
-                if 'page' in session and session['page']:
-                    session['page'].close()
-                    
-                # Fermer le context (qui ferme aussi le browser en mode persistent)
-                if 'context' in session and session['context']:
-                    session['context'].close()
-                    
-                # Arrêter playwright
-                if 'playwright' in session and session['playwright']:
-                    session['playwright'].stop()
+                # Fermer le contexte ; le navigateur partagé reste dans le pool
+                if not self.browser_pool.release(interview_id):
+                    if session.get('context'):
+                        session['context'].close()
                     
             except Exception as e:
                 print(f"❌ Erreur cleanup: {e}")
@@ -2954,37 +2922,19 @@ class AvatarService:
             print(f"{status} {step}: {message}")
 
         try:
-            from playwright.sync_api import sync_playwright
-
             log_step("Auth Humaine", True, "Démarrage avec interaction humaine...")
 
-            # ÉTAPE 1: Chrome normal pour authentification humaine
-            p = sync_playwright().start()
-
-            # Profil utilisateur NORMAL (pas persistent pour éviter détection)
-            browser = p.chromium.launch(
-                headless=False,  # Visible pour l'humain
-                args=[
-                    '--no-first-run',
-                    '--no-default-browser-check',
-                    '--disable-blink-features=AutomationControlled',
-                    '--exclude-switches=enable-automation',
-                    '--disable-web-security',
-                    '--window-size=1920,1080'
-                ]
-            )
-
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            )
-
-            page = context.new_page()
-
-            # Anti-détection minimal (pas trop suspect)
-            page.add_init_script("""
+            # ÉTAPE 1: Contexte visible (profil interactif du pool) pour l'authentification humaine
+            lease = self.browser_pool.acquire(
+                interview_id,
+                profile='interactive',
+                init_script="""
                 Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
                 delete window.__playwright;
-            """)
+            """
+            )
+            context = lease['context']
+            page = lease['page']
 
             meet_link = interview_data.get('meet_link', '')
 
@@ -3036,8 +2986,7 @@ class AvatarService:
 
             # Stocker la session authentifiée
             self.sessions[interview_id] = {
-                'playwright': p,
-                'browser': None,
+                'browser': lease['browser'],
                 'context': context,
                 'page': page,
                 'status': 'human_authenticated',
@@ -3083,6 +3032,7 @@ class AvatarService:
 
         except Exception as e:
             log_step("Erreur handoff", False, str(e))
+            self.browser_pool.release(interview_id)
             return {'success': False, 'error': str(e)}
 
     def _inject_post_human_system(self, page, interview_data, log_step):
@@ -0,0 +1,222 @@
+# backend/app/services/biometric_analytics.py
+"""
+Calculs vectorisés (NumPy) pour l'analyse biométrique.
+
+Les frames d'un entretien sont représentées par une matrice
+(n_frames x n_emotions) ; toutes les statistiques du résumé sont calculées
+sur cette matrice sans boucle Python par frame.
+"""
+import numpy as np
+
+# Colonnes d'émotions fixes (ordre de stockage et de calcul)
+EMOTION_COLUMNS = ['angry', 'disgusted', 'fearful', 'happy', 'neutral', 'sad', 'surprised']
+
+POSITIVE_EMOTIONS = ['happy', 'surprised']
+NEGATIVE_EMOTIONS = ['angry', 'sad', 'disgusted', 'fearful']
+
+KEY_MOMENT_MIN_CONFIDENCE = 0.6
+KEY_MOMENT_QUESTION_WINDOW = 15  # secondes après une question
+MAX_KEY_MOMENTS = 10
+
+
+def emotion_columns_for(emotion_dicts):
+    """Colonnes fixes, complétées par les émotions inconnues rencontrées dans les données"""
+    columns = list(EMOTION_COLUMNS)
+    known = set(columns)
+    for emotions in emotion_dicts:
+        for emotion in emotions:
+            if emotion not in known:
+                known.add(emotion)
+                columns.append(emotion)
+    return columns
+
+
+def frames_to_matrix(emotion_dicts, columns=None):
+    """
+    Convertit une liste de dictionnaires d'émotions en matrice float32.
+
+    Les émotions absentes d'une frame valent NaN pour ne pas biaiser les moyennes.
+
+    Returns:
+        tuple: (matrice n_frames x n_emotions, liste des colonnes)
+    """
+    if columns is None:
+        columns = emotion_columns_for(emotion_dicts)
+
+    matrix = np.full((len(emotion_dicts), len(columns)), np.nan, dtype=np.float32)
+    for column_index, emotion in enumerate(columns):
+        matrix[:, column_index] = [emotions.get(emotion, np.nan) for emotions in emotion_dicts]
+
+    return matrix, columns
+
+
+def dominant_indices(matrix):
+    """Indice de l'émotion dominante et sa valeur pour chaque frame"""
+    filled = np.nan_to_num(matrix, nan=-np.inf)
+    indices = filled.argmax(axis=1)
+    values = np.nan_to_num(filled[np.arange(len(filled)), indices], neginf=0.0)
+    return indices, values
+
+
+def emotion_distribution(matrix, columns):
+    """Moyenne de chaque émotion, normalisée en pourcentages"""
+    return distribution_from_sums(
+        np.nansum(matrix, axis=0, dtype=np.float64),
+        (~np.isnan(matrix)).sum(axis=0),
+        columns
+    )
+
+
+def distribution_from_sums(sums, counts, columns):
+    """Distribution en pourcentages à partir de sommes et d'effectifs par émotion"""
+    sums = np.asarray(sums, dtype=np.float64)
+    counts = np.asarray(counts)
+    present = counts > 0
+    if not present.any():
+        return {}
+
+    means = sums[present] / counts[present]
+    total = means.sum()
+    present_columns = [column for column, keep in zip(columns, present) if keep]
+
+    if total <= 0:
+        return {emotion: 0.0 for emotion in present_columns}
+
+    return {
+        emotion: round(float(value / total * 100), 2)
+        for emotion, value in zip(present_columns, means)
+    }
+
+
+def compute_scores(distribution):
+    """Scores d'engagement, de stress et de confiance à partir de la distribution"""
+    engagement_score = sum(distribution.get(emotion, 0) for emotion in POSITIVE_EMOTIONS)
+    stress_indicators = sum(distribution.get(emotion, 0) for emotion in NEGATIVE_EMOTIONS)
+    confidence_indicators = distribution.get('happy', 0) * 1.5 + distribution.get('neutral', 0) * 0.5
+
+    return (
+        min(100, engagement_score * 1.5),
+        min(100, stress_indicators * 1.5),
+        min(100, confidence_indicators)
+    )
+
+
+def key_moment_window(n_frames):
+    """Taille de la fenêtre glissante utilisée pour détecter les changements"""
+    return min(5, n_frames // 10) if n_frames > 10 else 2
+
+
+def rolling_window_modes(dominant, n_emotions, window, exclude_tail=True):
+    """
+    Émotion la plus fréquente sur les `window` frames précédant chaque frame.
+
+    Les comptes par fenêtre sont obtenus par différence de sommes cumulées
+    d'un encodage one-hot, en O(n x n_emotions). Par défaut les `window`
+    dernières frames ne sont pas évaluées (comportement du résumé complet).
+
+    Returns:
+        tuple: (indices des frames évaluées, mode de la fenêtre précédente)
+    """
+    n_frames = len(dominant)
+    one_hot = np.zeros((n_frames + 1, n_emotions), dtype=np.int32)
+    one_hot[np.arange(n_frames) + 1, dominant] = 1
+    cumulative = one_hot.cumsum(axis=0)
+
+    frames = np.arange(window, n_frames - window if exclude_tail else n_frames)
+    counts = cumulative[frames] - cumulative[frames - window]
+    return frames, counts.argmax(axis=1)
+
+
+def detect_emotion_changes(timestamps, dominant, confidence, columns, window, exclude_tail=True, first_frame=0):
+    """
+    Changements d'émotion dominante par rapport à la fenêtre précédente.
+
+    Returns:
+        list: Candidats {"timestamp", "from_emotion", "to_emotion", "confidence"} dans l'ordre chronologique
+    """
+    timestamps = np.asarray(timestamps)
+    dominant = np.asarray(dominant, dtype=np.int64)
+    confidence = np.asarray(confidence, dtype=np.float64)
+
+    frames, previous_modes = rolling_window_modes(dominant, len(columns), window, exclude_tail)
+    keep = frames >= first_frame
+    frames, previous_modes = frames[keep], previous_modes[keep]
+
+    changed = (dominant[frames] != previous_modes) & (confidence[frames] > KEY_MOMENT_MIN_CONFIDENCE)
+
+    return [
+        {
+            "timestamp": int(timestamps[frame]),
+            "from_emotion": columns[previous],
+            "to_emotion": columns[dominant[frame]],
+            "confidence": float(confidence[frame])
+        }
+        for frame, previous in zip(frames[changed], previous_modes[changed])
+    ]
+
+
+def select_key_moments(candidates, question_offsets=None, question_ids=None):
+    """
+    Associe les changements aux questions posées juste avant et retient les plus significatifs.
+
+    Args:
+        candidates: Changements détectés, dans l'ordre chronologique
+        question_offsets: Positions (secondes) des questions posées, triées
+        question_ids: Identifiants des questions, alignés sur question_offsets
+
+    Returns:
+        list: Moments clés triés par confiance décroissante
+    """
+    if not candidates:
+        return []
+
+    candidate_timestamps = np.array([c["timestamp"] for c in candidates], dtype=np.float64)
+
+    # Alignement sur la question posée juste avant chaque changement
+    closest_question = np.full(len(candidates), -1, dtype=np.int64)
+    question_gap = np.full(len(candidates), np.inf)
+    if question_offsets is not None and len(question_offsets) > 0:
+        question_offsets = np.asarray(question_offsets, dtype=np.float64)
+        positions = np.searchsorted(question_offsets, candidate_timestamps, side='right') - 1
+        has_question = positions >= 0
+        closest_question[has_question] = positions[has_question]
+        question_gap[has_question] = candidate_timestamps[has_question] - question_offsets[positions[has_question]]
+
+    key_moments = []
+    for index, candidate in enumerate(candidates):
+        moment = dict(candidate)
+
+        if question_gap[index] <= KEY_MOMENT_QUESTION_WINDOW:
+            moment["question_id"] = question_ids[closest_question[index]]
+            key_moments.append(moment)
+        elif len(key_moments) < 5 or moment["confidence"] > 0.8:
+            # Limiter le nombre de moments clés sans question associée
+            key_moments.append(moment)
+
+    key_moments.sort(key=lambda x: x["confidence"], reverse=True)
+    return key_moments[:MAX_KEY_MOMENTS]
+
+
+def find_key_moments(timestamps, dominant, confidence, columns, question_offsets=None, question_ids=None):
+    """
+    Détecte les changements d'émotion dominante significatifs sur un entretien complet.
+
+    Args:
+        timestamps: Positions des frames (secondes), triées
+        dominant: Indice de colonne de l'émotion dominante par frame
+        confidence: Confiance de l'émotion dominante par frame
+        columns: Noms des colonnes d'émotions
+        question_offsets: Positions (secondes) des questions posées, triées
+        question_ids: Identifiants des questions, alignés sur question_offsets
+
+    Returns:
+        list: Moments clés triés par confiance décroissante
+    """
+    n_frames = len(timestamps)
+    if n_frames < 3:
+        return []
+
+    candidates = detect_emotion_changes(
+        timestamps, dominant, confidence, columns, key_moment_window(n_frames)
+    )
+    return select_key_moments(candidates, question_offsets, question_ids)
@@ -1,6 +1,8 @@
 # backend/services/biometric_service.py
 from flask import current_app
 import numpy as np
+from . import biometric_analytics as analytics
+from .biometric_storage import BiometricFrameStore
 from ..models.biometric import FacialAnalysis, BiometricSummary
 from ..models.interview import Interview
 from ..models.interview_question import InterviewQuestion
@@ -9,113 +11,64 @@ from datetime import datetime
 
 class BiometricService:
     def __init__(self):
-        # Import ici pour éviter les imports circulaires
-        pass
+        self.frame_store = BiometricFrameStore()
     
     def save_facial_analysis(self, interview_id, timestamp, emotions):
         """Enregistre une analyse faciale"""
         # Trouver l'émotion dominante
         dominant_emotion = max(emotions.items(), key=lambda x: x[1])
         
-        analysis = FacialAnalysis(
-            interview_id=interview_id,
-            timestamp=timestamp,
-            emotions=emotions,
-            dominant_emotion=dominant_emotion[0],
-            confidence=dominant_emotion[1]
-        )
-        
-        db.session.add(analysis)
-        db.session.commit()
+        self.frame_store.append(interview_id, [{'timestamp': timestamp, 'emotions': emotions}])
         
-        return analysis
+        return {
+            'interview_id': interview_id,
+            'timestamp': timestamp,
+            'emotions': emotions,
+            'dominant_emotion': dominant_emotion[0],
+            'confidence': dominant_emotion[1]
+        }
     
     def batch_save_facial_analyses(self, interview_id, analyses):
         """Enregistre un lot d'analyses faciales"""
         # analyses est une liste de dictionnaires: [{"timestamp": 10, "emotions": {"happy": 0.8, ...}}, ...]
-        db_analyses = []
-        
-        for analysis in analyses:
-            emotions = analysis['emotions']
-            timestamp = analysis['timestamp']
-            
-            # Trouver l'émotion dominante
-            dominant_emotion = max(emotions.items(), key=lambda x: x[1])
-            
-            db_analysis = FacialAnalysis(
-                interview_id=interview_id,
-                timestamp=timestamp,
-                emotions=emotions,
-                dominant_emotion=dominant_emotion[0],
-                confidence=dominant_emotion[1]
-            )
-            
-            db_analyses.append(db_analysis)
-        
-        db.session.bulk_save_objects(db_analyses)
-        db.session.commit()
-        
-        return len(db_analyses)
+        return self.frame_store.append(interview_id, analyses)
+    
+    def get_facial_frames(self, interview_id, start=None, end=None):
+        """Récupère les frames d'un entretien sur un intervalle de positions (secondes)"""
+        timestamps, matrix, columns = self.frame_store.read_range(interview_id, start, end)
+        
+        return {
+            'interview_id': interview_id,
+            'emotion_columns': columns,
+            'timestamps': timestamps.tolist(),
+            'values': np.where(np.isnan(matrix), None, np.round(matrix, 4)).tolist()
+        }
     
     def generate_summary(self, interview_id):
         """Génère un résumé biométrique pour un entretien"""
-        # Récupérer toutes les analyses faciales pour cet entretien
-        analyses = FacialAnalysis.query.filter_by(interview_id=interview_id).all()
+        timestamps, matrix, columns, dominant, confidence = self._load_frames(interview_id)
         
-        if not analyses:
+        if len(timestamps) == 0:
             raise ValueError("Aucune analyse faciale trouvée pour cet entretien")
         
-        # Créer un dictionnaire pour stocker les distributions d'émotions
-        emotion_counts = {}
-        
-        # Calculer les distributions d'émotions
-        for analysis in analyses:
-            for emotion, value in analysis.emotions.items():
-                if emotion not in emotion_counts:
-                    emotion_counts[emotion] = []
-                emotion_counts[emotion].append(value)
-        
-        # Calculer la moyenne pour chaque émotion
-        emotion_distribution = {}
-        for emotion, values in emotion_counts.items():
-            emotion_distribution[emotion] = sum(values) / len(values)
-        
-        # Normaliser pour obtenir des pourcentages
-        total = sum(emotion_distribution.values())
-        for emotion in emotion_distribution:
-            emotion_distribution[emotion] = round((emotion_distribution[emotion] / total) * 100, 2)
-        
-        # Calculer le score d'engagement (basé sur les émotions positives et l'attention)
-        positive_emotions = ['happy', 'surprised']
-        negative_emotions = ['angry', 'sad', 'disgusted', 'fearful']
-        neutral_emotions = ['neutral']
-        
-        engagement_score = 0
-        for emotion in positive_emotions:
-            if emotion in emotion_distribution:
-                engagement_score += emotion_distribution[emotion]
-        
-        # Calculer les indicateurs de stress (basés sur les émotions négatives)
-        stress_indicators = 0
-        for emotion in negative_emotions:
-            if emotion in emotion_distribution:
-                stress_indicators += emotion_distribution[emotion]
-        
-        # Calculer les indicateurs de confiance (basés sur la neutralité et la joie)
-        confidence_indicators = 0
-        if 'happy' in emotion_distribution:
-            confidence_indicators += emotion_distribution['happy'] * 1.5
-        if 'neutral' in emotion_distribution:
-            confidence_indicators += emotion_distribution['neutral'] * 0.5
-        
-        # Normaliser les scores
-        engagement_score = min(100, engagement_score * 1.5)
-        stress_indicators = min(100, stress_indicators * 1.5)
-        confidence_indicators = min(100, confidence_indicators)
+        # Distribution des émotions et scores
+        emotion_distribution = analytics.emotion_distribution(matrix, columns)
+        engagement_score, stress_indicators, confidence_indicators = analytics.compute_scores(emotion_distribution)
         
         # Trouver les moments clés (changements significatifs d'émotions)
-        key_moments = self._find_key_moments(analyses, interview_id)
+        question_offsets, question_ids = self._question_offsets(interview_id)
+        key_moments = analytics.find_key_moments(
+            timestamps, dominant, confidence, columns, question_offsets, question_ids
+        )
         
+        return self._save_summary(
+            interview_id, emotion_distribution, engagement_score,
+            stress_indicators, confidence_indicators, key_moments
+        )
+    
+    def _save_summary(self, interview_id, emotion_distribution, engagement_score,
+                      stress_indicators, confidence_indicators, key_moments):
+        """Crée ou met à jour le résumé biométrique d'un entretien"""
         # Vérifier si un résumé existe déjà
         existing_summary = BiometricSummary.query.filter_by(interview_id=interview_id).first()
         
@@ -145,68 +98,60 @@ class BiometricService:
             
             return summary
     
-    def _find_key_moments(self, analyses, interview_id):
-        """Trouve les moments clés dans un entretien basés sur les changements d'émotions"""
-        if len(analyses) < 3:
-            return []
-        
-        # Obtenir les questions de l'entretien
-        questions = InterviewQuestion.query.filter_by(interview_id=interview_id).all()
-        question_times = {q.start_time: q.id for q in questions}
-        
-        key_moments = []
-        last_dominant = analyses[0].dominant_emotion
-        
-        # Fenêtre glissante pour détecter les changements
-        window_size = min(5, len(analyses) // 10) if len(analyses) > 10 else 2
-        
-        for i in range(window_size, len(analyses) - window_size):
-            # Comparer l'émotion actuelle avec la fenêtre précédente
-            previous_window = analyses[i-window_size:i]
-            current = analyses[i]
-            
-            # Calculer l'émotion dominante dans la fenêtre précédente
-            prev_emotions = {}
-            for a in previous_window:
-                emotion = a.dominant_emotion
-                prev_emotions[emotion] = prev_emotions.get(emotion, 0) + 1
-            
-            prev_dominant = max(prev_emotions.items(), key=lambda x: x[1])[0]
-            
-            # Si l'émotion dominante a changé
-            if current.dominant_emotion != prev_dominant and current.confidence > 0.6:
-                # Trouver la question la plus proche (si applicable)
-                timestamp = current.timestamp
-                closest_question = None
-                min_diff = float('inf')
-                
-                for q_time, q_id in question_times.items():
-                    if q_time <= timestamp:
-                        diff = timestamp - q_time
-                        if diff < min_diff:
-                            min_diff = diff
-                            closest_question = q_id
-                
-                if min_diff <= 15:  # Si la réaction est dans les 15 secondes après la question
-                    key_moments.append({
-                        "timestamp": timestamp,
-                        "from_emotion": prev_dominant,
-                        "to_emotion": current.dominant_emotion,
-                        "question_id": closest_question,
-                        "confidence": current.confidence
-                    })
-                elif len(key_moments) < 5 or current.confidence > 0.8:
-                    # Limiter le nombre de moments clés sans question associée
-                    key_moments.append({
-                        "timestamp": timestamp,
-                        "from_emotion": prev_dominant,
-                        "to_emotion": current.dominant_emotion,
-                        "confidence": current.confidence
-                    })
-        
-        # Trier par confiance et limiter à 10 moments
-        key_moments.sort(key=lambda x: x["confidence"], reverse=True)
-        return key_moments[:10]
+    def _load_frames(self, interview_id):
+        """
+        Charge les frames d'un entretien depuis le stockage colonnaire, ou depuis
+        les lignes FacialAnalysis historiques pour les entretiens antérieurs.
+        
+        Returns:
+            tuple: (positions, matrice d'émotions, colonnes, émotion dominante, confiance)
+        """
+        timestamps, matrix, columns = self.frame_store.read_range(interview_id)
+        if len(timestamps) > 0:
+            dominant, confidence = analytics.dominant_indices(matrix)
+            return timestamps, matrix, columns, dominant, confidence
+        
+        # Charger uniquement les colonnes utiles, triées par position (pas d'objets ORM)
+        rows = db.session.query(
+            FacialAnalysis.timestamp,
+            FacialAnalysis.emotions,
+            FacialAnalysis.dominant_emotion,
+            FacialAnalysis.confidence
+        ).filter_by(interview_id=interview_id).order_by(FacialAnalysis.timestamp).all()
+        
+        timestamps = np.fromiter((row.timestamp for row in rows), dtype=np.int64, count=len(rows))
+        matrix, columns = analytics.frames_to_matrix([row.emotions or {} for row in rows])
+        
+        # Émotion dominante enregistrée (repli sur l'argmax de la frame si absente)
+        dominant, confidence = self._dominant_arrays(rows, matrix, columns)
+        return timestamps, matrix, columns, dominant, confidence
+    
+    def _dominant_arrays(self, rows, matrix, columns):
+        """Indices d'émotion dominante et confiances par frame"""
+        dominant, confidence = analytics.dominant_indices(matrix)
+        column_index = {emotion: index for index, emotion in enumerate(columns)}
+        
+        for i, row in enumerate(rows):
+            if row.dominant_emotion in column_index:
+                dominant[i] = column_index[row.dominant_emotion]
+            if row.confidence is not None:
+                confidence[i] = row.confidence
+        
+        return dominant, confidence
+    
+    def _question_offsets(self, interview_id):
+        """Positions (secondes depuis le début de l'entretien) des questions posées, triées"""
+        interview = db.session.query(Interview.started_at).filter_by(id=interview_id).first()
+        if not interview or not interview.started_at:
+            return [], []
+        
+        questions = db.session.query(InterviewQuestion.id, InterviewQuestion.asked_at).filter(
+            InterviewQuestion.interview_id == interview_id,
+            InterviewQuestion.asked_at.isnot(None)
+        ).order_by(InterviewQuestion.asked_at).all()
+        
+        offsets = [(q.asked_at - interview.started_at).total_seconds() for q in questions]
+        return offsets, [q.id for q in questions]
     
     def get_summary(self, interview_id):
         """Récupère le résumé biométrique pour un entretien"""
@@ -214,8 +159,11 @@ class BiometricService:
         
         if not summary:
             # Essayer de générer un résumé s'il y a des analyses
-            analyses = FacialAnalysis.query.filter_by(interview_id=interview_id).all()
-            if analyses:
+            has_analyses = (
+                self.frame_store.has_frames(interview_id)
+                or db.session.query(FacialAnalysis.id).filter_by(interview_id=interview_id).first()
+            )
+            if has_analyses:
                 summary = self.generate_summary(interview_id)
             else:
                 raise ValueError("Aucune analyse biométrique disponible pour cet entretien")
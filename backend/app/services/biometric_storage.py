@@ -0,0 +1,178 @@
+# backend/app/services/biometric_storage.py
+import os
+import zlib
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from ..models.biometric import FacialAnalysisChunk
+from . import biometric_analytics as analytics
+from app import db
+
+
+class BiometricFrameStore:
+    """
+    Stockage compact des flux biométriques, par entretien et par tranche de temps.
+
+    Les frames sont regroupées en chunks de `chunk_seconds` secondes : positions
+    en int32 (encodées en delta) et émotions en float32 colonne par colonne,
+    compressées avec zlib. L'ajout fusionne les frames dans les chunks existants
+    et la lecture par intervalle ne décompresse que les chunks concernés.
+
+    La fusion verrouille les chunks existants (SELECT ... FOR UPDATE) ; la
+    création concurrente d'un même chunk lève une violation d'unicité, et
+    l'ajout est alors rejoué dans un nouveau savepoint.
+    """
+
+    def __init__(self, chunk_seconds=None, compression_level=6, max_retries=3):
+        self.chunk_seconds = chunk_seconds or int(os.getenv('BIOMETRIC_CHUNK_SECONDS', '60'))
+        self.compression_level = compression_level
+        self.max_retries = max_retries
+
+    def append(self, interview_id, frames, commit=True):
+        """
+        Ajoute des frames à l'entretien.
+
+        Args:
+            interview_id (int): ID de l'entretien
+            frames (list): [{"timestamp": 10, "emotions": {"happy": 0.8, ...}}, ...]
+            commit (bool): Valider la transaction à la fin
+
+        Returns:
+            int: Nombre de frames ajoutées
+        """
+        if not frames:
+            return 0
+
+        timestamps = np.fromiter((int(f['timestamp']) for f in frames), dtype=np.int32, count=len(frames))
+        matrix, columns = analytics.frames_to_matrix([f['emotions'] for f in frames])
+        return self.append_arrays(interview_id, timestamps, matrix, columns, commit=commit)
+
+    def append_arrays(self, interview_id, timestamps, matrix, columns, commit=True):
+        """Ajoute des frames déjà sous forme de tableaux (positions, matrice d'émotions)"""
+        if len(timestamps) == 0:
+            return 0
+
+        for attempt in range(self.max_retries):
+            try:
+                with db.session.begin_nested():
+                    self._merge(interview_id, timestamps, matrix, columns)
+                break
+            except IntegrityError:
+                # Chunk créé entre-temps par un autre ajout : relire et fusionner
+                if attempt == self.max_retries - 1:
+                    raise
+
+        if commit:
+            db.session.commit()
+
+        return len(timestamps)
+
+    def read_range(self, interview_id, start=None, end=None):
+        """
+        Lit les frames d'un entretien sur un intervalle de positions (bornes incluses).
+
+        Returns:
+            tuple: (positions int32, matrice float32 frames x émotions, colonnes)
+        """
+        query = FacialAnalysisChunk.query.filter(FacialAnalysisChunk.interview_id == interview_id)
+        if start is not None:
+            query = query.filter(FacialAnalysisChunk.end_timestamp >= start)
+        if end is not None:
+            query = query.filter(FacialAnalysisChunk.start_timestamp <= end)
+
+        chunks = query.order_by(FacialAnalysisChunk.chunk_index).all()
+        if not chunks:
+            return np.empty(0, dtype=np.int32), np.empty((0, len(analytics.EMOTION_COLUMNS)), dtype=np.float32), list(analytics.EMOTION_COLUMNS)
+
+        decoded = [self._decode(chunk) for chunk in chunks]
+        columns = analytics.emotion_columns_for([chunk_columns for _, _, chunk_columns in decoded])
+
+        timestamps = np.concatenate([chunk_timestamps for chunk_timestamps, _, _ in decoded])
+        matrix = np.vstack([
+            self._project(chunk_matrix, chunk_columns, columns)
+            for _, chunk_matrix, chunk_columns in decoded
+        ])
+
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps <= end
+
+        return timestamps[mask], matrix[mask], columns
+
+    def has_frames(self, interview_id):
+        """Vérifie si des frames sont stockées pour l'entretien"""
+        return db.session.query(FacialAnalysisChunk.id).filter_by(interview_id=interview_id).first() is not None
+
+    def _merge(self, interview_id, timestamps, matrix, columns):
+        """Fusionne les frames dans leurs chunks (verrouillés s'ils existent)"""
+        chunk_indices = timestamps // self.chunk_seconds
+        unique_indices = np.unique(chunk_indices)
+
+        existing = {
+            chunk.chunk_index: chunk
+            for chunk in FacialAnalysisChunk.query.filter(
+                FacialAnalysisChunk.interview_id == interview_id,
+                FacialAnalysisChunk.chunk_index.in_([int(i) for i in unique_indices])
+            ).populate_existing().with_for_update().all()
+        }
+
+        for chunk_index in unique_indices:
+            mask = chunk_indices == chunk_index
+            chunk_timestamps = timestamps[mask]
+            chunk_matrix = matrix[mask]
+            chunk_columns = list(columns)
+
+            chunk = existing.get(int(chunk_index))
+            if chunk:
+                old_timestamps, old_matrix, old_columns = self._decode(chunk)
+                chunk_columns = analytics.emotion_columns_for([old_columns, columns])
+                chunk_timestamps = np.concatenate([old_timestamps, chunk_timestamps])
+                chunk_matrix = np.vstack([
+                    self._project(old_matrix, old_columns, chunk_columns),
+                    self._project(chunk_matrix, columns, chunk_columns)
+                ])
+            else:
+                chunk = FacialAnalysisChunk(interview_id=interview_id, chunk_index=int(chunk_index))
+                db.session.add(chunk)
+
+            order = np.argsort(chunk_timestamps, kind='stable')
+            self._encode(chunk, chunk_timestamps[order], chunk_matrix[order], chunk_columns)
+
+    def _encode(self, chunk, timestamps, matrix, columns):
+        """Empaquette et compresse les tableaux d'un chunk"""
+        deltas = np.diff(timestamps.astype(np.int32), prepend=np.int32(0)).astype(np.int32)
+
+        chunk.emotion_columns = list(columns)
+        chunk.frame_count = int(len(timestamps))
+        chunk.start_timestamp = int(timestamps[0])
+        chunk.end_timestamp = int(timestamps[-1])
+        chunk.timestamps_blob = zlib.compress(deltas.tobytes(), self.compression_level)
+        # Stockage colonne par colonne : les valeurs d'une même émotion se compressent mieux
+        chunk.values_blob = zlib.compress(
+            np.ascontiguousarray(matrix.astype(np.float32).T).tobytes(),
+            self.compression_level
+        )
+
+    def _decode(self, chunk):
+        """Décompresse un chunk en (positions, matrice, colonnes)"""
+        columns = list(chunk.emotion_columns)
+        deltas = np.frombuffer(zlib.decompress(chunk.timestamps_blob), dtype=np.int32)
+        timestamps = np.cumsum(deltas, dtype=np.int64).astype(np.int32)
+        values = np.frombuffer(zlib.decompress(chunk.values_blob), dtype=np.float32)
+        matrix = values.reshape(len(columns), len(timestamps)).T.copy()
+        return timestamps, matrix, columns
+
+    def _project(self, matrix, columns, target_columns):
+        """Réordonne une matrice sur un autre jeu de colonnes (NaN pour les colonnes absentes)"""
+        if list(columns) == list(target_columns):
+            return matrix
+
+        projected = np.full((matrix.shape[0], len(target_columns)), np.nan, dtype=np.float32)
+        index = {emotion: i for i, emotion in enumerate(columns)}
+        for target_index, emotion in enumerate(target_columns):
+            if emotion in index:
+                projected[:, target_index] = matrix[:, index[emotion]]
+        return projected
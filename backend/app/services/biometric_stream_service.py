@@ -0,0 +1,496 @@
+# backend/app/services/biometric_stream_service.py
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+from flask import current_app, request
+from flask_socketio import emit
+
+from . import biometric_analytics as analytics
+from .biometric_service import BiometricService
+from ..middleware.auth_middleware import verify_token
+
+# Fenêtre fixe de détection des changements en flux (équivalent du résumé pour les longs entretiens)
+STREAM_CHANGE_WINDOW = 5
+
+
+class BiometricStreamService:
+    """
+    Ingestion temps réel des frames biométriques via Socket.IO.
+
+    Les frames sont tamponnées en mémoire par entretien et écrites par
+    micro-lots (taille ou délai atteint) dans le stockage colonnaire. Des
+    agrégats glissants (émotion dominante, engagement, stress) sont poussés
+    au recruteur à chaque lot, et des accumulateurs permettent de finaliser
+    le résumé en fin d'entretien sans tout recalculer.
+
+    Le tampon d'un entretien est borné (BIOMETRIC_STREAM_MAX_BUFFER) : quand
+    l'écriture échoue, l'excédent est déversé sur disque puis rejoué par la
+    tâche de fond. Un flux sans frame depuis BIOMETRIC_STREAM_IDLE_TTL
+    secondes est écrit puis oublié ; sa finalisation repart alors du stockage.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.socketio = None
+        self.biometric_service = BiometricService()
+        self.flush_size = int(os.getenv('BIOMETRIC_STREAM_FLUSH_SIZE', '50'))
+        self.flush_interval = float(os.getenv('BIOMETRIC_STREAM_FLUSH_INTERVAL', '5'))
+        self.window_seconds = int(os.getenv('BIOMETRIC_STREAM_WINDOW_SECONDS', '30'))
+        self.max_buffer = int(os.getenv('BIOMETRIC_STREAM_MAX_BUFFER', '2000'))
+        self.idle_ttl = float(os.getenv('BIOMETRIC_STREAM_IDLE_TTL', '1800'))
+        self.spill_dir = os.getenv('BIOMETRIC_STREAM_SPILL_DIR')
+        self._streams = {}
+        self._authorized = set()  # (sid, interview_id) déjà vérifiés
+        self._lock = threading.RLock()
+        self._spill_lock = threading.Lock()
+        self._last_replay = 0.0
+        self._flusher_started = False
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Initialise le service avec une application Flask.
+
+        Args:
+            app (Flask): Instance de l'application Flask
+        """
+        self.app = app
+        if not self.spill_dir:
+            self.spill_dir = os.path.join(app.instance_path, 'biometric_spill')
+
+        # Réutiliser l'instance SocketIO créée dans app/__init__.py
+        from app import socketio
+        self.socketio = socketio
+
+        app.biometric_stream_service = self
+
+        with app.app_context():
+            self._register_handlers()
+
+    # ------------------------------------------------------------------
+    # Gestionnaires Socket.IO
+    # ------------------------------------------------------------------
+
+    def _register_handlers(self):
+        @self.socketio.on('biometric_frames')
+        def handle_biometric_frames(data):
+            """
+            Reçoit un lot de frames d'un entretien en cours.
+
+            Args:
+                data (dict): {interview_id, token, frames: [{timestamp, emotions}, ...]}
+            """
+            interview_id = data.get('interview_id')
+            frames = data.get('frames') or []
+
+            if not self._authorize(interview_id, data.get('token')):
+                emit('biometric_error', {
+                    'status': 'error',
+                    'interview_id': interview_id,
+                    'message': 'Entretien non trouvé ou accès non autorisé'
+                })
+                return
+
+            try:
+                aggregates = self.ingest(interview_id, frames)
+                emit('biometric_ack', {
+                    'interview_id': interview_id,
+                    'received': len(frames),
+                    'buffered': aggregates['buffered']
+                })
+            except Exception as e:
+                current_app.logger.error(f"Erreur ingestion biométrique {interview_id}: {str(e)}")
+                emit('biometric_error', {
+                    'status': 'error',
+                    'interview_id': interview_id,
+                    'message': str(e)
+                })
+
+        @self.socketio.on('biometric_finalize')
+        def handle_biometric_finalize(data):
+            """Finalise le résumé biométrique à la fin de l'entretien"""
+            interview_id = data.get('interview_id')
+
+            if not self._authorize(interview_id, data.get('token')):
+                emit('biometric_error', {
+                    'status': 'error',
+                    'interview_id': interview_id,
+                    'message': 'Entretien non trouvé ou accès non autorisé'
+                })
+                return
+
+            try:
+                summary = self.finalize(interview_id)
+                emit('biometric_summary', {'interview_id': interview_id, 'summary': summary.to_dict()})
+            except ValueError as e:
+                emit('biometric_error', {'status': 'error', 'interview_id': interview_id, 'message': str(e)})
+
+        @self.socketio.on('disconnect')
+        def handle_biometric_disconnect():
+            with self._lock:
+                self._authorized = {entry for entry in self._authorized if entry[0] != request.sid}
+
+    def _authorize(self, interview_id, token):
+        """Vérifie le token et l'accès à l'entretien une seule fois par connexion"""
+        if not interview_id:
+            return False
+
+        key = (request.sid, interview_id)
+        if key in self._authorized:
+            return True
+
+        payload = verify_token(token) if token else None
+        if not payload:
+            return False
+
+        user_id = payload.get('user_id') or payload.get('sub')
+
+        from ..models.interview import Interview
+        from .subscription_service import SubscriptionService
+
+        interview = Interview.query.get(interview_id)
+        if not interview or str(interview.recruiter_id) != str(user_id):
+            return False
+
+        if not SubscriptionService().has_feature(user_id, 'biometric_analysis'):
+            return False
+
+        # Un flux ouvert après des frames déjà stockées (redémarrage, flux expiré,
+        # ingestion REST) n'a que des agrégats partiels
+        partial = interview_id not in self._streams and self.biometric_service.frame_store.has_frames(interview_id)
+
+        with self._lock:
+            self._authorized.add(key)
+            stream = self._get_stream(interview_id)
+            stream['recruiter_id'] = interview.recruiter_id
+            stream['partial'] = stream['partial'] or partial
+
+        return True
+
+    # ------------------------------------------------------------------
+    # Ingestion et agrégats
+    # ------------------------------------------------------------------
+
+    def ingest(self, interview_id, frames):
+        """
+        Tamponne des frames, met à jour les agrégats et écrit un micro-lot si nécessaire.
+
+        Returns:
+            dict: Agrégats glissants courants
+        """
+        frames = sorted(
+            (f for f in frames if 'timestamp' in f and f.get('emotions')),
+            key=lambda f: f['timestamp']
+        )
+
+        with self._lock:
+            stream = self._get_stream(interview_id)
+            stream['last_seen'] = time.monotonic()
+            if frames:
+                self._update_stream(stream, frames)
+                stream['buffer'].extend(frames)
+
+            should_flush = len(stream['buffer']) >= self.flush_size
+            aggregates = self._live_aggregates(stream)
+
+        if should_flush:
+            self.flush(interview_id)
+            aggregates['buffered'] = 0
+
+        self._push_aggregates(interview_id, stream, aggregates)
+        self._ensure_flusher()
+        return aggregates
+
+    def get_live_aggregates(self, interview_id):
+        """Agrégats glissants d'un entretien en cours (None si aucun flux)"""
+        with self._lock:
+            stream = self._streams.get(interview_id)
+            return self._live_aggregates(stream) if stream else None
+
+    def flush(self, interview_id=None):
+        """Écrit les frames tamponnées (d'un entretien ou de tous) dans le stockage colonnaire"""
+        with self._lock:
+            interview_ids = [interview_id] if interview_id is not None else list(self._streams.keys())
+            batches = []
+            for stream_id in interview_ids:
+                stream = self._streams.get(stream_id)
+                if stream and stream['buffer']:
+                    batches.append((stream_id, stream['buffer']))
+                    stream['buffer'] = []
+                    stream['last_flush'] = time.monotonic()
+
+        written = 0
+        for stream_id, frames in batches:
+            try:
+                written += self.biometric_service.batch_save_facial_analyses(stream_id, frames)
+            except Exception as e:
+                current_app.logger.error(f"Erreur écriture micro-lot biométrique {stream_id}: {str(e)}")
+                self._requeue(stream_id, frames)
+
+        return written
+
+    def finalize(self, interview_id):
+        """
+        Termine le flux d'un entretien et enregistre son résumé.
+
+        Le résumé est construit à partir des accumulateurs du flux ; sans flux
+        complet (redémarrage, flux expiré, ingestion REST), il est recalculé
+        depuis le stockage. Les frames qui n'ont pas pu être écrites sont
+        déversées sur disque et rejouées plus tard.
+        """
+        self.flush(interview_id)
+
+        with self._lock:
+            stream = self._streams.pop(interview_id, None)
+            self._authorized = {entry for entry in self._authorized if entry[1] != interview_id}
+
+        if stream and stream['buffer']:
+            self._spill(interview_id, stream['buffer'])
+
+        if not stream or stream['frame_count'] == 0 or stream['partial']:
+            self.replay_spilled(interview_id)
+            return self.biometric_service.generate_summary(interview_id)
+
+        emotion_distribution = analytics.distribution_from_sums(stream['sums'], stream['counts'], stream['columns'])
+        engagement_score, stress_indicators, confidence_indicators = analytics.compute_scores(emotion_distribution)
+
+        question_offsets, question_ids = self.biometric_service._question_offsets(interview_id)
+        key_moments = analytics.select_key_moments(stream['candidates'], question_offsets, question_ids)
+
+        return self.biometric_service._save_summary(
+            interview_id, emotion_distribution, engagement_score,
+            stress_indicators, confidence_indicators, key_moments
+        )
+
+    def expire_idle_streams(self):
+        """
+        Écrit puis oublie les flux sans frame depuis idle_ttl secondes.
+
+        Returns:
+            int: Nombre de flux retirés
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                interview_id for interview_id, stream in self._streams.items()
+                if now - stream['last_seen'] >= self.idle_ttl
+            ]
+
+        for interview_id in idle:
+            self.flush(interview_id)
+            with self._lock:
+                stream = self._streams.pop(interview_id, None)
+                self._authorized = {entry for entry in self._authorized if entry[1] != interview_id}
+            if stream and stream['buffer']:
+                self._spill(interview_id, stream['buffer'])
+
+        return len(idle)
+
+    # ------------------------------------------------------------------
+    # Débordement sur disque
+    # ------------------------------------------------------------------
+
+    def replay_spilled(self, interview_id=None):
+        """
+        Réécrit dans le stockage les frames déversées sur disque.
+
+        Returns:
+            int: Nombre de frames écrites
+        """
+        if not self.spill_dir:
+            return 0
+
+        pattern = f"{interview_id}.jsonl" if interview_id is not None else '*.jsonl'
+        written = 0
+        for path in glob.glob(os.path.join(glob.escape(self.spill_dir), pattern)):
+            stream_id = os.path.basename(path)[:-len('.jsonl')]
+
+            # Renommer avant lecture : un seul processus rejoue un fichier donné
+            replay_path = f"{path}.{uuid.uuid4().hex}.replay"
+            with self._spill_lock:
+                try:
+                    os.replace(path, replay_path)
+                except FileNotFoundError:
+                    continue
+
+            with open(replay_path, encoding='utf-8') as spill:
+                frames = [json.loads(line) for line in spill if line.strip()]
+
+            try:
+                written += self.biometric_service.batch_save_facial_analyses(stream_id, frames)
+            except Exception as e:
+                current_app.logger.error(f"Erreur rejeu des frames biométriques {stream_id}: {str(e)}")
+                self._write_spill(stream_id, frames)
+            os.remove(replay_path)
+
+        return written
+
+    def _requeue(self, interview_id, frames):
+        """Remet en tête du tampon des frames non écrites et déverse l'excédent sur disque"""
+        with self._lock:
+            stream = self._streams.get(interview_id)
+            if stream is None:
+                # Flux finalisé ou expiré pendant l'écriture
+                overflow = frames
+            else:
+                stream['buffer'] = frames + stream['buffer']
+                excess = len(stream['buffer']) - self.max_buffer
+                overflow = stream['buffer'][:max(excess, 0)]
+                stream['buffer'] = stream['buffer'][len(overflow):]
+
+        if overflow:
+            self._spill(interview_id, overflow)
+
+    def _spill(self, interview_id, frames):
+        try:
+            self._write_spill(interview_id, frames)
+        except OSError as e:
+            current_app.logger.error(
+                f"Débordement biométrique impossible pour {interview_id}, {len(frames)} frames perdues: {str(e)}"
+            )
+
+    def _write_spill(self, interview_id, frames):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        with self._spill_lock, open(os.path.join(self.spill_dir, f"{interview_id}.jsonl"), 'a', encoding='utf-8') as spill:
+            for frame in frames:
+                spill.write(json.dumps({'timestamp': frame['timestamp'], 'emotions': frame['emotions']}) + '\n')
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _get_stream(self, interview_id):
+        stream = self._streams.get(interview_id)
+        if stream is None:
+            columns = list(analytics.EMOTION_COLUMNS)
+            stream = {
+                'recruiter_id': None,
+                'buffer': [],
+                'last_flush': time.monotonic(),
+                'last_seen': time.monotonic(),
+                'partial': False,
+                'columns': columns,
+                'sums': np.zeros(len(columns), dtype=np.float64),
+                'counts': np.zeros(len(columns), dtype=np.int64),
+                'window': deque(),  # (timestamp, vecteur d'émotions)
+                'recent_dominant': np.empty(0, dtype=np.int64),
+                'candidates': [],
+                'frame_count': 0,
+                'last_timestamp': None
+            }
+            self._streams[interview_id] = stream
+        return stream
+
+    def _update_stream(self, stream, frames):
+        """Met à jour accumulateurs, fenêtre glissante et changements d'émotion pour un lot"""
+        columns = analytics.emotion_columns_for([stream['columns']] + [f['emotions'] for f in frames])
+        if len(columns) > len(stream['columns']):
+            extra = len(columns) - len(stream['columns'])
+            stream['sums'] = np.concatenate([stream['sums'], np.zeros(extra)])
+            stream['counts'] = np.concatenate([stream['counts'], np.zeros(extra, dtype=np.int64)])
+            stream['window'] = deque(
+                (ts, np.concatenate([vector, np.full(extra, np.nan, dtype=np.float32)]))
+                for ts, vector in stream['window']
+            )
+            stream['columns'] = columns
+
+        timestamps = np.array([f['timestamp'] for f in frames], dtype=np.int64)
+        matrix, _ = analytics.frames_to_matrix([f['emotions'] for f in frames], columns)
+
+        # Accumulateurs pour la distribution finale
+        stream['sums'] += np.nansum(matrix, axis=0, dtype=np.float64)
+        stream['counts'] += (~np.isnan(matrix)).sum(axis=0)
+        stream['frame_count'] += len(frames)
+        stream['last_timestamp'] = int(timestamps[-1])
+
+        # Fenêtre glissante pour les agrégats temps réel
+        for ts, vector in zip(timestamps, matrix):
+            stream['window'].append((int(ts), vector))
+        horizon = stream['last_timestamp'] - self.window_seconds
+        while stream['window'] and stream['window'][0][0] < horizon:
+            stream['window'].popleft()
+
+        # Changements d'émotion : la fin du lot précédent sert de fenêtre d'amorce
+        dominant, confidence = analytics.dominant_indices(matrix)
+        history = stream['recent_dominant']
+        sequence = np.concatenate([history, dominant])
+        padded_timestamps = np.concatenate([np.zeros(len(history), dtype=np.int64), timestamps])
+        padded_confidence = np.concatenate([np.zeros(len(history)), confidence])
+
+        stream['candidates'].extend(analytics.detect_emotion_changes(
+            padded_timestamps, sequence, padded_confidence, columns,
+            STREAM_CHANGE_WINDOW, exclude_tail=False, first_frame=len(history)
+        ))
+        stream['recent_dominant'] = sequence[-STREAM_CHANGE_WINDOW:]
+
+    def _live_aggregates(self, stream):
+        if stream['window']:
+            window_matrix = np.vstack([vector for _, vector in stream['window']])
+            distribution = analytics.emotion_distribution(window_matrix, stream['columns'])
+        else:
+            distribution = {}
+
+        engagement, stress, confidence = analytics.compute_scores(distribution)
+
+        return {
+            'dominant_emotion': max(distribution.items(), key=lambda x: x[1])[0] if distribution else None,
+            'emotion_distribution': distribution,
+            'engagement_score': round(engagement, 2),
+            'stress_indicators': round(stress, 2),
+            'confidence_indicators': round(confidence, 2),
+            'window_seconds': self.window_seconds,
+            'frames': stream['frame_count'],
+            'last_timestamp': stream['last_timestamp'],
+            'buffered': len(stream['buffer'])
+        }
+
+    def _push_aggregates(self, interview_id, stream, aggregates):
+        """Envoie les agrégats glissants dans la salle du recruteur"""
+        if not stream.get('recruiter_id'):
+            return
+
+        self.socketio.emit('biometric_live_update', {
+            'interview_id': interview_id,
+            **aggregates
+        }, room=f"user_{stream['recruiter_id']}")
+
+    def _ensure_flusher(self):
+        """Démarre la tâche de fond qui écrit les tampons expirés"""
+        if self._flusher_started:
+            return
+        self._flusher_started = True
+        self.socketio.start_background_task(self._flush_loop)
+
+    def _flush_loop(self):
+        while True:
+            self.socketio.sleep(1)
+            now = time.monotonic()
+
+            with self._lock:
+                expired = [
+                    interview_id for interview_id, stream in self._streams.items()
+                    if stream['buffer'] and now - stream['last_flush'] >= self.flush_interval
+                ]
+
+            replay = now - self._last_replay >= self.flush_interval
+            if replay:
+                self._last_replay = now
+
+            with self.app.app_context():
+                for interview_id in expired:
+                    self.flush(interview_id)
+                self.expire_idle_streams()
+                if replay:
+                    self.replay_spilled()
+
+
+def get_biometric_stream_service():
+    """Récupère le service de flux biométrique de l'application courante"""
+    return getattr(current_app, 'biometric_stream_service', None)
@@ -0,0 +1,732 @@
+# backend/app/services/browser_pool.py
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# Profils de lancement Chrome : un profil = une famille de navigateurs partagés
+BROWSER_PROFILES = {
+    # Sessions Meet automatiques (serveur sans affichage)
+    'meet': {
+        'headless': True,
+        'args': [
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-web-security',
+            '--use-fake-ui-for-media-stream',
+            '--use-fake-device-for-media-stream',
+            '--allow-running-insecure-content',
+            '--autoplay-policy=no-user-gesture-required'
+        ]
+    },
+    # Sessions avec identité Google du bot ou authentification humaine
+    'interactive': {
+        'headless': False,
+        'args': [
+            '--no-sandbox',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--disable-dev-shm-usage',
+            '--disable-blink-features=AutomationControlled',
+            '--exclude-switches=enable-automation',
+            '--disable-web-security',
+            '--use-fake-ui-for-media-stream',
+            '--window-size=1920,1080'
+        ]
+    }
+}
+
+
+class BrowserPoolError(Exception):
+    """Erreur levée quand le pool ne peut pas fournir de contexte"""
+    pass
+
+
+class _BrowserPoolBase:
+    """Comptabilité commune aux pools synchrone et asynchrone : navigateurs, baux, recyclage, mémoire"""
+
+    def __init__(self, max_browsers_per_profile: int = None, max_contexts_per_browser: int = None,
+                 max_contexts_served: int = None, max_browser_memory_mb: int = None,
+                 warm_browsers: int = None):
+        self.max_browsers_per_profile = max_browsers_per_profile or int(os.getenv('AVATAR_POOL_MAX_BROWSERS', '2'))
+        self.max_contexts_per_browser = max_contexts_per_browser or int(os.getenv('AVATAR_POOL_MAX_CONTEXTS', '4'))
+        self.max_contexts_served = max_contexts_served or int(os.getenv('AVATAR_POOL_RECYCLE_AFTER', '50'))
+        self.max_browser_memory_mb = max_browser_memory_mb or int(os.getenv('AVATAR_POOL_MAX_MEMORY_MB', '1500'))
+        self.warm_browsers = warm_browsers if warm_browsers is not None else int(os.getenv('AVATAR_POOL_WARM', '1'))
+
+        self._playwright = None
+        self._browsers: List[Dict] = []
+        self._leases: Dict[str, Dict] = {}
+        self._next_browser_id = 1
+        self._stats = {
+            'browsers_launched': 0,
+            'browsers_recycled': 0,
+            'contexts_created': 0,
+            'contexts_released': 0
+        }
+
+    def _pick_browser(self, profile: str) -> Optional[Dict]:
+        """Navigateur le moins chargé du profil, None s'il faut en lancer un nouveau"""
+        candidates = [
+            slot for slot in self._browsers
+            if slot['profile'] == profile
+            and not slot['draining']
+            and len(slot['active']) < self.max_contexts_per_browser
+        ]
+
+        if candidates:
+            return min(candidates, key=lambda s: len(s['active']))
+
+        profile_count = len([s for s in self._browsers if s['profile'] == profile])
+        if profile_count >= self.max_browsers_per_profile:
+            raise BrowserPoolError(
+                f"Capacité atteinte pour le profil {profile}: "
+                f"{profile_count} navigateurs x {self.max_contexts_per_browser} contextes"
+            )
+
+        return None
+
+    def _register_browser(self, profile: str, browser, known_pids: set) -> Dict:
+        """Ajoute un navigateur fraîchement lancé au pool"""
+        slot = {
+            'id': self._next_browser_id,
+            'profile': profile,
+            'browser': browser,
+            'pids': self._chrome_pids() - known_pids,
+            'active': set(),
+            'contexts_served': 0,
+            'draining': False,
+            'launched_at': time.time()
+        }
+        self._next_browser_id += 1
+        self._browsers.append(slot)
+        self._stats['browsers_launched'] += 1
+
+        print(f"🚀 Navigateur {slot['id']} ({profile}) lancé - version {browser.version}")
+        return slot
+
+    def _register_lease(self, interview_id: str, slot: Dict, profile: str, context, page,
+                        cookies_loaded: bool) -> Dict:
+        """Enregistre le bail d'un entretien sur un navigateur"""
+        slot['active'].add(interview_id)
+        slot['contexts_served'] += 1
+        self._stats['contexts_created'] += 1
+
+        lease = {
+            'interview_id': interview_id,
+            'browser_id': slot['id'],
+            'profile': profile,
+            'browser': slot['browser'],
+            'context': context,
+            'page': page,
+            'cookies_loaded': cookies_loaded,
+            'acquired_at': datetime.utcnow().isoformat()
+        }
+        self._leases[interview_id] = lease
+
+        print(f"🧩 Contexte {interview_id} sur navigateur {slot['id']} "
+              f"({len(slot['active'])}/{self.max_contexts_per_browser})")
+        return lease
+
+    def _context_options(self, context_options: Optional[Dict]) -> Dict:
+        options = {
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': DEFAULT_USER_AGENT,
+            'permissions': ['microphone', 'camera']
+        }
+        options.update(context_options or {})
+        return options
+
+    def _forget_browser(self, slot: Dict):
+        if slot in self._browsers:
+            self._browsers.remove(slot)
+
+        print(f"🧹 Navigateur {slot['id']} fermé après {slot['contexts_served']} contextes")
+
+    def get_lease(self, interview_id: str) -> Optional[Dict]:
+        """Récupère le bail d'un entretien"""
+        return self._leases.get(interview_id)
+
+    def get_stats(self) -> Dict:
+        """Statistiques globales du pool"""
+        return {
+            'browsers': len(self._browsers),
+            'active_contexts': len(self._leases),
+            'max_browsers_per_profile': self.max_browsers_per_profile,
+            'max_contexts_per_browser': self.max_contexts_per_browser,
+            **self._stats
+        }
+
+    def _browser_memory_entry(self, slot: Dict) -> Dict:
+        rss_mb = self._browser_rss_mb(slot)
+        return {
+            'browser_id': slot['id'],
+            'profile': slot['profile'],
+            'active_contexts': len(slot['active']),
+            'contexts_served': slot['contexts_served'],
+            'rss_mb': rss_mb,
+            'rss_per_context_mb': round(rss_mb / len(slot['active']), 1) if rss_mb and slot['active'] else None,
+            'draining': slot['draining'],
+            'uptime_seconds': int(time.time() - slot['launched_at'])
+        }
+
+    def _should_recycle(self, slot: Dict) -> bool:
+        """Un navigateur est recyclé après trop de contextes ou au-delà du seuil mémoire"""
+        if slot['draining'] or slot['contexts_served'] >= self.max_contexts_served:
+            return True
+
+        rss_mb = self._browser_rss_mb(slot)
+        return bool(rss_mb and rss_mb > self.max_browser_memory_mb)
+
+    def _get_slot(self, browser_id: int) -> Optional[Dict]:
+        for slot in self._browsers:
+            if slot['id'] == browser_id:
+                return slot
+        return None
+
+    def _is_connected(self, slot: Dict) -> bool:
+        try:
+            return slot['browser'].is_connected()
+        except Exception:
+            return False
+
+    def _chrome_pids(self) -> set:
+        """PIDs des processus Chrome descendants du processus courant"""
+        if not PSUTIL_AVAILABLE:
+            return set()
+
+        try:
+            return {
+                child.pid for child in psutil.Process().children(recursive=True)
+                if 'chrom' in child.name().lower()
+            }
+        except Exception:
+            return set()
+
+    def _browser_rss_mb(self, slot: Dict) -> Optional[float]:
+        """RSS cumulée du processus navigateur et de ses processus enfants (renderers, GPU)"""
+        if not PSUTIL_AVAILABLE or not slot['pids']:
+            return None
+
+        total = 0
+        seen = set()
+        for pid in slot['pids']:
+            try:
+                process = psutil.Process(pid)
+                for proc in [process] + process.children(recursive=True):
+                    if proc.pid not in seen:
+                        seen.add(proc.pid)
+                        total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        return round(total / (1024 * 1024), 1)
+
+
+class AsyncBrowserPool(_BrowserPoolBase):
+    """
+    Pool sur l'API async de Playwright, piloté depuis une seule boucle asyncio
+    (celle du runtime avatar, ou celle du thread propriétaire de BrowserPool).
+
+    Toutes les méthodes doivent être appelées depuis la même boucle d'événements.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Démarre Playwright (API async) et préchauffe les navigateurs headless"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise BrowserPoolError("Playwright non disponible")
+
+        async with self._lock:
+            await self._ensure_started()
+
+    async def shutdown(self):
+        """Ferme tous les contextes, navigateurs et l'instance Playwright"""
+        for interview_id in list(self._leases.keys()):
+            await self.release(interview_id)
+
+        async with self._lock:
+            for slot in list(self._browsers):
+                await self._close_browser(slot)
+
+            if self._playwright:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    print(f"⚠️ Erreur arrêt Playwright: {e}")
+                self._playwright = None
+
+        print("✅ Pool navigateurs async arrêté")
+
+    async def acquire(self, interview_id: str, profile: str = 'meet', context_options: Optional[Dict] = None,
+                      cookies: Optional[List[Dict]] = None, init_script: Optional[str] = None) -> Dict:
+        """Fournit un contexte isolé et une page pour un entretien (voir BrowserPool.acquire)"""
+        if profile not in BROWSER_PROFILES:
+            raise BrowserPoolError(f"Profil navigateur inconnu: {profile}")
+
+        async with self._lock:
+            if interview_id in self._leases:
+                return self._leases[interview_id]
+
+            await self._ensure_started()
+
+            for slot in list(self._browsers):
+                if slot['profile'] == profile and not self._is_connected(slot):
+                    await self._drop_dead_browser(slot)
+
+            slot = self._pick_browser(profile) or await self._launch_browser(profile)
+            context = await slot['browser'].new_context(**self._context_options(context_options))
+
+            if cookies:
+                await context.add_cookies(cookies)
+
+            if init_script:
+                await context.add_init_script(init_script)
+
+            try:
+                page = await context.new_page()
+            except Exception:
+                await context.close()
+                raise
+
+            return self._register_lease(interview_id, slot, profile, context, page, bool(cookies))
+
+    async def release(self, interview_id: str) -> bool:
+        """Ferme le contexte d'un entretien et recycle le navigateur si nécessaire"""
+        async with self._lock:
+            lease = self._leases.pop(interview_id, None)
+            if not lease:
+                return False
+
+            try:
+                await lease['context'].close()
+            except Exception as e:
+                print(f"⚠️ Erreur fermeture contexte {interview_id}: {e}")
+
+            self._stats['contexts_released'] += 1
+
+            slot = self._get_slot(lease['browser_id'])
+            if slot:
+                slot['active'].discard(interview_id)
+                if not slot['active'] and self._should_recycle(slot):
+                    await self._close_browser(slot)
+                    self._stats['browsers_recycled'] += 1
+
+            return True
+
+    async def recycle_leaking_browsers(self) -> int:
+        """Marque en drainage les navigateurs trop gourmands et ferme ceux qui sont vides"""
+        recycled = 0
+
+        async with self._lock:
+            for slot in list(self._browsers):
+                if not self._is_connected(slot):
+                    await self._drop_dead_browser(slot)
+                    recycled += 1
+                    continue
+
+                if self._should_recycle(slot):
+                    slot['draining'] = True
+                    if not slot['active']:
+                        await self._close_browser(slot)
+                        self._stats['browsers_recycled'] += 1
+                        recycled += 1
+
+        return recycled
+
+    def get_memory_report(self) -> Dict:
+        """Mémoire par navigateur (RSS des processus Chrome)"""
+        return {
+            'browsers': [self._browser_memory_entry(slot) for slot in self._browsers],
+            'contexts': {
+                interview_id: {'browser_id': lease['browser_id'], 'pages': len(lease['context'].pages)}
+                for interview_id, lease in self._leases.items()
+            }
+        }
+
+    async def collect_memory_report(self) -> Dict:
+        """Rapport mémoire complété du tas JS des pages de chaque contexte (métriques CDP)"""
+        report = self.get_memory_report()
+
+        async with self._lock:
+            for interview_id, lease in self._leases.items():
+                if interview_id in report['contexts']:
+                    report['contexts'][interview_id]['js_heap_mb'] = await self._context_js_heap_mb(lease)
+
+        return report
+
+    async def _ensure_started(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+            print("✅ Pool navigateurs async démarré")
+
+        warm_count = len([b for b in self._browsers if b['profile'] == 'meet'])
+        while warm_count < min(self.warm_browsers, self.max_browsers_per_profile):
+            await self._launch_browser('meet')
+            warm_count += 1
+
+    async def _launch_browser(self, profile: str) -> Dict:
+        launch_options = BROWSER_PROFILES[profile]
+        known_pids = self._chrome_pids()
+
+        browser = await self._playwright.chromium.launch(
+            headless=launch_options['headless'],
+            args=list(launch_options['args'])
+        )
+
+        return self._register_browser(profile, browser, known_pids)
+
+    async def _close_browser(self, slot: Dict):
+        try:
+            await slot['browser'].close()
+        except Exception as e:
+            print(f"⚠️ Erreur fermeture navigateur {slot['id']}: {e}")
+
+        self._forget_browser(slot)
+
+    async def _drop_dead_browser(self, slot: Dict):
+        for interview_id in list(slot['active']):
+            self._leases.pop(interview_id, None)
+        slot['active'].clear()
+        await self._close_browser(slot)
+
+    async def _context_js_heap_mb(self, lease: Dict) -> Optional[float]:
+        """Tas JavaScript utilisé par les pages du contexte (métriques CDP)"""
+        total = 0
+        try:
+            for page in lease['context'].pages:
+                session = await lease['context'].new_cdp_session(page)
+                try:
+                    await session.send('Performance.enable')
+                    metrics = await session.send('Performance.getMetrics')
+                    for metric in metrics.get('metrics', []):
+                        if metric['name'] == 'JSHeapUsedSize':
+                            total += metric['value']
+                finally:
+                    await session.detach()
+        except Exception:
+            return None
+
+        return round(total / (1024 * 1024), 1)
+
+
+class _LoopProxy:
+    """
+    Objet Playwright (API async) manipulé depuis un autre thread que la boucle du pool.
+
+    Chaque appel de méthode ou lecture d'attribut est exécuté dans la boucle
+    propriétaire et le thread appelant attend son résultat : le code synchrone
+    existant (page.goto, page.keyboard.press...) fonctionne sans toucher aux
+    objets Playwright hors de leur thread. Les objets Playwright renvoyés
+    (pages, éléments, claviers...) sont à leur tour enveloppés.
+    """
+
+    __slots__ = ('_pool', '_target')
+
+    def __init__(self, pool: 'BrowserPool', target):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name: str):
+        pool = self._pool
+        value = pool._call(getattr, self._target, name)
+        if callable(value) and not _is_playwright_object(value):
+            def method(*args, **kwargs):
+                return pool._wrap(pool._run(_invoke(value, pool._unwrap(args), pool._unwrap(kwargs))))
+            return method
+        return pool._wrap(value)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"Objet Playwright en lecture seule: {name}")
+
+    def __eq__(self, other):
+        return isinstance(other, _LoopProxy) and self._target is other._target
+
+    def __hash__(self):
+        return id(self._target)
+
+    def __repr__(self):
+        return f"<{type(self._target).__name__} via pool navigateurs>"
+
+
+def _is_playwright_object(value) -> bool:
+    return type(value).__module__.startswith('playwright.')
+
+
+async def _invoke(function, args, kwargs):
+    result = function(*args, **kwargs)
+    if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+        result = await result
+    return result
+
+
+class BrowserPool:
+    """
+    Pool de processus Chromium partagés entre les entretiens avatar.
+
+    Quelques navigateurs restent démarrés en permanence et chaque entretien
+    reçoit un BrowserContext isolé (cookies, stockage, permissions) au lieu
+    d'un Chrome complet. Un navigateur est recyclé lorsqu'il a servi trop de
+    contextes ou que sa mémoire dépasse le seuil configuré.
+
+    Les objets Playwright ne sont utilisables que depuis le thread qui les a
+    créés : un thread dédié ('browser-pool') possède une boucle asyncio et un
+    AsyncBrowserPool, et toutes les opérations (lancement, contextes,
+    fermeture, métriques CDP) y sont soumises. Les baux exposent des proxys
+    dont chaque appel est exécuté dans cette boucle ; les attentes des
+    différents entretiens (wait_for_timeout, navigation) s'y entrelacent au
+    lieu de se bloquer. Le runtime avatar asyncio exécute ses sessions dans
+    la même boucle et utilise directement async_pool : plafonds et recyclage
+    sont communs à tous les entretiens.
+    """
+
+    def __init__(self, **kwargs):
+        self._options = kwargs
+        self._pool = AsyncBrowserPool(**kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Cycle de vie du pool
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre le thread propriétaire, Playwright et préchauffe les navigateurs headless"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise BrowserPoolError("Playwright non disponible")
+
+        self._ensure_loop()
+        self._run(self._pool.start())
+        print("✅ Pool navigateurs démarré")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def async_pool(self) -> AsyncBrowserPool:
+        """Pool async sous-jacent, à n'utiliser que depuis la boucle du pool"""
+        return self._pool
+
+    def start_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre si besoin le thread propriétaire et renvoie sa boucle (sans lancer de navigateur)"""
+        self._ensure_loop()
+        return self._loop
+
+    def shutdown(self, timeout: int = 30):
+        """Ferme tous les contextes, navigateurs et l'instance Playwright, puis arrête le thread"""
+        with self._lock:
+            if not self.running:
+                return
+
+            try:
+                self._submit(self._pool.shutdown()).result(timeout=timeout)
+            except Exception as e:
+                print(f"⚠️ Erreur arrêt pool navigateurs: {e}")
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+            self._loop = None
+
+        print("✅ Pool navigateurs arrêté")
+
+    # ------------------------------------------------------------------
+    # Contextes par entretien
+    # ------------------------------------------------------------------
+
+    def acquire(self, interview_id: str, profile: str = 'meet', context_options: Optional[Dict] = None,
+                cookie_loader: Optional[Callable] = None, init_script: Optional[str] = None) -> Dict:
+        """
+        Fournit un contexte isolé et une page pour un entretien.
+
+        Args:
+            interview_id: Identifiant de l'entretien
+            profile: Profil de lancement ('meet' ou 'interactive')
+            context_options: Options passées à browser.new_context()
+            cookie_loader: Fonction appelée (dans le thread appelant) avec le
+                contexte pour charger les cookies, avant toute navigation
+            init_script: Script injecté dans chaque page du contexte
+
+        Returns:
+            dict: Bail avec les clés browser, context, page, browser_id
+        """
+        if profile not in BROWSER_PROFILES:
+            raise BrowserPoolError(f"Profil navigateur inconnu: {profile}")
+
+        if not PLAYWRIGHT_AVAILABLE:
+            raise BrowserPoolError("Playwright non disponible")
+
+        self._ensure_loop()
+        existing = self.get_lease(interview_id)
+        if existing:
+            return existing
+
+        lease = self._proxy_lease(self._run(
+            self._pool.acquire(interview_id, profile, context_options, init_script=init_script)
+        ))
+
+        if cookie_loader:
+            # Le chargeur manipule le contexte via le proxy : il doit tourner hors de la boucle
+            try:
+                lease['cookies_loaded'] = bool(cookie_loader(lease['context']))
+            except Exception:
+                self.release(interview_id)
+                raise
+            self._call(self._mark_cookies_loaded, interview_id, lease['cookies_loaded'])
+
+        return lease
+
+    def release(self, interview_id: str) -> bool:
+        """Ferme le contexte d'un entretien et recycle le navigateur si nécessaire"""
+        if not self.running:
+            return False
+        return self._run(self._pool.release(interview_id))
+
+    def get_lease(self, interview_id: str) -> Optional[Dict]:
+        """Récupère le bail d'un entretien"""
+        if not self.running:
+            return None
+        lease = self._call(self._pool.get_lease, interview_id)
+        return self._proxy_lease(lease) if lease else None
+
+    def is_context_alive(self, interview_id: str) -> bool:
+        """Vérifie que le navigateur et la page d'un entretien répondent encore"""
+        if not self.running:
+            return False
+        return self._call(self._context_alive, interview_id)
+
+    # ------------------------------------------------------------------
+    # Supervision
+    # ------------------------------------------------------------------
+
+    def recycle_leaking_browsers(self) -> int:
+        """Marque en drainage les navigateurs trop gourmands et ferme ceux qui sont vides"""
+        if not self.running:
+            return 0
+        return self._run(self._pool.recycle_leaking_browsers())
+
+    def get_memory_report(self) -> Dict:
+        """Mémoire par navigateur (RSS du processus) et par contexte (tas JS des pages)"""
+        if not self.running:
+            return {'browsers': [], 'contexts': {}}
+        return self._run(self._pool.collect_memory_report())
+
+    def get_stats(self) -> Dict:
+        """Statistiques globales du pool"""
+        if not self.running:
+            return {**self._pool.get_stats(), 'running': False}
+        return {**self._call(self._pool.get_stats), 'running': True}
+
+    # ------------------------------------------------------------------
+    # Boucle propriétaire
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self.running:
+                return
+
+            # Le verrou asyncio du pool est lié à sa boucle : nouveau pool à chaque démarrage
+            self._loop = asyncio.new_event_loop()
+            self._pool = AsyncBrowserPool(**self._options)
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name='browser-pool', daemon=True)
+            self._thread.start()
+            ready.wait(timeout=5)
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _run(self, coro):
+        """Exécute une coroutine dans la boucle du pool et attend son résultat"""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise BrowserPoolError("Appel bloquant depuis la boucle du pool navigateurs")
+        if not self.running:
+            coro.close()
+            raise BrowserPoolError("Pool navigateurs arrêté")
+        return self._submit(coro).result()
+
+    def _call(self, function: Callable, *args):
+        """Exécute une fonction synchrone dans la boucle du pool"""
+        return self._run(_invoke(function, args, {}))
+
+    def _mark_cookies_loaded(self, interview_id: str, cookies_loaded: bool):
+        lease = self._pool.get_lease(interview_id)
+        if lease:
+            lease['cookies_loaded'] = cookies_loaded
+
+    def _context_alive(self, interview_id: str) -> bool:
+        lease = self._pool.get_lease(interview_id)
+        if not lease:
+            return False
+
+        try:
+            return lease['browser'].is_connected() and not lease['page'].is_closed()
+        except Exception:
+            return False
+
+    def _proxy_lease(self, lease: Dict) -> Dict:
+        """Copie d'un bail dont les objets Playwright passent par la boucle du pool"""
+        return {key: self._wrap(value) for key, value in lease.items()}
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(self._wrap(item) for item in value)
+        if _is_playwright_object(value):
+            return _LoopProxy(self, value)
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, _LoopProxy):
+            return value._target
+        if isinstance(value, dict):
+            return {key: self._unwrap(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._unwrap(item) for item in value)
+        return value
+
+
+# Instance globale
+browser_pool = None
+
+def get_browser_pool():
+    """Récupère (ou crée) le pool de navigateurs partagé"""
+    global browser_pool
+    if browser_pool is None:
+        browser_pool = BrowserPool()
+    return browser_pool
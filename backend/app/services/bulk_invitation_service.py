@@ -0,0 +1,200 @@
+# backend/app/services/bulk_invitation_service.py
+import os
+import re
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+
+from ..models.invitation import Invitation, InvitationBatch
+from ..models.organization import Organization, OrganizationMember
+from ..models.user import User
+from app import db
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class BulkInvitationService:
+    """
+    Invitations groupées en un nombre constant de requêtes.
+
+    Les emails sont normalisés et dédoublonnés, puis confrontés en deux
+    requêtes ensemblistes aux membres et aux invitations en attente. Les
+    invitations retenues sont insérées en un seul executemany, puis les
+    emails sont envoyés par lots sur une connexion SMTP partagée. Chaque lot
+    est suivi par un InvitationBatch (résultat par email) : `resume` renvoie
+    les emails non partis sans recréer d'invitation.
+    """
+
+    def __init__(self, email_batch_size=None):
+        self.email_batch_size = email_batch_size or int(os.getenv('INVITATION_EMAIL_BATCH_SIZE', '50'))
+
+    def invite(self, organization_id, emails, role, created_by, message=None, max_new=None):
+        """
+        Crée les invitations d'une liste d'emails.
+
+        Args:
+            organization_id: ID de l'organisation
+            emails: Liste d'emails à inviter
+            role: Rôle proposé
+            created_by: ID de l'utilisateur qui invite
+            message: Message personnalisé (optionnel)
+            max_new: Nombre maximum d'invitations créables (limite du plan), None si illimité
+
+        Returns:
+            InvitationBatch: Lot avec le résultat de chaque email
+        """
+        organization = Organization.query.get(organization_id)
+        if not organization:
+            raise ValueError(f"Organisation introuvable: {organization_id}")
+
+        results = {}
+        candidates = []
+        for raw_email in emails:
+            email = (raw_email or '').strip().lower()
+            if not email or not EMAIL_PATTERN.match(email):
+                results[raw_email or ''] = {'status': 'invalid', 'error': 'Adresse email invalide'}
+            elif email in results:
+                continue
+            else:
+                results[email] = None
+                candidates.append(email)
+
+        # Deux requêtes ensemblistes : membres existants et invitations en attente
+        existing_members = set()
+        pending = set()
+        if candidates:
+            existing_members = {
+                row[0] for row in db.session.query(func.lower(User.email)).join(
+                    OrganizationMember, OrganizationMember.user_id == User.id
+                ).filter(
+                    OrganizationMember.organization_id == organization_id,
+                    func.lower(User.email).in_(candidates)
+                ).all()
+            }
+            pending = {
+                row[0] for row in db.session.query(Invitation.email).filter(
+                    Invitation.organization_id == organization_id,
+                    Invitation.status == 'pending',
+                    Invitation.email.in_(candidates)
+                ).all()
+            }
+
+        now = datetime.utcnow()
+        batch = InvitationBatch(
+            id=str(uuid.uuid4()),
+            organization_id=str(organization_id),
+            created_by=created_by,
+            role=role,
+            message=message,
+            total=len(results)
+        )
+
+        rows = []
+        for email in candidates:
+            if email in existing_members:
+                results[email] = {'status': 'already_member', 'error': "Déjà membre de l'organisation"}
+            elif email in pending:
+                results[email] = {'status': 'already_invited', 'error': 'Une invitation est déjà en cours'}
+            elif max_new is not None and len(rows) >= max_new:
+                results[email] = {'status': 'limit_reached', 'error': 'La limite de membres pour votre plan a été atteinte'}
+            else:
+                invitation_id = str(uuid.uuid4())
+                rows.append({
+                    'id': invitation_id,
+                    'organization_id': organization_id,
+                    'created_by': created_by,
+                    'email': email,
+                    'role': role,
+                    'token': str(uuid.uuid4()),
+                    'status': 'pending',
+                    'batch_id': batch.id,
+                    'created_at': now,
+                    'updated_at': now
+                })
+                results[email] = {'status': 'created', 'invitation_id': invitation_id}
+
+        batch.created_count = len(rows)
+        batch.results = results
+        db.session.add(batch)
+        db.session.flush()
+
+        if rows:
+            db.session.execute(Invitation.__table__.insert(), rows)
+        db.session.commit()
+
+        self._send_pending(batch, organization)
+        return batch
+
+    def resume(self, batch_id):
+        """
+        Reprend un lot interrompu : renvoie les emails des invitations non envoyées.
+
+        Returns:
+            InvitationBatch: Lot mis à jour
+        """
+        batch = InvitationBatch.query.get(batch_id)
+        if not batch:
+            raise ValueError(f"Lot d'invitations introuvable: {batch_id}")
+
+        organization = Organization.query.get(batch.organization_id)
+        self._send_pending(batch, organization)
+        return batch
+
+    def get_batch(self, batch_id):
+        """Récupère un lot d'invitations"""
+        return InvitationBatch.query.get(batch_id)
+
+    def _send_pending(self, batch, organization):
+        """Envoie par lots les emails des invitations du lot encore en attente d'envoi"""
+        from .email_service import EmailService
+
+        invitations = Invitation.query.filter(
+            Invitation.batch_id == batch.id,
+            Invitation.status == 'pending',
+            Invitation.email_sent_at.is_(None)
+        ).all()
+
+        results = dict(batch.results or {})
+        if invitations:
+            base_url = current_app.config.get('FRONTEND_URL', 'https://recruteai.com')
+            organization_name = organization.name if organization else ''
+            messages = [
+                {
+                    'to_email': invitation.email,
+                    'subject': f"Invitation à rejoindre {organization_name}",
+                    'template_name': 'generic_notification',
+                    'context': {
+                        'notification_title': f"Invitation à rejoindre {organization_name}",
+                        'notification_message': batch.message or f"Vous avez été invité à rejoindre {organization_name} en tant que {invitation.role}.",
+                        'notification_link': f"{base_url}/invitations/{invitation.token}"
+                    }
+                }
+                for invitation in invitations
+            ]
+
+            outcomes = EmailService().send_bulk_emails(messages, batch_size=self.email_batch_size)
+
+            sent_emails = {email for email, success, _ in outcomes if success}
+            sent_at = datetime.utcnow()
+            sent_ids = [invitation.id for invitation in invitations if invitation.email in sent_emails]
+            if sent_ids:
+                Invitation.query.filter(Invitation.id.in_(sent_ids)).update(
+                    {'email_sent_at': sent_at}, synchronize_session=False
+                )
+
+            for email, success, error in outcomes:
+                entry = dict(results.get(email) or {})
+                if success:
+                    entry.update({'status': 'sent', 'error': None})
+                else:
+                    entry.update({'status': 'email_failed', 'error': error})
+                results[email] = entry
+
+        batch.results = results
+        batch.sent_count = sum(1 for entry in results.values() if entry and entry.get('status') == 'sent')
+        batch.status = 'partial' if any(
+            entry and entry.get('status') in ('created', 'email_failed') for entry in results.values()
+        ) else 'completed'
+        db.session.commit()
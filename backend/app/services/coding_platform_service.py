@@ -11,6 +11,7 @@ from app.models.coding_platform import (
 import uuid
 import base64
 import requests
+from app.services.exercise_retrieval_index import get_exercise_retrieval_index
 
 class CodingPlatformService:
     """Service pour gérer la plateforme de coding challenges"""
@@ -140,6 +141,7 @@ class CodingPlatformService:
                 
             exercise.updated_at = datetime.now(timezone.utc)
             db.session.commit()
+            get_exercise_retrieval_index().mark_dirty(exercise.id)
             
             return exercise
             
@@ -163,6 +165,7 @@ class CodingPlatformService:
         try:
             db.session.delete(exercise)
             db.session.commit()
+            get_exercise_retrieval_index().mark_dirty(exercise_id)
         except Exception as e:
             db.session.rollback()
             raise Exception(f'Error deleting exercise: {str(e)}')
@@ -200,6 +203,7 @@ class CodingPlatformService:
             
             db.session.add(challenge)
             db.session.commit()
+            get_exercise_retrieval_index().mark_dirty(challenge.exercise_id)
             
             return challenge
             
@@ -304,6 +308,7 @@ class CodingPlatformService:
                 
             challenge.updated_at = datetime.now(timezone.utc)
             db.session.commit()
+            get_exercise_retrieval_index().mark_dirty(challenge.exercise_id)
             
             return challenge
             
@@ -324,9 +329,11 @@ class CodingPlatformService:
         """
         challenge = self.get_challenge_by_id(challenge_id, user_id, check_published=False)
         
+        exercise_id = challenge.exercise_id
         try:
             db.session.delete(challenge)
             db.session.commit()
+            get_exercise_retrieval_index().mark_dirty(exercise_id)
         except Exception as e:
             db.session.rollback()
             raise Exception(f'Error deleting challenge: {str(e)}')
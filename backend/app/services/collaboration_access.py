@@ -0,0 +1,260 @@
+# backend/app/services/collaboration_access.py
+from datetime import datetime
+
+from flask import g, has_request_context
+from sqlalchemy import Integer, cast, literal, null, or_, union_all
+
+from ..models.collaboration import InterviewAccessEntry, InterviewShare, TeamMember, TeamInterviewAccess
+from ..models.interview import Interview
+from ..models.user import User
+from app import db
+
+# Ordre des niveaux de permission (le plus élevé l'emporte)
+PERMISSION_RANKS = {'viewer': 1, 'commenter': 2, 'editor': 3, 'owner': 4}
+
+
+class InterviewAccessResolver:
+    """
+    Résout en une requête l'ensemble des entretiens accessibles à un utilisateur.
+
+    Les entretiens possédés (Interview.recruiter_id) et les droits de la table
+    dénormalisée interview_access_entries (partages directs et d'équipe non
+    expirés) sont réunis dans une seule requête UNION ALL sur des colonnes
+    indexées ; le résultat est mis en cache dans `g` pour la durée de la
+    requête HTTP.
+    """
+
+    def get_access(self, user_id):
+        """
+        Entretiens accessibles à un utilisateur.
+
+        Returns:
+            dict: {'is_admin': bool, 'interviews': {interview_id: permission_level}}
+        """
+        cache = self._request_cache()
+        if cache is not None and user_id in cache:
+            return cache[user_id]
+
+        access = self._compute(user_id)
+
+        if cache is not None:
+            cache[user_id] = access
+        return access
+
+    def can_access(self, interview_id, user_id, levels=None):
+        """
+        Vérifie l'accès d'un utilisateur à un entretien.
+
+        Args:
+            interview_id (int): ID de l'entretien
+            user_id (int): ID de l'utilisateur
+            levels (list, optional): Niveaux de permission acceptés (le propriétaire est toujours accepté)
+
+        Returns:
+            bool: True si l'utilisateur a accès
+        """
+        access = self.get_access(user_id)
+        if access['is_admin']:
+            return True
+
+        permission = access['interviews'].get(interview_id)
+        if permission is None:
+            return False
+        return levels is None or permission == 'owner' or permission in levels
+
+    def accessible_interview_ids(self, user_id):
+        """Identifiants des entretiens accessibles (hors droits administrateur)"""
+        return set(self.get_access(user_id)['interviews'])
+
+    def invalidate(self, user_id=None):
+        """Oublie le cache de la requête (après un partage ou une révocation)"""
+        cache = self._request_cache()
+        if cache is None:
+            return
+        if user_id is None:
+            cache.clear()
+        else:
+            cache.pop(user_id, None)
+
+    def _compute(self, user_id):
+        now = datetime.utcnow()
+
+        owned = db.session.query(
+            Interview.id.label('interview_id'),
+            literal('owner').label('permission_level')
+        ).filter(Interview.recruiter_id == user_id)
+
+        shared = db.session.query(
+            InterviewAccessEntry.interview_id,
+            InterviewAccessEntry.permission_level
+        ).filter(
+            InterviewAccessEntry.user_id == user_id,
+            or_(InterviewAccessEntry.expires_at.is_(None), InterviewAccessEntry.expires_at >= now)
+        )
+
+        admin = db.session.query(
+            cast(null(), Integer).label('interview_id'),
+            literal('admin').label('permission_level')
+        ).filter(User.id == user_id, User.role == 'admin')
+
+        rows = db.session.execute(union_all(
+            owned.statement, shared.statement, admin.statement
+        )).all()
+
+        interviews = {}
+        is_admin = False
+        for interview_id, permission_level in rows:
+            if permission_level == 'admin':
+                is_admin = True
+                continue
+            current = interviews.get(interview_id)
+            if current is None or PERMISSION_RANKS.get(permission_level, 0) > PERMISSION_RANKS.get(current, 0):
+                interviews[interview_id] = permission_level
+
+        return {'is_admin': is_admin, 'interviews': interviews}
+
+    @staticmethod
+    def _request_cache():
+        if not has_request_context():
+            return None
+        if not hasattr(g, '_interview_access'):
+            g._interview_access = {}
+        return g._interview_access
+
+
+class InterviewAclService:
+    """
+    Synchronisation de la table d'accès interview_access_entries.
+
+    Les méthodes modifient la session courante sans valider : elles sont
+    appelées dans la transaction de l'opération de partage correspondante.
+    """
+
+    def sync_share(self, share):
+        """Crée ou met à jour la ligne d'accès d'un partage direct"""
+        self._upsert(
+            share.shared_with_id, share.interview_id, 'share', str(share.id),
+            share.permission_level, share.expires_at
+        )
+
+    def revoke_share(self, share):
+        """Supprime la ligne d'accès d'un partage direct"""
+        InterviewAccessEntry.query.filter_by(
+            source_type='share', source_id=str(share.id)
+        ).delete(synchronize_session=False)
+
+    def sync_team_access(self, team_access):
+        """Propage l'accès d'une équipe à un entretien vers tous ses membres"""
+        member_ids = [row[0] for row in db.session.query(TeamMember.user_id).filter(
+            TeamMember.team_id == team_access.team_id
+        ).all()]
+        existing = {
+            entry.user_id: entry
+            for entry in InterviewAccessEntry.query.filter_by(
+                interview_id=team_access.interview_id,
+                source_type='team',
+                source_id=str(team_access.team_id)
+            ).all()
+        }
+
+        for user_id in member_ids:
+            self._apply(
+                existing.get(user_id), user_id, team_access.interview_id, 'team',
+                str(team_access.team_id), team_access.permission_level, team_access.expires_at
+            )
+
+    def sync_team_member_added(self, team_id, user_id):
+        """Donne à un nouveau membre les accès aux entretiens de l'équipe"""
+        accesses = TeamInterviewAccess.query.filter_by(team_id=team_id).all()
+        existing = {
+            entry.interview_id: entry
+            for entry in InterviewAccessEntry.query.filter_by(
+                user_id=user_id, source_type='team', source_id=str(team_id)
+            ).all()
+        }
+
+        for access in accesses:
+            self._apply(
+                existing.get(access.interview_id), user_id, access.interview_id, 'team',
+                str(team_id), access.permission_level, access.expires_at
+            )
+
+    def sync_team_member_removed(self, team_id, user_id):
+        """Retire à un ancien membre les accès hérités de l'équipe"""
+        InterviewAccessEntry.query.filter_by(
+            user_id=user_id, source_type='team', source_id=str(team_id)
+        ).delete(synchronize_session=False)
+
+    def sweep_expired(self, now=None):
+        """
+        Supprime les lignes d'accès expirées.
+
+        Returns:
+            int: Nombre de lignes supprimées
+        """
+        deleted = InterviewAccessEntry.query.filter(
+            InterviewAccessEntry.expires_at.isnot(None),
+            InterviewAccessEntry.expires_at < (now or datetime.utcnow())
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def rebuild(self):
+        """
+        Reconstruit entièrement la table depuis les partages et les équipes.
+
+        Returns:
+            int: Nombre de lignes d'accès créées
+        """
+        InterviewAccessEntry.query.delete(synchronize_session=False)
+
+        entries = [
+            {
+                'user_id': share.shared_with_id,
+                'interview_id': share.interview_id,
+                'permission_level': share.permission_level,
+                'source_type': 'share',
+                'source_id': str(share.id),
+                'expires_at': share.expires_at
+            }
+            for share in InterviewShare.query.all()
+        ]
+        entries.extend(
+            {
+                'user_id': user_id,
+                'interview_id': access.interview_id,
+                'permission_level': access.permission_level,
+                'source_type': 'team',
+                'source_id': str(access.team_id),
+                'expires_at': access.expires_at
+            }
+            for access, user_id in db.session.query(TeamInterviewAccess, TeamMember.user_id).join(
+                TeamMember, TeamMember.team_id == TeamInterviewAccess.team_id
+            ).all()
+        )
+
+        if entries:
+            db.session.execute(InterviewAccessEntry.__table__.insert(), entries)
+        db.session.commit()
+        return len(entries)
+
+    def _upsert(self, user_id, interview_id, source_type, source_id, permission_level, expires_at):
+        entry = InterviewAccessEntry.query.filter_by(
+            user_id=user_id, interview_id=interview_id,
+            source_type=source_type, source_id=source_id
+        ).first()
+        self._apply(entry, user_id, interview_id, source_type, source_id, permission_level, expires_at)
+
+    def _apply(self, entry, user_id, interview_id, source_type, source_id, permission_level, expires_at):
+        if entry is None:
+            db.session.add(InterviewAccessEntry(
+                user_id=user_id,
+                interview_id=interview_id,
+                source_type=source_type,
+                source_id=source_id,
+                permission_level=permission_level,
+                expires_at=expires_at
+            ))
+        else:
+            entry.permission_level = permission_level
+            entry.expires_at = expires_at
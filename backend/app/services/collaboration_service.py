@@ -7,12 +7,17 @@ from app import db
 from datetime import datetime, timedelta
 from ..services.notification_service import NotificationService
 from ..services.websocket_service import WebSocketService
+from .collaboration_access import InterviewAccessResolver, InterviewAclService
+from sqlalchemy import func, or_
+from sqlalchemy.orm import aliased, selectinload
 import uuid
 
 class CollaborationService:
     def __init__(self):
         self.notification_service = NotificationService()
         self.websocket_service = WebSocketService()
+        self.access_resolver = InterviewAccessResolver()
+        self.acl_service = InterviewAclService()
     
     # ====== MÉTHODES DE PARTAGE INDIVIDUEL D'ENTRETIEN ======
     
@@ -61,6 +66,7 @@ class CollaborationService:
             # Mettre à jour le partage existant
             existing_share.permission_level = permission_level
             existing_share.expires_at = expires_at
+            self.acl_service.sync_share(existing_share)
             db.session.commit()
             share = existing_share
         else:
@@ -74,8 +80,12 @@ class CollaborationService:
             )
             
             db.session.add(share)
+            db.session.flush()
+            self.acl_service.sync_share(share)
             db.session.commit()
         
+        self.access_resolver.invalidate(shared_with_user.id)
+        
         # Enregistrer l'activité
         activity = CollaborationActivity(
             interview_id=interview_id,
@@ -145,7 +155,9 @@ class CollaborationService:
         interview = Interview.query.get(interview_id)
         interview_title = interview.title or f"Entretien avec {interview.candidate_name}" if interview else "Entretien"
         
+        self.acl_service.revoke_share(share)
         db.session.delete(share)
+        self.access_resolver.invalidate(shared_with_id)
         
         # Enregistrer l'activité
         activity = CollaborationActivity(
@@ -182,72 +194,65 @@ class CollaborationService:
         Returns:
             list: Liste des entretiens partagés
         """
-        # Entretiens partagés directement avec l'utilisateur
-        shares = InterviewShare.query.filter_by(shared_with_id=user_id).all()
-        
-        # Équipes dont l'utilisateur est membre
-        team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-        team_ids = [tm.team_id for tm in team_memberships]
+        now = datetime.utcnow()
+        owner = aliased(User)
+        
+        # Entretiens partagés directement avec l'utilisateur (partage, entretien et propriétaire en une requête)
+        direct_shares = db.session.query(InterviewShare, Interview, owner).join(
+            Interview, Interview.id == InterviewShare.interview_id
+        ).join(
+            owner, owner.id == InterviewShare.owner_id
+        ).filter(
+            InterviewShare.shared_with_id == user_id,
+            or_(InterviewShare.expires_at.is_(None), InterviewShare.expires_at >= now)
+        ).all()
         
-        # Entretiens partagés avec les équipes
-        team_shares = TeamInterviewAccess.query.filter(
-            TeamInterviewAccess.team_id.in_(team_ids) if team_ids else False
+        # Entretiens partagés avec les équipes dont l'utilisateur est membre
+        team_shares = db.session.query(TeamInterviewAccess, Interview, Team).join(
+            TeamMember, TeamMember.team_id == TeamInterviewAccess.team_id
+        ).join(
+            Interview, Interview.id == TeamInterviewAccess.interview_id
+        ).join(
+            Team, Team.id == TeamInterviewAccess.team_id
+        ).filter(
+            TeamMember.user_id == user_id,
+            or_(TeamInterviewAccess.expires_at.is_(None), TeamInterviewAccess.expires_at >= now)
         ).all()
         
         result = []
         
-        # Traiter les partages directs
-        for share in shares:
-            # Vérifier si le partage n'a pas expiré
-            if share.expires_at and share.expires_at < datetime.utcnow():
-                continue
-                
-            # Récupérer les détails de l'entretien
-            interview = Interview.query.get(share.interview_id)
-            owner = User.query.get(share.owner_id)
-            
-            if interview and owner:
-                result.append({
-                    'interview_id': interview.id,
-                    'title': interview.title or f"Entretien avec {interview.candidate_name}",
-                    'candidate_name': interview.candidate_name,
-                    'status': interview.status,
-                    'shared_type': 'direct',
-                    'owner': {
-                        'id': owner.id,
-                        'name': f"{owner.first_name} {owner.last_name}",
-                        'email': owner.email
-                    },
-                    'permission_level': share.permission_level,
-                    'created_at': share.created_at,
-                    'expires_at': share.expires_at
-                })
+        for share, interview, share_owner in direct_shares:
+            result.append({
+                'interview_id': interview.id,
+                'title': interview.title or f"Entretien avec {interview.candidate_name}",
+                'candidate_name': interview.candidate_name,
+                'status': interview.status,
+                'shared_type': 'direct',
+                'owner': {
+                    'id': share_owner.id,
+                    'name': f"{share_owner.first_name} {share_owner.last_name}",
+                    'email': share_owner.email
+                },
+                'permission_level': share.permission_level,
+                'created_at': share.created_at,
+                'expires_at': share.expires_at
+            })
         
-        # Traiter les partages d'équipe
-        for share in team_shares:
-            # Vérifier si le partage n'a pas expiré
-            if share.expires_at and share.expires_at < datetime.utcnow():
-                continue
-                
-            # Récupérer les détails de l'entretien et de l'équipe
-            interview = Interview.query.get(share.interview_id)
-            team = Team.query.get(share.team_id)
-            
-            if interview and team:
-                result.append({
-                    'interview_id': interview.id,
-                    'title': interview.title or f"Entretien avec {interview.candidate_name}",
-                    'candidate_name': interview.candidate_name,
-                    'status': interview.status,
-                    'shared_type': 'team',
-                    'team': {
-                        'id': team.id,
-                        'name': team.name
-                    },
-                    'permission_level': share.permission_level,
-                    'created_at': share.created_at,
-                    'expires_at': share.expires_at
-                })
+        for share, interview, team in team_shares:
+            result.append({
+                'interview_id': interview.id,
+                'title': interview.title or f"Entretien avec {interview.candidate_name}",
+                'candidate_name': interview.candidate_name,
+                'status': interview.status,
+                'shared_type': 'team',
+                'team': {
+                    'id': team.id,
+                    'name': team.name
+                },
+                'permission_level': share.permission_level,
+                'created_at': share.created_at,
+                'expires_at': share.expires_at
+            })
         
         return result
     
@@ -271,39 +276,8 @@ class CollaborationService:
         if not interview:
             raise ValueError("Entretien non trouvé")
         
-        has_access = False
-        if interview.recruiter_id == user_id:
-            has_access = True
-        else:
-            # Vérifier partage direct
-            share = InterviewShare.query.filter_by(
-                interview_id=interview_id,
-                shared_with_id=user_id
-            ).first()
-            if share and share.permission_level in ['commenter', 'editor']:
-                if not share.expires_at or share.expires_at >= datetime.utcnow():
-                    has_access = True
-            
-            # Vérifier partage via équipe
-            if not has_access:
-                team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-                team_ids = [tm.team_id for tm in team_memberships]
-                
-                if team_ids:
-                    team_access = TeamInterviewAccess.query.filter(
-                        TeamInterviewAccess.interview_id == interview_id,
-                        TeamInterviewAccess.team_id.in_(team_ids),
-                        TeamInterviewAccess.permission_level.in_(['commenter', 'editor'])
-                    ).first()
-                    
-                    if team_access and (not team_access.expires_at or team_access.expires_at >= datetime.utcnow()):
-                        has_access = True
-        
-        if not has_access:
-            # Vérifier si l'utilisateur est admin
-            user = User.query.get(user_id)
-            if not user or user.role != 'admin':
-                raise ValueError("Vous n'êtes pas autorisé à commenter cet entretien")
+        if not self.access_resolver.can_access(interview_id, user_id, levels=['commenter', 'editor']):
+            raise ValueError("Vous n'êtes pas autorisé à commenter cet entretien")
         
         comment = Comment(
             interview_id=interview_id,
@@ -371,7 +345,9 @@ class CollaborationService:
         if not self._user_can_access_interview(interview_id, user_id):
             raise ValueError("Vous n'êtes pas autorisé à voir les commentaires de cet entretien")
         
-        comments = Comment.query.filter_by(interview_id=interview_id).order_by(Comment.timestamp, Comment.created_at).all()
+        comments = Comment.query.options(selectinload(Comment.user)).filter_by(
+            interview_id=interview_id
+        ).order_by(Comment.timestamp, Comment.created_at).all()
         
         # Enregistrer l'activité de visualisation
         activity = CollaborationActivity(
@@ -429,25 +405,33 @@ class CollaborationService:
         Returns:
             list: Liste des équipes
         """
-        team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
+        memberships = db.session.query(TeamMember, Team).join(
+            Team, Team.id == TeamMember.team_id
+        ).filter(TeamMember.user_id == user_id).all()
+        
+        team_ids = [team.id for _, team in memberships]
+        members_counts = {}
+        interviews_counts = {}
+        if team_ids:
+            members_counts = dict(db.session.query(TeamMember.team_id, func.count(TeamMember.id)).filter(
+                TeamMember.team_id.in_(team_ids)
+            ).group_by(TeamMember.team_id).all())
+            interviews_counts = dict(db.session.query(TeamInterviewAccess.team_id, func.count(TeamInterviewAccess.id)).filter(
+                TeamInterviewAccess.team_id.in_(team_ids)
+            ).group_by(TeamInterviewAccess.team_id).all())
         
         result = []
-        for membership in team_memberships:
-            team = Team.query.get(membership.team_id)
-            if team:
-                members_count = TeamMember.query.filter_by(team_id=team.id).count()
-                interviews_count = TeamInterviewAccess.query.filter_by(team_id=team.id).count()
-                
-                result.append({
-                    'id': team.id,
-                    'name': team.name,
-                    'description': team.description,
-                    'created_at': team.created_at,
-                    'created_by': team.created_by,
-                    'members_count': members_count,
-                    'interviews_count': interviews_count,
-                    'user_role': membership.role
-                })
+        for membership, team in memberships:
+            result.append({
+                'id': team.id,
+                'name': team.name,
+                'description': team.description,
+                'created_at': team.created_at,
+                'created_by': team.created_by,
+                'members_count': members_counts.get(team.id, 0),
+                'interviews_count': interviews_counts.get(team.id, 0),
+                'user_role': membership.role
+            })
         
         return result
     
@@ -473,36 +457,36 @@ class CollaborationService:
         
         # Récupérer les membres
         members_data = []
-        members = TeamMember.query.filter_by(team_id=team_id).all()
-        
-        for member in members:
-            user = User.query.get(member.user_id)
-            if user:
-                members_data.append({
-                    'id': user.id,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'email': user.email,
-                    'role': member.role,
-                    'joined_at': member.joined_at
-                })
+        members = db.session.query(TeamMember, User).join(
+            User, User.id == TeamMember.user_id
+        ).filter(TeamMember.team_id == team_id).all()
+        
+        for member, user in members:
+            members_data.append({
+                'id': user.id,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'email': user.email,
+                'role': member.role,
+                'joined_at': member.joined_at
+            })
         
         # Récupérer les entretiens
         interviews_data = []
-        team_interviews = TeamInterviewAccess.query.filter_by(team_id=team_id).all()
-        
-        for access in team_interviews:
-            interview = Interview.query.get(access.interview_id)
-            if interview:
-                interviews_data.append({
-                    'id': interview.id,
-                    'title': interview.title or f"Entretien avec {interview.candidate_name}",
-                    'candidate_name': interview.candidate_name,
-                    'status': interview.status,
-                    'permission_level': access.permission_level,
-                    'granted_at': access.created_at,
-                    'expires_at': access.expires_at
-                })
+        team_interviews = db.session.query(TeamInterviewAccess, Interview).join(
+            Interview, Interview.id == TeamInterviewAccess.interview_id
+        ).filter(TeamInterviewAccess.team_id == team_id).all()
+        
+        for access, interview in team_interviews:
+            interviews_data.append({
+                'id': interview.id,
+                'title': interview.title or f"Entretien avec {interview.candidate_name}",
+                'candidate_name': interview.candidate_name,
+                'status': interview.status,
+                'permission_level': access.permission_level,
+                'granted_at': access.created_at,
+                'expires_at': access.expires_at
+            })
         
         return {
             'id': team.id,
@@ -570,7 +554,9 @@ class CollaborationService:
         )
         
         db.session.add(new_member)
+        self.acl_service.sync_team_member_added(team_id, user_to_add.id)
         db.session.commit()
+        self.access_resolver.invalidate(user_to_add.id)
         
         # Envoyer notification
         notification_data = {
@@ -647,8 +633,10 @@ class CollaborationService:
         if not member:
             raise ValueError("Utilisateur non membre de cette équipe")
         
+        self.acl_service.sync_team_member_removed(team_id, user_id)
         db.session.delete(member)
         db.session.commit()
+        self.access_resolver.invalidate(user_id)
         
         # Envoyer notification
         notification_data = {
@@ -714,6 +702,7 @@ class CollaborationService:
             # Mettre à jour l'accès existant
             existing.permission_level = permission_level
             existing.expires_at = expires_at
+            self.acl_service.sync_team_access(existing)
             db.session.commit()
             team_access = existing
         else:
@@ -727,6 +716,7 @@ class CollaborationService:
             )
             
             db.session.add(team_access)
+            self.acl_service.sync_team_access(team_access)
             
             # Enregistrer l'activité
             activity = CollaborationActivity(
@@ -744,6 +734,7 @@ class CollaborationService:
             # Notifier tous les membres de l'équipe
             self._notify_team_about_interview(team_id, interview_id, user_id)
         
+        self.access_resolver.invalidate()
         return team_access
     
     def add_team_note(self, team_id, interview_id, user_id, content, visibility='team'):
@@ -867,9 +858,35 @@ class CollaborationService:
             interview_id=interview_id
         ).order_by(CollaborationActivity.created_at.desc()).all()
         
+        # Charger en une requête par type toutes les entités référencées par les activités
+        user_ids = {activity.user_id for activity in activities}
+        comment_ids, note_ids, team_ids = set(), set(), set()
+        for activity in activities:
+            details = activity.details or {}
+            if activity.activity_type == 'comment' and details.get('comment_id'):
+                comment_ids.add(details['comment_id'])
+            elif activity.activity_type == 'team_note' and details.get('note_id'):
+                note_ids.add(details['note_id'])
+            elif activity.activity_type in ['share', 'unshare'] and details.get('shared_with_id'):
+                user_ids.add(details['shared_with_id'])
+            elif activity.activity_type == 'team_share' and details.get('team_id'):
+                team_ids.add(details['team_id'])
+        
+        users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
+        comments = {
+            comment.id: comment
+            for comment in Comment.query.options(selectinload(Comment.user)).filter(Comment.id.in_(comment_ids)).all()
+        } if comment_ids else {}
+        notes = {
+            note.id: note
+            for note in TeamNote.query.options(selectinload(TeamNote.author)).filter(TeamNote.id.in_(note_ids)).all()
+        } if note_ids else {}
+        teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids)).all()} if team_ids else {}
+        
         result = []
         for activity in activities:
-            user = User.query.get(activity.user_id)
+            user = users.get(activity.user_id)
+            details = activity.details or {}
             
             activity_data = {
                 'id': activity.id,
@@ -882,38 +899,30 @@ class CollaborationService:
             
             # Enrichir les détails selon le type d'activité
             if activity.activity_type == 'comment':
-                comment_id = activity.details.get('comment_id')
-                if comment_id:
-                    comment = Comment.query.get(comment_id)
-                    if comment:
-                        activity_data['comment'] = comment.to_dict()
+                comment = comments.get(details.get('comment_id'))
+                if comment:
+                    activity_data['comment'] = comment.to_dict()
             
             elif activity.activity_type == 'team_note':
-                note_id = activity.details.get('note_id')
-                if note_id:
-                    note = TeamNote.query.get(note_id)
-                    if note:
-                        activity_data['note'] = note.to_dict()
+                note = notes.get(details.get('note_id'))
+                if note:
+                    activity_data['note'] = note.to_dict()
             
             elif activity.activity_type in ['share', 'unshare']:
-                shared_with_id = activity.details.get('shared_with_id')
-                if shared_with_id:
-                    shared_with = User.query.get(shared_with_id)
-                    if shared_with:
-                        activity_data['shared_with'] = {
-                            'id': shared_with.id,
-                            'name': f"{shared_with.first_name} {shared_with.last_name}"
-                        }
+                shared_with = users.get(details.get('shared_with_id'))
+                if shared_with:
+                    activity_data['shared_with'] = {
+                        'id': shared_with.id,
+                        'name': f"{shared_with.first_name} {shared_with.last_name}"
+                    }
             
             elif activity.activity_type == 'team_share':
-                team_id = activity.details.get('team_id')
-                if team_id:
-                    team = Team.query.get(team_id)
-                    if team:
-                        activity_data['team'] = {
-                            'id': team.id,
-                            'name': team.name
-                        }
+                team = teams.get(details.get('team_id'))
+                if team:
+                    activity_data['team'] = {
+                        'id': team.id,
+                        'name': team.name
+                    }
             
             result.append(activity_data)
         
@@ -932,44 +941,7 @@ class CollaborationService:
         Returns:
             bool: True si l'utilisateur a accès, False sinon
         """
-        interview = Interview.query.get(interview_id)
-        if not interview:
-            return False
-        
-        # Si l'utilisateur est le propriétaire
-        if interview.recruiter_id == user_id:
-            return True
-        
-        # Si l'utilisateur est un admin
-        user = User.query.get(user_id)
-        if user and user.role == 'admin':
-            return True
-        
-        # Vérifier partage direct
-        share = InterviewShare.query.filter_by(
-            interview_id=interview_id,
-            shared_with_id=user_id
-        ).first()
-        
-        if share:
-            if not share.expires_at or share.expires_at >= datetime.utcnow():
-                return True
-        
-        # Vérifier partage via équipe
-        team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-        team_ids = [tm.team_id for tm in team_memberships]
-        
-        if team_ids:
-            team_access = TeamInterviewAccess.query.filter(
-                TeamInterviewAccess.interview_id == interview_id,
-                TeamInterviewAccess.team_id.in_(team_ids)
-            ).first()
-            
-            if team_access:
-                if not team_access.expires_at or team_access.expires_at >= datetime.utcnow():
-                    return True
-        
-        return False
+        return self.access_resolver.can_access(interview_id, user_id)
     
     def _notify_others_about_comment(self, interview_id, comment_id, except_user_id):
         """
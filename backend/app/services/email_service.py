@@ -96,6 +96,60 @@ class EmailService:
     
     
     
+    def send_bulk_emails(self, messages, batch_size=50):
+        """
+        Envoie une série d'emails en réutilisant une connexion SMTP par lot
+        
+        Args:
+            messages: Liste de dicts {to_email, subject, template_name, context}
+            batch_size: Nombre d'emails envoyés par connexion SMTP
+            
+        Returns:
+            Liste de tuples (to_email, succès, erreur)
+        """
+        results = []
+        
+        for start in range(0, len(messages), batch_size):
+            chunk = messages[start:start + batch_size]
+            
+            # Rendu des messages avant d'ouvrir la connexion
+            rendered = []
+            for item in chunk:
+                try:
+                    html_template = self.jinja_env.get_template(f"{item['template_name']}.html")
+                    text_template = self.jinja_env.get_template(f"{item['template_name']}.txt")
+                    context = item.get('context') or {}
+                    
+                    message = MIMEMultipart('alternative')
+                    message['Subject'] = item['subject']
+                    message['From'] = f"{self.sender_name} <{self.sender_email}>"
+                    message['To'] = item['to_email']
+                    message.attach(MIMEText(text_template.render(**context), 'plain'))
+                    message.attach(MIMEText(html_template.render(**context), 'html'))
+                    rendered.append((item['to_email'], message))
+                except Exception as e:
+                    results.append((item['to_email'], False, str(e)))
+            
+            if not rendered:
+                continue
+            
+            try:
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    server.starttls()
+                    server.login(self.smtp_username, self.smtp_password)
+                    for to_email, message in rendered:
+                        try:
+                            server.sendmail(self.sender_email, to_email, message.as_string())
+                            results.append((to_email, True, None))
+                        except smtplib.SMTPException as e:
+                            results.append((to_email, False, str(e)))
+            except Exception as e:
+                # Connexion impossible : tout le lot est en échec
+                sent = {to_email for to_email, _, _ in results}
+                results.extend((to_email, False, str(e)) for to_email, _ in rendered if to_email not in sent)
+        
+        return results
+    
     def send_interview_invitation(self, email, candidate_name, interview_title, recruiter_name, 
                              scheduled_at, duration_minutes, timezone, access_token, description=None, meet_link=None,
                              coding_link=None, coding_exercises_count=0):
@@ -0,0 +1,256 @@
+# backend/app/services/entitlement_cache.py
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import redis
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'entitlements'
+USAGE_PREFIX = 'usage'
+
+# Incrément appliqué seulement si le compteur est déjà initialisé (sinon il
+# sera recalculé depuis la base à la prochaine lecture) ; un compteur devenu
+# négatif est supprimé.
+INCREMENT_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('incrby', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('del', KEYS[1])
+    return nil
+end
+return value
+"""
+
+
+class EntitlementCache:
+    """
+    Cache partagé (Redis) des droits d'abonnement.
+
+    Chaque utilisateur (ou organisation) a un instantané de son plan, de ses
+    fonctionnalités et de ses limites : les gardes des routes ne font qu'une
+    lecture Redis au lieu de la résolution abonnement personnel ->
+    organisation -> abonnement d'organisation. Les instantanés sont invalidés
+    par les changements de plan, les webhooks de paiement et les changements
+    d'appartenance ; ENTITLEMENT_CACHE_TTL borne leur fraîcheur sinon.
+
+    Les compteurs d'usage (entretiens du mois, places d'une organisation)
+    sont initialisés depuis la base à la première lecture puis incrémentés à
+    chaque création. USAGE_COUNTER_TTL borne l'écart possible avec la base
+    (suppressions non suivies, incréments concurrents d'une initialisation).
+
+    Redis indisponible : les valeurs sont calculées depuis la base.
+    """
+
+    def __init__(self, ttl=None, usage_ttl=None, enabled=None):
+        self.ttl = ttl or int(os.getenv('ENTITLEMENT_CACHE_TTL', '300'))
+        self.usage_ttl = usage_ttl or int(os.getenv('USAGE_COUNTER_TTL', '3600'))
+        if enabled is None:
+            enabled = os.getenv('ENTITLEMENT_CACHE_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+
+        self._redis = None
+        self._increment = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'errors': 0}
+
+    # ------------------------------------------------------------------
+    # Instantanés de droits
+    # ------------------------------------------------------------------
+
+    def get(self, subject, subject_id, loader):
+        """
+        Instantané des droits d'un utilisateur ou d'une organisation.
+
+        Args:
+            subject (str): 'user' ou 'organization'
+            subject_id: ID du sujet
+            loader (callable): Fonction subject_id -> dict, appelée en cas d'absence
+
+        Returns:
+            dict: Instantané (plan, features, limits, organization_id)
+        """
+        client = self._client()
+        if client is None:
+            return loader(subject_id)
+
+        key = self._key(subject, subject_id)
+        try:
+            cached = client.get(key)
+        except redis.RedisError as e:
+            self._error(e)
+            return loader(subject_id)
+
+        if cached is not None:
+            self._count('hits')
+            return json.loads(cached)
+
+        self._count('misses')
+        snapshot = loader(subject_id)
+
+        try:
+            pipe = client.pipeline()
+            pipe.set(key, json.dumps(snapshot), ex=self.ttl)
+            # Index organisation -> utilisateurs pour invalider les membres d'un coup
+            if subject == 'user' and snapshot.get('organization_id'):
+                members_key = self._members_key(snapshot['organization_id'])
+                pipe.sadd(members_key, str(subject_id))
+                pipe.expire(members_key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._error(e)
+        return snapshot
+
+    def invalidate_user(self, user_id):
+        """Supprime l'instantané d'un utilisateur (abonnement personnel, appartenance)"""
+        self._delete(self._key('user', user_id))
+
+    def invalidate_organization(self, organization_id):
+        """Supprime l'instantané d'une organisation et ceux de ses membres"""
+        client = self._client()
+        if client is None:
+            return
+
+        members_key = self._members_key(organization_id)
+        try:
+            user_ids = client.smembers(members_key)
+            keys = [self._key('organization', organization_id), members_key]
+            keys.extend(self._key('user', user_id) for user_id in user_ids)
+            client.delete(*keys)
+            self._count('invalidations')
+        except redis.RedisError as e:
+            self._error(e)
+
+    def invalidate_subscription(self, subscription):
+        """Invalide les droits dépendant d'un abonnement"""
+        if subscription.organization_id:
+            self.invalidate_organization(subscription.organization_id)
+        if subscription.user_id:
+            self.invalidate_user(subscription.user_id)
+
+    # ------------------------------------------------------------------
+    # Compteurs d'usage
+    # ------------------------------------------------------------------
+
+    def usage(self, counter, subject_id, loader, monthly=False):
+        """
+        Valeur d'un compteur d'usage, initialisée depuis la base si absente.
+
+        Args:
+            counter (str): Nom du compteur ('interviews', 'members')
+            subject_id: ID de l'utilisateur ou de l'organisation
+            loader (callable): Fonction subject_id -> int (comptage en base)
+            monthly (bool): Compteur remis à zéro chaque mois
+
+        Returns:
+            int: Valeur du compteur
+        """
+        client = self._client()
+        if client is None:
+            return loader(subject_id)
+
+        key = self._usage_key(counter, subject_id, monthly)
+        try:
+            value = client.get(key)
+            if value is not None:
+                self._count('hits')
+                return int(value)
+
+            self._count('misses')
+            value = loader(subject_id)
+            client.set(key, value, ex=self.usage_ttl, nx=True)
+            return value
+        except redis.RedisError as e:
+            self._error(e)
+            return loader(subject_id)
+
+    def increment_usage(self, counter, subject_id, amount=1, monthly=False):
+        """Ajoute amount (négatif pour décrémenter) à un compteur initialisé"""
+        client = self._client()
+        if client is None:
+            return
+        try:
+            self._increment(keys=[self._usage_key(counter, subject_id, monthly)], args=[amount], client=client)
+        except redis.RedisError as e:
+            self._error(e)
+
+    def reset_usage(self, counter, subject_id, monthly=False):
+        """Supprime un compteur (recalculé à la prochaine lecture)"""
+        self._delete(self._usage_key(counter, subject_id, monthly))
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update({'enabled': self.enabled, 'ttl': self.ttl, 'usage_ttl': self.usage_ttl})
+        return stats
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _client(self):
+        if not self.enabled:
+            return None
+        if self._redis is None:
+            with self._lock:
+                if self._redis is None:
+                    client = redis.Redis(
+                        host=current_app.config.get('REDIS_HOST', 'localhost'),
+                        port=current_app.config.get('REDIS_PORT', 6379),
+                        db=current_app.config.get('REDIS_DB', 0),
+                        decode_responses=True
+                    )
+                    self._increment = client.register_script(INCREMENT_SCRIPT)
+                    self._redis = client
+        return self._redis
+
+    def _delete(self, key):
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.delete(key)
+            self._count('invalidations')
+        except redis.RedisError as e:
+            self._error(e)
+
+    @staticmethod
+    def _key(subject, subject_id):
+        return f"{KEY_PREFIX}:{subject}:{subject_id}"
+
+    @staticmethod
+    def _members_key(organization_id):
+        return f"{KEY_PREFIX}:organization:{organization_id}:users"
+
+    @staticmethod
+    def _usage_key(counter, subject_id, monthly):
+        key = f"{USAGE_PREFIX}:{counter}:{subject_id}"
+        if monthly:
+            key += f":{datetime.utcnow().strftime('%Y%m')}"
+        return key
+
+    def _error(self, error):
+        self._count('errors')
+        logger.warning(f"Cache des droits d'abonnement indisponible: {str(error)}")
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+entitlement_cache = None
+
+
+def get_entitlement_cache():
+    """Récupère (ou crée) le cache des droits d'abonnement partagé"""
+    global entitlement_cache
+    if entitlement_cache is None:
+        entitlement_cache = EntitlementCache()
+    return entitlement_cache
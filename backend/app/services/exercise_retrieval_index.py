@@ -0,0 +1,263 @@
+# backend/app/services/exercise_retrieval_index.py
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from sqlalchemy import func
+
+from ..models.coding_platform import Challenge, ChallengeStatus, Exercise
+from app import db
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9#+]+')
+
+# Pondérations (identiques à l'ancien calcul de pertinence)
+LANGUAGE_WEIGHT = 10
+TITLE_WEIGHT = 5
+DESCRIPTION_WEIGHT = 2
+CHALLENGE_WEIGHT = 1
+
+
+def tokenize(text):
+    """Tokens normalisés (minuscules, sans accents)"""
+    if not text:
+        return []
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(char for char in normalized if not unicodedata.combining(char))
+    return TOKEN_PATTERN.findall(normalized)
+
+
+class ExerciseDocument:
+    """Ensembles de tokens précalculés d'un exercice et de ses challenges publiés"""
+
+    __slots__ = ('exercise_id', 'language', 'difficulty', 'title', 'description', 'challenges', 'tokens')
+
+    def __init__(self, exercise, published_challenges):
+        self.exercise_id = exercise.id
+        self.language = exercise.language.value.lower() if exercise.language else None
+        self.difficulty = exercise.difficulty.value if exercise.difficulty else None
+        self.title = frozenset(tokenize(exercise.title))
+        self.description = frozenset(tokenize(exercise.description))
+        self.challenges = [
+            frozenset(tokenize(f"{challenge.title} {challenge.description or ''}"))
+            for challenge in published_challenges
+        ]
+        self.tokens = self.title | self.description | frozenset().union(*self.challenges)
+        if self.language:
+            self.tokens |= {self.language}
+
+    def score(self, keyword_tokens):
+        """Score d'un mot-clé (liste de tokens, tous requis dans un même champ)"""
+        score = 0
+        if len(keyword_tokens) == 1 and keyword_tokens[0] == self.language:
+            score += LANGUAGE_WEIGHT
+
+        if self.title.issuperset(keyword_tokens):
+            score += TITLE_WEIGHT
+        elif self.description.issuperset(keyword_tokens):
+            score += DESCRIPTION_WEIGHT
+
+        score += CHALLENGE_WEIGHT * sum(1 for tokens in self.challenges if tokens.issuperset(keyword_tokens))
+        return score
+
+
+class ExerciseRetrievalIndex:
+    """
+    Index inversé en mémoire des exercices pour la sélection automatique.
+
+    Chaque exercice ayant au moins un challenge publié est réduit à des
+    ensembles de tokens normalisés (titre, description, challenges publiés) ;
+    une requête ne parcourt que les listes d'exercices des tokens demandés,
+    filtrées par difficulté, puis garde les k meilleurs scores. L'index est
+    mis à jour exercice par exercice : les modifications locales le marquent
+    directement, et une signature du catalogue (nombre et dernière
+    modification des exercices et challenges) vérifiée toutes les
+    EXERCISE_INDEX_CHECK_INTERVAL secondes propage celles des autres workers.
+    """
+
+    def __init__(self, check_interval=None):
+        self.check_interval = check_interval or float(os.getenv('EXERCISE_INDEX_CHECK_INTERVAL', '30'))
+
+        self._lock = threading.RLock()
+        self._documents = {}
+        self._postings = defaultdict(set)  # token -> ids d'exercices
+        self._by_difficulty = defaultdict(set)  # difficulté -> ids d'exercices
+        self._dirty = set()
+        self._signature = None
+        self._checked_at = 0.0
+        self._built = False
+
+    # ------------------------------------------------------------------
+    # Requête
+    # ------------------------------------------------------------------
+
+    def top_k(self, keywords, difficulty=None, limit=10):
+        """
+        Exercices les plus pertinents pour des mots-clés.
+
+        Args:
+            keywords (list): Mots-clés techniques
+            difficulty (str): Valeur de ChallengeDifficulty, None pour toutes
+            limit (int): Nombre maximum d'exercices
+
+        Returns:
+            list: [(exercise_id, score)] par score décroissant
+        """
+        self.ensure_fresh()
+
+        queries = []
+        for keyword in keywords or []:
+            tokens = tokenize(keyword)
+            if tokens:
+                queries.append(tokens)
+
+        with self._lock:
+            allowed = self._by_difficulty.get(difficulty, set()) if difficulty else None
+
+            scores = defaultdict(int)
+            for tokens in queries:
+                candidates = set.intersection(*(self._postings.get(token, set()) for token in tokens))
+                if allowed is not None:
+                    candidates &= allowed
+                for exercise_id in candidates:
+                    scores[exercise_id] += self._documents[exercise_id].score(tokens)
+
+        return heapq.nlargest(
+            limit,
+            ((exercise_id, score) for exercise_id, score in scores.items() if score > 0),
+            key=lambda item: item[1]
+        )
+
+    # ------------------------------------------------------------------
+    # Mise à jour
+    # ------------------------------------------------------------------
+
+    def mark_dirty(self, exercise_id):
+        """Signale un exercice (ou un de ses challenges) modifié ou supprimé"""
+        with self._lock:
+            self._dirty.add(str(exercise_id))
+
+    def ensure_fresh(self):
+        """Construit l'index au premier appel puis applique les modifications en attente"""
+        with self._lock:
+            if not self._built:
+                self.rebuild()
+                return
+
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                signature = self._catalog_signature()
+                if signature != self._signature:
+                    previous = self._signature
+                    self._signature = signature
+                    if signature[0] < previous[0] or signature[2] < previous[2]:
+                        # Suppressions dans un autre worker : reconstruction complète
+                        self.rebuild()
+                        return
+                    self._dirty.update(self._changed_since(previous))
+
+            if self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                self.refresh(dirty)
+
+    def rebuild(self):
+        """Reconstruit entièrement l'index"""
+        with self._lock:
+            self._documents = {}
+            self._postings = defaultdict(set)
+            self._by_difficulty = defaultdict(set)
+            self._dirty = set()
+            self._signature = self._catalog_signature()
+            self._checked_at = time.monotonic()
+
+            exercises = Exercise.query.join(Challenge).filter(
+                Challenge.status == ChallengeStatus.PUBLISHED
+            ).distinct().all()
+            self._index(exercises)
+            self._built = True
+
+    def refresh(self, exercise_ids):
+        """Réindexe des exercices (retirés s'ils n'existent plus ou n'ont plus de challenge publié)"""
+        exercise_ids = [str(exercise_id) for exercise_id in exercise_ids]
+        with self._lock:
+            for exercise_id in exercise_ids:
+                self._remove(exercise_id)
+
+            exercises = Exercise.query.filter(Exercise.id.in_(exercise_ids)).all() if exercise_ids else []
+            self._index(exercises)
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _index(self, exercises):
+        if not exercises:
+            return
+
+        published = defaultdict(list)
+        for challenge in Challenge.query.filter(
+            Challenge.exercise_id.in_([exercise.id for exercise in exercises]),
+            Challenge.status == ChallengeStatus.PUBLISHED
+        ).all():
+            published[challenge.exercise_id].append(challenge)
+
+        for exercise in exercises:
+            challenges = published.get(exercise.id)
+            if not challenges:
+                continue
+            document = ExerciseDocument(exercise, challenges)
+            self._documents[exercise.id] = document
+            for token in document.tokens:
+                self._postings[token].add(exercise.id)
+            self._by_difficulty[document.difficulty].add(exercise.id)
+
+    def _remove(self, exercise_id):
+        document = self._documents.pop(exercise_id, None)
+        if document is None:
+            return
+        for token in document.tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(exercise_id)
+                if not postings:
+                    del self._postings[token]
+        self._by_difficulty[document.difficulty].discard(exercise_id)
+
+    @staticmethod
+    def _catalog_signature():
+        exercise_count, exercise_updated = db.session.query(
+            func.count(Exercise.id), func.max(Exercise.updated_at)
+        ).one()
+        challenge_count, challenge_updated = db.session.query(
+            func.count(Challenge.id), func.max(Challenge.updated_at)
+        ).one()
+        return exercise_count, exercise_updated, challenge_count, challenge_updated
+
+    @staticmethod
+    def _changed_since(signature):
+        _, exercise_updated, _, challenge_updated = signature
+
+        exercises = db.session.query(Exercise.id)
+        if exercise_updated is not None:
+            exercises = exercises.filter(Exercise.updated_at > exercise_updated)
+
+        challenges = db.session.query(Challenge.exercise_id)
+        if challenge_updated is not None:
+            challenges = challenges.filter(Challenge.updated_at > challenge_updated)
+
+        return {row[0] for row in exercises.all()} | {row[0] for row in challenges.all()}
+
+
+exercise_retrieval_index = None
+
+
+def get_exercise_retrieval_index():
+    """Récupère (ou crée) l'index de sélection d'exercices partagé"""
+    global exercise_retrieval_index
+    if exercise_retrieval_index is None:
+        exercise_retrieval_index = ExerciseRetrievalIndex()
+    return exercise_retrieval_index
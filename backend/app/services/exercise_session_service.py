@@ -0,0 +1,311 @@
+# backend/app/services/exercise_session_service.py
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models.coding_platform import (
+    Challenge, ChallengeStatus, ChallengeStep, ChallengeStepTestcase,
+    Exercise, UserChallenge, UserChallengeProgress
+)
+from app import db
+
+
+class ExerciseSessionReadModel:
+    """
+    Chargement d'une session d'exercices candidat en un nombre fixe de requêtes.
+
+    Exercices, challenges, étapes, nombre de cas de test par étape, challenges
+    du candidat et progression par étape sont chargés par requêtes
+    ensemblistes (une par table) puis assemblés en mémoire. Les statistiques
+    calculées sont conservées sur UserExercise (score, exercices tentés et
+    terminés, détail par exercice) et mises à jour exercice par exercice à
+    chaque soumission.
+    """
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def load(self, user_exercise, exercise_ids=None):
+        """
+        Charge les données d'une session.
+
+        Args:
+            user_exercise: Session UserExercise
+            exercise_ids (list): Restreindre à certains exercices (par défaut: tous ceux de la session)
+
+        Returns:
+            dict: exercises (ordonnés), challenges, steps, testcase_counts,
+                  user_challenges et progress, indexés pour l'assemblage
+        """
+        ids = [str(exercise_id) for exercise_id in (exercise_ids or self.exercise_ids(user_exercise))]
+        if not ids:
+            return self._empty()
+
+        exercises = {exercise.id: exercise for exercise in Exercise.query.filter(Exercise.id.in_(ids)).all()}
+
+        challenges = Challenge.query.filter(
+            Challenge.exercise_id.in_(list(exercises))
+        ).order_by(Challenge.order_index).all() if exercises else []
+
+        challenges_by_exercise = defaultdict(list)
+        for challenge in challenges:
+            challenges_by_exercise[challenge.exercise_id].append(challenge)
+
+        challenge_ids = [challenge.id for challenge in challenges]
+        steps = ChallengeStep.query.filter(
+            ChallengeStep.challenge_id.in_(challenge_ids)
+        ).order_by(ChallengeStep.order_index).all() if challenge_ids else []
+
+        steps_by_challenge = defaultdict(list)
+        for step in steps:
+            steps_by_challenge[step.challenge_id].append(step)
+
+        step_ids = [step.id for step in steps]
+        testcase_counts = dict(db.session.query(
+            ChallengeStepTestcase.step_id, func.count(ChallengeStepTestcase.id)
+        ).filter(
+            ChallengeStepTestcase.step_id.in_(step_ids)
+        ).group_by(ChallengeStepTestcase.step_id).all()) if step_ids else {}
+
+        published_ids = [challenge.id for challenge in challenges if challenge.status == ChallengeStatus.PUBLISHED]
+        user_challenges = {}
+        if published_ids:
+            # La plus récente l'emporte si le candidat a plusieurs tentatives
+            for user_challenge in UserChallenge.query.filter(
+                UserChallenge.challenge_id.in_(published_ids),
+                self.identity_clause(user_exercise)
+            ).order_by(UserChallenge.started_at).all():
+                user_challenges[user_challenge.challenge_id] = user_challenge
+
+        progress = {}
+        user_challenge_ids = [user_challenge.id for user_challenge in user_challenges.values()]
+        if user_challenge_ids:
+            for entry in UserChallengeProgress.query.filter(
+                UserChallengeProgress.user_challenge_id.in_(user_challenge_ids)
+            ).all():
+                progress[(entry.user_challenge_id, entry.step_id)] = entry
+
+        # Relations déjà chargées : les to_dict() ne déclenchent plus de requêtes
+        for exercise_id, exercise in exercises.items():
+            set_committed_value(exercise, 'challenges', challenges_by_exercise.get(exercise_id, []))
+        for challenge in challenges:
+            set_committed_value(challenge, 'steps', steps_by_challenge.get(challenge.id, []))
+
+        return {
+            'exercises': [exercises[exercise_id] for exercise_id in ids if exercise_id in exercises],
+            'challenges': challenges_by_exercise,
+            'steps': steps_by_challenge,
+            'testcase_counts': testcase_counts,
+            'user_challenges': user_challenges,
+            'progress': progress
+        }
+
+    @staticmethod
+    def identity_clause(user_exercise):
+        """Challenges du candidat : son compte, son email (routes candidat) ou son token d'accès"""
+        identifiers = [value for value in (user_exercise.candidate_email, user_exercise.access_token) if value]
+        clauses = [
+            UserChallenge.anonymous_identifier.in_(identifiers),
+            UserChallenge.session_token == user_exercise.access_token
+        ]
+        if user_exercise.user_id:
+            clauses.append(UserChallenge.user_id == user_exercise.user_id)
+        return or_(*clauses)
+
+    @staticmethod
+    def exercise_ids(user_exercise):
+        """Identifiants d'exercices de la session (la colonne JSON peut contenir une chaîne)"""
+        exercise_ids = user_exercise.exercise_ids
+        if isinstance(exercise_ids, str):
+            try:
+                exercise_ids = json.loads(exercise_ids)
+            except json.JSONDecodeError:
+                return []
+        return exercise_ids if isinstance(exercise_ids, list) else []
+
+    # ------------------------------------------------------------------
+    # Assemblage
+    # ------------------------------------------------------------------
+
+    def exercises_payload(self, data):
+        """Exercices et challenges publiés, au format de get_exercises_for_candidate"""
+        payload = []
+        for exercise in data['exercises']:
+            exercise_data = exercise.to_dict()
+            exercise_data['challenges'] = [
+                challenge.to_dict() for challenge in data['challenges'].get(exercise.id, [])
+                if challenge.status == ChallengeStatus.PUBLISHED
+            ]
+            payload.append(exercise_data)
+        return payload
+
+    def exercise_results(self, data, exercise, include_steps=True):
+        """
+        Résultat détaillé d'un exercice.
+
+        Un exercice est terminé quand toutes les étapes de ses challenges publiés
+        le sont ; le score additionne les tests réussis des étapes terminées et
+        le score maximal le nombre de cas de test.
+        """
+        challenges_results = []
+        attempted = False
+        completed = True
+        score = 0
+        max_score = 0
+
+        for challenge in data['challenges'].get(exercise.id, []):
+            if challenge.status != ChallengeStatus.PUBLISHED:
+                continue
+
+            steps = data['steps'].get(challenge.id, [])
+            user_challenge = data['user_challenges'].get(challenge.id)
+            steps_progress = []
+
+            if user_challenge:
+                attempted = True
+
+            for step in steps:
+                step_max_score = data['testcase_counts'].get(step.id, 0)
+                progress = data['progress'].get((user_challenge.id, step.id)) if user_challenge else None
+
+                if user_challenge:
+                    max_score += step_max_score
+
+                if progress and progress.is_completed:
+                    score += progress.tests_passed or 0
+                else:
+                    completed = False
+
+                if include_steps:
+                    steps_progress.append(self._step_progress(step, progress, user_challenge, step_max_score))
+
+            if not user_challenge:
+                completed = False
+
+            if include_steps:
+                challenges_results.append({
+                    'challenge': {
+                        'id': challenge.id,
+                        'title': challenge.title,
+                        'description': challenge.description,
+                        'step_count': len(steps)
+                    },
+                    'user_challenge': {
+                        'id': user_challenge.id if user_challenge else None,
+                        'status': getattr(user_challenge.status, 'value', user_challenge.status) if user_challenge else 'not_started',
+                        'attempt_count': user_challenge.attempt_count if user_challenge else 0,
+                        'started_at': user_challenge.started_at.isoformat() if user_challenge and user_challenge.started_at else None,
+                        'completed_at': user_challenge.completed_at.isoformat() if user_challenge and user_challenge.completed_at else None,
+                        'current_step_id': user_challenge.current_step_id if user_challenge else None
+                    },
+                    'steps_progress': steps_progress
+                })
+
+        stats = {
+            'attempted': attempted,
+            'completed': completed,
+            'score': score,
+            'max_score': max_score,
+            'completion_rate': round((score / max_score * 100), 2) if max_score > 0 else 0
+        }
+        return challenges_results, stats
+
+    # ------------------------------------------------------------------
+    # Statistiques
+    # ------------------------------------------------------------------
+
+    def refresh_stats(self, user_exercise, exercise_ids=None, data=None):
+        """
+        Recalcule les statistiques de la session et les enregistre sur UserExercise.
+
+        Args:
+            user_exercise: Session UserExercise
+            exercise_ids (list): Exercices à recalculer (par défaut: tous) ; les
+                                 autres conservent leurs statistiques enregistrées
+                                 (recalcul complet si elles manquent)
+            data (dict): Données déjà chargées par load() (évite un rechargement)
+
+        Returns:
+            dict: Statistiques par exercice de la session
+        """
+        session_ids = [str(exercise_id) for exercise_id in self.exercise_ids(user_exercise)]
+
+        if exercise_ids:
+            # Sessions antérieures aux statistiques enregistrées (ou exercices jamais
+            # calculés) : les totaux ne peuvent pas partir des statistiques stockées
+            stored = user_exercise.exercise_stats or {}
+            requested = {str(exercise_id) for exercise_id in exercise_ids}
+            if any(exercise_id not in stored for exercise_id in session_ids if exercise_id not in requested):
+                exercise_ids = None
+                data = None
+
+        if data is None:
+            data = self.load(user_exercise, exercise_ids)
+
+        exercise_stats = dict(user_exercise.exercise_stats or {}) if exercise_ids else {}
+        for exercise in data['exercises']:
+            _, stats = self.exercise_results(data, exercise, include_steps=False)
+            exercise_stats[exercise.id] = stats
+
+        exercise_stats = {exercise_id: exercise_stats[exercise_id] for exercise_id in session_ids if exercise_id in exercise_stats}
+
+        user_exercise.exercise_stats = exercise_stats
+        user_exercise.total_score = sum(stats['score'] for stats in exercise_stats.values())
+        user_exercise.max_score = sum(stats['max_score'] for stats in exercise_stats.values())
+        user_exercise.exercises_attempted = sum(1 for stats in exercise_stats.values() if stats['attempted'])
+        user_exercise.exercises_completed = sum(1 for stats in exercise_stats.values() if stats['completed'])
+        user_exercise.stats_updated_at = datetime.now(timezone.utc)
+
+        if user_exercise.exercises_completed == len(session_ids) and user_exercise.exercises_completed > 0:
+            user_exercise.status = 'completed'
+            if not user_exercise.completed_at:
+                user_exercise.completed_at = datetime.now(timezone.utc)
+        elif user_exercise.exercises_attempted > 0 and user_exercise.status == 'not_started':
+            user_exercise.status = 'in_progress'
+
+        return exercise_stats
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _step_progress(step, progress, user_challenge, step_max_score):
+        if progress:
+            return {
+                'id': progress.id,
+                'step_id': step.id,
+                'is_completed': progress.is_completed,
+                'tests_passed': progress.tests_passed,
+                'tests_total': progress.tests_total,
+                'code': progress.code or '',
+                'language': progress.language.value if progress.language else '',
+                'last_edited': progress.last_edited.isoformat() if progress.last_edited else None
+            }
+
+        prefix = 'no_progress' if user_challenge else 'no_attempt'
+        return {
+            'id': f'{prefix}_{step.id}',
+            'step_id': step.id,
+            'is_completed': False,
+            'tests_passed': 0,
+            'tests_total': step_max_score,
+            'code': '',
+            'language': '',
+            'last_edited': None
+        }
+
+    @staticmethod
+    def _empty():
+        return {
+            'exercises': [],
+            'challenges': {},
+            'steps': {},
+            'testcase_counts': {},
+            'user_challenges': {},
+            'progress': {}
+        }
@@ -1,10 +1,11 @@
 # backend/services/interview_exercise_service.py
 from datetime import datetime, timezone, timedelta
-import json
 from app import db
 from ..models.user_exercise import UserExercise
-from ..models.coding_platform import Exercise, Challenge, ChallengeStatus, UserChallengeProgress, UserChallenge
+from ..models.coding_platform import Exercise
 from ..services.coding_platform_service import CodingPlatformService
+from ..services.exercise_retrieval_index import get_exercise_retrieval_index
+from ..services.exercise_session_service import ExerciseSessionReadModel
 import re
 from typing import List, Dict, Optional, Tuple
 
@@ -13,6 +14,7 @@ class InterviewExerciseService:
     
     def __init__(self):
         self.coding_service = CodingPlatformService()
+        self.session_reads = ExerciseSessionReadModel()
     
     def extract_job_keywords(self, position: str, description: str = None) -> List[str]:
         """
@@ -97,75 +99,39 @@ class InterviewExerciseService:
         Returns:
             Liste des exercices trouvés
         """
-        query = db.session.query(Exercise).join(Challenge).filter(
-            Challenge.status == ChallengeStatus.PUBLISHED
-        )
-        print('5555555555555555555555555555555555555',keywords)
-        # Filtrer par difficulté si spécifiée
-        if difficulty != 'any':
-            from app.types.coding_platform import ChallengeDifficulty
-            difficulty_mapping = {
-                'beginner': ChallengeDifficulty.BEGINNER,
-                'intermediate': ChallengeDifficulty.INTERMEDIATE,
-                'advanced': ChallengeDifficulty.ADVANCED,
-                'expert': ChallengeDifficulty.EXPERT
-            }
-            if difficulty in difficulty_mapping:
-                query = query.filter(Exercise.difficulty == difficulty_mapping[difficulty])
-            else:
-                query = query.filter(Exercise.difficulty == difficulty_mapping['expert'])
-        
-        exercises = query.distinct().all()
-        print('psspspododood')
-        # Scorer les exercices selon leur pertinence
-        scored_exercises = []
-        for exercise in exercises:
-            score = self._calculate_exercise_relevance(exercise, keywords)
-            if score > 0:
-                scored_exercises.append((exercise, score))
-        
-        # Trier par score décroissant et retourner les meilleurs
-        scored_exercises.sort(key=lambda x: x[1], reverse=True)
-        return [exercise for exercise, _ in scored_exercises[:limit]]
+        return [exercise for exercise, _ in self.find_scored_exercises(keywords, difficulty, limit)]
     
-    def _calculate_exercise_relevance(self, exercise: Exercise, keywords: List[str]) -> int:
+    def find_scored_exercises(self, keywords: List[str], difficulty: str = 'intermediate', limit: int = 10) -> List[Tuple[Exercise, int]]:
         """
-        Calcule un score de pertinence pour un exercice donné
+        Trouve les exercices appropriés avec leur score de pertinence
         
         Args:
-            exercise: Exercice à évaluer
-            keywords: Mots-clés à rechercher
+            keywords: Liste de mots-clés techniques
+            difficulty: Niveau de difficulté souhaité
+            limit: Nombre maximum d'exercices à retourner
             
         Returns:
-            Score de pertinence (plus élevé = plus pertinent)
+            Liste de tuples (exercice, score) par score décroissant
         """
-        score = 0
-        exercise_text = f"{exercise.title} {exercise.description or ''}".lower()
-        print('88888888888888888',exercise.language)
-        # Score basé sur le langage de programmation
-        if exercise.language:
-            lang_name = exercise.language.value.lower()
-            if lang_name in [k.lower() for k in keywords]:
-                score += 10  # Correspondance exacte du langage
-        
-        # Score basé sur les mots-clés dans le titre et la description
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            if keyword_lower in exercise_text:
-                if keyword_lower in exercise.title.lower():
-                    score += 5  # Mot-clé dans le titre
-                else:
-                    score += 2  # Mot-clé dans la description
-        
-        # Score basé sur les challenges associés
-        for challenge in exercise.challenges:
-            if challenge.status == ChallengeStatus.PUBLISHED:
-                challenge_text = f"{challenge.title} {challenge.description or ''}".lower()
-                for keyword in keywords:
-                    if keyword.lower() in challenge_text:
-                        score += 1
-        
-        return score
+        # Difficulté demandée ('any' pour toutes, valeur inconnue ramenée à 'expert')
+        from app.types.coding_platform import ChallengeDifficulty
+        if difficulty == 'any':
+            difficulty_value = None
+        elif difficulty in {level.value for level in ChallengeDifficulty}:
+            difficulty_value = difficulty
+        else:
+            difficulty_value = ChallengeDifficulty.EXPERT.value
+        
+        # Classement par l'index inversé en mémoire (indépendant de la taille du catalogue)
+        ranked = get_exercise_retrieval_index().top_k(keywords, difficulty_value, limit)
+        if not ranked:
+            return []
+        
+        exercises = {
+            exercise.id: exercise
+            for exercise in Exercise.query.filter(Exercise.id.in_([exercise_id for exercise_id, _ in ranked])).all()
+        }
+        return [(exercises[exercise_id], score) for exercise_id, score in ranked if exercise_id in exercises]
     
     def select_exercises_for_interview(self, position: str, description: str = None, 
                                      difficulty: str = 'intermediate', count: int = 4) -> Tuple[List[Exercise], List[str]]:
@@ -330,48 +296,8 @@ class InterviewExerciseService:
 
         print('yes commencons..........1')
 
-        # Gérer le cas où exercise_ids pourrait être une chaîne JSON
-        exercise_ids = user_exercise.exercise_ids
-        if isinstance(exercise_ids, str):
-            try:
-                exercise_ids = json.loads(exercise_ids)
-            except json.JSONDecodeError:
-                print(f"Erreur de parsing JSON pour exercise_ids: {exercise_ids}")
-                exercise_ids = []
-        elif not isinstance(exercise_ids, list):
-            print(f"Format inattendu pour exercise_ids: {type(exercise_ids)}")
-            exercise_ids = []
-
-        print(f'Exercise IDs à traiter: {exercise_ids}')
-
-        # Récupérer les détails des exercices
-        exercises = []
-        for exercise_id in exercise_ids:
-            try:
-                exercise = Exercise.query.get(exercise_id)  # S'assurer que c'est un entier
-                print(f'Exercise trouvé pour ID {exercise_id}: {exercise is not None}')
-
-                if exercise:
-                    # Récupérer les challenges publiés de cet exercice
-                    published_challenges = [
-                        c for c in exercise.challenges 
-                        if c.status == ChallengeStatus.PUBLISHED
-                    ]
-                    print(f'Challenges publiés trouvés: {len(published_challenges)}')
-
-                    exercise_data = exercise.to_dict()
-                    exercise_data['challenges'] = [c.to_dict() for c in published_challenges]
-                    exercises.append(exercise_data)
-
-                    print(f'Exercise ajouté: ID={exercise_id}, Titre={exercise_data.get("title", "N/A")}')
-                else:
-                    print(f'Exercise non trouvé pour ID: {exercise_id}')
-
-            except (ValueError, TypeError) as e:
-                print(f'Erreur lors du traitement de exercise_id {exercise_id}: {e}')
-                continue
-            
-        print(f'Total exercises récupérés: {len(exercises)}')
+        # Exercices, challenges publiés et étapes chargés en un nombre fixe de requêtes
+        exercises = self.session_reads.exercises_payload(self.session_reads.load(user_exercise))
 
         # Calculer le temps restant
         now = datetime.now(timezone.utc)
@@ -399,13 +325,16 @@ class InterviewExerciseService:
     def update_exercise_progress(self, access_token: str, exercise_id: str, 
                                completed: bool = False, score: int = 0) -> UserExercise:
         """
-        Met à jour le progrès d'un exercice
+        Met à jour le progrès d'un exercice après une soumission
+        
+        Seules les statistiques de l'exercice soumis sont recalculées depuis la
+        progression enregistrée ; les totaux de la session en sont déduits.
         
         Args:
             access_token: Token d'accès du candidat
             exercise_id: ID de l'exercice
-            completed: Si l'exercice est terminé
-            score: Score obtenu
+            completed: Si l'étape soumise est terminée (conservé pour compatibilité)
+            score: Score obtenu (conservé pour compatibilité)
             
         Returns:
             Session UserExercise mise à jour
@@ -414,21 +343,14 @@ class InterviewExerciseService:
         if not user_exercise:
             raise ValueError("Session d'exercices non trouvée")
         
-        if exercise_id not in user_exercise.exercise_ids:
+        if str(exercise_id) not in [str(e) for e in self.session_reads.exercise_ids(user_exercise)]:
             raise ValueError("Exercice non assigné à cette session")
         
         # Démarrer la session si c'est la première interaction
         if user_exercise.status == 'not_started':
             user_exercise.start_session()
         
-        # Mettre à jour les statistiques si l'exercice est complété
-        if completed:
-            user_exercise.exercises_completed += 1
-            user_exercise.total_score += score
-            
-            # Marquer comme terminé si tous les exercices sont complétés
-            if user_exercise.exercises_completed >= user_exercise.total_exercises:
-                user_exercise.complete_session()
+        self.session_reads.refresh_stats(user_exercise, exercise_ids=[exercise_id])
         
         db.session.commit()
         return user_exercise
@@ -446,153 +368,13 @@ class InterviewExerciseService:
         if not user_exercise:
             raise ValueError("Aucune session d'exercices trouvée pour cet entretien")
 
-        # Récupérer tous les résultats détaillés
-        detailed_results = []
-        total_global_score = 0
-        total_exercises_attempted = 0
-        total_exercises_completed = 0
-
-        exercise_ids = user_exercise.exercise_ids
-        if isinstance(exercise_ids, str):
-            try:
-                exercise_ids = json.loads(exercise_ids)
-            except json.JSONDecodeError:
-                exercise_ids = []
-
-        print(f'🔍 DEBUG: Analyse des résultats pour {len(exercise_ids)} exercices')
-
-        for exercise_id in exercise_ids:
-            exercise = Exercise.query.get(exercise_id)
-            if not exercise:
-                continue
-
-            print(f'🔍 DEBUG: Analyse exercice {exercise_id}: {exercise.title}')
-
-            # Récupérer tous les challenges de cet exercice
-            challenges_results = []
-            exercise_attempted = False
-            exercise_completed = True  # Considéré complété jusqu'à preuve du contraire
-            exercise_total_score = 0
-            exercise_max_score = 0
-
-            for challenge in exercise.challenges:
-                if challenge.status != ChallengeStatus.PUBLISHED:
-                    continue
-
-                print(f'🔍 DEBUG: Analyse challenge {challenge.id}: {challenge.title}')
-
-                # Trouver le UserChallenge correspondant
-                user_challenge = UserChallenge.query.filter_by(
-                    challenge_id=challenge.id
-                ).filter(
-                    (UserChallenge.user_id == user_exercise.user_id if user_exercise.user_id else False) |
-                    (UserChallenge.session_token == user_exercise.access_token) |
-                    (UserChallenge.anonymous_identifier == user_exercise.access_token)
-                ).first()
-
-                if not user_challenge:
-                    print(f'🔍 DEBUG: Pas de UserChallenge trouvé pour challenge {challenge.id}')
-                    # Challenge non tenté
-                    steps_progress = []
-                    for step in challenge.steps:
-                        steps_progress.append({
-                            'id': f'no_attempt_{step.id}',
-                            'step_id': step.id,
-                            'is_completed': False,
-                            'tests_passed': 0,
-                            'tests_total': len(step.testcases) if step.testcases else 0,
-                            'code': '',
-                            'language': '',
-                            'last_edited': None
-                        })
-                    exercise_completed = False
-                else:
-                    print(f'🔍 DEBUG: UserChallenge trouvé: {user_challenge.id}, status: {user_challenge.status}')
-                    exercise_attempted = True
-
-                    # Récupérer la progression détaillée des étapes
-                    steps_progress = []
-                    challenge_completed = True
-                    challenge_score = 0
-                    challenge_max_score = 0
-
-                    for step in challenge.steps:
-                        # Récupérer la progression pour cette étape
-                        step_progress = UserChallengeProgress.query.filter_by(
-                            user_challenge_id=user_challenge.id,
-                            step_id=step.id
-                        ).first()
-
-                        step_max_score = len(step.testcases) if step.testcases else 0
-                        challenge_max_score += step_max_score
-
-                        if step_progress:
-                            steps_progress.append({
-                                'id': step_progress.id,
-                                'step_id': step.id,
-                                'is_completed': step_progress.is_completed,
-                                'tests_passed': step_progress.tests_passed,
-                                'tests_total': step_progress.tests_total,
-                                'code': step_progress.code or '',
-                                'language': step_progress.language.value if step_progress.language else '',
-                                'last_edited': step_progress.last_edited.isoformat() if step_progress.last_edited else None
-                            })
-
-                            if step_progress.is_completed:
-                                challenge_score += step_progress.tests_passed
-                            else:
-                                challenge_completed = False
-
-                            print(f'🔍 DEBUG: Step {step.id} - completed: {step_progress.is_completed}, tests: {step_progress.tests_passed}/{step_progress.tests_total}')
-                        else:
-                            # Étape non tentée
-                            steps_progress.append({
-                                'id': f'no_progress_{step.id}',
-                                'step_id': step.id,
-                                'is_completed': False,
-                                'tests_passed': 0,
-                                'tests_total': step_max_score,
-                                'code': '',
-                                'language': '',
-                                'last_edited': None
-                            })
-                            challenge_completed = False
-                            print(f'🔍 DEBUG: Step {step.id} - pas de progression')
-
-                    if not challenge_completed:
-                        exercise_completed = False
-
-                    exercise_total_score += challenge_score
-                    exercise_max_score += challenge_max_score
-
-                challenges_results.append({
-                    'challenge': {
-                        'id': challenge.id,
-                        'title': challenge.title,
-                        'description': challenge.description,
-                        'step_count': len(challenge.steps)
-                    },
-                    'user_challenge': {
-                        'id': user_challenge.id if user_challenge else None,
-                        'status': user_challenge.status if user_challenge else 'not_started',
-                        'attempt_count': user_challenge.attempt_count if user_challenge else 0,
-                        'started_at': user_challenge.started_at.isoformat() if user_challenge and user_challenge.started_at else None,
-                        'completed_at': user_challenge.completed_at.isoformat() if user_challenge and user_challenge.completed_at else None,
-                        'current_step_id': user_challenge.current_step_id if user_challenge else None
-                    },
-                    'steps_progress': steps_progress
-                })
-
-            if exercise_attempted:
-                total_exercises_attempted += 1
-
-            if exercise_completed:
-                total_exercises_completed += 1
-
-            total_global_score += exercise_total_score
-
-            print(f'🔍 DEBUG: Exercice {exercise_id} - Score: {exercise_total_score}/{exercise_max_score}, Complété: {exercise_completed}')
+        # Chargement ensembliste de la session puis assemblage en mémoire
+        exercise_ids = self.session_reads.exercise_ids(user_exercise)
+        data = self.session_reads.load(user_exercise)
 
+        detailed_results = []
+        for exercise in data['exercises']:
+            challenges_results, exercise_stats = self.session_reads.exercise_results(data, exercise)
             detailed_results.append({
                 'exercise': {
                     'id': exercise.id,
@@ -602,30 +384,16 @@ class InterviewExerciseService:
                     'difficulty': exercise.difficulty.value if exercise.difficulty else ''
                 },
                 'challenges_results': challenges_results,
-                'exercise_stats': {
-                    'attempted': exercise_attempted,
-                    'completed': exercise_completed,
-                    'score': exercise_total_score,
-                    'max_score': exercise_max_score,
-                    'completion_rate': round((exercise_total_score / exercise_max_score * 100), 2) if exercise_max_score > 0 else 0
-                }
+                'exercise_stats': exercise_stats
             })
 
-        # CORRECTION: Recalcul des statistiques globales
-        user_exercise.exercises_completed = total_exercises_completed
-        user_exercise.total_score = total_global_score
-
-        # Mettre à jour le statut si nécessaire
-        if total_exercises_completed == len(exercise_ids) and total_exercises_completed > 0:
-            user_exercise.status = 'completed'
-            if not user_exercise.completed_at:
-                user_exercise.completed_at = datetime.now(timezone.utc)
-        elif total_exercises_attempted > 0:
-            user_exercise.status = 'in_progress'
-
+        # Les statistiques enregistrées sont réalignées sur la progression réelle
+        self.session_reads.refresh_stats(user_exercise, data=data)
         db.session.commit()
 
-        print(f'🔍 DEBUG: Statistiques finales - Complétés: {total_exercises_completed}/{len(exercise_ids)}, Score: {total_global_score}')
+        total_exercises_attempted = user_exercise.exercises_attempted
+        total_exercises_completed = user_exercise.exercises_completed
+        total_global_score = user_exercise.total_score
 
         return {
             'user_exercise': {
@@ -664,68 +432,13 @@ class InterviewExerciseService:
         if not user_exercise:
             raise ValueError("Session d'exercices non trouvée")
 
-        exercise_ids = user_exercise.exercise_ids
-        if isinstance(exercise_ids, str):
-            try:
-                exercise_ids = json.loads(exercise_ids)
-            except json.JSONDecodeError:
-                exercise_ids = []
-
-        total_score = 0
-        exercises_completed = 0
-
-        for exercise_id in exercise_ids:
-            exercise = Exercise.query.get(exercise_id)
-            if not exercise:
-                continue
-
-            exercise_completed = True
-
-            for challenge in exercise.challenges:
-                if challenge.status != ChallengeStatus.PUBLISHED:
-                    continue
-
-                # Trouver le UserChallenge
-                user_challenge = UserChallenge.query.filter_by(
-                    challenge_id=challenge.id
-                ).filter(
-                    (UserChallenge.session_token == access_token) |
-                    (UserChallenge.anonymous_identifier == access_token)
-                ).first()
-
-                if not user_challenge:
-                    exercise_completed = False
-                    continue
-
-                # Vérifier si toutes les étapes sont complétées
-                for step in challenge.steps:
-                    step_progress = UserChallengeProgress.query.filter_by(
-                        user_challenge_id=user_challenge.id,
-                        step_id=step.id
-                    ).first()
-
-                    if not step_progress or not step_progress.is_completed:
-                        exercise_completed = False
-                        break
-                    else:
-                        total_score += step_progress.tests_passed
-
-            if exercise_completed:
-                exercises_completed += 1
-
-        # Mettre à jour les statistiques
-        user_exercise.total_score = total_score
-        user_exercise.exercises_completed = exercises_completed
-
-        if exercises_completed == len(exercise_ids) and exercises_completed > 0:
-            user_exercise.status = 'completed'
-            if not user_exercise.completed_at:
-                user_exercise.completed_at = datetime.now(timezone.utc)
-        elif total_score > 0:
-            user_exercise.status = 'in_progress'
-
+        exercise_ids = self.session_reads.exercise_ids(user_exercise)
+        self.session_reads.refresh_stats(user_exercise)
         db.session.commit()
 
+        total_score = user_exercise.total_score
+        exercises_completed = user_exercise.exercises_completed
+
         return {
             'total_score': total_score,
             'exercises_completed': exercises_completed,
@@ -8,6 +8,8 @@ from ..models.interview_scheduling import InterviewSchedule
 from ..services.notification_service import NotificationService
 from ..services.email_service import EmailService
 from ..services.audit_service import AuditService
+from ..services.availability_service import get_availability_engine
+from ..services.entitlement_cache import get_entitlement_cache
 from ..services.subscription_service import SubscriptionService
 from ..services.meet_service import MeetService
 from app import db
@@ -144,7 +146,23 @@ class InterviewSchedulingService:
         """Valide le statut d'entretien"""
         if status not in self.VALID_STATUSES:
             raise ValueError(f"Statut invalide. Statuts autorisés: {', '.join(self.VALID_STATUSES)}")
-    
+
+    def _check_conflicts(self, recruiter_id, scheduled_at, duration_minutes, timezone=None, exclude_schedule_id=None):
+        """Refuse un créneau qui chevauche l'agenda du recruteur (entretiens relus en base)"""
+        conflicts = get_availability_engine().conflicts(
+            [recruiter_id],
+            scheduled_at,
+            scheduled_at + timedelta(minutes=int(duration_minutes or 30)),
+            exclude_schedule_id=exclude_schedule_id,
+            refresh=True,
+            tz=timezone
+        )
+        if conflicts:
+            conflict = conflicts[0]
+            raise ValueError(
+                f"Conflit d'agenda: le recruteur est déjà occupé de {conflict['start']} à {conflict['end']}"
+            )
+
     def create_schedule(self, organization_id, recruiter_id, data):
         """
         Crée une nouvelle planification d'entretien avec meeting Google Calendar
@@ -204,6 +222,10 @@ class InterviewSchedulingService:
             if existing_schedule:
                 raise ValueError(f"Un entretien existe déjà pour {candidate_email} sur cette offre")
         
+        # Vérifier que le recruteur est libre sur ce créneau
+        if not data.get('allow_conflicts'):
+            self._check_conflicts(recruiter_id, scheduled_at, data.get('duration_minutes', 30), data.get('timezone'))
+        
         # Validation des champs requis
         required_fields = ['candidate_name', 'candidate_email', 'title', 'position', 'scheduled_at']
         for field in required_fields:
@@ -305,6 +327,8 @@ class InterviewSchedulingService:
         
         # Commit final
         db.session.commit()
+        get_entitlement_cache().increment_usage('interviews', recruiter_id, monthly=True)
+        get_availability_engine().sync_schedule(schedule)
         print('debut programmtion...................17')
         avatar_scheduled = False
         if schedule.mode in ['autonomous', 'collaborative']:
@@ -495,16 +519,17 @@ class InterviewSchedulingService:
             Liste des exercices disponibles avec scores de pertinence
         """
         keywords = self.exercise_service.extract_job_keywords(position, description)
-        exercises = self.exercise_service.find_suitable_exercises(keywords, difficulty, 20)
+        scored_exercises = self.exercise_service.find_scored_exercises(keywords, difficulty, 20)
+        exercises = [ex for ex, _ in scored_exercises]
         
         return {
             'keywords_extracted': keywords,
             'exercises': [
                 {
                     **ex.to_dict(),
-                    'relevance_score': self.exercise_service._calculate_exercise_relevance(ex, keywords)
+                    'relevance_score': score
                 }
-                for ex in exercises
+                for ex, score in scored_exercises
             ],
             'total_found': len(exercises)
         }
@@ -570,6 +595,15 @@ class InterviewSchedulingService:
                 meeting_update_needed = True
                 break
             
+        # Vérifier les conflits d'agenda si l'horaire change
+        new_start = datetime.fromisoformat(data['scheduled_at']) if data.get('scheduled_at') else schedule.scheduled_at
+        new_duration = data.get('duration_minutes') or schedule.duration_minutes or 30
+        new_timezone = data.get('timezone') or schedule.timezone
+        if (new_start != schedule.scheduled_at or new_duration != schedule.duration_minutes
+                or new_timezone != schedule.timezone):
+            self._check_conflicts(schedule.recruiter_id, new_start, new_duration, new_timezone,
+                                  exclude_schedule_id=schedule.id)
+            
         # Mettre à jour uniquement les champs autorisés
         for field in ['duration_minutes', 'timezone', 'mode', 'ai_assistant_id', 'predefined_questions']:
             if field in data and data[field] is not None:
@@ -595,6 +629,7 @@ class InterviewSchedulingService:
             meeting_success = self._create_or_update_meeting(schedule, is_update=True)
 
         db.session.commit()
+        get_availability_engine().sync_schedule(schedule)
 
         # Enregistrer dans les logs d'audit
         updated_fields = list(data.keys())
@@ -698,6 +733,7 @@ class InterviewSchedulingService:
         schedule.cancellation_reason = reason
         schedule.updated_at = datetime.utcnow()
         db.session.commit()
+        get_availability_engine().sync_schedule(schedule)
         
         # Enregistrer dans les logs d'audit
         self.audit_service.log_action(
@@ -932,6 +968,7 @@ class InterviewSchedulingService:
         schedule.status = 'completed'
         schedule.updated_at = datetime.utcnow()
         db.session.commit()
+        get_availability_engine().sync_schedule(schedule)
         
         return schedule
     
@@ -957,6 +994,7 @@ class InterviewSchedulingService:
         schedule.status = 'no_show'
         schedule.updated_at = datetime.utcnow()
         db.session.commit()
+        get_availability_engine().sync_schedule(schedule)
         
         # Enregistrer dans les logs d'audit
         self.audit_service.log_action(
@@ -1111,6 +1149,7 @@ class InterviewSchedulingService:
             schedule.updated_at = datetime.utcnow()
 
             db.session.commit()
+            get_availability_engine().sync_schedule(schedule)
 
             # Enregistrer dans les logs
             self.audit_service.log_action(
@@ -8,6 +8,7 @@ from datetime import datetime
 from ..models.interview import Interview
 from app import db
 from sqlalchemy import desc
+from sqlalchemy.orm import undefer
 
 # Initialisation des services
 notification_service = NotificationService()
@@ -228,7 +229,7 @@ def get_interview(interview_id):
     Returns:
         dict: Données de l'entretien ou None si non trouvé
     """
-    interview = Interview.query.get(interview_id)
+    interview = Interview.query.options(undefer(Interview.facial_frame_count)).get(interview_id)
     if not interview:
         return None
     
@@ -1,14 +1,24 @@
-from models.invitation import Invitation
-from models.organization import Organization, OrganizationMember
-from models.user import User
+from ..models.invitation import Invitation
+from ..models.organization import Organization, OrganizationMember
+from ..models.user import User
 from datetime import datetime
 import uuid
 from ..middleware.audit_middleware import audit_action
+from .audit_service import AuditService
+from .bulk_invitation_service import BulkInvitationService
+from .entitlement_cache import get_entitlement_cache
+from .organization_metrics_service import get_organization_metrics_service
+from .subscription_service import SubscriptionService
 from app import db
 
 class InvitationService:
     """Service pour gérer les invitations aux organisations"""
     
+    def __init__(self):
+        self.audit_service = AuditService()
+        self.subscription_service = SubscriptionService()
+        self.bulk_service = BulkInvitationService()
+    
     @audit_action('create', 'invitation', 'Invitation envoyée à {email} avec le rôle {role}')
     def create_invitation(self, organization_id, email, role, created_by, message=None, expires_in_days=7):
         """
@@ -71,6 +81,7 @@ class InvitationService:
         
         db.session.add(invitation)
         db.session.commit()
+        get_entitlement_cache().increment_usage('members', organization_id)
         
         # Enregistrer l'action dans les logs d'audit
         self.audit_service.log_action(
@@ -162,6 +173,9 @@ class InvitationService:
         invitation.updated_at = datetime.utcnow()
         
         db.session.commit()
+        get_organization_metrics_service().invalidate(invitation.organization_id, 'members')
+        # L'invitation devient un membre : le nombre de places occupées ne change pas
+        get_entitlement_cache().invalidate_user(user_id)
         
         # Enregistrer l'action dans les logs d'audit
         self.audit_service.log_action(
@@ -212,6 +226,7 @@ class InvitationService:
         invitation.status = 'canceled'
         invitation.updated_at = datetime.utcnow()
         db.session.commit()
+        get_entitlement_cache().increment_usage('members', invitation.organization_id, -1)
         
         # Enregistrer l'action dans les logs d'audit
         self.audit_service.log_action(
@@ -299,45 +314,60 @@ class InvitationService:
             Liste des invitations créées
         """
         if not emails:
-            return []
-        
-        # Vérifier que l'organisation existe
-        organization = Organization.query.get(organization_id)
-        if not organization:
-            raise ValueError(f"Organisation introuvable: {organization_id}")
-        
-        # Vérifier les limites du plan
-        current_members = OrganizationMember.query.filter_by(organization_id=organization_id).count()
-        current_invitations = Invitation.query.filter_by(organization_id=organization_id, status='pending').count()
-        total_after = current_members + current_invitations + len(emails)
+            return {"batch_id": None, "created": [], "failed": [], "results": {}}
         
+        # Places restantes selon le plan (membres + invitations en attente)
         plan_limits = self.subscription_service.get_plan_limits(
             self.subscription_service.get_user_plan(created_by)
         )
+        max_new = None
+        if plan_limits['max_members'] > 0:
+            current_members = OrganizationMember.query.filter_by(organization_id=organization_id).count()
+            current_invitations = Invitation.query.filter_by(organization_id=organization_id, status='pending').count()
+            max_new = max(0, plan_limits['max_members'] - current_members - current_invitations)
+        
+        # Validation ensembliste, insertion groupée et envoi des emails par lots
+        batch = self.bulk_service.invite(
+            organization_id=organization_id,
+            emails=emails,
+            role=role,
+            created_by=created_by,
+            message=message,
+            max_new=max_new
+        )
+        get_entitlement_cache().increment_usage('members', organization_id, batch.created_count)
         
-        if plan_limits['max_members'] > 0 and total_after > plan_limits['max_members']:
-            raise ValueError(f"Cette opération dépasserait la limite de membres pour votre plan ({plan_limits['max_members']})")
-        
-        created_invitations = []
-        failed_emails = []
-        
-        for email in emails:
-            try:
-                invitation = self.create_invitation(
-                    organization_id=organization_id,
-                    email=email,
-                    role=role,
-                    created_by=created_by,
-                    message=message,
-                    expires_in_days=expires_in_days
-                )
-                created_invitations.append(invitation)
-            except Exception as e:
-                failed_emails.append({"email": email, "error": str(e)})
+        # Un seul log d'audit pour le lot
+        self.audit_service.log_action(
+            organization_id=organization_id,
+            user_id=created_by,
+            action='create',
+            entity_type='invitation_batch',
+            entity_id=batch.id,
+            description=f"{batch.created_count} invitation(s) envoyée(s) avec le rôle {role}",
+            metadata={'total': batch.total, 'created': batch.created_count}
+        )
         
+        return self._bulk_response(batch)
+    
+    def resume_bulk_invitations(self, batch_id):
+        """Reprend l'envoi des emails d'un lot d'invitations interrompu"""
+        return self._bulk_response(self.bulk_service.resume(batch_id))
+    
+    def _bulk_response(self, batch):
+        results = batch.results or {}
         return {
-            "created": created_invitations,
-            "failed": failed_emails
+            "batch_id": batch.id,
+            "status": batch.status,
+            "created": [
+                {"email": email, "invitation_id": entry.get('invitation_id'), "status": entry['status']}
+                for email, entry in results.items() if entry and entry.get('invitation_id')
+            ],
+            "failed": [
+                {"email": email, "error": entry.get('error'), "status": entry['status']}
+                for email, entry in results.items() if entry and not entry.get('invitation_id')
+            ],
+            "results": results
         }
     
     def get_invitation_by_token(self, token):
@@ -0,0 +1,252 @@
+# backend/app/services/job_board_service.py
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select, true
+from sqlalchemy.orm import joinedload, noload
+
+from ..models.job_posting import JobApplication, JobPosting
+from .job_search_service import get_job_search_index
+from app import db
+
+# Filtres acceptés par le job board et leur normalisation
+TEXT_FILTERS = ('location', 'keywords')
+EXACT_FILTERS = ('employment_type', 'remote_policy')
+NUMERIC_FILTERS = ('salary_min', 'salary_max')
+
+
+class JobBoardService:
+    """
+    Chemin de lecture du job board public.
+
+    Les offres publiées sont paginées par curseur sur (published_at, id) via
+    l'index ix_job_postings_status_published, sans COUNT (les offres sans
+    date de publication viennent en dernier). La pagination par numéro de
+    page, conservée pour le frontend, renvoie aussi total et pages. Les
+    mots-clés passent par l'index de recherche des offres (JobSearchIndex),
+    et le nombre de candidatures est lu dans la colonne dénormalisée
+    application_count. Les réponses sont mises en cache par jeu de filtres
+    normalisé et invalidées à la publication, la fermeture ou la modification
+    d'une offre.
+    """
+
+    def __init__(self, cache_ttl=None, cache_size=None, max_limit=100):
+        self.cache_ttl = cache_ttl or int(os.getenv('JOB_BOARD_CACHE_TTL', '60'))
+        self.cache_size = cache_size or int(os.getenv('JOB_BOARD_CACHE_SIZE', '500'))
+        self.max_limit = max_limit
+        self._cache = OrderedDict()  # clé -> (réponse, expiration)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def list_jobs(self, filters=None, cursor=None, limit=20, page=None):
+        """
+        Liste les offres publiées, de la plus récente à la plus ancienne.
+
+        Args:
+            filters (dict): location, employment_type, remote_policy, salary_min, salary_max, keywords
+            cursor (str): Curseur renvoyé par l'appel précédent
+            limit (int): Nombre maximum d'offres
+            page (int): Numéro de page (compatibilité, ignoré si un curseur est fourni)
+
+        Returns:
+            dict: {'data': [...], 'pagination': {...}}
+        """
+        limit = max(1, min(int(limit or 20), self.max_limit))
+        normalized = self.normalize_filters(filters)
+        if cursor:
+            page = None
+
+        key = (tuple(sorted(normalized.items())), cursor, limit, page)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        generation = self._generation
+        response = self._load(normalized, cursor, limit, page)
+        self._cache_set(key, response, generation)
+        return response
+
+    def invalidate(self):
+        """Vide le cache des réponses (publication, fermeture ou modification d'une offre)"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def recount_applications(self):
+        """
+        Recalcule la colonne application_count de toutes les offres.
+
+        Returns:
+            int: Nombre d'offres mises à jour
+        """
+        count = db.session.query(func.count(JobApplication.id)).filter(
+            JobApplication.job_posting_id == JobPosting.id
+        ).scalar_subquery()
+
+        updated = JobPosting.query.update(
+            {JobPosting.application_count: count}, synchronize_session=False
+        )
+        db.session.commit()
+        self.invalidate()
+        return updated
+
+    @staticmethod
+    def normalize_filters(filters):
+        """Normalise les filtres pour qu'un même jeu de filtres produise la même clé de cache"""
+        normalized = {}
+        for name, value in (filters or {}).items():
+            if value in (None, ''):
+                continue
+            if name in TEXT_FILTERS:
+                value = ' '.join(str(value).lower().split())
+                if value:
+                    normalized[name] = value
+            elif name in EXACT_FILTERS:
+                normalized[name] = str(value).strip()
+            elif name in NUMERIC_FILTERS:
+                normalized[name] = int(value)
+        return normalized
+
+    # ------------------------------------------------------------------
+    # Requête
+    # ------------------------------------------------------------------
+
+    def _load(self, filters, cursor, limit, page):
+        query = JobPosting.query.filter(
+            JobPosting.status == 'published'
+        ).options(
+            joinedload(JobPosting.organization),
+            joinedload(JobPosting.creator)
+        )
+        query = self._apply_filters(query, filters)
+
+        total = None
+        if page:
+            total = query.order_by(None).options(noload('*')).count()
+
+        position = self.decode_cursor(cursor)
+        if position:
+            published_at, job_id = position
+            if published_at is None:
+                query = query.filter(JobPosting.published_at.is_(None), JobPosting.id < job_id)
+            else:
+                query = query.filter(or_(
+                    JobPosting.published_at < published_at,
+                    and_(JobPosting.published_at == published_at, JobPosting.id < job_id),
+                    JobPosting.published_at.is_(None)
+                ))
+
+        query = query.order_by(JobPosting.published_at.desc().nullslast(), JobPosting.id.desc())
+        if page and page > 1:
+            query = query.offset((page - 1) * limit)
+
+        jobs = query.limit(limit + 1).all()
+        has_next = len(jobs) > limit
+        jobs = jobs[:limit]
+
+        pagination = {
+            'limit': limit,
+            'has_next': has_next,
+            'next_cursor': self.encode_cursor(jobs[-1]) if has_next and jobs else None
+        }
+        if page:
+            pagination.update({
+                'page': page,
+                'offset': (page - 1) * limit,
+                'has_prev': page > 1,
+                'total': total,
+                'pages': -(-total // limit)
+            })
+
+        return {'data': [job.to_dict() for job in jobs], 'pagination': pagination}
+
+    def _apply_filters(self, query, filters):
+        if filters.get('location'):
+            query = query.filter(JobPosting.location.ilike(f"%{filters['location']}%"))
+
+        for name in EXACT_FILTERS:
+            if filters.get(name):
+                query = query.filter(getattr(JobPosting, name) == filters[name])
+
+        if filters.get('salary_min') is not None:
+            query = query.filter(JobPosting.salary_range_min >= filters['salary_min'])
+
+        if filters.get('salary_max') is not None:
+            query = query.filter(JobPosting.salary_range_max <= filters['salary_max'])
+
+        if filters.get('keywords'):
+            query = query.filter(self._keyword_clause(filters['keywords']))
+
+        return query
+
+    @staticmethod
+    def _keyword_clause(keywords):
+        matches = get_job_search_index().match(keywords)
+        if matches is None:
+            return true()
+        return JobPosting.id.in_(select(matches.c.job_posting_id))
+
+    # ------------------------------------------------------------------
+    # Curseurs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(job):
+        """Encode la position d'une offre ; une date absente est encodée vide"""
+        raw = f"{job.published_at.isoformat() if job.published_at else ''}|{job.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Décode un curseur ; un curseur invalide est ignoré (première page)"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            published_at, job_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+            if not job_id:
+                return None
+            return (datetime.fromisoformat(published_at) if published_at else None), job_id
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Cache des réponses
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def _cache_set(self, key, response, generation):
+        with self._lock:
+            # Une invalidation survenue pendant le chargement rend la réponse obsolète
+            if generation != self._generation:
+                return
+            self._cache[key] = (response, time.monotonic() + self.cache_ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+job_board_service = None
+
+
+def get_job_board_service():
+    """Récupère (ou crée) le service du job board partagé"""
+    global job_board_service
+    if job_board_service is None:
+        job_board_service = JobBoardService()
+    return job_board_service
@@ -11,7 +11,11 @@ from app import db
 from ..models.job_posting import JobApplication, JobPosting
 from ..models.user import User
 from ..services.ai_service import AIService
-from sqlalchemy import and_, or_
+from ..services.application_read_service import ApplicationReadModel
+from ..services.job_board_service import get_job_board_service
+from ..services.job_search_service import get_job_search_index
+from ..services.organization_metrics_service import get_organization_metrics_service
+from sqlalchemy import and_
 from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 
@@ -21,6 +25,7 @@ class JobPostingService:
     def __init__(self):
         self.ai_service = AIService()
         self.notification_service = NotificationService()
+        self.application_reads = ApplicationReadModel()
 
 
         # Configuration pour l'upload de fichiers
@@ -79,8 +84,14 @@ class JobPostingService:
             )
         
         db.session.add(job)
+        db.session.flush()
+        # Le document de recherche est écrit dans la même transaction que l'offre
+        get_job_search_index().index_job(job, commit=False)
         db.session.commit()
         
+        if job.status == 'published':
+            get_job_board_service().invalidate()
+        
         return job
 
     def import_from_website(self, organization_id, user_id, url, source_name='custom'):
@@ -237,6 +248,7 @@ class JobPostingService:
 
         job.status = new_status
         job.updated_at = datetime.utcnow()
+        get_job_search_index().index_job(job, commit=False)
 
         try:
             db.session.commit()
@@ -245,6 +257,7 @@ class JobPostingService:
             print(f"Erreur lors de la mise à jour du statut de l'offre: {e}")
             raise e
 
+        get_job_board_service().invalidate()
         return job
 
     def get_job_posting(self, job_id, user_id=None):
@@ -271,7 +284,7 @@ class JobPostingService:
 
         return job
 
-    def get_job_postings(self, organization_id=None, status=None, user_id=None, limit=20, offset=0):
+    def get_job_postings(self, organization_id=None, status=None, user_id=None, limit=20, offset=0, search=None):
         """
         Récupère une liste d'offres d'emploi avec filtres optionnels
 
@@ -281,12 +294,17 @@ class JobPostingService:
             user_id: Filtre par créateur (optionnel)
             limit: Nombre maximum d'offres à retourner
             offset: Décalage pour la pagination
+            search: Recherche plein texte, résultats classés par pertinence (optionnel)
 
         Returns:
             Liste de JobPosting et nombre total
         """
         query = JobPosting.query
 
+        matches = get_job_search_index().match(search) if search else None
+        if matches is not None:
+            query = query.join(matches, matches.c.job_posting_id == JobPosting.id)
+
         # Appliquer les filtres
         if organization_id:
             query = query.filter(JobPosting.organization_id == organization_id)
@@ -300,8 +318,12 @@ class JobPostingService:
         # Récupérer le nombre total pour la pagination
         total_count = query.count()
 
-        # Appliquer la pagination et trier par date de mise à jour
-        jobs = query.order_by(JobPosting.updated_at.desc()).limit(limit).offset(offset).all()
+        # Appliquer la pagination et trier par pertinence ou par date de mise à jour
+        if matches is not None:
+            query = query.order_by(matches.c.rank.desc(), JobPosting.updated_at.desc())
+        else:
+            query = query.order_by(JobPosting.updated_at.desc())
+        jobs = query.limit(limit).offset(offset).all()
 
         return jobs, total_count
 
@@ -330,6 +352,7 @@ class JobPostingService:
             abort(400, description="Seules les offres en brouillon peuvent être supprimées")
 
         try:
+            get_job_search_index().remove_job(job.id, commit=False)
             db.session.delete(job)
             db.session.commit()
         except Exception as e:
@@ -543,6 +566,9 @@ class JobPostingService:
                 # Ne pas faire échouer la mise à jour si l'IA ne fonctionne pas
                 print(f"Avertissement - Erreur lors de l'extraction des mots-clés: {e}")
 
+        # Mettre à jour le document de recherche dans la même transaction
+        get_job_search_index().index_job(job, commit=False)
+
         # Sauvegarder les modifications
         try:
             db.session.commit()
@@ -552,88 +578,29 @@ class JobPostingService:
             # Utiliser raise au lieu d'abort pour les erreurs de DB
             raise Exception("Erreur interne lors de la mise à jour")
 
+        get_job_board_service().invalidate()
         return job
     
-    def get_public_job_postings(self, page=1, per_page=20, filters=None):
+    def get_public_job_postings(self, page=None, per_page=20, filters=None, cursor=None):
         """
         Récupère les offres d'emploi publiques (status = 'published')
         
         Args:
-            page: Numéro de la page
+            page: Numéro de la page (compatibilité, préférer `cursor`)
             per_page: Nombre d'éléments par page
             filters: Dictionnaire de filtres (location, employment_type, etc.)
+            cursor: Curseur de pagination renvoyé par l'appel précédent
             
         Returns:
             Dict avec les offres et métadonnées de pagination
         """
         try:
-            # Base query pour les offres publiées
-            query = JobPosting.query.filter(
-                JobPosting.status == 'published'
-            ).options(
-                joinedload(JobPosting.organization),
-                joinedload(JobPosting.creator)
+            return get_job_board_service().list_jobs(
+                filters=filters,
+                cursor=cursor,
+                limit=per_page,
+                page=page
             )
-            
-            # Appliquer les filtres si fournis
-            if filters:
-                if filters.get('location'):
-                    query = query.filter(
-                        JobPosting.location.ilike(f"%{filters['location']}%")
-                    )
-                
-                if filters.get('employment_type'):
-                    query = query.filter(
-                        JobPosting.employment_type == filters['employment_type']
-                    )
-                
-                if filters.get('remote_policy'):
-                    query = query.filter(
-                        JobPosting.remote_policy == filters['remote_policy']
-                    )
-                
-                if filters.get('salary_min'):
-                    query = query.filter(
-                        JobPosting.salary_range_min >= filters['salary_min']
-                    )
-                
-                if filters.get('salary_max'):
-                    query = query.filter(
-                        JobPosting.salary_range_max <= filters['salary_max']
-                    )
-                
-                if filters.get('keywords'):
-                    # Recherche dans le titre et la description
-                    search_term = f"%{filters['keywords']}%"
-                    query = query.filter(
-                        or_(
-                            JobPosting.title.ilike(search_term),
-                            JobPosting.description.ilike(search_term)
-                        )
-                    )
-            
-            # Ordonner par date de publication décroissante
-            query = query.order_by(JobPosting.published_at.desc())
-            
-            # Paginer les résultats
-            paginated = query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
-            )
-            
-            return {
-                'data': [job.to_dict() for job in paginated.items],
-                'pagination': {
-                    'total': paginated.total,
-                    'limit': per_page,
-                    'offset': (page - 1) * per_page,
-                    'page': page,
-                    'pages': paginated.pages,
-                    'has_next': paginated.has_next,
-                    'has_prev': paginated.has_prev
-                }
-            }
         except Exception as e:
             print(f"Erreur lors de la récupération des offres publiques: {str(e)}")
             raise Exception("Erreur lors de la récupération des offres")
@@ -715,7 +682,13 @@ class JobPostingService:
             )
             
             db.session.add(application)
+            # Incrément atomique du compteur dénormalisé, dans la même transaction
+            JobPosting.query.filter(JobPosting.id == job_id).update(
+                {JobPosting.application_count: JobPosting.application_count + 1},
+                synchronize_session=False
+            )
             db.session.commit()
+            get_organization_metrics_service().invalidate(job.organization_id, 'applications')
             
             # Envoyer l'email de confirmation au candidat
             self._send_application_confirmation(application, job)
@@ -730,7 +703,7 @@ class JobPostingService:
             print(f"Erreur lors de la création de la candidature: {str(e)}")
             raise
     
-    def get_applications_for_job(self, job_id, user_id, limit=20, offset=0):
+    def get_applications_for_job(self, job_id, user_id, limit=20, offset=0, cursor=None, status=None):
         """
         Récupère les candidatures pour une offre d'emploi
         (Seulement accessible au créateur de l'offre ou aux membres de l'organisation)
@@ -739,41 +712,30 @@ class JobPostingService:
             job_id: ID de l'offre d'emploi
             user_id: ID de l'utilisateur qui fait la demande
             limit: Nombre d'éléments par page
-            offset: Décalage pour la pagination
+            offset: Décalage pour la pagination (compatibilité, préférer `cursor`)
+            cursor: Curseur renvoyé par l'appel précédent
+            status: Restreindre à un statut (colonne du pipeline)
             
         Returns:
-            Tuple (applications, total_count) ou exception si non autorisé
+            Tuple (job, page) où page contient data, status_counts et pagination,
+            ou exception si non autorisé
         """
         try:
-            # Vérifier que l'utilisateur a accès à cette offre
-            job = JobPosting.query.filter(JobPosting.id == job_id).first()
+            job = JobPosting.query.options(
+                joinedload(JobPosting.organization),
+                joinedload(JobPosting.creator)
+            ).filter(JobPosting.id == job_id).first()
             if not job:
                 raise Exception('Offre d\'emploi non trouvée')
             
-            # Vérifier les permissions
-            user = User.query.get(user_id)
-            if not user:
-                raise Exception('Utilisateur non trouvé')
-            
             # L'utilisateur doit être le créateur de l'offre ou membre de l'organisation
-            if (job.created_by != user_id and 
-                not any(org.id == job.organization_id for org in user.organizations)):
+            if not self.application_reads.can_access_job(user_id, job):
                 raise Exception('Accès non autorisé')
             
-            # Compter le total des candidatures
-            total_count = JobApplication.query.filter(
-                JobApplication.job_posting_id == job_id
-            ).count()
-            
-            # Récupérer les candidatures avec pagination
-            applications = JobApplication.query.filter(
-                JobApplication.job_posting_id == job_id
-            ).order_by(JobApplication.created_at.desc())\
-             .limit(limit)\
-             .offset(offset)\
-             .all()
-            
-            return applications, total_count
+            page = self.application_reads.list_for_job(
+                job, status=status, cursor=cursor, limit=limit, offset=offset
+            )
+            return job, page
             
         except Exception as e:
             print(f"Erreur lors de la récupération des candidatures: {str(e)}")
@@ -800,10 +762,7 @@ class JobPostingService:
             
             # Vérifier les permissions
             job = application.job_posting
-            user = User.query.get(user_id)
-            
-            if (job.created_by != user_id and 
-                not any(org.id == job.organization_id for org in user.organizations)):
+            if not self.application_reads.can_access_job(user_id, job):
                 raise Exception('Accès non autorisé')
             
             # Valider le statut
@@ -820,6 +779,7 @@ class JobPostingService:
                 application.notes = notes
             
             db.session.commit()
+            get_organization_metrics_service().invalidate(job.organization_id, 'applications')
             
             # Envoyer une notification au candidat si le statut change
             if old_status != new_status:
@@ -844,16 +804,12 @@ class JobPostingService:
             JobApplication object ou exception si non autorisé
         """
         try:
-            application = JobApplication.query.get(application_id)
+            application = self.application_reads.get_application(application_id)
             if not application:
                 raise Exception('Candidature non trouvée')
             
             # Vérifier les permissions
-            job = application.job_posting
-            user = User.query.get(user_id)
-            
-            if (job.created_by != user_id and 
-                not any(org.id == job.organization_id for org in user.organizations)):
+            if not self.application_reads.can_access_job(user_id, application.job_posting):
                 raise Exception('Accès non autorisé')
             
             return application
@@ -1145,20 +1101,8 @@ class JobPostingService:
         Returns:
             bool: True si autorisé, False sinon
         """
-        # Récupérer l'utilisateur
-        user = User.query.get(current_user_id)
-        if not user:
-            return False
-        
-        job = application.job_posting
-        
-        # Vérifier les permissions (propriétaire de l'offre ou membre de la même organisation)
-        has_permission = (
-            job.created_by == current_user_id or 
-            (user.organization_id and job.organization_id == user.organization_id)
-        )
-        
-        return has_permission
+        # Propriétaire de l'offre ou membre de son organisation (résolu une fois par requête)
+        return self.application_reads.can_access_job(current_user_id, application.job_posting)
 
     def _get_resume_file_path(self, resume_url):
         """
@@ -1308,8 +1252,13 @@ class JobPostingService:
                     print(f"Avertissement - Erreur IA lors de la création: {e}")
 
             db.session.add(job)
+            db.session.flush()
+            get_job_search_index().index_job(job, commit=False)
             db.session.commit()
 
+            if job.status == 'published':
+                get_job_board_service().invalidate()
+
             return job
 
         except Exception as e:
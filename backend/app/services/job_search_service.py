@@ -0,0 +1,256 @@
+# backend/app/services/job_search_service.py
+import re
+
+from sqlalchemy import Float, String, case, column, func, literal, literal_column, or_, select, text
+from sqlalchemy.orm import joinedload
+
+from ..models.job_posting import JOB_SEARCH_VECTOR, JobPosting, JobSearchDocument
+from app import db
+
+# Tranches de salaire (sur salary_range_min) : libellé -> (borne basse incluse, borne haute exclue)
+SALARY_BUCKETS = (
+    ('0-30000', 0, 30000),
+    ('30000-50000', 30000, 50000),
+    ('50000-70000', 50000, 70000),
+    ('70000-100000', 70000, 100000),
+    ('100000+', 100000, None),
+)
+
+FACETS = ('location', 'employment_type', 'remote_policy', 'salary_bucket')
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class JobSearchIndex:
+    """
+    Moteur de recherche des offres d'emploi.
+
+    Chaque offre est résumée dans job_search_documents (titre, compétences
+    extraites, description/exigences/responsabilités), mise à jour à chaque
+    écriture de l'offre. Sur PostgreSQL l'index inversé est un GIN sur un
+    tsvector pondéré (titre > compétences > corps) classé par ts_rank_cd ; sur
+    SQLite, une table FTS5 synchronisée par triggers classée par bm25. Les
+    autres bases retombent sur ILIKE sans classement.
+    """
+
+    # ------------------------------------------------------------------
+    # Indexation
+    # ------------------------------------------------------------------
+
+    def index_job(self, job, commit=True):
+        """Crée ou met à jour le document indexé d'une offre"""
+        document = JobSearchDocument.query.get(job.id)
+        if document is None:
+            document = JobSearchDocument(job_posting_id=job.id)
+            db.session.add(document)
+
+        document.title = job.title
+        document.skills = self._skills_text(job.skills)
+        document.body = '\n'.join(part for part in (job.description, job.requirements, job.responsibilities) if part)
+
+        if commit:
+            db.session.commit()
+
+    def remove_job(self, job_id, commit=True):
+        """Retire une offre de l'index"""
+        JobSearchDocument.query.filter_by(job_posting_id=job_id).delete(synchronize_session=False)
+        if commit:
+            db.session.commit()
+
+    def rebuild(self, batch_size=500):
+        """
+        Réindexe toutes les offres.
+
+        Returns:
+            int: Nombre d'offres indexées
+        """
+        JobSearchDocument.query.delete(synchronize_session=False)
+
+        indexed = 0
+        offset = 0
+        while True:
+            jobs = JobPosting.query.order_by(JobPosting.id).offset(offset).limit(batch_size).all()
+            if not jobs:
+                break
+            db.session.add_all([
+                JobSearchDocument(
+                    job_posting_id=job.id,
+                    title=job.title,
+                    skills=self._skills_text(job.skills),
+                    body='\n'.join(part for part in (job.description, job.requirements, job.responsibilities) if part)
+                )
+                for job in jobs
+            ])
+            db.session.commit()
+            indexed += len(jobs)
+            offset += batch_size
+
+        return indexed
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def match(self, query_text):
+        """
+        Offres correspondant à une recherche.
+
+        Returns:
+            Subquery (job_posting_id, rank) ou None si la recherche est vide
+        """
+        tokens = TOKEN_PATTERN.findall(query_text or '')
+        if not tokens:
+            return None
+
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            vector = literal_column(f"({JOB_SEARCH_VECTOR})")
+            ts_query = func.websearch_to_tsquery('french', query_text)
+            return select(
+                JobSearchDocument.job_posting_id,
+                func.ts_rank_cd(vector, ts_query).label('rank')
+            ).where(vector.op('@@')(ts_query)).subquery('job_search_matches')
+
+        if dialect == 'sqlite':
+            fts_query = ' '.join(f'"{token}"*' for token in tokens)
+            return text(
+                "SELECT job_posting_id, -bm25(job_search_fts, 0.0, 10.0, 5.0, 1.0) AS rank "
+                "FROM job_search_fts WHERE job_search_fts MATCH :query"
+            ).bindparams(query=fts_query).columns(
+                column('job_posting_id', String), column('rank', Float)
+            ).subquery('job_search_matches')
+
+        conditions = []
+        for token in tokens:
+            pattern = f"%{token}%"
+            conditions.append(or_(
+                JobSearchDocument.title.ilike(pattern),
+                JobSearchDocument.skills.ilike(pattern),
+                JobSearchDocument.body.ilike(pattern)
+            ))
+        return select(
+            JobSearchDocument.job_posting_id,
+            literal(1.0).label('rank')
+        ).where(*conditions).subquery('job_search_matches')
+
+    def search(self, query_text=None, filters=None, organization_id=None, status='published',
+               limit=20, offset=0, with_facets=True):
+        """
+        Recherche classée par pertinence, avec les comptes par facette.
+
+        Args:
+            query_text (str): Texte recherché (titre, description, exigences, compétences)
+            filters (dict): location, employment_type, remote_policy, salary_bucket
+            organization_id: Restreindre à une organisation
+            status (str): Statut des offres (None pour tous)
+            limit (int): Nombre maximum d'offres
+            offset (int): Décalage
+            with_facets (bool): Calculer les facettes
+
+        Returns:
+            dict: {'data': [...], 'facets': {...}, 'pagination': {...}}
+        """
+        filters = filters or {}
+        matches = self.match(query_text)
+
+        query = self._base_query(matches, organization_id, status)
+        query = self._apply_facet_filters(query, filters)
+
+        total = query.with_entities(func.count(JobPosting.id)).scalar()
+        query = query.options(joinedload(JobPosting.organization), joinedload(JobPosting.creator))
+
+        if matches is not None:
+            rows = query.with_entities(JobPosting, matches.c.rank).order_by(
+                matches.c.rank.desc(), JobPosting.published_at.desc(), JobPosting.id.desc()
+            ).offset(offset).limit(limit).all()
+        else:
+            rows = [(job, None) for job in query.order_by(
+                JobPosting.published_at.desc(), JobPosting.id.desc()
+            ).offset(offset).limit(limit).all()]
+
+        data = []
+        for job, rank in rows:
+            item = job.to_dict()
+            item['score'] = round(float(rank), 4) if rank is not None else None
+            data.append(item)
+
+        return {
+            'data': data,
+            'facets': self.facets(matches, filters, organization_id, status) if with_facets else {},
+            'pagination': {'total': total, 'limit': limit, 'offset': offset}
+        }
+
+    def facets(self, matches, filters, organization_id=None, status='published'):
+        """
+        Comptes par facette ; chaque facette ignore son propre filtre pour
+        présenter les alternatives.
+        """
+        result = {}
+        for facet in FACETS:
+            other_filters = {name: value for name, value in filters.items() if name != facet}
+            query = self._apply_facet_filters(self._base_query(matches, organization_id, status), other_filters)
+
+            expression = self._salary_bucket_expression() if facet == 'salary_bucket' else getattr(JobPosting, facet)
+            rows = query.with_entities(expression, func.count(JobPosting.id)).group_by(expression).all()
+            result[facet] = sorted(
+                ({'value': value, 'count': count} for value, count in rows if value is not None),
+                key=lambda entry: -entry['count']
+            )
+        return result
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _base_query(matches, organization_id, status):
+        query = JobPosting.query
+        if matches is not None:
+            query = query.join(matches, matches.c.job_posting_id == JobPosting.id)
+        if status:
+            query = query.filter(JobPosting.status == status)
+        if organization_id:
+            query = query.filter(JobPosting.organization_id == organization_id)
+        return query
+
+    def _apply_facet_filters(self, query, filters):
+        for name in ('location', 'employment_type', 'remote_policy'):
+            if filters.get(name):
+                query = query.filter(getattr(JobPosting, name) == filters[name])
+
+        if filters.get('salary_bucket'):
+            query = query.filter(self._salary_bucket_expression() == filters['salary_bucket'])
+
+        return query
+
+    @staticmethod
+    def _salary_bucket_expression():
+        whens = []
+        for label, low, high in SALARY_BUCKETS:
+            condition = JobPosting.salary_range_min >= low
+            if high is not None:
+                condition = condition & (JobPosting.salary_range_min < high)
+            whens.append((condition, label))
+        return case(*whens, else_=None)
+
+    @classmethod
+    def _skills_text(cls, skills):
+        """Aplatis les compétences extraites ({'technical': [...], 'soft': [...]} ou liste)"""
+        if not skills:
+            return None
+        if isinstance(skills, dict):
+            return ' '.join(filter(None, (cls._skills_text(value) for value in skills.values()))) or None
+        if isinstance(skills, (list, tuple)):
+            return ' '.join(filter(None, (cls._skills_text(value) for value in skills))) or None
+        return str(skills)
+
+
+job_search_index = None
+
+
+def get_job_search_index():
+    """Récupère (ou crée) le moteur de recherche d'offres partagé"""
+    global job_search_index
+    if job_search_index is None:
+        job_search_index = JobSearchIndex()
+    return job_search_index
@@ -4,7 +4,7 @@ from flask import current_app
 import requests
 import json
 
-def get_llm_response(prompt, model=None, temperature=0.7, max_tokens=1000):
+def get_llm_response(prompt, model=None, temperature=0.7, max_tokens=1000, cached_prefix=None):
     """
     Obtient une réponse d'un modèle de langage (GPT-4o ou Claude).
     
@@ -13,6 +13,8 @@ def get_llm_response(prompt, model=None, temperature=0.7, max_tokens=1000):
         model (str, optional): Le modèle spécifique à utiliser. Par défaut, utilise le meilleur modèle disponible.
         temperature (float, optional): La température pour la génération. Défaut à 0.7.
         max_tokens (int, optional): Le nombre maximum de tokens à générer. Défaut à 1000.
+        cached_prefix (str, optional): Préfixe stable du prompt (instructions système),
+            envoyé séparément pour être mis en cache par le fournisseur.
         
     Returns:
         str: La réponse du modèle
@@ -20,15 +22,18 @@ def get_llm_response(prompt, model=None, temperature=0.7, max_tokens=1000):
     provider = current_app.config.get('LLM_PROVIDER', 'openai')
     
     if provider == 'openai':
-        return _get_openai_response(prompt, model, temperature, max_tokens)
+        return _get_openai_response(prompt, model, temperature, max_tokens, cached_prefix)
     elif provider == 'anthropic':
-        return _get_anthropic_response(prompt, model, temperature, max_tokens)
+        return _get_anthropic_response(prompt, model, temperature, max_tokens, cached_prefix)
     else:
         raise ValueError(f"Fournisseur LLM non pris en charge: {provider}")
 
-def _get_openai_response(prompt, model=None, temperature=0.7, max_tokens=1000):
+def _get_openai_response(prompt, model=None, temperature=0.7, max_tokens=1000, cached_prefix=None):
     """
     Obtient une réponse de l'API OpenAI.
+    
+    Le préfixe stable est placé en message système, en tête de la requête :
+    OpenAI met automatiquement en cache les préfixes identiques.
     """
     api_key = current_app.config.get('OPENAI_API_KEY')
     if not api_key:
@@ -42,9 +47,13 @@ def _get_openai_response(prompt, model=None, temperature=0.7, max_tokens=1000):
         "Authorization": f"Bearer {api_key}"
     }
     
+    messages = [{"role": "user", "content": prompt}]
+    if cached_prefix:
+        messages.insert(0, {"role": "system", "content": cached_prefix})
+    
     payload = {
         "model": model,
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens
     }
@@ -63,9 +72,11 @@ def _get_openai_response(prompt, model=None, temperature=0.7, max_tokens=1000):
         # En production, utilisez un logger approprié
         return f"Erreur de l'API: {str(e)}"
 
-def _get_anthropic_response(prompt, model=None, temperature=0.7, max_tokens=1000):
+def _get_anthropic_response(prompt, model=None, temperature=0.7, max_tokens=1000, cached_prefix=None):
     """
     Obtient une réponse de l'API Anthropic.
+    
+    Le préfixe stable est envoyé en bloc système marqué cache_control.
     """
     api_key = current_app.config.get('ANTHROPIC_API_KEY')
     if not api_key:
@@ -86,6 +97,12 @@ def _get_anthropic_response(prompt, model=None, temperature=0.7, max_tokens=1000
         "temperature": temperature,
         "max_tokens": max_tokens
     }
+    if cached_prefix:
+        payload["system"] = [{
+            "type": "text",
+            "text": cached_prefix,
+            "cache_control": {"type": "ephemeral"}
+        }]
     
     try:
         response = requests.post(
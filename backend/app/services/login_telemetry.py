@@ -0,0 +1,213 @@
+# backend/app/services/login_telemetry.py
+import functools
+import ipaddress
+import logging
+import os
+import threading
+from datetime import datetime
+
+from flask import current_app, has_app_context
+
+from ..models.login_history import LoginHistory
+from .audit_writer import AuditLogWriter
+from app import db
+
+logger = logging.getLogger(__name__)
+
+LOCAL_NETWORK = 'Réseau local'
+UNKNOWN_LOCATION = 'Localisation inconnue'
+
+DEFAULT_GEOIP_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'GeoLite2-City.mmdb')
+
+
+def parse_user_agent(user_agent_string):
+    """
+    Analyse l'user agent pour déterminer l'appareil
+
+    Args:
+        user_agent_string (str): Chaîne User-Agent
+
+    Returns:
+        str: Description de l'appareil
+    """
+    user_agent_string = user_agent_string or ''
+    if 'Mobile' in user_agent_string:
+        if 'iPhone' in user_agent_string:
+            return 'iPhone'
+        elif 'Android' in user_agent_string:
+            return 'Android'
+        return 'Mobile'
+    if 'Tablet' in user_agent_string:
+        return 'Tablet'
+    if 'Chrome' in user_agent_string:
+        return 'Chrome/Desktop'
+    if 'Firefox' in user_agent_string:
+        return 'Firefox/Desktop'
+    if 'Safari' in user_agent_string:
+        return 'Safari/Desktop'
+    if 'Edge' in user_agent_string:
+        return 'Edge/Desktop'
+    return 'Desktop'
+
+
+class LoginHistoryWriter(AuditLogWriter):
+    """
+    Écriture groupée de l'historique de connexion (même pipeline que l'audit).
+
+    Les enregistrements arrivent bruts (IP et user agent) : l'appareil et la
+    localisation sont résolus dans le thread d'écriture, hors de la requête.
+    """
+
+    table = LoginHistory.__table__
+    env_prefix = 'LOGIN_HISTORY'
+    thread_name = 'login-history-writer'
+    wal_filename = 'login_history_wal.jsonl'
+    datetime_fields = ('timestamp',)
+    label = 'historiques de connexion'
+
+    def __init__(self, telemetry, **kwargs):
+        super().__init__(**kwargs)
+        self.telemetry = telemetry
+
+    def _write(self, batch):
+        return super()._write([self.telemetry.enrich(record) for record in batch])
+
+    def _spill(self, records):
+        super()._spill([self.telemetry.enrich(record) for record in records])
+
+
+class LoginTelemetry:
+    """
+    Télémétrie des connexions : historique, appareil et géolocalisation.
+
+    Un seul lecteur GeoIP (base MaxMind projetée en mémoire) est ouvert par
+    processus ; les localisations des IP récentes et les appareils des user
+    agents récents sont mis en cache (LRU). L'historique est écrit par lots
+    par un thread dédié : la requête de connexion ne fait que placer
+    l'enregistrement dans une file.
+    """
+
+    def __init__(self, geoip_path=None, geoip_cache_size=None, user_agent_cache_size=None):
+        self.geoip_path = geoip_path or os.getenv('GEOIP_DB_PATH')
+        self.writer = LoginHistoryWriter(self)
+
+        self._reader = None
+        self._reader_lock = threading.Lock()
+        self._reader_failed = False
+
+        self.locate = functools.lru_cache(
+            maxsize=geoip_cache_size or int(os.getenv('GEOIP_CACHE_SIZE', '10000'))
+        )(self._locate)
+        self.device = functools.lru_cache(
+            maxsize=user_agent_cache_size or int(os.getenv('USER_AGENT_CACHE_SIZE', '1000'))
+        )(parse_user_agent)
+
+    def init_app(self, app):
+        """Démarre le thread d'écriture de l'historique"""
+        self.geoip_path = self.geoip_path or app.config.get('GEOIP_DB_PATH')
+        self.writer.init_app(app)
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    def record(self, user_id, status, ip_address=None, user_agent=None):
+        """
+        Enregistre une connexion (ou un accès) dans l'historique.
+
+        Args:
+            user_id (str): ID de l'utilisateur
+            status (str): success, failed, account_created, api_access...
+            ip_address (str): Adresse IP du client
+            user_agent (str): User-Agent du client
+        """
+        values = {
+            'user_id': user_id,
+            'ip_address': ip_address,
+            'status': status,
+            'timestamp': datetime.utcnow(),
+            '_user_agent': (user_agent or '')[:512]
+        }
+
+        if self.writer.running:
+            self.writer.enqueue(values)
+            return
+
+        db.session.add(LoginHistory(**self.enrich(values)))
+        db.session.commit()
+
+    def enrich(self, values):
+        """Résout appareil et localisation d'un enregistrement brut (idempotent)"""
+        if '_user_agent' not in values:
+            return values
+        values = dict(values)
+        values['device'] = self.device(values.pop('_user_agent'))
+        values['location'] = self.locate(values.get('ip_address'))
+        return values
+
+    def get_stats(self):
+        """Compteurs de l'écriture et taux de succès des caches"""
+        stats = self.writer.get_stats()
+        stats['geoip_cache'] = self.locate.cache_info()._asdict()
+        stats['user_agent_cache'] = self.device.cache_info()._asdict()
+        stats['geoip_available'] = self._reader is not None
+        return stats
+
+    # ------------------------------------------------------------------
+    # Géolocalisation
+    # ------------------------------------------------------------------
+
+    def _locate(self, ip_address):
+        """Localisation (ville, pays) d'une adresse IP"""
+        if not ip_address:
+            return UNKNOWN_LOCATION
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return UNKNOWN_LOCATION
+        if address.is_private or address.is_loopback:
+            return LOCAL_NETWORK
+
+        reader = self._get_reader()
+        if reader is None:
+            return UNKNOWN_LOCATION
+        try:
+            response = reader.city(ip_address)
+        except Exception:
+            return UNKNOWN_LOCATION
+        if response.city.name and response.country.name:
+            return f"{response.city.name}, {response.country.name}"
+        return UNKNOWN_LOCATION
+
+    def _get_reader(self):
+        """Lecteur GeoIP du processus (ouvert au premier besoin)"""
+        if self._reader is not None or self._reader_failed:
+            return self._reader
+
+        with self._reader_lock:
+            if self._reader is not None or self._reader_failed:
+                return self._reader
+
+            path = self.geoip_path
+            if not path and has_app_context():
+                path = current_app.config.get('GEOIP_DB_PATH')
+            path = path or DEFAULT_GEOIP_PATH
+
+            try:
+                import geoip2.database
+                self._reader = geoip2.database.Reader(path, mode=geoip2.database.MODE_MMAP)
+            except Exception as e:
+                logger.warning(f"Base GeoIP indisponible ({path}): {str(e)}")
+                self._reader_failed = True
+            return self._reader
+
+
+login_telemetry = None
+
+
+def get_login_telemetry():
+    """Récupère (ou crée) la télémétrie de connexion partagée"""
+    global login_telemetry
+    if login_telemetry is None:
+        login_telemetry = LoginTelemetry()
+    return login_telemetry
@@ -0,0 +1,162 @@
+# backend/app/services/organization_metrics_service.py
+import os
+import threading
+import time
+
+from sqlalchemy import case, func
+
+from ..models.organization import OrganizationDomain, OrganizationMember
+from app import db
+
+# Registre des métriques : nom -> (fonction organization_id -> valeur, sources invalidantes)
+METRICS = {}
+
+
+def register_metric(name, sources=None):
+    """
+    Déclare une métrique d'organisation.
+
+    Args:
+        name (str): Clé de la métrique dans la réponse
+        sources (tuple): Données dont la modification invalide la métrique (par défaut: le nom)
+
+    Usage:
+    @register_metric('interviews', sources=('interviews',))
+    def interview_metrics(organization_id):
+        ...
+    """
+    def decorator(provider):
+        METRICS[name] = (provider, tuple(sources or (name,)))
+        return provider
+    return decorator
+
+
+@register_metric('members')
+def member_metrics(organization_id):
+    rows = db.session.query(OrganizationMember.role, func.count(OrganizationMember.id)).filter(
+        OrganizationMember.organization_id == organization_id
+    ).group_by(OrganizationMember.role).all()
+
+    by_role = {'owner': 0, 'admin': 0, 'member': 0}
+    by_role.update({role: count for role, count in rows})
+    return {'total': sum(count for _, count in rows), 'by_role': by_role}
+
+
+@register_metric('domains')
+def domain_metrics(organization_id):
+    total, verified = db.session.query(
+        func.count(OrganizationDomain.id),
+        func.coalesce(func.sum(case((OrganizationDomain.is_verified == True, 1), else_=0)), 0)
+    ).filter(OrganizationDomain.organization_id == organization_id).one()
+    return {'total': total, 'verified': int(verified)}
+
+
+@register_metric('ai_assistants')
+def ai_assistant_metrics(organization_id):
+    from ..models.ai_assistant import AIAssistant
+    return db.session.query(func.count(AIAssistant.id)).filter(
+        AIAssistant.organization_id == organization_id
+    ).scalar()
+
+
+@register_metric('interviews')
+def interview_metrics(organization_id):
+    from ..models.interview_scheduling import InterviewSchedule
+    rows = db.session.query(InterviewSchedule.status, func.count(InterviewSchedule.id)).filter(
+        InterviewSchedule.organization_id == organization_id
+    ).group_by(InterviewSchedule.status).all()
+    return {'total': sum(count for _, count in rows), 'by_status': {status: count for status, count in rows}}
+
+
+@register_metric('applications', sources=('applications', 'job_postings'))
+def application_metrics(organization_id):
+    from ..models.job_posting import JobApplication, JobPosting
+    rows = db.session.query(JobApplication.status, func.count(JobApplication.id)).join(
+        JobPosting, JobPosting.id == JobApplication.job_posting_id
+    ).filter(
+        JobPosting.organization_id == str(organization_id)
+    ).group_by(JobApplication.status).all()
+    return {'total': sum(count for _, count in rows), 'by_status': {status: count for status, count in rows}}
+
+
+class OrganizationMetricsService:
+    """
+    Statistiques d'organisation mises en cache par organisation.
+
+    Chaque métrique est calculée par une requête groupée et conservée dans un
+    instantané par organisation. Les mutations invalident uniquement les
+    métriques concernées ; la durée de vie (ORG_METRICS_CACHE_TTL) borne la
+    fraîcheur des métriques sans point d'invalidation explicite.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or int(os.getenv('ORG_METRICS_CACHE_TTL', '300'))
+        self._snapshots = {}  # organization_id -> {metric: (valeur, expiration)}
+        self._lock = threading.Lock()
+
+    def get_stats(self, organization_id, metrics=None):
+        """
+        Récupère les statistiques d'une organisation.
+
+        Args:
+            organization_id: ID de l'organisation
+            metrics (list): Métriques demandées (par défaut: toutes)
+
+        Returns:
+            dict: Valeurs par nom de métrique
+        """
+        key = str(organization_id)
+        names = [name for name in (metrics or METRICS) if name in METRICS]
+        now = time.monotonic()
+
+        with self._lock:
+            snapshot = dict(self._snapshots.get(key, {}))
+
+        stats = {}
+        computed = {}
+        for name in names:
+            cached = snapshot.get(name)
+            if cached and cached[1] > now:
+                stats[name] = cached[0]
+                continue
+
+            value = METRICS[name][0](organization_id)
+            stats[name] = value
+            computed[name] = (value, now + self.ttl)
+
+        if computed:
+            with self._lock:
+                self._snapshots.setdefault(key, {}).update(computed)
+
+        return stats
+
+    def invalidate(self, organization_id, *sources):
+        """
+        Invalide les métriques d'une organisation.
+
+        Args:
+            organization_id: ID de l'organisation
+            sources: Données modifiées ('members', 'domains', ...) ; toutes si omis
+        """
+        key = str(organization_id)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return
+            if not sources:
+                del self._snapshots[key]
+                return
+            for name, (_, metric_sources) in METRICS.items():
+                if set(sources) & set(metric_sources):
+                    snapshot.pop(name, None)
+
+
+organization_metrics_service = None
+
+
+def get_organization_metrics_service():
+    """Récupère (ou crée) le service de métriques partagé"""
+    global organization_metrics_service
+    if organization_metrics_service is None:
+        organization_metrics_service = OrganizationMetricsService()
+    return organization_metrics_service
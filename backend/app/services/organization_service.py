@@ -7,6 +7,9 @@ from typing import List, Optional
 import uuid
 import re
 from app import db
+from .entitlement_cache import get_entitlement_cache
+from .tenant_cache import get_tenant_cache
+from .organization_metrics_service import get_organization_metrics_service
 
 class OrganizationService:
    
@@ -47,6 +50,8 @@ class OrganizationService:
             user.current_organization_id = organization.id
         
         db.session.commit()
+        get_organization_metrics_service().invalidate(organization.id)
+        get_entitlement_cache().invalidate_user(user_id)
         return organization
     
     def get_organization_by_id(self, organization_id: str) -> Optional[Organization]:
@@ -90,6 +95,10 @@ class OrganizationService:
         
         db.session.add(domain_entry)
         db.session.commit()
+        
+        # Le domaine a pu être mis en cache comme inconnu
+        get_tenant_cache().invalidate_host(domain)
+        get_organization_metrics_service().invalidate(organization_id, 'domains')
         return domain_entry
     
     def verify_domain(self, domain_id: str, token: str) -> bool:
@@ -104,6 +113,8 @@ class OrganizationService:
         if domain_entry.verification_token == token:
             domain_entry.is_verified = True
             db.session.commit()
+            get_tenant_cache().invalidate_host(domain_entry.domain)
+            get_organization_metrics_service().invalidate(domain_entry.organization_id, 'domains')
             return True
             
         return False
@@ -119,12 +130,12 @@ class OrganizationService:
 
     def get_organization_by_domain(self, domain: str) -> Optional[Organization]:
         """Obtient l'organisation correspondant à un domaine"""
-        domain_entry = db.session.query(OrganizationDomain).filter(
+        return db.session.query(Organization).join(
+            OrganizationDomain, OrganizationDomain.organization_id == Organization.id
+        ).filter(
             OrganizationDomain.domain == domain,
             OrganizationDomain.is_verified == True
         ).first()
-        
-        return domain_entry.organization if domain_entry else None
     
     def add_member(self, organization_id: str, user_id: str, role: str = "member") -> OrganizationMember:
         """Ajoute un membre à l'organisation"""
@@ -139,6 +150,7 @@ class OrganizationService:
             if existing.role != role:
                 existing.role = role
                 db.session.commit()
+                get_organization_metrics_service().invalidate(organization_id, 'members')
             return existing
         
         # Ajouter le nouveau membre
@@ -151,6 +163,9 @@ class OrganizationService:
         
         db.session.add(member)
         db.session.commit()
+        get_organization_metrics_service().invalidate(organization_id, 'members')
+        get_entitlement_cache().invalidate_user(user_id)
+        get_entitlement_cache().increment_usage('members', organization_id)
         return member
     
     def remove_member(self, organization_id: str, user_id: str) -> bool:
@@ -175,6 +190,9 @@ class OrganizationService:
         
         db.session.delete(member)
         db.session.commit()
+        get_organization_metrics_service().invalidate(organization_id, 'members')
+        get_entitlement_cache().invalidate_user(user_id)
+        get_entitlement_cache().increment_usage('members', organization_id, -1)
         return True
     
     def update_member_role(self, organization_id: str, user_id: str, new_role: str) -> bool:
@@ -199,6 +217,7 @@ class OrganizationService:
         
         member.role = new_role
         db.session.commit()
+        get_organization_metrics_service().invalidate(organization_id, 'members')
         return True
     
     def update_organization(self, organization_id: str, name: str = None, logo_url: str = None, 
@@ -221,4 +240,5 @@ class OrganizationService:
             organization.is_active = is_active
             
         db.session.commit()
+        get_tenant_cache().invalidate_organization(organization.id)
         return organization
\ No newline at end of file
@@ -0,0 +1,240 @@
+# backend/app/services/password_hasher.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import eventlet
+    from eventlet import tpool
+    from eventlet.semaphore import Semaphore as GreenSemaphore
+except ImportError:
+    eventlet = None
+
+logger = logging.getLogger(__name__)
+
+# Bornes de la calibration (coût plancher = valeurs par défaut de werkzeug)
+SCRYPT_MIN_COST = 2 ** 15
+SCRYPT_MAX_COST = 2 ** 17
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+PBKDF2_MIN_ITERATIONS = 600000
+PBKDF2_MAX_ITERATIONS = 5000000
+
+# Mot de passe de référence pour égaliser le temps de réponse des comptes inexistants
+_DUMMY_PASSWORD = 'password-timing-equalizer'
+
+
+class PasswordHasherBusy(Exception):
+    """Trop de calculs de mots de passe en attente (afflux de tentatives de connexion)"""
+
+
+class PasswordHashingService:
+    """
+    Hachage et vérification des mots de passe hors de la boucle d'événements.
+
+    Le KDF (scrypt ou PBKDF2-SHA256 de werkzeug) s'exécute dans des threads
+    natifs : pool tpool d'eventlet quand eventlet est présent (le hub continue
+    de servir les sockets pendant le calcul), sinon un ThreadPoolExecutor
+    (hashlib relâche le GIL). Un sémaphore limite les calculs simultanés ;
+    au-delà de PASSWORD_HASH_QUEUE_TIMEOUT secondes d'attente, l'appel échoue
+    avec PasswordHasherBusy plutôt que d'accumuler la charge. Le coût est
+    calibré au premier usage pour viser PASSWORD_HASH_TARGET_MS par calcul,
+    sans descendre sous les valeurs par défaut de werkzeug ; les hachages de
+    coût inférieur (ou d'un autre algorithme) sont recalculés à la connexion.
+    """
+
+    def __init__(self, method=None, cost=None, target_ms=None, concurrency=None, queue_timeout=None, backend=None):
+        self.method = (method or os.getenv('PASSWORD_HASH_METHOD', 'scrypt')).lower()
+        if self.method not in ('scrypt', 'pbkdf2'):
+            raise ValueError(f"Méthode de hachage non prise en charge: {self.method}")
+
+        self.target_ms = target_ms or float(os.getenv('PASSWORD_HASH_TARGET_MS', '250'))
+        self.concurrency = concurrency or int(os.getenv('PASSWORD_HASH_CONCURRENCY', '0')) or max(1, (os.cpu_count() or 2) // 2)
+        self.queue_timeout = queue_timeout or float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))
+
+        backend = (backend or os.getenv('PASSWORD_HASH_BACKEND', 'auto')).lower()
+        if backend == 'auto':
+            backend = 'eventlet' if eventlet is not None else 'thread'
+        if backend == 'eventlet' and eventlet is None:
+            raise ValueError("Le backend eventlet nécessite le paquet eventlet")
+        self.backend = backend
+
+        # Sous eventlet, seules des primitives vertes peuvent attendre sans bloquer le hub
+        if backend == 'eventlet':
+            self._slots = GreenSemaphore(self.concurrency)
+            self._cost_lock = GreenSemaphore(1)
+            self._executor = None
+        else:
+            self._slots = threading.BoundedSemaphore(self.concurrency)
+            self._cost_lock = threading.Lock()
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='password-hasher')
+
+        configured_cost = cost or int(os.getenv('PASSWORD_HASH_COST', '0'))
+        self._cost = self._clamp(configured_cost) if configured_cost else None
+        self._dummy_hash = None
+
+        self._stats_lock = threading.Lock()
+        self.stats = {'hashes': 0, 'verifications': 0, 'rehashes': 0, 'rejected_busy': 0, 'in_flight': 0}
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def hash(self, password):
+        """Hache un mot de passe avec la méthode et le coût courants"""
+        self._count('hashes')
+        return self._execute(generate_password_hash, password, self.current_method())
+
+    def verify(self, password_hash, password):
+        """Vérifie un mot de passe"""
+        self._count('verifications')
+        if not password_hash:
+            return False
+        return self._execute(check_password_hash, password_hash, password)
+
+    def verify_and_update(self, password_hash, password):
+        """
+        Vérifie un mot de passe et prépare un nouveau hachage si ses paramètres sont dépassés.
+
+        Returns:
+            tuple: (valide, nouveau hachage ou None)
+        """
+        if not self.verify(password_hash, password):
+            return False, None
+        if not self.needs_rehash(password_hash):
+            return True, None
+
+        self._count('rehashes')
+        return True, self.hash(password)
+
+    def verify_dummy(self, password):
+        """Vérification factice (compte inexistant) : même coût qu'une vraie vérification"""
+        if self._dummy_hash is None:
+            self._dummy_hash = self._execute(generate_password_hash, _DUMMY_PASSWORD, self.current_method())
+        self.verify(self._dummy_hash, password)
+        return False
+
+    def needs_rehash(self, password_hash):
+        """Le hachage utilise un autre algorithme ou un coût inférieur au coût courant"""
+        method = (password_hash or '').split('$', 1)[0]
+        parts = method.split(':')
+        cost = self.current_cost()
+
+        try:
+            if self.method == 'scrypt':
+                return parts[0] != 'scrypt' or int(parts[1]) < cost
+            return parts[0] != 'pbkdf2' or parts[1] != 'sha256' or int(parts[2]) < cost
+        except (IndexError, ValueError):
+            return True
+
+    def current_method(self):
+        """Chaîne de méthode werkzeug (ex. scrypt:65536:8:1)"""
+        cost = self.current_cost()
+        if self.method == 'scrypt':
+            return f'scrypt:{cost}:{SCRYPT_BLOCK_SIZE}:{SCRYPT_PARALLELISM}'
+        return f'pbkdf2:sha256:{cost}'
+
+    def current_cost(self):
+        """Coût configuré ou calibré (calibration au premier appel)"""
+        if self._cost is None:
+            with self._cost_lock:
+                if self._cost is None:
+                    self._cost = self._execute(self._calibrate, acquire=False)
+                    logger.info(f"Coût de hachage des mots de passe calibré: {self.method} {self._cost}")
+        return self._cost
+
+    def sleep(self, seconds):
+        """Pause coopérative (ne bloque pas le hub eventlet)"""
+        if self.backend == 'eventlet':
+            eventlet.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update({
+            'method': self.current_method(),
+            'backend': self.backend,
+            'concurrency': self.concurrency
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    def _execute(self, function, *args, acquire=True):
+        if acquire:
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                self._count('rejected_busy')
+                raise PasswordHasherBusy("Trop de vérifications de mots de passe en cours, veuillez réessayer.")
+            self._count('in_flight')
+
+        try:
+            if self.backend == 'eventlet':
+                return tpool.execute(function, *args)
+            return self._executor.submit(function, *args).result()
+        finally:
+            if acquire:
+                self._count('in_flight', -1)
+                self._slots.release()
+
+    # ------------------------------------------------------------------
+    # Calibration
+    # ------------------------------------------------------------------
+
+    def _calibrate(self):
+        """Coût visant target_ms sur cette machine (exécuté dans un thread natif)"""
+        salt = os.urandom(16)
+        target = self.target_ms / 1000
+
+        if self.method == 'scrypt':
+            probe = 2 ** 14
+            elapsed = self._time(lambda: hashlib.scrypt(
+                b'calibration', salt=salt, n=probe, r=SCRYPT_BLOCK_SIZE, p=SCRYPT_PARALLELISM,
+                maxmem=132 * probe * SCRYPT_BLOCK_SIZE * SCRYPT_PARALLELISM
+            ))
+            cost = probe
+            # Le temps de scrypt est linéaire en n : plus grande puissance de 2 sous la cible
+            while cost * 2 <= SCRYPT_MAX_COST and elapsed * (cost * 2 / probe) <= target:
+                cost *= 2
+            return self._clamp(cost)
+
+        probe = 100000
+        elapsed = self._time(lambda: hashlib.pbkdf2_hmac('sha256', b'calibration', salt, probe))
+        cost = int(probe * target / elapsed) // 10000 * 10000 if elapsed > 0 else PBKDF2_MIN_ITERATIONS
+        return self._clamp(cost)
+
+    def _clamp(self, cost):
+        if self.method == 'scrypt':
+            # n doit être une puissance de 2
+            cost = 1 << max(cost - 1, 1).bit_length()
+            return min(max(cost, SCRYPT_MIN_COST), SCRYPT_MAX_COST)
+        return min(max(cost, PBKDF2_MIN_ITERATIONS), PBKDF2_MAX_ITERATIONS)
+
+    @staticmethod
+    def _time(function):
+        started = time.perf_counter()
+        function()
+        return time.perf_counter() - started
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+
+password_hasher = None
+
+
+def get_password_hasher():
+    """Récupère (ou crée) le service de hachage des mots de passe partagé"""
+    global password_hasher
+    if password_hasher is None:
+        password_hasher = PasswordHashingService()
+    return password_hasher
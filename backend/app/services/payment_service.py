@@ -5,6 +5,7 @@ from flask import current_app
 from ..models.subscription import Subscription
 from ..models.payment import Payment
 from ..models.plan import Plan
+from .entitlement_cache import get_entitlement_cache
 from app import db
 
 class PaymentService:
@@ -106,6 +107,7 @@ class PaymentService:
         
         db.session.add(subscription)
         db.session.commit()
+        get_entitlement_cache().invalidate_subscription(subscription)
         
         return subscription, stripe_subscription
     
@@ -124,6 +126,7 @@ class PaymentService:
             
             subscription.status = 'canceled'
             db.session.commit()
+            get_entitlement_cache().invalidate_subscription(subscription)
             
             return subscription
         except stripe.error.StripeError as e:
@@ -131,16 +134,31 @@ class PaymentService:
             raise e
     
     def process_webhook_event(self, payload, sig_header):
-        """Traite les événements webhook de Stripe"""
+        """Vérifie et traite immédiatement un événement webhook de Stripe"""
         try:
-            event = stripe.Webhook.construct_event(
-                payload, sig_header, current_app.config['STRIPE_WEBHOOK_SECRET']
-            )
+            event = self.construct_webhook_event(payload, sig_header)
         except ValueError as e:
             return {"error": "Invalid payload"}
         except stripe.error.SignatureVerificationError as e:
             return {"error": "Invalid signature"}
         
+        return self.handle_webhook_event(event)
+    
+    @staticmethod
+    def construct_webhook_event(payload, sig_header):
+        """
+        Vérifie la signature d'un webhook et décode l'événement
+        
+        Raises:
+            ValueError: Corps invalide
+            stripe.error.SignatureVerificationError: Signature invalide
+        """
+        return stripe.Webhook.construct_event(
+            payload, sig_header, current_app.config['STRIPE_WEBHOOK_SECRET']
+        )
+    
+    def handle_webhook_event(self, event):
+        """Applique un événement Stripe vérifié (rejouable sans double écriture)"""
         # Traiter différents types d'événements
         if event['type'] == 'invoice.payment_succeeded':
             return self._handle_payment_succeeded(event)
@@ -165,6 +183,10 @@ class PaymentService:
         if not subscription:
             return {"error": "Subscription not found"}
         
+        # Facture déjà enregistrée (livraison répétée de l'événement)
+        if Payment.query.filter_by(external_payment_id=invoice.get('id')).first():
+            return {"status": "Payment already recorded"}
+        
         # Créer un paiement
         payment = Payment(
             user_id=subscription.user_id,
@@ -186,6 +208,7 @@ class PaymentService:
             subscription.end_date = datetime.utcnow() + timedelta(days=365)
         
         db.session.commit()
+        get_entitlement_cache().invalidate_subscription(subscription)
         
         return {"status": "Payment recorded successfully"}
     
@@ -203,5 +226,6 @@ class PaymentService:
         
         subscription.status = 'expired'
         db.session.commit()
+        get_entitlement_cache().invalidate_subscription(subscription)
         
         return {"status": "Subscription marked as expired"}
\ No newline at end of file
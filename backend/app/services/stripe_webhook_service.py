@@ -0,0 +1,317 @@
+# backend/app/services/stripe_webhook_service.py
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from ..models.payment import StripeWebhookEvent
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Statuts d'un événement pas encore terminé (bloquent les suivants du même customer)
+UNFINISHED_STATUSES = ('pending', 'processing', 'failed')
+
+
+def event_customer(event):
+    """Customer Stripe concerné par un événement (clé d'ordonnancement)"""
+    obj = (event.get('data') or {}).get('object') or {}
+    if obj.get('object') == 'customer':
+        return obj.get('id')
+    customer = obj.get('customer')
+    if isinstance(customer, dict):
+        return customer.get('id')
+    return customer
+
+
+class StripeWebhookProcessor:
+    """
+    Ingestion et traitement différé des webhooks Stripe.
+
+    La requête webhook vérifie la signature, enregistre le corps brut
+    (l'ID de l'événement est la clé primaire : une nouvelle livraison est
+    ignorée) et répond immédiatement. Un thread dédié applique ensuite les
+    événements via PaymentService, dans l'ordre de création Stripe pour un
+    même customer : un événement n'est traité que lorsque les précédents
+    du même customer sont terminés. Les échecs sont retentés avec un délai
+    exponentiel, puis marqués 'dead' après STRIPE_WEBHOOK_MAX_ATTEMPTS (un
+    événement 'dead' ne bloque plus son customer ; il peut être remis en
+    file avec requeue).
+
+    Plusieurs processus peuvent faire tourner le thread : un événement est
+    réservé par une mise à jour conditionnelle de son statut ; une
+    réservation plus ancienne que STRIPE_WEBHOOK_LOCK_TIMEOUT (processus
+    arrêté en cours de traitement) est reprise.
+    """
+
+    def __init__(self, batch_size=None, poll_interval=None, max_attempts=None, retry_delay=None,
+                 max_retry_delay=None, lock_timeout=None):
+        self.batch_size = batch_size or int(os.getenv('STRIPE_WEBHOOK_BATCH_SIZE', '50'))
+        self.poll_interval = poll_interval or float(os.getenv('STRIPE_WEBHOOK_POLL_INTERVAL', '5'))
+        self.max_attempts = max_attempts or int(os.getenv('STRIPE_WEBHOOK_MAX_ATTEMPTS', '8'))
+        self.retry_delay = retry_delay or float(os.getenv('STRIPE_WEBHOOK_RETRY_DELAY', '30'))
+        self.max_retry_delay = max_retry_delay or float(os.getenv('STRIPE_WEBHOOK_MAX_RETRY_DELAY', '3600'))
+        self.lock_timeout = lock_timeout or float(os.getenv('STRIPE_WEBHOOK_LOCK_TIMEOUT', '300'))
+        self.scan_limit = int(os.getenv('STRIPE_WEBHOOK_SCAN_LIMIT', '1000'))
+
+        self.app = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {'received': 0, 'duplicates': 0, 'processed': 0, 'retried': 0, 'dead': 0}
+
+    def init_app(self, app):
+        """Démarre le thread de traitement pour l'application"""
+        self.app = app
+        if self.running:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='stripe-webhook-worker', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=10):
+        """Arrête le thread de traitement"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Ingestion (requête webhook)
+    # ------------------------------------------------------------------
+
+    def ingest(self, payload, sig_header):
+        """
+        Vérifie et enregistre un événement webhook.
+
+        Args:
+            payload (bytes): Corps brut de la requête
+            sig_header (str): En-tête Stripe-Signature
+
+        Returns:
+            tuple: (ID de l'événement, True s'il avait déjà été reçu)
+
+        Raises:
+            ValueError: Corps invalide
+            stripe.error.SignatureVerificationError: Signature invalide
+        """
+        from .payment_service import PaymentService
+
+        event = PaymentService.construct_webhook_event(payload, sig_header)
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8')
+
+        record = StripeWebhookEvent(
+            id=event['id'],
+            type=event['type'],
+            customer_id=event_customer(event),
+            payload=payload,
+            stripe_created_at=datetime.utcfromtimestamp(event.get('created') or time.time()),
+            received_at=datetime.utcnow(),
+            status='pending'
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            self._count('duplicates')
+            return event['id'], True
+
+        self._count('received')
+        if self.running:
+            self._wakeup.set()
+        else:
+            # Pas de thread (scripts, tests) : traitement immédiat
+            self.process_pending()
+        return event['id'], False
+
+    # ------------------------------------------------------------------
+    # Traitement
+    # ------------------------------------------------------------------
+
+    def process_pending(self, limit=None):
+        """
+        Traite les événements prêts, en tête de file de leur customer.
+
+        Returns:
+            int: Nombre d'événements traités (avec ou sans succès)
+        """
+        handled = 0
+        for event_id in self._ready_events(limit or self.batch_size):
+            if self._claim(event_id):
+                self._process(event_id)
+                handled += 1
+        return handled
+
+    def requeue(self, statuses=('dead',), event_ids=None):
+        """Remet en file des événements terminés en échec (ou désignés)"""
+        query = StripeWebhookEvent.query
+        if event_ids:
+            query = query.filter(StripeWebhookEvent.id.in_(event_ids))
+        else:
+            query = query.filter(StripeWebhookEvent.status.in_(statuses))
+        count = query.update({
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': None,
+            'locked_at': None
+        }, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def purge(self, retain_days=None):
+        """Supprime les événements traités plus anciens que retain_days"""
+        retain_days = retain_days or int(os.getenv('STRIPE_WEBHOOK_RETENTION_DAYS', '90'))
+        cutoff = datetime.utcnow() - timedelta(days=retain_days)
+        count = StripeWebhookEvent.query.filter(
+            StripeWebhookEvent.status == 'processed',
+            StripeWebhookEvent.processed_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def get_stats(self):
+        """Compteurs du processus et profondeur de la file par statut"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        rows = db.session.query(StripeWebhookEvent.status, db.func.count(StripeWebhookEvent.id)).filter(
+            StripeWebhookEvent.status != 'processed'
+        ).group_by(StripeWebhookEvent.status).all()
+        stats['queue'] = {status: count for status, count in rows}
+        stats['running'] = self.running
+        return stats
+
+    # ------------------------------------------------------------------
+    # Boucle de traitement
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    # Vider la file tant que des lots complets sont traités
+                    while not self._stopping.is_set() and self.process_pending() >= self.batch_size:
+                        pass
+            except Exception as e:
+                logger.error(f"Échec du traitement des webhooks Stripe: {str(e)}")
+
+    def _ready_events(self, limit):
+        """IDs des événements prêts : premier événement non terminé de chaque customer"""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lock_timeout)
+
+        rows = db.session.query(
+            StripeWebhookEvent.id,
+            StripeWebhookEvent.customer_id,
+            StripeWebhookEvent.status,
+            StripeWebhookEvent.next_attempt_at,
+            StripeWebhookEvent.locked_at
+        ).filter(
+            StripeWebhookEvent.status.in_(UNFINISHED_STATUSES)
+        ).order_by(
+            StripeWebhookEvent.stripe_created_at,
+            StripeWebhookEvent.received_at,
+            StripeWebhookEvent.id
+        ).limit(self.scan_limit).all()
+
+        ready = []
+        seen_customers = set()
+        for event_id, customer_id, status, next_attempt_at, locked_at in rows:
+            if customer_id:
+                if customer_id in seen_customers:
+                    continue
+                seen_customers.add(customer_id)
+
+            if status == 'processing' and locked_at and locked_at > stale:
+                continue
+            if status == 'failed' and next_attempt_at and next_attempt_at > now:
+                continue
+
+            ready.append(event_id)
+            if len(ready) >= limit:
+                break
+        return ready
+
+    def _claim(self, event_id):
+        """Réserve un événement (mise à jour conditionnelle, sûre entre processus)"""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lock_timeout)
+        claimed = StripeWebhookEvent.query.filter(
+            StripeWebhookEvent.id == event_id,
+            db.or_(
+                StripeWebhookEvent.status.in_(('pending', 'failed')),
+                db.and_(StripeWebhookEvent.status == 'processing', StripeWebhookEvent.locked_at <= stale)
+            )
+        ).update({'status': 'processing', 'locked_at': now}, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _process(self, event_id):
+        from .payment_service import PaymentService
+
+        record = StripeWebhookEvent.query.get(event_id)
+        try:
+            result = PaymentService().handle_webhook_event(json.loads(record.payload))
+        except Exception as e:
+            db.session.rollback()
+            self._fail(event_id, e)
+            return
+
+        record.status = 'processed'
+        record.attempts += 1
+        record.result = result
+        record.processed_at = datetime.utcnow()
+        record.locked_at = None
+        record.last_error = None
+        db.session.commit()
+        self._count('processed')
+
+    def _fail(self, event_id, error):
+        record = StripeWebhookEvent.query.get(event_id)
+        record.attempts += 1
+        record.locked_at = None
+        record.last_error = str(error)[:2000]
+
+        if record.attempts >= self.max_attempts:
+            record.status = 'dead'
+            self._count('dead')
+            logger.error(f"Webhook Stripe {event_id} abandonné après {record.attempts} tentatives: {str(error)}")
+        else:
+            delay = min(self.retry_delay * 2 ** (record.attempts - 1), self.max_retry_delay)
+            record.status = 'failed'
+            record.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            self._count('retried')
+            logger.warning(f"Webhook Stripe {event_id} en échec (tentative {record.attempts}): {str(error)}")
+        db.session.commit()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+
+stripe_webhook_processor = None
+
+
+def get_stripe_webhook_processor():
+    """Récupère (ou crée) le processeur de webhooks Stripe partagé"""
+    global stripe_webhook_processor
+    if stripe_webhook_processor is None:
+        stripe_webhook_processor = StripeWebhookProcessor()
+    return stripe_webhook_processor
@@ -4,6 +4,7 @@ from ..models.organization import Organization, OrganizationMember
 from ..models.subscription import Subscription
 from ..models.plan import Plan, PlanFeature
 from datetime import datetime, timedelta
+from .entitlement_cache import get_entitlement_cache
 from app import db
 
 class SubscriptionService:
@@ -41,35 +42,48 @@ class SubscriptionService:
             status='active'
         ).order_by(Subscription.end_date.desc()).first()
     
-    def get_user_plan(self, user_id):
-        """Récupère le plan d'abonnement d'un utilisateur via son organisation"""
+    def resolve_user_plan(self, user_id):
+        """
+        Résout le plan d'un utilisateur depuis la base (sans cache)
+        
+        Returns:
+            tuple: (nom du plan, ID de l'organisation consultée ou None)
+        """
         # Priorité à l'abonnement personnel
         subscription = self.get_user_subscription(user_id)
         if subscription and subscription.plan:
-            return subscription.plan.name
+            return subscription.plan.name, None
         
         # Sinon, vérifier l'abonnement de l'organisation
         organization = self.get_organization_for_user(user_id)
         if not organization:
-            return 'freemium'
+            return 'freemium', None
         
         org_subscription = self.get_organization_subscription(organization.id)
         if org_subscription and org_subscription.plan:
-            return org_subscription.plan.name
+            return org_subscription.plan.name, str(organization.id)
         
-        return 'freemium'
+        return 'freemium', str(organization.id)
+    
+    def get_user_entitlements(self, user_id):
+        """Plan, fonctionnalités et limites d'un utilisateur (instantané en cache)"""
+        return get_entitlement_cache().get('user', user_id, self._load_user_entitlements)
+    
+    def get_organization_entitlements(self, organization_id):
+        """Plan et limites d'une organisation (instantané en cache, plan None si elle n'existe pas)"""
+        return get_entitlement_cache().get('organization', organization_id, self._load_organization_entitlements)
+    
+    def get_user_plan(self, user_id):
+        """Récupère le plan d'abonnement d'un utilisateur via son organisation"""
+        return self.get_user_entitlements(user_id)['plan']
     
     def has_feature(self, user_id, feature_name):
         """Vérifie si un utilisateur a accès à une fonctionnalité spécifique"""
-        plan_name = self.get_user_plan(user_id)
-        
-        # Vérifier si la fonctionnalité est incluse dans le plan
-        return feature_name in self.PLAN_FEATURES.get(plan_name, [])
+        return feature_name in self.get_user_entitlements(user_id)['features']
     
     def get_user_features(self, user_id):
         """Récupère toutes les fonctionnalités disponibles pour un utilisateur"""
-        plan_name = self.get_user_plan(user_id)
-        return self.PLAN_FEATURES.get(plan_name, [])
+        return self.get_user_entitlements(user_id)['features']
     
     def upgrade_plan(self, organization_id, new_plan_name, billing_cycle='monthly'):
         """Met à jour le plan d'abonnement d'une organisation"""
@@ -110,6 +124,7 @@ class SubscriptionService:
         
         db.session.add(new_subscription)
         db.session.commit()
+        get_entitlement_cache().invalidate_organization(organization_id)
         
         return new_subscription
     
@@ -142,33 +157,49 @@ class SubscriptionService:
     
     def check_interview_limit(self, user_id):
         """Vérifie si l'utilisateur a atteint sa limite d'entretiens mensuelle"""
-        from ..models.interview_scheduling import InterviewSchedule
-        
-        # Récupérer le plan et les limites
-        plan_name = self.get_user_plan(user_id)
-        limits = self.get_plan_limits(plan_name)
-        
-        monthly_limit = limits['monthly_interviews']
+        monthly_limit = self.get_user_entitlements(user_id)['limits']['monthly_interviews']
         if monthly_limit < 0:  # -1 signifie illimité
             return True
         
-        # Calculer la date de début du mois courant
-        now = datetime.utcnow()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        # Compter les entretiens du mois
-        interview_count = InterviewSchedule.query.filter(
-            InterviewSchedule.recruiter_id == user_id,
-            InterviewSchedule.created_at >= start_of_month
-        ).count()
+        # Compteur du mois courant (initialisé par un COUNT au premier appel)
+        interview_count = get_entitlement_cache().usage(
+            'interviews', user_id, self._count_monthly_interviews, monthly=True
+        )
         
         return interview_count < monthly_limit
     
     def check_member_limit(self, organization_id):
         """Vérifie si l'organisation a atteint sa limite de membres"""
+        entitlements = self.get_organization_entitlements(organization_id)
+        if entitlements['plan'] is None:
+            return False
+        
+        max_members = entitlements['limits']['max_members']
+        if max_members < 0:  # -1 signifie illimité
+            return True
+        
+        # Membres et invitations en cours
+        total_count = get_entitlement_cache().usage('members', organization_id, self._count_seats)
+        
+        return total_count < max_members
+    
+    # ------------------------------------------------------------------
+    # Chargement des droits et compteurs (cache manquant)
+    # ------------------------------------------------------------------
+    
+    def _load_user_entitlements(self, user_id):
+        plan_name, organization_id = self.resolve_user_plan(user_id)
+        return {
+            'plan': plan_name,
+            'features': self.PLAN_FEATURES.get(plan_name, []),
+            'limits': self.get_plan_limits(plan_name),
+            'organization_id': organization_id
+        }
+    
+    def _load_organization_entitlements(self, organization_id):
         organization = Organization.query.get(organization_id)
         if not organization:
-            return False
+            return {'plan': None, 'features': [], 'limits': {}, 'organization_id': str(organization_id)}
         
         # Récupérer l'abonnement de l'organisation
         org_subscription = self.get_organization_subscription(organization_id)
@@ -177,23 +208,38 @@ class SubscriptionService:
         else:
             plan_name = org_subscription.plan.name
         
-        limits = self.get_plan_limits(plan_name)
-        max_members = limits['max_members']
+        return {
+            'plan': plan_name,
+            'features': self.PLAN_FEATURES.get(plan_name, []),
+            'limits': self.get_plan_limits(plan_name),
+            'organization_id': str(organization_id)
+        }
+    
+    @staticmethod
+    def _count_monthly_interviews(user_id):
+        from ..models.interview_scheduling import InterviewSchedule
         
-        if max_members < 0:  # -1 signifie illimité
-            return True
+        # Calculer la date de début du mois courant
+        now = datetime.utcnow()
+        start_of_month = datetime(now.year, now.month, 1)
+        
+        return InterviewSchedule.query.filter(
+            InterviewSchedule.recruiter_id == user_id,
+            InterviewSchedule.created_at >= start_of_month
+        ).count()
+    
+    @staticmethod
+    def _count_seats(organization_id):
+        from ..models.invitation import Invitation
         
         current_members = OrganizationMember.query.filter_by(
             organization_id=organization_id
         ).count()
         
         # Inclure également les invitations en cours
-        from ..models.invitation import Invitation
         invitations_count = Invitation.query.filter_by(
             organization_id=organization_id,
             status='pending'
         ).count()
         
-        total_count = current_members + invitations_count
-        
-        return total_count < max_members
\ No newline at end of file
+        return current_members + invitations_count
\ No newline at end of file
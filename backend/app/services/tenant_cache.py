@@ -0,0 +1,213 @@
+# backend/app/services/tenant_cache.py
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import redis
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'tenant_cache:invalidate'
+
+
+class TenantResolutionCache:
+    """
+    Cache local au processus de la résolution domaine -> organisation.
+
+    Chaque entrée conserve une copie détachée de l'organisation (colonnes
+    uniquement) ; elle est rattachée à la session de la requête avec
+    `merge(load=False)`, sans requête SQL. Les domaines inconnus sont aussi
+    mis en cache (cache négatif) avec une durée plus courte.
+
+    Les invalidations peuvent être diffusées aux autres workers via Redis
+    pub/sub (TENANT_CACHE_PUBSUB=true).
+    """
+
+    def __init__(self, ttl=None, negative_ttl=None, max_entries=None):
+        self.ttl = ttl or int(os.getenv('TENANT_CACHE_TTL', '300'))
+        self.negative_ttl = negative_ttl or int(os.getenv('TENANT_CACHE_NEGATIVE_TTL', '30'))
+        self.max_entries = max_entries or int(os.getenv('TENANT_CACHE_MAX_ENTRIES', '10000'))
+        self.pubsub_enabled = os.getenv('TENANT_CACHE_PUBSUB', 'false').lower() == 'true'
+
+        self._entries = OrderedDict()  # host -> (organisation détachée ou None, expiration)
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener = None
+        self._origin = uuid.uuid4().hex
+        self._generation = 0  # incrémenté à chaque invalidation
+        self.stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'invalidations': 0}
+
+    def get_organization(self, host, loader):
+        """
+        Résout un domaine en organisation, attachée à la session courante.
+
+        Args:
+            host (str): Nom d'hôte sans port
+            loader (callable): Fonction host -> Organization ou None, appelée en cas d'absence
+
+        Returns:
+            Organization: Organisation du domaine, ou None si le domaine est inconnu
+        """
+        host = host.lower()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(host)
+                snapshot = entry[0]
+                if snapshot is None:
+                    self.stats['negative_hits'] += 1
+                    return None
+                self.stats['hits'] += 1
+            else:
+                snapshot = None
+                entry = None
+                generation = self._generation
+                self.stats['misses'] += 1
+
+        if entry:
+            return db.session.merge(snapshot, load=False)
+
+        organization = loader(host)
+        self._store(host, organization, generation)
+        return organization
+
+    def invalidate_host(self, host, broadcast=True):
+        """Supprime l'entrée d'un domaine"""
+        if not host:
+            return
+        with self._lock:
+            self._entries.pop(host.lower(), None)
+            self._generation += 1
+            self.stats['invalidations'] += 1
+        if broadcast:
+            self._publish({'host': host.lower()})
+
+    def invalidate_organization(self, organization_id, broadcast=True):
+        """Supprime toutes les entrées pointant vers une organisation"""
+        organization_id = str(organization_id)
+        with self._lock:
+            hosts = [
+                host for host, (snapshot, _) in self._entries.items()
+                if snapshot is not None and str(snapshot.id) == organization_id
+            ]
+            for host in hosts:
+                del self._entries[host]
+            self._generation += 1
+            self.stats['invalidations'] += 1
+        if broadcast:
+            self._publish({'organization_id': organization_id})
+
+    def clear(self, broadcast=True):
+        """Vide entièrement le cache"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.stats['invalidations'] += 1
+        if broadcast:
+            self._publish({'all': True})
+
+    def get_stats(self):
+        """Statistiques du cache"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'pubsub': self._listener is not None}
+
+    # ------------------------------------------------------------------
+    # Diffusion Redis
+    # ------------------------------------------------------------------
+
+    def start_listener(self, app):
+        """Démarre l'écoute des invalidations des autres workers"""
+        if not self.pubsub_enabled or self._listener:
+            return
+
+        try:
+            self._redis = redis.Redis(
+                host=app.config.get('REDIS_HOST', 'localhost'),
+                port=app.config.get('REDIS_PORT', 6379),
+                db=app.config.get('REDIS_DB', 0),
+                decode_responses=True
+            )
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+        except redis.RedisError as e:
+            logger.warning(f"Invalidation distribuée du cache tenant indisponible: {str(e)}")
+            self._redis = None
+            return
+
+        self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True, name='tenant-cache-listener')
+        self._listener.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            try:
+                payload = json.loads(message['data'])
+            except (TypeError, ValueError):
+                continue
+
+            if payload.get('origin') == self._origin:
+                continue
+
+            if payload.get('all'):
+                self.clear(broadcast=False)
+            elif payload.get('organization_id'):
+                self.invalidate_organization(payload['organization_id'], broadcast=False)
+            elif payload.get('host'):
+                self.invalidate_host(payload['host'], broadcast=False)
+
+    def _publish(self, payload):
+        if not self._redis:
+            return
+        try:
+            self._redis.publish(INVALIDATION_CHANNEL, json.dumps({**payload, 'origin': self._origin}))
+        except redis.RedisError as e:
+            logger.warning(f"Échec de diffusion de l'invalidation tenant: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Méthodes internes
+    # ------------------------------------------------------------------
+
+    def _store(self, host, organization, generation):
+        if organization is None:
+            snapshot, ttl = None, self.negative_ttl
+        else:
+            snapshot, ttl = self._snapshot(organization), self.ttl
+
+        with self._lock:
+            # Une invalidation pendant le chargement rend le résultat potentiellement périmé
+            if generation != self._generation:
+                return
+            self._entries[host] = (snapshot, time.monotonic() + ttl)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _snapshot(self, organization):
+        """Copie détachée des colonnes d'une organisation"""
+        mapper = sa_inspect(organization).mapper
+        snapshot = mapper.class_(**{
+            attr.key: getattr(organization, attr.key)
+            for attr in mapper.column_attrs
+        })
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+
+tenant_cache = None
+
+
+def get_tenant_cache():
+    """Récupère (ou crée) le cache de résolution des tenants"""
+    global tenant_cache
+    if tenant_cache is None:
+        tenant_cache = TenantResolutionCache()
+    return tenant_cache
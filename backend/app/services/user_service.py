@@ -5,7 +5,7 @@ from ..models.login_history import LoginHistory
 from ..models.notification_setting import NotificationPreference
 from ..models.two_factor_auth import TwoFactorAuth
 from ..models.organization import OrganizationMember
-from werkzeug.security import generate_password_hash, check_password_hash
+from .password_hasher import get_password_hasher
 from werkzeug.utils import secure_filename
 import datetime
 import os
@@ -171,7 +171,8 @@ class UserService:
                 return False, "Utilisateur non trouvé", None
             
             # Vérifier le mot de passe actuel
-            if not check_password_hash(user.password, current_password):
+            hasher = get_password_hasher()
+            if not hasher.verify(user.password, current_password):
                 return False, "Mot de passe actuel incorrect", None
             
             # Valider le nouveau mot de passe
@@ -179,7 +180,7 @@ class UserService:
                 return False, "Le nouveau mot de passe doit contenir au moins 8 caractères", None
             
             # Mettre à jour le mot de passe
-            user.password = generate_password_hash(new_password)
+            user.password = hasher.hash(new_password)
             user.last_password_change = datetime.datetime.now()
             user.updated_at = datetime.datetime.now()
             db.session.commit()
@@ -0,0 +1,28 @@
+"""Nombre de chunks indexés par document d'assistant (ai_assistant_documents)
+
+Revision ID: 0e301d8644bd
+Revises: 7a017cd6f3bf
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e301d8644bd'
+down_revision = '7a017cd6f3bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Documents existants : 0 jusqu'à leur prochaine indexation
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('ai_assistant_documents')}
+    if 'chunk_count' not in columns:
+        op.add_column('ai_assistant_documents', sa.Column('chunk_count', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('ai_assistant_documents') as batch_op:
+        batch_op.drop_column('chunk_count')
@@ -0,0 +1,64 @@
+"""Invitations groupées (invitation_batches) et suivi d'envoi des invitations
+
+Revision ID: 1ddbc281cb21
+Revises: 5ae54e53adcc
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1ddbc281cb21'
+down_revision = '5ae54e53adcc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('invitation_batches'):
+        op.create_table(
+            'invitation_batches',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('organization_id', sa.String(36), nullable=False),
+            sa.Column('created_by', sa.Integer(), nullable=False),
+            sa.Column('role', sa.String(50), nullable=False),
+            sa.Column('message', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(20), nullable=False, server_default='processing'),
+            sa.Column('total', sa.Integer(), nullable=True),
+            sa.Column('created_count', sa.Integer(), nullable=True),
+            sa.Column('sent_count', sa.Integer(), nullable=True),
+            sa.Column('results', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+    op.create_index('ix_invitation_batches_organization_id', 'invitation_batches', ['organization_id'],
+                    if_not_exists=True)
+
+    # Les invitations existantes n'appartiennent à aucun lot : batch_id et email_sent_at restent NULL
+    columns = {column['name'] for column in inspector.get_columns('invitations')}
+    with op.batch_alter_table('invitations') as batch_op:
+        if 'batch_id' not in columns:
+            batch_op.add_column(sa.Column('batch_id', sa.String(36), nullable=True))
+            batch_op.create_foreign_key('fk_invitations_batch_id', 'invitation_batches', ['batch_id'], ['id'])
+        if 'email_sent_at' not in columns:
+            batch_op.add_column(sa.Column('email_sent_at', sa.DateTime(), nullable=True))
+
+    op.create_index('ix_invitations_batch_id', 'invitations', ['batch_id'], if_not_exists=True)
+    op.create_index('ix_invitations_org_email_status', 'invitations', ['organization_id', 'email', 'status'],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_invitations_org_email_status', table_name='invitations', if_exists=True)
+    op.drop_index('ix_invitations_batch_id', table_name='invitations', if_exists=True)
+    with op.batch_alter_table('invitations') as batch_op:
+        batch_op.drop_constraint('fk_invitations_batch_id', type_='foreignkey')
+        batch_op.drop_column('email_sent_at')
+        batch_op.drop_column('batch_id')
+
+    op.drop_index('ix_invitation_batches_organization_id', table_name='invitation_batches', if_exists=True)
+    op.drop_table('invitation_batches')
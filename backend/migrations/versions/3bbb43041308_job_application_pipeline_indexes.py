@@ -0,0 +1,27 @@
+"""Index des listes de candidatures par offre (job_applications)
+
+Revision ID: 3bbb43041308
+Revises: 52570f7bbb3f
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3bbb43041308'
+down_revision = '52570f7bbb3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_job_applications_job_created', 'job_applications', ['job_posting_id', 'created_at', 'id'],
+                    if_not_exists=True)
+    op.create_index('ix_job_applications_job_status', 'job_applications', ['job_posting_id', 'status'],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_job_applications_job_status', table_name='job_applications', if_exists=True)
+    op.drop_index('ix_job_applications_job_created', table_name='job_applications', if_exists=True)
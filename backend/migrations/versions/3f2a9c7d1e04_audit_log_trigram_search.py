@@ -0,0 +1,77 @@
+"""Archive des logs d'audit, index de pagination et recherche trigramme (pg_trgm)
+
+Revision ID: 3f2a9c7d1e04
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c7d1e04'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index, table, colonnes) : pagination par organisation, historique d'une entité, archivage
+BTREE_INDEXES = (
+    ('ix_audit_logs_org_created', 'audit_logs', ['organization_id', 'created_at', 'id']),
+    ('ix_audit_logs_org_entity', 'audit_logs', ['organization_id', 'entity_type', 'entity_id', 'created_at']),
+    ('ix_audit_logs_created', 'audit_logs', ['created_at']),
+    ('ix_audit_logs_archive_org_created', 'audit_logs_archive', ['organization_id', 'created_at', 'id']),
+    ('ix_audit_logs_archive_org_entity', 'audit_logs_archive',
+     ['organization_id', 'entity_type', 'entity_id', 'created_at']),
+    ('ix_audit_logs_archive_created', 'audit_logs_archive', ['created_at']),
+)
+
+# (index, table) : ILIKE '%terme%' sur la description
+TRIGRAM_INDEXES = (
+    ('ix_audit_logs_description_trgm', 'audit_logs'),
+    ('ix_audit_logs_archive_description_trgm', 'audit_logs_archive'),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not sa.inspect(bind).has_table('audit_logs_archive'):
+        # Pas de clés étrangères : l'archive survit aux utilisateurs et organisations supprimés
+        op.create_table(
+            'audit_logs_archive',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('organization_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('action', sa.String(50), nullable=False),
+            sa.Column('entity_type', sa.String(50), nullable=False),
+            sa.Column('entity_id', sa.String(50), nullable=True),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('data', sa.JSON(), nullable=True),
+            sa.Column('ip_address', sa.String(45), nullable=True),
+            sa.Column('user_agent', sa.String(255), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=True),
+        )
+
+    for index, table, columns in BTREE_INDEXES:
+        op.create_index(index, table, columns, if_not_exists=True)
+
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index, table in TRIGRAM_INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (description gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for index, _ in TRIGRAM_INDEXES:
+            op.execute(f'DROP INDEX IF EXISTS {index}')
+
+    for index, table, _ in BTREE_INDEXES:
+        if table == 'audit_logs':
+            op.drop_index(index, table_name=table, if_exists=True)
+
+    # L'archive contient des logs qui ne sont plus dans audit_logs : elle est conservée
@@ -0,0 +1,51 @@
+"""Compteur de candidatures dénormalisé et index du job board (job_postings)
+
+Revision ID: 52570f7bbb3f
+Revises: 1ddbc281cb21
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '52570f7bbb3f'
+down_revision = '1ddbc281cb21'
+branch_labels = None
+depends_on = None
+
+job_postings = sa.table(
+    'job_postings',
+    sa.column('id', sa.String),
+    sa.column('application_count', sa.Integer),
+)
+
+job_applications = sa.table(
+    'job_applications',
+    sa.column('id', sa.String),
+    sa.column('job_posting_id', sa.String),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('job_postings')}
+    if 'application_count' not in columns:
+        op.add_column('job_postings', sa.Column('application_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('ix_job_postings_status_published', 'job_postings', ['status', 'published_at', 'id'],
+                    if_not_exists=True)
+
+    # Même sous-requête que JobBoardService.recount_applications
+    count = sa.select(sa.func.count(job_applications.c.id)).where(
+        job_applications.c.job_posting_id == job_postings.c.id
+    ).scalar_subquery()
+    bind.execute(job_postings.update().values(application_count=count))
+
+
+def downgrade():
+    op.drop_index('ix_job_postings_status_published', table_name='job_postings', if_exists=True)
+    with op.batch_alter_table('job_postings') as batch_op:
+        batch_op.drop_column('application_count')
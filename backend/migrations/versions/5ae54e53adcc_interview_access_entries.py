@@ -0,0 +1,113 @@
+"""Table d'accès aux entretiens (interview_access_entries) et reconstruction depuis les partages
+
+Revision ID: 5ae54e53adcc
+Revises: 895dffe7697e
+Create Date: 2026-10-19 11:10:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5ae54e53adcc'
+down_revision = '895dffe7697e'
+branch_labels = None
+depends_on = None
+
+interview_shares = sa.table(
+    'interview_shares',
+    sa.column('id', sa.Integer),
+    sa.column('interview_id', sa.Integer),
+    sa.column('shared_with_id', sa.Integer),
+    sa.column('permission_level', sa.String),
+    sa.column('expires_at', sa.DateTime),
+)
+
+team_interview_access = sa.table(
+    'team_interview_access',
+    sa.column('team_id', sa.String),
+    sa.column('interview_id', sa.Integer),
+    sa.column('permission_level', sa.String),
+    sa.column('expires_at', sa.DateTime),
+)
+
+team_members = sa.table(
+    'team_members',
+    sa.column('team_id', sa.String),
+    sa.column('user_id', sa.Integer),
+)
+
+interview_access_entries = sa.table(
+    'interview_access_entries',
+    sa.column('user_id', sa.Integer),
+    sa.column('interview_id', sa.Integer),
+    sa.column('permission_level', sa.String),
+    sa.column('source_type', sa.String),
+    sa.column('source_id', sa.String),
+    sa.column('expires_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+
+ENTRY_COLUMNS = ['user_id', 'interview_id', 'permission_level', 'source_type', 'source_id', 'expires_at', 'updated_at']
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not sa.inspect(bind).has_table('interview_access_entries'):
+        op.create_table(
+            'interview_access_entries',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('interview_id', sa.Integer(), sa.ForeignKey('interviews.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('permission_level', sa.String(20), nullable=False, server_default='viewer'),
+            sa.Column('source_type', sa.String(10), nullable=False),
+            sa.Column('source_id', sa.String(36), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('user_id', 'interview_id', 'source_type', 'source_id',
+                                name='unique_interview_access_source'),
+        )
+    op.create_index('ix_interview_access_user_interview', 'interview_access_entries', ['user_id', 'interview_id'],
+                    if_not_exists=True)
+    op.create_index('ix_interview_access_expires', 'interview_access_entries', ['expires_at'], if_not_exists=True)
+
+    rebuild(bind)
+
+
+def rebuild(bind):
+    """Reconstruit les accès depuis les partages et les équipes (même règle que InterviewAclService.rebuild)"""
+    now = sa.literal(datetime.utcnow(), sa.DateTime)
+
+    bind.execute(interview_access_entries.delete())
+
+    bind.execute(interview_access_entries.insert().from_select(ENTRY_COLUMNS, sa.select(
+        interview_shares.c.shared_with_id,
+        interview_shares.c.interview_id,
+        interview_shares.c.permission_level,
+        sa.literal('share', sa.String),
+        sa.cast(interview_shares.c.id, sa.String(36)),
+        interview_shares.c.expires_at,
+        now
+    )))
+
+    bind.execute(interview_access_entries.insert().from_select(ENTRY_COLUMNS, sa.select(
+        team_members.c.user_id,
+        team_interview_access.c.interview_id,
+        team_interview_access.c.permission_level,
+        sa.literal('team', sa.String),
+        team_interview_access.c.team_id,
+        team_interview_access.c.expires_at,
+        now
+    ).select_from(
+        team_interview_access.join(team_members, team_members.c.team_id == team_interview_access.c.team_id)
+    )))
+
+
+def downgrade():
+    op.drop_index('ix_interview_access_expires', table_name='interview_access_entries', if_exists=True)
+    op.drop_index('ix_interview_access_user_interview', table_name='interview_access_entries', if_exists=True)
+    op.drop_table('interview_access_entries')
@@ -0,0 +1,50 @@
+"""File des webhooks Stripe (stripe_webhook_events) et index des paiements par ID externe
+
+Revision ID: 5e429d6142b0
+Revises: 0e301d8644bd
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e429d6142b0'
+down_revision = '0e301d8644bd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('stripe_webhook_events'):
+        op.create_table(
+            'stripe_webhook_events',
+            sa.Column('id', sa.String(255), primary_key=True),
+            sa.Column('type', sa.String(100), nullable=False),
+            sa.Column('customer_id', sa.String(255), nullable=True),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('stripe_created_at', sa.DateTime(), nullable=False),
+            sa.Column('received_at', sa.DateTime(), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('processed_at', sa.DateTime(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+        )
+    op.create_index('ix_stripe_webhook_events_queue', 'stripe_webhook_events',
+                    ['status', 'stripe_created_at', 'received_at'], if_not_exists=True)
+    op.create_index('ix_stripe_webhook_events_customer', 'stripe_webhook_events',
+                    ['customer_id', 'stripe_created_at'], if_not_exists=True)
+
+    # Rapprochement des webhooks avec les paiements existants
+    op.create_index('ix_payments_external_payment_id', 'payments', ['external_payment_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_payments_external_payment_id', table_name='payments', if_exists=True)
+    op.drop_index('ix_stripe_webhook_events_customer', table_name='stripe_webhook_events', if_exists=True)
+    op.drop_index('ix_stripe_webhook_events_queue', table_name='stripe_webhook_events', if_exists=True)
+    op.drop_table('stripe_webhook_events')
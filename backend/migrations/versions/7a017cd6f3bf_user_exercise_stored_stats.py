@@ -0,0 +1,38 @@
+"""Statistiques enregistrées des sessions d'exercices (user_exercises)
+
+Revision ID: 7a017cd6f3bf
+Revises: 3bbb43041308
+Create Date: 2026-10-19 11:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a017cd6f3bf'
+down_revision = '3bbb43041308'
+branch_labels = None
+depends_on = None
+
+# Sessions existantes : exercise_stats NULL, recalculées entièrement au prochain refresh_stats
+def stats_columns():
+    return [
+        sa.Column('exercises_attempted', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('max_score', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('exercise_stats', sa.JSON(), nullable=True),
+        sa.Column('stats_updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('user_exercises')}
+    for column in stats_columns():
+        if column.name not in columns:
+            op.add_column('user_exercises', column)
+
+
+def downgrade():
+    with op.batch_alter_table('user_exercises') as batch_op:
+        for column in reversed(stats_columns()):
+            batch_op.drop_column(column.name)
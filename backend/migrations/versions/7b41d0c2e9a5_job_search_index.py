@@ -0,0 +1,143 @@
+"""Index de recherche des offres (GIN PostgreSQL, FTS5 SQLite) et indexation des offres existantes
+
+Revision ID: 7b41d0c2e9a5
+Revises: 3f2a9c7d1e04
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b41d0c2e9a5'
+down_revision = '3f2a9c7d1e04'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+JOB_SEARCH_VECTOR = (
+    "setweight(to_tsvector('french', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('french', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('french', coalesce(body, '')), 'C')"
+)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS job_search_fts USING fts5("
+    "job_posting_id UNINDEXED, title, skills, body, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_ai AFTER INSERT ON job_search_documents BEGIN "
+    "INSERT INTO job_search_fts(job_posting_id, title, skills, body) "
+    "VALUES (new.job_posting_id, new.title, new.skills, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_au AFTER UPDATE ON job_search_documents BEGIN "
+    "DELETE FROM job_search_fts WHERE job_posting_id = old.job_posting_id; "
+    "INSERT INTO job_search_fts(job_posting_id, title, skills, body) "
+    "VALUES (new.job_posting_id, new.title, new.skills, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS job_search_documents_ad AFTER DELETE ON job_search_documents BEGIN "
+    "DELETE FROM job_search_fts WHERE job_posting_id = old.job_posting_id; END",
+)
+
+job_postings = sa.table(
+    'job_postings',
+    sa.column('id', sa.String),
+    sa.column('title', sa.Text),
+    sa.column('description', sa.Text),
+    sa.column('requirements', sa.Text),
+    sa.column('responsibilities', sa.Text),
+    sa.column('skills', sa.JSON),
+)
+
+job_search_documents = sa.table(
+    'job_search_documents',
+    sa.column('job_posting_id', sa.String),
+    sa.column('title', sa.Text),
+    sa.column('skills', sa.Text),
+    sa.column('body', sa.Text),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def skills_text(skills):
+    """Compétences extraites aplaties (même règle que JobSearchIndex._skills_text)"""
+    if not skills:
+        return None
+    if isinstance(skills, dict):
+        return ' '.join(filter(None, (skills_text(value) for value in skills.values()))) or None
+    if isinstance(skills, (list, tuple)):
+        return ' '.join(filter(None, (skills_text(value) for value in skills))) or None
+    return str(skills)
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if not sa.inspect(bind).has_table('job_search_documents'):
+        op.create_table(
+            'job_search_documents',
+            sa.Column('job_posting_id', sa.String(36),
+                      sa.ForeignKey('job_postings.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('title', sa.Text(), nullable=True),
+            sa.Column('skills', sa.Text(), nullable=True),
+            sa.Column('body', sa.Text(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+    if dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_job_search_documents_vector "
+            f"ON job_search_documents USING gin (({JOB_SEARCH_VECTOR}))"
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Documents écrits avant les triggers
+        op.execute("DELETE FROM job_search_fts")
+        op.execute(
+            "INSERT INTO job_search_fts(job_posting_id, title, skills, body) "
+            "SELECT job_posting_id, title, skills, body FROM job_search_documents"
+        )
+
+    backfill(bind)
+
+
+def backfill(bind):
+    """Indexe les offres qui n'ont pas encore de document (les triggers alimentent FTS5)"""
+    missing = sa.select(
+        job_postings.c.id,
+        job_postings.c.title,
+        job_postings.c.description,
+        job_postings.c.requirements,
+        job_postings.c.responsibilities,
+        job_postings.c.skills
+    ).where(
+        ~sa.exists().where(job_search_documents.c.job_posting_id == job_postings.c.id)
+    ).order_by(job_postings.c.id).limit(BATCH_SIZE)
+
+    while True:
+        rows = bind.execute(missing).fetchall()
+        if not rows:
+            break
+        now = datetime.utcnow()
+        bind.execute(job_search_documents.insert(), [
+            {
+                'job_posting_id': row.id,
+                'title': row.title,
+                'skills': skills_text(row.skills),
+                'body': '\n'.join(part for part in (row.description, row.requirements, row.responsibilities) if part),
+                'updated_at': now
+            }
+            for row in rows
+        ])
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_job_search_documents_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('job_search_documents_ai', 'job_search_documents_au', 'job_search_documents_ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS job_search_fts")
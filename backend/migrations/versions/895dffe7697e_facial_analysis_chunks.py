@@ -0,0 +1,42 @@
+"""Stockage colonnaire des frames d'analyse faciale (facial_analysis_chunks)
+
+Revision ID: 895dffe7697e
+Revises: c58e13a7f6b2
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '895dffe7697e'
+down_revision = 'c58e13a7f6b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('facial_analysis_chunks'):
+        op.create_table(
+            'facial_analysis_chunks',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('interview_id', sa.Integer(), sa.ForeignKey('interviews.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('chunk_index', sa.Integer(), nullable=False),
+            sa.Column('start_timestamp', sa.Integer(), nullable=False),
+            sa.Column('end_timestamp', sa.Integer(), nullable=False),
+            sa.Column('frame_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('emotion_columns', sa.JSON(), nullable=False),
+            sa.Column('timestamps_blob', sa.LargeBinary(), nullable=False),
+            sa.Column('values_blob', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('interview_id', 'chunk_index', name='uq_facial_chunk_interview_index'),
+        )
+    op.create_index('ix_facial_analysis_chunks_interview_id', 'facial_analysis_chunks', ['interview_id'],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_facial_analysis_chunks_interview_id', table_name='facial_analysis_chunks', if_exists=True)
+    op.drop_table('facial_analysis_chunks')
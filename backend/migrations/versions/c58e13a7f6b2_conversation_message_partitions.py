@@ -0,0 +1,88 @@
+"""Conversations d'assistants et messages partitionnés (PostgreSQL)
+
+Revision ID: c58e13a7f6b2
+Revises: 7b41d0c2e9a5
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c58e13a7f6b2'
+down_revision = '7b41d0c2e9a5'
+branch_labels = None
+depends_on = None
+
+PARTITIONS = 16
+
+
+def guid():
+    """Même stockage que models.organization.GUID : UUID natif sur PostgreSQL, CHAR(36) ailleurs"""
+    return sa.CHAR(36).with_variant(postgresql.UUID(), 'postgresql')
+
+
+def is_partitioned(bind):
+    """La table est partitionnée (PARTITION BY HASH sans partitions, les insertions échouent)"""
+    relkind = bind.execute(sa.text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = 'ai_conversation_messages' AND n.nspname = current_schema()"
+    )).scalar()
+    return relkind == 'p'
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table('ai_conversations'):
+        op.create_table(
+            'ai_conversations',
+            sa.Column('id', guid(), primary_key=True),
+            sa.Column('assistant_id', guid(), sa.ForeignKey('ai_assistants.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('user_id', guid(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('title', sa.String(255), nullable=True),
+            sa.Column('summary', sa.Text(), nullable=True),
+            sa.Column('summary_through', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('pending_tokens', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+    op.create_index(
+        'ix_ai_conversations_assistant_user_updated', 'ai_conversations',
+        ['assistant_id', 'user_id', 'updated_at', 'id'], if_not_exists=True
+    )
+
+    if not inspector.has_table('ai_conversation_messages'):
+        # La clé primaire contient la clé de partitionnement (assistant_id)
+        op.create_table(
+            'ai_conversation_messages',
+            sa.Column('assistant_id', guid(), primary_key=True),
+            sa.Column('conversation_id', guid(), sa.ForeignKey('ai_conversations.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('sequence', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('role', sa.String(20), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('token_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            postgresql_partition_by='HASH (assistant_id)'
+        )
+
+    # Tables ordinaires (autres bases, ou créées sans partitionnement) : pas de partitions
+    if bind.dialect.name != 'postgresql' or not is_partitioned(bind):
+        return
+
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS ai_conversation_messages_p{remainder} "
+            f"PARTITION OF ai_conversation_messages "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def downgrade():
+    # Retirer les tables supprimerait les conversations : rien à défaire
+    pass
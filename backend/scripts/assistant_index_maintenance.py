@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# scripts/assistant_index_maintenance.py
+"""
+Reconstruction de l'index local des documents des assistants IA
+(extraction, découpage et compilation BM25).
+
+À lancer une fois après le déploiement pour indexer les documents existants,
+puis pour reprendre les documents en échec.
+
+Usage:
+    python scripts/assistant_index_maintenance.py [--assistant ID] [--failed-only]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app, db
+from app.models.ai_assistant import AIAssistantDocument
+from app.services.assistant_document_index import AssistantDocumentIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruction de l'index des documents d'assistants")
+    parser.add_argument('--assistant', default=None,
+                        help="Ne reconstruire que l'index de cet assistant")
+    parser.add_argument('--failed-only', action='store_true',
+                        help="Ne traiter que les assistants ayant des documents en attente ou en échec")
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'dev'))
+    with app.app_context():
+        query = db.session.query(AIAssistantDocument.assistant_id).distinct()
+        if args.assistant:
+            query = query.filter(AIAssistantDocument.assistant_id == args.assistant)
+        if args.failed_only:
+            query = query.filter(AIAssistantDocument.vector_index_status.in_(['pending', 'failed']))
+
+        # Instance dédiée : indexation synchrone, sans passer par le thread de l'application
+        index = AssistantDocumentIndex()
+        total = 0
+        for (assistant_id,) in query.all():
+            chunks = index.rebuild(assistant_id)
+            total += chunks
+            print(f"Assistant {assistant_id}: {chunks} chunk(s) indexé(s)")
+        print(f"Chunks indexés: {total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# scripts/audit_maintenance.py
+"""
+Maintenance des logs d'audit : archivage de la fenêtre chaude puis purge de l'archive.
+
+Usage:
+    python scripts/audit_maintenance.py [--archive-after JOURS] [--retain JOURS] [--max-batches N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.services.audit_storage import AuditLogStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivage et rétention des logs d'audit")
+    parser.add_argument('--archive-after', type=int, default=None,
+                        help="Archiver les logs plus anciens que ce nombre de jours (AUDIT_HOT_RETENTION_DAYS)")
+    parser.add_argument('--retain', type=int, default=None,
+                        help="Supprimer les logs archivés plus anciens que ce nombre de jours (AUDIT_RETENTION_DAYS)")
+    parser.add_argument('--max-batches', type=int, default=None,
+                        help="Nombre maximum de lots archivés par exécution")
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'dev'))
+    with app.app_context():
+        store = AuditLogStore()
+        archived = store.archive_old_logs(args.archive_after, max_batches=args.max_batches)
+        purged = store.purge_archive(args.retain)
+        print(f"Logs d'audit archivés: {archived}, purgés de l'archive: {purged}")
+
+
+if __name__ == '__main__':
+    main()
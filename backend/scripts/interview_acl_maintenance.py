@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# scripts/interview_acl_maintenance.py
+"""
+Maintenance de la table d'accès aux entretiens (interview_access_entries).
+
+Usage:
+    python scripts/interview_acl_maintenance.py           # purge des accès expirés
+    python scripts/interview_acl_maintenance.py --rebuild # reconstruction complète (la migration 5ae54e53adcc initialise la table)
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.services.collaboration_access import InterviewAclService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance des accès aux entretiens")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Reconstruire la table depuis les partages et les équipes")
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'dev'))
+    with app.app_context():
+        acl_service = InterviewAclService()
+        if args.rebuild:
+            print(f"Accès reconstruits: {acl_service.rebuild()}")
+        print(f"Accès expirés supprimés: {acl_service.sweep_expired()}")
+
+
+if __name__ == '__main__':
+    main()
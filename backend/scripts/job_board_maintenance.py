@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# scripts/job_board_maintenance.py
+"""
+Maintenance du job board public : recalcul du compteur dénormalisé
+application_count et reconstruction de l'index de recherche des offres.
+
+L'index de recherche est créé et alimenté par la migration 7b41d0c2e9a5
+(`flask db upgrade`) ; --reindex le reconstruit en cas de doute.
+
+Usage:
+    python scripts/job_board_maintenance.py [--skip-recount] [--reindex]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.services.job_board_service import JobBoardService
+from app.services.job_search_service import JobSearchIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance du job board public")
+    parser.add_argument('--skip-recount', action='store_true',
+                        help="Ne pas recalculer les compteurs de candidatures")
+    parser.add_argument('--reindex', action='store_true',
+                        help="Reconstruire l'index de recherche des offres")
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'dev'))
+    with app.app_context():
+        if not args.skip_recount:
+            updated = JobBoardService().recount_applications()
+            print(f"Compteurs de candidatures recalculés pour {updated} offre(s)")
+        if args.reindex:
+            indexed = JobSearchIndex().rebuild()
+            print(f"Offres réindexées: {indexed}")
+
+
+if __name__ == '__main__':
+    main()
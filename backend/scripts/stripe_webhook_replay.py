@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# scripts/stripe_webhook_replay.py
+"""
+Rejeu local des webhooks Stripe et maintenance de leur file de traitement.
+
+`replay` signe des événements enregistrés (fichiers .json contenant un
+événement ou une liste, fichiers .jsonl, ou répertoires de fichiers) avec
+STRIPE_WEBHOOK_SECRET et les envoie à la route webhook via le client de test
+Flask : tout le chemin (vérification, enregistrement, traitement) est
+exercé sans réseau. --repeat sans --unique-ids rejoue les mêmes IDs (test de
+déduplication) ; avec --unique-ids, chaque répétition est un nouvel
+événement (test de charge).
+
+Usage:
+    python scripts/stripe_webhook_replay.py replay FIXTURE [FIXTURE ...] [--repeat N] [--unique-ids] [--drain]
+    python scripts/stripe_webhook_replay.py requeue [--id EVENT_ID ...]
+    python scripts/stripe_webhook_replay.py purge [--retain JOURS]
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.services.stripe_webhook_service import get_stripe_webhook_processor
+
+WEBHOOK_URL = '/api/subscriptions/webhook'
+
+
+def load_fixtures(paths):
+    """Événements des fichiers (ou répertoires) de fixtures, dans l'ordre"""
+    events = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith(('.json', '.jsonl'))
+            )
+            events.extend(load_fixtures(files))
+            continue
+
+        with open(path, encoding='utf-8') as fixture:
+            if path.endswith('.jsonl'):
+                events.extend(json.loads(line) for line in fixture if line.strip())
+            else:
+                data = json.load(fixture)
+                events.extend(data if isinstance(data, list) else [data])
+    return events
+
+
+def sign(payload, secret, timestamp=None):
+    """En-tête Stripe-Signature d'un corps (schéma v1 : HMAC-SHA256 de 't.corps')"""
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def replay(app, args):
+    events = load_fixtures(args.fixtures)
+    if not events:
+        print("Aucun événement dans les fixtures")
+        return
+
+    secret = app.config['STRIPE_WEBHOOK_SECRET']
+    client = app.test_client()
+    statuses = {}
+    duplicates = 0
+    latencies = []
+
+    started = time.perf_counter()
+    for round_number in range(args.repeat):
+        for event in events:
+            if args.unique_ids and round_number:
+                event = dict(event, id=f"{event['id']}_r{round_number}")
+            payload = json.dumps(event)
+
+            sent = time.perf_counter()
+            response = client.post(
+                WEBHOOK_URL,
+                data=payload,
+                content_type='application/json',
+                headers={'Stripe-Signature': sign(payload, secret)}
+            )
+            latencies.append((time.perf_counter() - sent) * 1000)
+
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if (response.get_json(silent=True) or {}).get('duplicate'):
+                duplicates += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"Événements envoyés: {len(latencies)} en {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"Réponses: {statuses}, doublons ignorés: {duplicates}")
+    print(f"Accusé de réception (ms): p50={percentile(latencies, 0.5):.1f} "
+          f"p95={percentile(latencies, 0.95):.1f} max={max(latencies):.1f}")
+
+    if args.drain:
+        processor = get_stripe_webhook_processor()
+        started = time.perf_counter()
+        handled = 0
+        while True:
+            count = processor.process_pending()
+            if not count:
+                break
+            handled += count
+        print(f"Événements traités par le rejeu: {handled} en {time.perf_counter() - started:.2f}s")
+        print(f"File: {processor.get_stats()['queue']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu et maintenance des webhooks Stripe")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = subparsers.add_parser('replay', help="Rejouer des événements enregistrés")
+    replay_parser.add_argument('fixtures', nargs='+', help="Fichiers .json/.jsonl ou répertoires")
+    replay_parser.add_argument('--repeat', type=int, default=1, help="Nombre de passes sur les fixtures")
+    replay_parser.add_argument('--unique-ids', action='store_true',
+                               help="Nouvel ID d'événement à chaque passe (sinon doublons)")
+    replay_parser.add_argument('--drain', action='store_true',
+                               help="Traiter la file jusqu'au bout avant de rendre la main")
+
+    requeue_parser = subparsers.add_parser('requeue', help="Remettre en file les événements abandonnés")
+    requeue_parser.add_argument('--id', dest='event_ids', action='append',
+                                help="ID d'événement à retraiter (répétable ; défaut : tous les 'dead')")
+
+    purge_parser = subparsers.add_parser('purge', help="Supprimer les événements traités anciens")
+    purge_parser.add_argument('--retain', type=int, default=None,
+                              help="Conserver ce nombre de jours (STRIPE_WEBHOOK_RETENTION_DAYS)")
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'dev'))
+    with app.app_context():
+        processor = get_stripe_webhook_processor()
+        if args.command == 'replay':
+            replay(app, args)
+        elif args.command == 'requeue':
+            print(f"Événements remis en file: {processor.requeue(event_ids=args.event_ids)}")
+        else:
+            print(f"Événements purgés: {processor.purge(args.retain)}")
+
+
+if __name__ == '__main__':
+    main()
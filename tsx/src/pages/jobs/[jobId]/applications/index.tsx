@@ -503,7 +503,7 @@ export default function JobApplicationsPage() {
                           <div className="mb-4">
                             <h4 className="text-sm font-medium text-gray-900 mb-2">Lettre de motivation :</h4>
                             <p className="text-sm text-gray-700 bg-gray-50 p-3 rounded-md">
-                              {application.cover_letter.length > 200 
+                              {application.cover_letter_truncated || application.cover_letter.length > 200 
                                 ? `${application.cover_letter.substring(0, 200)}...` 
                                 : application.cover_letter}
                             </p>
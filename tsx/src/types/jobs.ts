@@ -48,6 +48,7 @@ export interface JobApplication {
   candidate_phone: string | null;
   resume_url: string | null;
   cover_letter: string | null;
+  cover_letter_truncated?: boolean;
   status: ApplicationStatus;
   notes: string | null;
   source: string | null;